@@ -0,0 +1,65 @@
+"""
+Documents per second for a whole class rendered in one process versus
+across worker pools of increasing size.
+
+Run from the repository root:
+    python -m benchmarks.bench_bulk_render
+"""
+import os
+import time
+import tempfile
+
+from benchmarks.common import sample_answers, print_table
+from core.render_pool import create_render_pool, render_document, render_many, _warm_up_worker
+
+STUDENTS = 60
+ANSWERS_PER_STUDENT = 10
+
+
+def worker_counts() -> list[int]:
+    """1, 2, 4, ... up to the number of CPUs."""
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def main():
+    output_dir = tempfile.mkdtemp()
+    answers = sample_answers(ANSWERS_PER_STUDENT)
+    jobs = [(f"Student {idx}", "Group", answers, "pdf") for idx in range(STUDENTS)]
+    
+    headers = ["workers", "time", "docs/s", "scaling"]
+    rows = []
+    
+    _warm_up_worker()
+    started = time.perf_counter()
+    for student_name, group, student_answers, output_format in jobs:
+        render_document(output_format, student_answers, student_name, group, os.path.join(output_dir, student_name))
+    baseline = STUDENTS / (time.perf_counter() - started)
+    rows.append(["in-process", f"{STUDENTS / baseline:.2f}s", f"{baseline:.1f}", "1.00x"])
+    print_table(headers, rows[-1:])
+    
+    for workers in worker_counts():
+        pool = create_render_pool(workers)
+        # Start and warm every worker before timing
+        for future in [pool.submit(_warm_up_worker) for _ in range(workers)]:
+            future.result()
+        started = time.perf_counter()
+        results = render_many(jobs, output_dir, pool=pool)
+        elapsed = time.perf_counter() - started
+        pool.shutdown()
+        assert all(result.error is None for result in results)
+        rows.append([workers, f"{elapsed:.2f}s", f"{STUDENTS / elapsed:.1f}", f"{STUDENTS / elapsed / baseline:.2f}x"])
+        print_table(headers, rows[-1:])
+    
+    print()
+    print(f"{STUDENTS} students x {ANSWERS_PER_STUDENT} answers, PDF, {os.cpu_count()} CPUs")
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
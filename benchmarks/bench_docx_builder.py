@@ -0,0 +1,90 @@
+"""
+Compare the python-docx object API with the bulk template builder for
+Word output: a class of small documents, long essays and a big batch.
+
+Run from the repository root:
+    python -m benchmarks.bench_docx_builder
+"""
+import os
+import time
+import tempfile
+
+from docx import Document
+
+from benchmarks.common import SAMPLE_ESSAY, sample_answers, print_table
+from core.document_generator import DocumentGenerator
+from core.document_styles import get_style_registry
+from utils.text_utils import parse_markdown, block_runs
+
+ROUNDS = 5
+
+CASES = [
+    # (name, documents, answers per document)
+    ("30 students x 5 answers", 30, sample_answers(5)),
+    ("5 x 20 long essays", 5, sample_answers(20, SAMPLE_ESSAY)),
+    ("1 x 1000 answers", 1, sample_answers(1000)),
+]
+
+
+def python_docx_word(exercises_with_answers, student_name: str, group: str, output_path: str):
+    """The previous behaviour: one python-docx call per paragraph and run."""
+    doc = Document()
+    font = doc.styles['Normal'].font
+    font.name, font.size = get_style_registry().random_word_font()
+    
+    p = doc.add_paragraph()
+    p.add_run('Student: ').bold = True
+    p.add_run(student_name)
+    p = doc.add_paragraph()
+    p.add_run('Group: ').bold = True
+    p.add_run(group)
+    doc.add_paragraph()
+    
+    for idx, (exercise_text, answer_text) in enumerate(exercises_with_answers, 1):
+        for block in parse_markdown(answer_text):
+            p = doc.add_paragraph()
+            for span in block_runs(block):
+                run = p.add_run(span.text)
+                if span.bold:
+                    run.bold = True
+                if span.italic:
+                    run.italic = True
+        if idx < len(exercises_with_answers):
+            doc.add_paragraph()
+    
+    doc.save(output_path)
+
+
+def bulk_word(exercises_with_answers, student_name: str, group: str, output_path: str):
+    """The template builder used by generate_word."""
+    DocumentGenerator.generate_word(exercises_with_answers, student_name, group, output_path)
+
+
+def best_time(render, documents: int, answers, output_dir: str) -> float:
+    """Best of ROUNDS renders of documents documents."""
+    times = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for idx in range(documents):
+            render(answers, f"Student {idx}", "Group", os.path.join(output_dir, f"doc_{idx}.docx"))
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    output_dir = tempfile.mkdtemp()
+    bulk_word(sample_answers(1), "Warm", "Up", os.path.join(output_dir, "warm_up.docx"))
+    
+    headers = ["case", "python-docx", "bulk builder", "speedup"]
+    rows = []
+    for name, documents, answers in CASES:
+        old = best_time(python_docx_word, documents, answers, output_dir)
+        new = best_time(bulk_word, documents, answers, output_dir)
+        rows.append([name, f"{old * 1000:.0f} ms", f"{new * 1000:.0f} ms", f"{old / new:.1f}x"])
+        print_table(headers, rows[-1:])
+    print()
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Opening an image in the full image viewer: the GUI thread blocked, time to
+the first and final pixels, and reopening a recently viewed image.
+Also times the PIL-to-QImage conversion against the previous
+tobytes-and-copy path.
+
+Run from the repository root:
+    python -m benchmarks.bench_full_image
+"""
+import os
+import time
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp()  # Cold thumbnail cache
+
+from PIL import Image as PILImage
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.common import print_table
+from utils.image_utils import pil_to_qimage
+from ui.image_viewer import FullImageLoader, ImageViewerWindow
+
+SCANS = {"A4 300 dpi": (2480, 3508), "A4 600 dpi": (4960, 7016)}
+MAX_SIZE = (1820, 980)  # A 1920x1080 screen less the window margins
+REPEATS = 5
+
+
+def copying_qimage(img: PILImage.Image) -> QImage:
+    """The previous conversion: an intermediate bytes object, then a copy."""
+    img_bytes = img.convert('RGB').tobytes("raw", "RGB")
+    return QImage(img_bytes, img.width, img.height, img.width * 3, QImage.Format.Format_RGB888).copy()
+
+
+def synchronous_open(path: str) -> float:
+    """The previous viewer: decode, scale and convert on the GUI thread."""
+    started = time.perf_counter()
+    with PILImage.open(path) as img:
+        img.thumbnail(MAX_SIZE, PILImage.Resampling.LANCZOS)
+        img_rgb = img.convert('RGB')
+    QPixmap.fromImage(copying_qimage(img_rgb))
+    return time.perf_counter() - started
+
+
+def viewer_open(app: QApplication, loader: FullImageLoader, path: str) -> tuple[float, float, float]:
+    """Open the viewer; get (GUI thread blocked, first pixels, final pixels) in seconds."""
+    started = time.perf_counter()
+    window = ImageViewerWindow(path, loader, MAX_SIZE)
+    blocked = time.perf_counter() - started
+    first = None
+    while not window.final:
+        app.processEvents()
+        if first is None and window.label.pixmap() is not None and not window.label.pixmap().isNull():
+            first = time.perf_counter() - started
+        time.sleep(0.001)
+    final = time.perf_counter() - started
+    window.close()
+    return blocked, first or final, final
+
+
+def timed(fn, *args) -> float:
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(*args)
+    return (time.perf_counter() - started) / REPEATS
+
+
+def main():
+    app = QApplication([])
+    folder = tempfile.mkdtemp()
+    
+    conversion_rows, viewer_rows = [], []
+    for name, size in SCANS.items():
+        path = os.path.join(folder, f"{size[0]}x{size[1]}.jpg")
+        PILImage.new("RGB", size, (240, 240, 235)).save(path, "JPEG", quality=85)
+        with PILImage.open(path) as img:
+            img.load()
+            conversion_rows.append([
+                name, f"{timed(copying_qimage, img) * 1000:.0f} ms", f"{timed(pil_to_qimage, img) * 1000:.0f} ms",
+                f"{size[0] * size[1] * 3 / 1024 / 1024:.0f} MB"
+            ])
+        
+        blocked = synchronous_open(path)
+        viewer_rows.append([name, "synchronous", f"{blocked * 1000:.0f} ms", f"{blocked * 1000:.0f} ms", f"{blocked * 1000:.0f} ms"])
+        loader = FullImageLoader()
+        for label in ("background", "reopen (LRU)"):
+            blocked, first, final = viewer_open(app, loader, path)
+            viewer_rows.append([name, label, f"{blocked * 1000:.1f} ms", f"{first * 1000:.0f} ms", f"{final * 1000:.0f} ms"])
+        loader.shutdown()
+    
+    print_table(["image", "tobytes + copy", "pil_to_qimage", "intermediate bytes avoided"], conversion_rows)
+    print()
+    print_table(["image", "viewer", "GUI thread blocked", "first pixels", "final pixels"], viewer_rows)
+    print(f"Scaled to fit {MAX_SIZE[0]}x{MAX_SIZE[1]}, {os.cpu_count()} CPUs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Memory and frame time of the selected-images list at 100, 1,000 and 5,000
+images: one widget row (thumbnail label and prompt editor) per image,
+as before, versus the virtualized table.
+Frame time is a full repaint after scrolling, averaged over 20 positions.
+
+Run from the repository root:
+    python -m benchmarks.bench_image_list
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+
+from benchmarks.common import run_isolated, print_table
+from utils.memory_utils import current_rss, format_bytes
+
+COUNTS = (100, 1000, 5000)
+SCROLL_STEPS = 20
+
+
+def make_pages(folder: str, count: int) -> list[str]:
+    """Write count small distinct pages (decoding cost is not what is measured)."""
+    from PIL import Image as PILImage
+    paths = []
+    for idx in range(count):
+        path = os.path.join(folder, f"page_{idx:04d}.jpg")
+        PILImage.new("RGB", (300, 420), (idx % 256, 128, 255 - idx % 256)).save(path, "JPEG")
+        paths.append(path)
+    return paths
+
+
+def widget_rows(paths: list[str]):
+    """The previous behaviour: a thumbnail label, name and prompt editor per image in a scroll area."""
+    from PyQt6.QtGui import QPixmap
+    from PyQt6.QtWidgets import QScrollArea, QWidget, QFormLayout, QLabel, QTextEdit, QHBoxLayout
+    from utils.image_utils import load_image_as_pixmap
+    
+    container = QWidget()
+    layout = QFormLayout(container)
+    for idx, path in enumerate(paths):
+        row = QWidget()
+        row_layout = QHBoxLayout(row)
+        thumbnail = QLabel()
+        thumbnail.setPixmap(load_image_as_pixmap(path) or QPixmap())
+        row_layout.addWidget(thumbnail)
+        row_layout.addWidget(QLabel(f"{idx + 1}. {os.path.basename(path)}"))
+        prompt_input = QTextEdit()
+        prompt_input.setMaximumHeight(60)
+        layout.addRow(row, prompt_input)
+    area = QScrollArea()
+    area.setWidgetResizable(True)
+    area.setWidget(container)
+    return area, area.verticalScrollBar(), area.viewport()
+
+
+def run_case(mode: str, count: int) -> dict:
+    """Show count images and measure RSS growth and frame time."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp()
+    from PyQt6.QtWidgets import QApplication, QWidget, QGridLayout
+    from ui.image_preview import ImagePreviewWidget
+    
+    app = QApplication([])
+    paths = make_pages(tempfile.mkdtemp(), count)
+    app.processEvents()
+    start_rss = current_rss()
+    
+    started = time.perf_counter()
+    if mode == "widgets":
+        window, scroll_bar, viewport = widget_rows(paths)
+    else:
+        window = QWidget()
+        preview = ImagePreviewWidget(window, QGridLayout(window), lambda path: None, lambda path: None)
+        preview.update_preview(paths)
+        scroll_bar = preview.table_view.verticalScrollBar()
+        viewport = preview.table_view.viewport()
+    window.resize(800, 600)
+    window.show()
+    app.processEvents()
+    shown = time.perf_counter() - started
+    
+    frames = []
+    for step in range(SCROLL_STEPS):
+        scroll_bar.setValue(scroll_bar.maximum() * step // (SCROLL_STEPS - 1))
+        frame_started = time.perf_counter()
+        viewport.repaint()
+        frames.append(time.perf_counter() - frame_started)
+        if mode == "model":
+            # Let the visible rows' thumbnails arrive, as they would between frames
+            while preview.thumbnail_loader.pending():
+                app.processEvents()
+                time.sleep(0.001)
+            app.processEvents()
+    
+    return {
+        "shown": shown,
+        "frame": sum(frames) / len(frames),
+        "rss_growth": current_rss() - start_rss
+    }
+
+
+def main():
+    headers = ["images", "mode", "time to show", "frame time", "RSS growth"]
+    rows = []
+    for count in COUNTS:
+        for mode in ("widgets", "model"):
+            result = run_isolated("benchmarks.bench_image_list", mode, count)
+            rows.append([
+                count, mode, f"{result['shown'] * 1000:.0f} ms",
+                f"{result['frame'] * 1000:.1f} ms", format_bytes(result["rss_growth"])
+            ])
+            print_table(headers, rows[-1:])
+    print()
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--case":
+        print(json.dumps(run_case(sys.argv[2], int(sys.argv[3]))))
+    else:
+        main()
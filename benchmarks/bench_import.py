@@ -0,0 +1,77 @@
+"""
+Importing a folder tree of scans: header-only validation on a thread pool
+versus validating by decoding every image, which is how bad files were
+found before (in the preview or a Gemini worker).
+
+Run from the repository root:
+    python -m benchmarks.bench_import [IMAGES]
+"""
+import os
+import sys
+import time
+import tempfile
+from PIL import Image as PILImage
+
+from benchmarks.common import print_table
+from core.image_import import import_images
+
+FOLDERS = 20
+SCAN_SIZE = (1240, 1754)  # A4 at 150 dpi
+
+
+def make_tree(root: str, count: int) -> int:
+    """Write count scans spread over FOLDERS subfolders, one in fifty truncated; get the number truncated."""
+    template = os.path.join(root, "template.jpg")
+    PILImage.new("RGB", SCAN_SIZE, (240, 240, 235)).save(template, "JPEG", quality=85)
+    with open(template, "rb") as f:
+        data = f.read()
+    os.remove(template)
+    
+    truncated = 0
+    for idx in range(count):
+        folder = os.path.join(root, f"student_{idx % FOLDERS}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"page_{idx}.jpg"), "wb") as f:
+            if idx % 50 == 49:
+                f.write(data[:len(data) // 2])
+                truncated += 1
+            else:
+                f.write(data)
+    return truncated
+
+
+def decode_all(root: str) -> int:
+    """The previous behaviour: a bad file is only found by decoding it."""
+    bad = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            try:
+                with PILImage.open(os.path.join(dirpath, name)) as img:
+                    img.load()
+            except OSError:
+                bad += 1
+    return bad
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    root = tempfile.mkdtemp()
+    truncated = make_tree(root, count)
+    
+    started = time.perf_counter()
+    bad = decode_all(root)
+    decoded = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    result = import_images([root])
+    imported = time.perf_counter() - started
+    
+    print_table(["mode", "time", "per 100 files", "rejected"], [
+        ["decode every image", f"{decoded:.2f}s", f"{decoded / count * 100 * 1000:.0f} ms", bad],
+        ["header-only import", f"{imported:.2f}s", f"{imported / count * 100 * 1000:.0f} ms", len(result.rejected)],
+    ])
+    print(f"{count} scans in {FOLDERS} folders ({truncated} truncated), {os.cpu_count()} CPUs")
+
+
+if __name__ == "__main__":
+    main()
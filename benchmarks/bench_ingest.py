@@ -0,0 +1,77 @@
+"""
+Preparing a batch of scans for preview and upload: the thumbnail, content
+hash, decoded-size estimate and upload payload each read from the file,
+as before, versus one ingestion pass that derives them all from one read.
+Thumbnails use a memory-only cache so every one is decoded.
+
+Run from the repository root:
+    python -m benchmarks.bench_ingest [IMAGES]
+"""
+import os
+import sys
+import time
+import tempfile
+
+from benchmarks.common import print_table
+from benchmarks.bench_thumbnail_cache import make_scans
+from core.answer_cache import hash_file
+from core.image_store import ImageStore
+from utils.memory_utils import estimate_decoded_size
+from utils.thumbnail_cache import ThumbnailCache
+from PIL import Image as PILImage
+
+
+def read_io() -> int:
+    """Bytes this process has read through read() calls so far (0 where unknown)."""
+    try:
+        with open("/proc/self/io") as f:
+            return int(next(line for line in f if line.startswith("rchar:")).split()[1])
+    except (OSError, StopIteration):
+        return 0
+
+
+def separate(paths: list[str]):
+    """The previous behaviour: every consumer opens the file itself."""
+    cache = ThumbnailCache(None)
+    for path in paths:
+        cache.get(path)
+        hash_file(path)
+        estimate_decoded_size(path)
+        with PILImage.open(path) as img:
+            img.get_format_mimetype()
+        with open(path, "rb") as f:
+            f.read()
+
+
+def ingested(paths: list[str], mmap_threshold: int):
+    store = ImageStore(ThumbnailCache(None), mmap_threshold=mmap_threshold)
+    for path in paths:
+        store.ingest(path)
+        store.content_hash(path)
+        store.decoded_size(path)
+        store.payload(path)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    paths = make_scans(tempfile.mkdtemp(), count)
+    size = sum(os.path.getsize(path) for path in paths)
+    
+    rows = []
+    for name, fn in [
+        ("separate reads", lambda: separate(paths)),
+        ("ingest, read()", lambda: ingested(paths, mmap_threshold=sys.maxsize)),
+        ("ingest, mmap", lambda: ingested(paths, mmap_threshold=0)),
+    ]:
+        fn()  # Warm the page cache so only the work differs
+        read_before = read_io()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        rows.append([name, f"{elapsed * 1000:.0f} ms", f"{(read_io() - read_before) / size:.1f}x"])
+    print_table(["mode", "time", "bytes read / file size"], rows)
+    print(f"{count} A4 scans, {size / count / 1024:.0f} KB each")
+
+
+if __name__ == "__main__":
+    main()
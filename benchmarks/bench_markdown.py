@@ -0,0 +1,75 @@
+"""
+Parse throughput on very long essay answers: the old per-format regex
+passes against the single-pass parser shared by the PDF and Word renderers.
+
+Run from the repository root:
+    python -m benchmarks.bench_markdown
+"""
+import time
+
+from benchmarks.common import SAMPLE_ESSAY, print_table
+from utils.text_utils import (
+    convert_markdown_bold_to_html, split_markdown_bold, parse_markdown, to_reportlab_markup
+)
+
+PARAGRAPHS = (100, 1000, 10000)
+ROUNDS = 5
+
+ESSAY_PARAGRAPH = (
+    "Technology has **changed** the way *students* learn, and teachers "
+    "now set __longer__ projects & research tasks < than before. " * 4
+)
+
+
+def make_essay(paragraphs: int) -> str:
+    """Build an essay answer with a title and paragraphs paragraphs."""
+    return SAMPLE_ESSAY.split('\n')[0] + "\n" + "\n\n".join([ESSAY_PARAGRAPH] * paragraphs)
+
+
+def old_both_formats(text: str):
+    """The previous behaviour: one regex pass for PDF, one per line for Word."""
+    convert_markdown_bold_to_html(text).replace('\n', '<br/>')
+    for line in text.split('\n'):
+        split_markdown_bold(line.strip())
+
+
+def new_both_formats(text: str):
+    """Parse once (uncached) and render markup; Word reuses the cached parse."""
+    parse_markdown.cache_clear()
+    to_reportlab_markup(parse_markdown(text))
+    parse_markdown(text)
+
+
+def best_time(func, text: str) -> float:
+    """Best of ROUNDS calls."""
+    times = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        func(text)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    headers = ["paragraphs", "size", "old (2 regex passes)", "parse once + markup", "cached parse", "MB/s (parse)"]
+    rows = []
+    for paragraphs in PARAGRAPHS:
+        text = make_essay(paragraphs)
+        size_mb = len(text) / (1024 * 1024)
+        old = best_time(old_both_formats, text)
+        new = best_time(new_both_formats, text)
+        parse_markdown(text)
+        cached = best_time(parse_markdown, text)
+        parse_markdown.cache_clear()
+        parse_only = best_time(lambda t: parse_markdown.__wrapped__(t), text)
+        rows.append([
+            paragraphs, f"{size_mb * 1024:.0f} KB", f"{old * 1000:.1f} ms",
+            f"{new * 1000:.1f} ms", f"{cached * 1e6:.1f} µs", f"{size_mb / parse_only:.1f}"
+        ])
+        print_table(headers, rows[-1:])
+    print()
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Requests saved by sharing answers between near-identical images, and how
+many images would get another worksheet's answer, for a class handing in
+the same worksheets: some as forwarded copies of one file, some re-exported
+(resized, recompressed, re-exposed), some re-shot (slightly turned, cropped
+and lit differently). All worksheets share one layout, the hard case; each
+hash match is confirmed on the pixels, as the pipeline does.
+Then the BK-tree lookup against comparing with every recorded hash.
+
+Run from the repository root:
+    python -m benchmarks.bench_near_duplicates [STUDENTS]
+"""
+import io
+import os
+import sys
+import time
+import random
+import hashlib
+import tempfile
+from PIL import Image as PILImage, ImageDraw, ImageEnhance
+
+from benchmarks.common import print_table
+from core.near_duplicates import BKTree, SharedAnswers, hamming_distance, perceptual_hash
+from constants import NEAR_DUPLICATE_THRESHOLD, THUMBNAIL_SIZE
+
+WORKSHEETS = 12
+PAGE_SIZE = (620, 877)
+THRESHOLDS = (None, NEAR_DUPLICATE_THRESHOLD, 8, 12)
+INDEX_SIZES = (1000, 10_000, 100_000)
+QUERIES = 200
+
+
+def worksheet(seed: int) -> PILImage.Image:
+    """Draw a worksheet of random exercises on the shared layout."""
+    rng = random.Random(seed)
+    img = PILImage.new("RGB", PAGE_SIZE, "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((40, 30, 580, 90), outline="black", width=3)
+    for row in range(12):
+        y = 130 + row * 60
+        draw.text((50, y), f"{row + 1}. {rng.randint(1, 99)} x {rng.randint(1, 99)} = ____", fill="black")
+        draw.rectangle((300, y, 300 + rng.randint(50, 250), y + 12), fill="black")
+    return img
+
+
+def encode(img: PILImage.Image, quality: int = 85) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def submission(original: bytes, rng: random.Random) -> tuple[str, bytes]:
+    """One student's copy of a worksheet: (kind, file contents)."""
+    roll = rng.random()
+    if roll < 0.3:
+        return "copy", original
+    img = PILImage.open(io.BytesIO(original)).convert("RGB")
+    if roll < 0.6:
+        scale = rng.uniform(0.5, 0.9)
+        img = img.resize((int(img.width * scale), int(img.height * scale)))
+        img = ImageEnhance.Brightness(img).enhance(rng.uniform(0.85, 1.1))
+        return "re-export", encode(img, rng.randint(50, 90))
+    width, height = img.size
+    img = img.rotate(rng.uniform(-2, 2), fillcolor=(200, 190, 180))
+    img = img.crop((rng.randint(0, 30), rng.randint(0, 30), width - rng.randint(0, 30), height - rng.randint(0, 30)))
+    img = ImageEnhance.Brightness(img).enhance(rng.uniform(0.8, 1.1))
+    return "re-shot", encode(img, rng.randint(60, 90))
+
+
+def hashes(data: bytes) -> tuple[str, int]:
+    """Content hash and perceptual hash (of the thumbnail, as ingestion computes it)."""
+    with PILImage.open(io.BytesIO(data)) as img:
+        img.thumbnail(THUMBNAIL_SIZE)
+        return hashlib.sha256(data).hexdigest(), perceptual_hash(img.convert("RGB"))
+
+
+def sharing(students: int) -> list[list]:
+    """Answer every submission through SharedAnswers at each threshold."""
+    rng = random.Random(1)
+    originals = [encode(worksheet(seed)) for seed in range(WORKSHEETS)]
+    submissions = []
+    folder = tempfile.TemporaryDirectory()
+    for _ in range(students):
+        for sheet, original in enumerate(originals):
+            kind, data = submission(original, rng)
+            path = os.path.join(folder.name, f"{len(submissions)}.jpg")
+            with open(path, "wb") as f:
+                f.write(data)
+            submissions.append((sheet, kind, path) + hashes(data))
+    
+    rows = []
+    for threshold in THRESHOLDS:
+        shared = SharedAnswers(threshold=threshold)
+        requests, wrong = 0, 0
+        missed = {"copy": 0, "re-export": 0, "re-shot": 0}
+        for sheet, kind, path, content_hash, phash in submissions:
+            answer, how = shared.answer(
+                content_hash, phash, "", lambda sheet=sheet: f"answers to sheet {sheet}", path
+            )
+            if how == "requested":
+                requests += 1
+                missed[kind] += 1
+            wrong += answer != f"answers to sheet {sheet}"
+        saved = len(submissions) - requests
+        rows.append([
+            "identical only" if threshold is None else threshold, requests,
+            f"{saved} ({saved / len(submissions):.0%})", wrong,
+            " / ".join(str(missed[kind]) for kind in ("copy", "re-export", "re-shot"))
+        ])
+    folder.cleanup()
+    return rows
+
+
+def lookups() -> list[list]:
+    """Time BK-tree searches against a linear scan, for indexes of several sizes."""
+    rng = random.Random(2)
+    rows = []
+    for size in INDEX_SIZES:
+        keys = [rng.getrandbits(63) for _ in range(size)]
+        queries = [rng.choice(keys) ^ (1 << rng.randrange(63)) for _ in range(QUERIES)]
+        tree = BKTree()
+        for key in keys:
+            tree.add(key, key)
+        
+        started = time.perf_counter()
+        found_tree = sum(len(tree.search(query, NEAR_DUPLICATE_THRESHOLD)) for query in queries)
+        tree_time = time.perf_counter() - started
+        started = time.perf_counter()
+        found_linear = sum(
+            sum(1 for key in keys if hamming_distance(query, key) <= NEAR_DUPLICATE_THRESHOLD) for query in queries
+        )
+        linear_time = time.perf_counter() - started
+        assert found_tree == found_linear
+        rows.append([size, f"{linear_time / QUERIES * 1e6:.0f} us", f"{tree_time / QUERIES * 1e6:.0f} us"])
+    return rows
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 25
+    print_table(
+        ["threshold", "requests", "saved", "wrong answers", "requested: copy / re-export / re-shot"],
+        sharing(students)
+    )
+    print(f"{students} students x {WORKSHEETS} worksheets on one layout")
+    print()
+    print_table(["recorded images", "linear scan", "BK-tree"], lookups())
+    print(f"Time per lookup of images within distance {NEAR_DUPLICATE_THRESHOLD}")
+
+
+if __name__ == "__main__":
+    main()
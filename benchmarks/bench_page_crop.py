@@ -0,0 +1,96 @@
+"""
+CPU time of cropping and straightening upload payloads, against the bytes
+and image tokens each request saves, for 12-megapixel phone photos of a
+page (on a desk, held at the edge, some tilted) and for scans that are
+already tight. Tokens are estimated as Gemini counts them for larger
+images: 258 per 768x768 tile.
+
+Run from the repository root:
+    python -m benchmarks.bench_page_crop [REPEATS]
+"""
+import io
+import sys
+import math
+import time
+import random
+from PIL import Image as PILImage, ImageDraw, ImageFilter
+
+from benchmarks.common import print_table
+from utils.memory_utils import format_bytes
+from utils.page_crop import crop_payload
+
+PHOTO_SIZE = (3024, 4032)  # 12 MP, portrait
+PAGE_SIZE = (2100, 2970)  # The A4 sheet within the photo
+TOKENS_PER_TILE = 258
+TILE_SIZE = 768
+
+
+def page(rng: random.Random, size: tuple = PAGE_SIZE, margin: float = 0.12) -> PILImage.Image:
+    """Draw a sheet of exercises: lines of text of varying length inside the margins."""
+    width, height = size
+    img = PILImage.new("RGB", size, (244, 242, 236))
+    draw = ImageDraw.Draw(img)
+    left, top = int(width * margin), int(height * margin)
+    y = top
+    while y < height * (1 - margin):
+        draw.rectangle((left, y, left + rng.randint(width // 4, width - 2 * left), y + height // 120), fill=(35, 35, 40))
+        y += height // 40
+    return img
+
+
+def photo(rng: random.Random, angle: float) -> PILImage.Image:
+    """The sheet photographed on a textured desk, turned by angle, with a thumb on its edge."""
+    desk = PILImage.effect_noise(PHOTO_SIZE, 40).filter(ImageFilter.GaussianBlur(3))
+    desk = PILImage.merge("RGB", [desk.point(lambda v, k=k: v // k + 40) for k in (2, 3, 4)])
+    sheet = page(rng).rotate(angle, PILImage.Resampling.BICUBIC, expand=True, fillcolor=(0, 0, 0))
+    mask = PILImage.new("L", PAGE_SIZE, 255).rotate(angle, expand=True)
+    desk.paste(sheet, ((PHOTO_SIZE[0] - sheet.width) // 2, (PHOTO_SIZE[1] - sheet.height) // 2), mask)
+    ImageDraw.Draw(desk).ellipse((300, 2200, 700, 2600), fill=(205, 160, 130))
+    return desk
+
+
+def encode(img: PILImage.Image) -> dict:
+    """Encode as a phone or scanner would save it."""
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=88)
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
+
+
+def tokens(data: bytes) -> int:
+    """Estimated image tokens of an encoded image."""
+    with PILImage.open(io.BytesIO(data)) as img:
+        return TOKENS_PER_TILE * math.ceil(img.width / TILE_SIZE) * math.ceil(img.height / TILE_SIZE)
+
+
+def cases() -> dict[str, dict]:
+    rng = random.Random(1)
+    return {
+        "photo, straight": encode(photo(rng, 0.0)),
+        "photo, tilted 2.5°": encode(photo(rng, 2.5)),
+        "photo, tilted -4°": encode(photo(rng, -4.0)),
+        "scan, wide margins": encode(page(rng, size=(2480, 3508), margin=0.2)),
+        "scan, tight": encode(page(rng, size=(2480, 3508), margin=0.03)),
+    }
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    rows = []
+    for name, payload in cases().items():
+        started = time.process_time()
+        for _ in range(repeats):
+            cropped = crop_payload(payload)
+        cpu = (time.process_time() - started) / repeats
+        before, after = len(payload["data"]), len(cropped["data"])
+        tokens_before, tokens_after = tokens(payload["data"]), tokens(cropped["data"])
+        rows.append([
+            name, f"{cpu * 1000:.0f} ms", format_bytes(before), format_bytes(after),
+            f"{1 - after / before:.0%}", f"{tokens_before} -> {tokens_after}",
+            "kept" if cropped is payload else "cropped"
+        ])
+    print_table(["image", "CPU per image", "payload", "cropped", "bytes saved", "tokens (est.)", "sent"], rows)
+    print(f"CPU time of crop_payload (decode, analyse, crop and straighten, encode), mean of {repeats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Peak memory of preparing every page of a long multi-page scan for upload:
+decoding (or rasterizing) the whole file up front and then encoding each
+page, versus streaming it as page work items that are each decoded only
+when a worker takes them. PDF cases need pypdfium2.
+
+Run from the repository root:
+    python -m benchmarks.bench_pages [PAGES]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+from PIL import Image as PILImage
+
+from benchmarks.common import run_isolated, print_table
+from utils.memory_utils import PeakMemoryTracker, format_bytes
+
+PAGE_SIZE = (1654, 2339)  # A4 at 200 dpi
+
+
+def make_files(folder: str, pages: int) -> dict[str, str]:
+    """Write a grey multi-page TIFF, and a PDF of the same pages where PDFs can be read."""
+    frames = [PILImage.new("L", PAGE_SIZE, 255 - page % 64) for page in range(pages)]
+    files = {"TIFF": os.path.join(folder, "scans.tif")}
+    frames[0].save(files["TIFF"], "TIFF", save_all=True, append_images=frames[1:], compression="tiff_lzw")
+    try:
+        import pypdfium2  # noqa: F401
+        files["PDF"] = os.path.join(folder, "scans.pdf")
+        frames[0].save(files["PDF"], "PDF", save_all=True, append_images=frames[1:], resolution=200)
+    except ImportError:
+        pass
+    return files
+
+
+def run_case(mode: str, path: str) -> dict:
+    """Produce every page's upload payload and measure time and peak RSS growth."""
+    from core.image_import import expand_pages
+    from core.image_store import ImageStore
+    from utils.page_utils import encode_page, open_image
+    from utils.thumbnail_cache import ThumbnailCache
+    
+    pages = expand_pages(path)
+    tracker = PeakMemoryTracker(interval=0.02).start()
+    started = time.perf_counter()
+    try:
+        if mode == "whole file":
+            decoded = []
+            for page in pages:
+                with open_image(page) as img:
+                    img.load()
+                    decoded.append(img.copy())
+            sent = sum(len(encode_page(img)["data"]) for img in decoded)
+        else:
+            # As the workers do: each page is decoded when its request is made, and dropped after
+            store = ImageStore(ThumbnailCache(None), payload_budget=0)
+            sent = sum(len(store.payload(page)["data"]) for page in pages)
+    finally:
+        peak = tracker.stop()
+    return {
+        "time": time.perf_counter() - started,
+        "peak_growth": peak - tracker.start_rss,
+        "pages": len(pages),
+        "sent": sent
+    }
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    files = make_files(tempfile.mkdtemp(), pages)
+    headers = ["file", "mode", "time", "peak RSS growth", "uploaded"]
+    rows = []
+    for kind, path in files.items():
+        for mode in ("whole file", "streamed"):
+            result = run_isolated("benchmarks.bench_pages", mode, path)
+            rows.append([
+                f"{kind}, {result['pages']} pages", mode, f"{result['time']:.2f}s",
+                format_bytes(result["peak_growth"]), format_bytes(result["sent"])
+            ])
+    print_table(headers, rows)
+    print(f"A4 pages at 200 dpi, {format_bytes(PAGE_SIZE[0] * PAGE_SIZE[1])} each decoded (grey)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--case":
+        print(json.dumps(run_case(sys.argv[2], sys.argv[3])))
+    else:
+        main()
@@ -0,0 +1,63 @@
+"""
+Single-core PDF layout against chunked layout on a worker pool, to pick
+PDF_PARALLEL_MIN_EXERCISES (the size from which chunking pays off).
+
+Run from the repository root:
+    python -m benchmarks.bench_pdf_parallel [WORKERS]
+"""
+import io
+import os
+import sys
+import time
+
+from benchmarks.common import sample_answers, print_table
+from core.document_generator import DocumentGenerator
+from core.render_pool import create_render_pool, render_pdf_parallel, _warm_up_worker, PdfReader
+
+COUNTS = (100, 200, 400, 800, 1600, 3200)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    pool = create_render_pool(workers)
+    for future in [pool.submit(_warm_up_worker) for _ in range(workers)]:
+        future.result()
+    
+    headers = ["answers", "one core", "chunked", "speedup", "merge", "pages (one core / chunked)"]
+    rows = []
+    for count in COUNTS:
+        answers = sample_answers(count)
+        
+        single = io.BytesIO()
+        started = time.perf_counter()
+        DocumentGenerator.layout_pdf(answers, "Student", "Group", single)
+        single_time = time.perf_counter() - started
+        
+        chunked = io.BytesIO()
+        started = time.perf_counter()
+        render_pdf_parallel(answers, "Student", "Group", chunked, pool=pool, chunk_size=max(50, count // (workers * 2)))
+        chunked_time = time.perf_counter() - started
+        
+        # Merge cost on its own: re-merge the chunked output's pages
+        started = time.perf_counter()
+        from pypdf import PdfWriter
+        writer = PdfWriter()
+        writer.append(PdfReader(io.BytesIO(chunked.getvalue())))
+        writer.write(io.BytesIO())
+        merge_time = time.perf_counter() - started
+        
+        pages = (len(PdfReader(io.BytesIO(single.getvalue())).pages), len(PdfReader(io.BytesIO(chunked.getvalue())).pages))
+        rows.append([
+            count, f"{single_time:.2f}s", f"{chunked_time:.2f}s", f"{single_time / chunked_time:.2f}x",
+            f"{merge_time:.2f}s", f"{pages[0]} / {pages[1]}"
+        ])
+        print_table(headers, rows[-1:])
+    pool.shutdown()
+    
+    print()
+    print(f"{workers} workers on {os.cpu_count()} CPUs")
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compare eager and streaming PDF layout at 100, 1,000 and 10,000 exercises.
+
+Run from the repository root:
+    python -m benchmarks.bench_pdf_streaming
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+
+from benchmarks.common import sample_answers, run_isolated, print_table
+from utils.memory_utils import PeakMemoryTracker, format_bytes
+
+COUNTS = (100, 1000, 10000)
+
+
+def run_case(mode: str, count: int) -> dict:
+    """Render count answers and measure time and peak RSS growth."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+    from core.document_generator import DocumentGenerator
+    
+    answers = sample_answers(count)
+    output_path = os.path.join(tempfile.mkdtemp(), f"bench_{mode}.pdf")
+    
+    tracker = PeakMemoryTracker(interval=0.02).start()
+    started = time.perf_counter()
+    if mode == "eager":
+        # The previous behaviour: build the whole story, then lay it out
+        doc = SimpleDocTemplate(output_path, pagesize=letter)
+        doc.build(list(DocumentGenerator._pdf_flowables(answers, "Student", "Group")))
+    else:
+        DocumentGenerator.generate_pdf(iter(answers), "Student", "Group", output_path)
+    elapsed = time.perf_counter() - started
+    peak = tracker.stop()
+    
+    return {
+        "seconds": elapsed,
+        "peak_growth": peak - tracker.start_rss,
+        "size": os.path.getsize(output_path)
+    }
+
+
+def main():
+    rows = []
+    for count in COUNTS:
+        for mode in ("eager", "streaming"):
+            result = run_isolated("benchmarks.bench_pdf_streaming", mode, count)
+            rows.append([
+                count, mode, f"{result['seconds']:.2f}s",
+                f"{count / result['seconds']:.0f}/s",
+                format_bytes(result["peak_growth"]), format_bytes(result["size"])
+            ])
+            print_table(["exercises", "mode", "time", "rate", "peak RSS growth", "PDF size"], rows[-1:])
+    print()
+    print_table(["exercises", "mode", "time", "rate", "peak RSS growth", "PDF size"], rows)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--case":
+        print(json.dumps(run_case(sys.argv[2], int(sys.argv[3]))))
+    else:
+        main()
@@ -0,0 +1,67 @@
+"""
+Time-to-interactive after selecting images: decoding every thumbnail on
+the GUI thread before the preview appears, versus showing the image list
+at once and decoding the visible rows' thumbnails in the background.
+Uses an empty thumbnail cache so every image is decoded.
+
+Run from the repository root:
+    python -m benchmarks.bench_preview_latency [IMAGES]
+"""
+import os
+import sys
+import time
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp()  # Cold thumbnail cache
+
+from PyQt6.QtWidgets import QApplication, QWidget, QGridLayout, QLabel
+
+from benchmarks.common import print_table
+from benchmarks.bench_thumbnail_cache import make_scans
+from utils.image_utils import pil_to_qimage
+from utils.thumbnail_cache import make_thumbnail
+from ui.image_preview import ImagePreviewWidget
+
+
+def synchronous_preview(paths: list[str]) -> float:
+    """The previous behaviour: every thumbnail decoded before the preview is shown."""
+    from PyQt6.QtGui import QPixmap
+    started = time.perf_counter()
+    labels = []
+    for path in paths:
+        label = QLabel()
+        label.setPixmap(QPixmap.fromImage(pil_to_qimage(make_thumbnail(path))))
+        labels.append(label)
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    app = QApplication([])
+    paths = make_scans(tempfile.mkdtemp(), count)
+    
+    blocked = synchronous_preview(paths)
+    
+    window = QWidget()
+    preview = ImagePreviewWidget(window, QGridLayout(window), lambda path: None, lambda path: None)
+    window.show()
+    started = time.perf_counter()
+    preview.update_preview(paths)
+    app.processEvents()  # First paint queues the visible rows
+    while preview.thumbnail_loader.pending():
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+    visible_done = time.perf_counter() - started
+    
+    headers = ["mode", "time to interactive", "visible thumbnails complete"]
+    print_table(headers, [
+        ["decode on GUI thread", f"{blocked * 1000:.0f} ms", f"{blocked:.2f}s"],
+        ["image list, background", f"{preview.time_to_interactive * 1000:.0f} ms", f"{visible_done:.2f}s"],
+    ])
+    print(f"{count} A4 scans, {os.cpu_count()} CPUs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Cost of adding one image to a selection of N images: rebuilding the whole
+image list versus inserting only the new row.
+Thumbnails are cached in memory beforehand so only UI work is timed.
+
+Run from the repository root:
+    python -m benchmarks.bench_preview_updates
+"""
+import os
+import time
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ["XDG_CACHE_HOME"] = tempfile.mkdtemp()
+
+from PIL import Image as PILImage
+from PyQt6.QtWidgets import QApplication
+
+from benchmarks.common import print_table
+from utils.thumbnail_cache import get_thumbnail_cache
+
+SIZES = (1, 100, 500, 2000)
+
+
+def make_images(folder: str, count: int) -> list[str]:
+    paths = []
+    for idx in range(count):
+        path = os.path.join(folder, f"page_{idx:03d}.png")
+        PILImage.new("RGB", (300, 400), (idx % 256, 90, 160)).save(path)
+        get_thumbnail_cache().get(path)
+        paths.append(path)
+    return paths
+
+
+def add_one(window, image_path: str, rebuild: bool) -> float:
+    """Add an image the way select_images does and time the UI update."""
+    window.image_paths.append(image_path)
+    started = time.perf_counter()
+    if rebuild:
+        window.image_preview.clear()
+    window.image_preview.update_preview(window.image_paths)
+    QApplication.processEvents()  # Includes painting the visible rows
+    return time.perf_counter() - started
+
+
+def main():
+    from ui.main_window import MainWindow
+    
+    app = QApplication([])
+    paths = make_images(tempfile.mkdtemp(), max(SIZES) + 1)
+    
+    headers = ["images already selected", "full rebuild", "incremental"]
+    rows = []
+    for size in SIZES:
+        times = {}
+        for rebuild in (True, False):
+            window = MainWindow()
+            window.image_paths = list(paths[:size])
+            window.show()
+            window.image_preview.update_preview(window.image_paths)
+            app.processEvents()
+            times[rebuild] = add_one(window, paths[size], rebuild)
+            window.image_preview.clear()
+            window.deleteLater()
+            app.processEvents()
+        rows.append([size, f"{times[True] * 1000:.1f} ms", f"{times[False] * 1000:.2f} ms"])
+        print_table(headers, rows[-1:])
+    print()
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
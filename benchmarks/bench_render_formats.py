@@ -0,0 +1,49 @@
+"""
+Render PDF and Word one after the other versus in parallel worker
+processes from the same answers.
+
+Run from the repository root:
+    python -m benchmarks.bench_render_formats
+"""
+import os
+import time
+import tempfile
+
+from benchmarks.common import sample_answers, print_table
+from core.render_pool import render_document, render_formats, get_render_pool, format_render_times
+
+COUNTS = (50, 500, 2000)
+
+
+def main():
+    output_dir = tempfile.mkdtemp()
+    # Start the workers first; the pool is reused for every later document
+    render_formats(sample_answers(1), "Warm", "Up", os.path.join(output_dir, "warm_up"), ("pdf", "word"))
+    
+    headers = ["answers", "sequential", "parallel", "speedup", "per format (parallel)"]
+    rows = []
+    for count in COUNTS:
+        answers = sample_answers(count)
+        output_filename = os.path.join(output_dir, f"answers_{count}")
+        
+        started = time.perf_counter()
+        for fmt in ("pdf", "word"):
+            render_document(fmt, answers, "Student", "Group", output_filename)
+        sequential = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        results = render_formats(answers, "Student", "Group", output_filename, ("pdf", "word"))
+        parallel = time.perf_counter() - started
+        
+        rows.append([
+            count, f"{sequential:.2f}s", f"{parallel:.2f}s",
+            f"{sequential / parallel:.2f}x", format_render_times(results)
+        ])
+        print_table(headers, rows[-1:])
+    print()
+    print_table(headers, rows)
+    get_render_pool().shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Time to load a saved results bundle and render it again, compared with
+the Gemini request time the bundle saves.
+
+Run from the repository root:
+    python -m benchmarks.bench_rerender
+"""
+import os
+import time
+import tempfile
+
+from benchmarks.common import SAMPLE_ANSWER, print_table
+from core.results_bundle import BundleItem, ResultsBundle
+from core.render_pool import render_document
+
+COUNTS = (5, 20, 100)
+REQUEST_SECONDS = 8.0  # Typical time for one image through Gemini
+
+
+def main():
+    output_dir = tempfile.mkdtemp()
+    render_document("pdf", [("", SAMPLE_ANSWER)], "Warm", "Up", os.path.join(output_dir, "warm_up"))
+    
+    headers = ["images", "bundle size", "load", "PDF", "Word", "requests saved"]
+    rows = []
+    for count in COUNTS:
+        items = [
+            BundleItem(f"page_{idx}.jpg", "0" * 64, "", "models/gemini-2.0-flash", SAMPLE_ANSWER, REQUEST_SECONDS)
+            for idx in range(count)
+        ]
+        path = ResultsBundle("Student", "Group", items).save(os.path.join(output_dir, f"bundle_{count}"))
+        
+        started = time.perf_counter()
+        bundle = ResultsBundle.load(path)
+        load = time.perf_counter() - started
+        
+        times = {}
+        for fmt in ("pdf", "word"):
+            started = time.perf_counter()
+            bundle.render([fmt], output_dir=output_dir)
+            times[fmt] = time.perf_counter() - started
+        
+        rows.append([
+            count, f"{os.path.getsize(path) / 1024:.1f} KB", f"{load * 1000:.1f} ms",
+            f"{times['pdf'] * 1000:.0f} ms", f"{times['word'] * 1000:.0f} ms",
+            f"{count} ({count * REQUEST_SECONDS:.0f}s)"
+        ])
+        print_table(headers, rows[-1:])
+    print()
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+What routing changes per request before anything is sent: the prompt each
+route sends (text tokens estimated at 4 characters each), the models it
+tries first and its output limit, and what classifying an image costs.
+Latency and billed tokens per route are measured on real requests by
+RouteMeter and reported in the pipeline and job scheduler summaries.
+
+Run from the repository root:
+    python -m benchmarks.bench_routing
+"""
+import time
+
+from benchmarks.common import print_table
+from core.routing import ROUTES, classify, order_models
+
+LISTED_MODELS = ["models/gemini-1.5-pro", "models/gemini-1.5-flash", "models/gemini-2.0-flash", "models/gemini-2.0-flash-lite"]
+CUSTOM_PROMPTS = ["", "Fill in the blanks", "Write an essay of 300 words about your town", "Answer in British English"]
+CLASSIFICATIONS = 100_000
+
+
+def main():
+    base = len(ROUTES["general"].prompt)
+    rows = []
+    for route in ROUTES.values():
+        rows.append([
+            route.name, len(route.prompt), f"~{len(route.prompt) // 4}", f"{len(route.prompt) - base:+}",
+            order_models(LISTED_MODELS, route.tier)[0].split("/")[-1], route.max_output_tokens, route.fallback or "-"
+        ])
+    print_table(["route", "prompt chars", "prompt tokens", "vs general", "first model", "max output", "cut off ->"], rows)
+    print()
+    
+    started = time.perf_counter()
+    for idx in range(CLASSIFICATIONS):
+        classify(CUSTOM_PROMPTS[idx % len(CUSTOM_PROMPTS)])
+    elapsed = time.perf_counter() - started
+    print(f"classify: {elapsed / CLASSIFICATIONS * 1e6:.2f} us per image")
+    print(", ".join(f"{prompt or '(no prompt)'!r} -> {classify(prompt).name}" for prompt in CUSTOM_PROMPTS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measure what the shared style registry saves when rendering many small
+documents (a class of 30 students, a few exercises each).
+
+Run from the repository root:
+    python -m benchmarks.bench_style_pool
+"""
+import os
+import time
+import tempfile
+from unittest.mock import patch
+
+from benchmarks.common import sample_answers, print_table
+from core.document_generator import DocumentGenerator
+from core.document_styles import StyleRegistry
+
+STUDENTS = 30
+EXERCISES = 5
+ROUNDS = 10
+MODES = ("per-document", "shared")
+
+
+def render_class(fmt: str, output_dir: str) -> float:
+    """Render one document per student and return the elapsed time."""
+    answers = sample_answers(EXERCISES)
+    generate = DocumentGenerator.generate_pdf if fmt == "pdf" else DocumentGenerator.generate_word
+    started = time.perf_counter()
+    for student in range(STUDENTS):
+        generate(answers, f"Student {student}", "Group", os.path.join(output_dir, f"student_{student}"))
+    return time.perf_counter() - started
+
+
+def render_with(fmt: str, mode: str, output_dir: str) -> float:
+    """Render the class with shared styles or with styles rebuilt per document."""
+    if mode == "per-document":
+        # The previous behaviour: styles are rebuilt for every document
+        with patch("core.document_generator.get_style_registry", side_effect=StyleRegistry):
+            return render_class(fmt, output_dir)
+    return render_class(fmt, output_dir)
+
+
+def best_of(fmt: str, output_dir: str) -> dict[str, float]:
+    """Best time per mode over ROUNDS interleaved renders of the whole class."""
+    times = {mode: [] for mode in MODES}
+    for _ in range(ROUNDS):
+        for mode in MODES:
+            times[mode].append(render_with(fmt, mode, output_dir))
+    return {mode: min(values) for mode, values in times.items()}
+
+
+def main():
+    output_dir = tempfile.mkdtemp()
+    render_class("pdf", output_dir)  # Warm up imports and the shared registry
+    
+    started = time.perf_counter()
+    for _ in range(100):
+        StyleRegistry()
+    build_cost = (time.perf_counter() - started) / 100
+    print(f"Building the style set once costs {build_cost * 1000:.2f} ms")
+    print()
+    
+    headers = ["format", "mode", "class time", "per document", "docs/s"]
+    rows = []
+    for fmt in ("pdf", "word"):
+        for mode, elapsed in best_of(fmt, output_dir).items():
+            rows.append([
+                fmt, mode, f"{elapsed:.3f}s", f"{elapsed / STUDENTS * 1000:.1f} ms",
+                f"{STUDENTS / elapsed:.0f}"
+            ])
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
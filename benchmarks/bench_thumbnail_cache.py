@@ -0,0 +1,65 @@
+"""
+Time to produce preview thumbnails for a folder of scans: decoding every
+image (first open), reading the on-disk cache (after a restart) and the
+in-memory LRU (re-creating the preview).
+
+Run from the repository root:
+    python -m benchmarks.bench_thumbnail_cache [IMAGES]
+"""
+import os
+import sys
+import time
+import tempfile
+from PIL import Image as PILImage
+
+from benchmarks.common import print_table
+from utils.thumbnail_cache import ThumbnailCache, make_thumbnail
+
+SCAN_SIZE = (2480, 3508)  # A4 at 300 dpi
+
+
+def make_scans(folder: str, count: int) -> list[str]:
+    """Write count distinct A4 scans."""
+    paths = []
+    for idx in range(count):
+        path = os.path.join(folder, f"scan_{idx:03d}.jpg")
+        PILImage.new("RGB", SCAN_SIZE, (idx % 256, 128, 255 - idx % 256)).save(path, "JPEG", quality=85)
+        paths.append(path)
+    return paths
+
+
+def timed(fn, paths: list[str]) -> float:
+    started = time.perf_counter()
+    for path in paths:
+        fn(path)
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    folder = tempfile.mkdtemp()
+    cache_dir = os.path.join(folder, "thumbnails")
+    paths = make_scans(folder, count)
+    
+    uncached = timed(make_thumbnail, paths)
+    first = timed(ThumbnailCache(cache_dir).get, paths)
+    restarted = timed(ThumbnailCache(cache_dir).get, paths)
+    cache = ThumbnailCache(cache_dir)
+    timed(cache.get, paths)
+    memory = timed(cache.get, paths)
+    
+    headers = ["case", f"{count} images", "per image", "vs decode"]
+    rows = [
+        [name, f"{seconds * 1000:.0f} ms", f"{seconds / count * 1000:.2f} ms", f"{uncached / seconds:.0f}x"]
+        for name, seconds in [
+            ("decode (no cache)", uncached),
+            ("first open (decode + write)", first),
+            ("restart (disk cache)", restarted),
+            ("re-preview (memory LRU)", memory),
+        ]
+    ]
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
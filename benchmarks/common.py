@@ -0,0 +1,43 @@
+import os
+import sys
+import json
+import subprocess
+
+# Allow running benchmark modules as scripts from the repository root
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+SAMPLE_ANSWER = "**Exercise A (Page 45)**\n" + "\n".join(
+    f"{i}. The answer to question {i} is written out in a full sentence." for i in range(1, 11)
+)
+
+SAMPLE_ESSAY = "**Task 3 (Page 112)**\n" + "\n\n".join(
+    "Technology has changed the way students learn. " * 12 for _ in range(6)
+)
+
+
+def sample_answers(count: int, answer: str = SAMPLE_ANSWER) -> list[tuple[str, str]]:
+    """Get count (exercise_text, answer_text) tuples."""
+    return [("", answer) for _ in range(count)]
+
+
+def run_isolated(module: str, *args) -> dict:
+    """
+    Run one benchmark case in a fresh interpreter so memory numbers
+    are not polluted by earlier cases.
+    
+    The module must print a single JSON object when given `--case ARGS...`.
+    """
+    output = subprocess.run(
+        [sys.executable, "-m", module, "--case", *map(str, args)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def print_table(headers: list[str], rows: list[list]):
+    """Print rows as an aligned text table."""
+    widths = [max(len(str(x)) for x in column) for column in zip(headers, *rows)]
+    for row in [headers] + rows:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
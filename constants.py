@@ -1,49 +1,135 @@
+import os
+
 # Processing delays (in seconds)
 DELAY_BETWEEN_IMAGES = 2
 BASE_RETRY_DELAY = 15
 MAX_RETRIES = 2
+REQUEST_TIMEOUT = 120.0  # Per-request timeout passed to the Gemini SDK
+MIN_REQUEST_TIME = 5.0  # Don't start a request with less time than this left before the job deadline
 
 # Rate limiting settings
 MAX_REQUESTS_PER_WINDOW = 15  # Maximum requests per time window
 RATE_LIMIT_WINDOW = 60.0  # Time window in seconds
 MAX_CONCURRENT_WORKERS = 5  # Maximum parallel workers
+INITIAL_LATENCY_ESTIMATE = 10.0  # Assumed request latency (s) before any is measured
+LATENCY_SMOOTHING = 0.3  # Weight of the newest latency sample in the moving average
+
+# Memory settings
+MEMORY_BUDGET_BYTES = 512 * 1024 * 1024  # Decoded image bytes allowed in flight at once
+ANSWER_SPILL_THRESHOLD = 200  # Jobs with more images keep answers on disk
+MEMORY_SAMPLE_INTERVAL = 0.25  # Seconds between RSS samples while a job runs
+
+# Watch folder settings
+WATCH_SETTLE_TIME = 2.0  # Seconds a file must stay unchanged before processing
+WATCH_POLL_INTERVAL = 1.0  # Seconds between scans when inotify is unavailable
+WATCH_GROUP_IDLE = 30.0  # Seconds without new images before a group's document is written
+WATCH_GROUPINGS = ("subfolder", "student", "folder")
+WATCH_METRICS_INTERVAL = 60.0  # Seconds between throughput reports
+THROUGHPUT_WINDOW = 300.0  # Sliding window for steady-state throughput
+
+# Scheduling cost model
+BASE_IMAGE_COST = 200_000  # Fixed per-request cost, in bytes-equivalent
+ESSAY_COST_FACTOR = 4.0  # Essays produce several times more output than short answers
+DEADLINE_MARKER = "Error: Abandoned - the job deadline was reached before this image finished"
+
+# Job queue settings
+ANSWER_CACHE_SIZE = 2000  # Answers kept in memory for reuse across jobs
+# Largest pHash distance (of 63 bits) at which two images are compared as near-duplicates
+# (off by default). Re-saved, resized and recompressed copies stay within it, but so do many
+# different worksheets printed from one template, so each candidate is confirmed on its pixels
+NEAR_DUPLICATE_THRESHOLD = 4
+NEAR_DUPLICATE_TILE = 4  # Pixel squares compared when confirming a near-duplicate
+NEAR_DUPLICATE_TOLERANCE = 12  # Largest mean grey difference of any square in a confirmed near-duplicate
 
 # Image preview settings
 THUMBNAIL_SIZE = (100, 100)
-PREVIEW_MIN_HEIGHT = 220
+IMAGE_LIST_HEIGHT = 360  # Height of the selected images list
+THUMBNAIL_PIXMAP_CACHE_SIZE = 200  # Thumbnail pixmaps kept by the image list (visible rows and some history)
+IMAGE_LIST_RESET_RUNS = 16  # Removing more separate runs of rows than this rebuilds the list in one go
+THUMBNAIL_WORKERS = min(4, os.cpu_count() or 1)  # Threads decoding thumbnails (Pillow releases the GIL)
+THUMBNAIL_MEMORY_CACHE_SIZE = 1000  # Thumbnails kept decoded in memory (~30 KB each)
+FULL_IMAGE_CACHE_SIZE = 8  # Screen-sized images kept for the full image viewer
+FULL_IMAGE_PROGRESSIVE_PIXELS = 20_000_000  # Larger JPEGs are shown at low resolution first
+THUMBNAIL_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "luma", "thumbnails"
+)
+
+# Image ingestion (each image is read once when it is added)
+INGEST_WORKERS = THUMBNAIL_WORKERS  # Threads ingesting newly added images in the background
+INGEST_MMAP_THRESHOLD = 4 * 1024 * 1024  # Larger files are memory-mapped instead of read into memory
+INGEST_PAYLOAD_BUDGET = 256 * 1024 * 1024  # Bytes of upload payloads kept in memory until sent
+INGEST_INFO_CACHE_SIZE = 20_000  # Ingested images remembered (~1 KB each); older ones are read again if needed
+IMPORT_WORKERS = min(16, (os.cpu_count() or 1) * 4)  # Threads scanning folders and reading headers (I/O bound)
+MAX_REJECTED_SHOWN = 20  # Skipped files listed by name after an import
+PDF_RENDER_DPI = 200  # Resolution PDF pages are rasterized at for upload
+PAGE_JPEG_QUALITY = 90  # Colour pages of multi-page files are uploaded as JPEG (black-and-white and grey as PNG)
+
+# Margin cropping and deskew (optional, needs NumPy; shrinks phone photos to the printed region before upload)
+CROP_ANALYSIS_SIZE = 800  # Images are analysed reduced to this many pixels on the longest side
+CROP_PADDING = 0.02  # Blank border kept around the printed region, as a fraction of the longest side
+CROP_MIN_SAVING = 0.1  # Smaller savings (fraction of the pixels) keep the original file, saving a re-encode
+DESKEW_MAX_ANGLE = 5.0  # Largest tilt (degrees) searched for
+DESKEW_MIN_ANGLE = 0.3  # Smaller tilts are left alone
 
 # document settings
+OUTPUT_FORMATS = ("pdf", "word")
+FORMAT_NAMES = {"pdf": "PDF", "word": "Word document"}
 DOCUMENT_FONTS = ['Helvetica']
 MIN_FONT_SIZE = 10
 MAX_FONT_SIZE = 14
+ANSWER_LEADING = 14  # Line spacing of answer paragraphs in PDFs
+DOCUMENT_TTF_FONTS = {}  # Font name -> (regular .ttf path, bold .ttf path or None) to embed in PDFs
+MARKDOWN_CACHE_SIZE = 256  # Parsed answers kept so PDF and Word share one parse
+PDF_STREAM_LOOKAHEAD = 16  # Flowables buffered ahead of the PDF layout loop
+PDF_PARALLEL_MIN_EXERCISES = 500  # Smaller PDFs are laid out on one core (see benchmarks/bench_pdf_parallel.py)
+PDF_MIN_CHUNK_EXERCISES = 100  # Fewest answers laid out per worker
 
-# Gemini API prompts
-BASE_PROMPT = """Look at this exercise image from an English textbook and solve it completely.
+# Gemini API prompts (BASE_PROMPT handles any exercise; the variants are sent once an image is classified)
+_PROMPT_INTRO = """Look at this exercise image from an English textbook and solve it completely.
 
 IMPORTANT FORMATTING:
 - Start your answer with the exercise name/title in BOLD (e.g., **Exercise A** or **Task 1** or whatever the exercise is called in the image)
 - Format the exercise name as bold text at the very beginning of your response
-- If you can see a page number in the image, include it in your answer (e.g., **Page 45, Exercise A** or **Exercise A (Page 45)**)
-
-If this is asking for an essay, composition, or to write paragraphs:
-- Write a complete, well-structured essay with introduction, body paragraphs, and conclusion
+- If you can see a page number in the image, include it in your answer (e.g., **Page 45, Exercise A** or **Exercise A (Page 45)**)"""
+_ESSAY_RULES = """- Write a complete, well-structured essay with introduction, body paragraphs, and conclusion
 - Follow any length requirements specified
 - Do NOT include numbers or bullet points
 - Write in continuous prose
-- Start with the bold exercise name (and page number if visible) first
-
-If this is a regular exercise with questions:
-- Start with the bold exercise name (and page number if visible) first
+- Start with the bold exercise name (and page number if visible) first"""
+_EXERCISE_RULES = """- Start with the bold exercise name (and page number if visible) first
 - Provide ALL numbered answers completely
 - Answer EVERY question in the exercise
 - Number each answer clearly (1., 2., 3., etc.)
 - Do NOT stop after a few answers
-- Output ONLY the final words. No explanations, no "Answer:" labels.
+- Output ONLY the final words. No explanations, no "Answer:" labels."""
+_PROMPT_OUTRO = "Please solve the exercise and provide your answer now, starting with the bold exercise name (and page number if you can see it in the image)."
+BASE_PROMPT = (
+    f"{_PROMPT_INTRO}\n\nIf this is asking for an essay, composition, or to write paragraphs:\n{_ESSAY_RULES}"
+    f"\n\nIf this is a regular exercise with questions:\n{_EXERCISE_RULES}\n\n{_PROMPT_OUTRO}"
+)
+ESSAY_PROMPT = f"{_PROMPT_INTRO}\n\nThis exercise asks for an essay, composition, or paragraphs:\n{_ESSAY_RULES}\n\n{_PROMPT_OUTRO}"
+EXERCISE_PROMPT = f"{_PROMPT_INTRO}\n\nThis is a regular exercise with questions:\n{_EXERCISE_RULES}\n\n{_PROMPT_OUTRO}"
 
-Please solve the exercise and provide your answer now, starting with the bold exercise name (and page number if you can see it in the image)."""
+# Request routing (see core/routing.py)
+MODEL_TIERS = {  # Model name fragments preferred per tier, in order; other models remain as fallbacks
+    "fast": ("flash-lite", "flash"),
+    "strong": ("pro",),
+}
+EXERCISE_MAX_OUTPUT_TOKENS = 1024  # Short answers; a cut-off answer is asked again on the general route
+ESSAY_MAX_OUTPUT_TOKENS = 4096
+GENERAL_MAX_OUTPUT_TOKENS = 8192
 
 # File filters
-IMAGE_FILTER = "Image files (*.png *.jpg *.jpeg *.bmp *.tiff);;All files (*.*)"
+IMAGE_FILTER = "Images and scans (*.png *.jpg *.jpeg *.bmp *.tiff *.tif *.pdf);;All files (*.*)"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif')
+MULTI_PAGE_EXTENSIONS = ('.tiff', '.tif', '.pdf')  # Imported as one work item per page ("scan.pdf#page=2")
+IMAGE_FORMATS = ('PNG', 'JPEG', 'MPO', 'BMP', 'TIFF')  # Pillow formats accepted on import (MPO: phone JPEGs)
+RESULTS_FILTER = "Luma results (*.luma);;All files (*.*)"
+
+# Results bundles (answers saved next to each document so it can be re-rendered)
+RESULTS_BUNDLE_EXTENSION = ".luma"
+RESULTS_BUNDLE_VERSION = 2  # 2: each item records its route and the route's prompt
 
 # Config file
 CONFIG_FILE = "config.json"
@@ -0,0 +1,69 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from constants import ANSWER_CACHE_SIZE
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Get the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnswerCache:
+    """
+    Thread-safe LRU cache of answers keyed by image content and prompt.
+    Shared between jobs so the same worksheet is only sent to Gemini once.
+    """
+    
+    def __init__(self, max_entries: int = ANSWER_CACHE_SIZE):
+        """
+        Initialize answer cache.
+        
+        Args:
+            max_entries: Maximum number of cached answers
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, image_hash: str, custom_prompt: str = "") -> Optional[str]:
+        """Get a cached answer, or None."""
+        key = (image_hash, custom_prompt)
+        with self.lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+    
+    def put(self, image_hash: str, custom_prompt: str, answer: str):
+        """Store an answer. Error answers are never cached."""
+        if answer.startswith("Error:"):
+            return
+        key = (image_hash, custom_prompt)
+        with self.lock:
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._entries)
+    
+    def clear(self):
+        """Remove all cached answers."""
+        with self.lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
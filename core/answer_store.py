@@ -0,0 +1,74 @@
+import json
+import tempfile
+import threading
+from typing import Iterator, Optional
+
+from constants import ANSWER_SPILL_THRESHOLD
+
+
+class AnswerStore:
+    """
+    Fixed-size sequence of (exercise_text, answer_text) tuples kept on disk.
+    Answers are appended to an anonymous temporary file and only their
+    offsets stay in memory, so very large jobs don't hold every answer.
+    Supports the list operations the pipeline and document generator use.
+    """
+    
+    def __init__(self, size: int, directory: Optional[str] = None):
+        """
+        Initialize answer store.
+        
+        Args:
+            size: Number of slots
+            directory: Where the temporary file lives (None = system default)
+        """
+        self._offsets: list[Optional[tuple[int, int]]] = [None] * size
+        self._file = tempfile.TemporaryFile(mode="w+b", dir=directory)
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._offsets)
+    
+    def __setitem__(self, idx: int, value: tuple[str, str]):
+        data = json.dumps(list(value)).encode("utf-8")
+        with self._lock:
+            self._file.seek(0, 2)
+            offset = self._file.tell()
+            self._file.write(data)
+            self._offsets[idx] = (offset, len(data))
+    
+    def __getitem__(self, idx: int) -> Optional[tuple[str, str]]:
+        with self._lock:
+            location = self._offsets[idx]
+            if location is None:
+                return None
+            offset, length = location
+            self._file.seek(offset)
+            data = self._file.read(length)
+        exercise_text, answer_text = json.loads(data.decode("utf-8"))
+        return (exercise_text, answer_text)
+    
+    def __iter__(self) -> Iterator[Optional[tuple[str, str]]]:
+        for idx in range(len(self)):
+            yield self[idx]
+    
+    def close(self):
+        """Delete the temporary file."""
+        with self._lock:
+            self._file.close()
+
+
+def create_answer_list(size: int, spill_threshold: int = ANSWER_SPILL_THRESHOLD):
+    """
+    Create storage for a job's answers.
+    
+    Args:
+        size: Number of images in the job
+        spill_threshold: Jobs larger than this keep their answers on disk
+    
+    Returns:
+        A plain list for normal jobs, an AnswerStore for large ones
+    """
+    if size > spill_threshold:
+        return AnswerStore(size)
+    return [None] * size
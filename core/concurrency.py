@@ -0,0 +1,160 @@
+import math
+import time
+import threading
+from collections import deque
+from typing import Optional
+
+from core.rate_limiter import RateLimiter
+from constants import (
+    MAX_CONCURRENT_WORKERS, INITIAL_LATENCY_ESTIMATE, LATENCY_SMOOTHING, MEMORY_BUDGET_BYTES
+)
+
+
+class ConcurrencyController:
+    """
+    Adjusts the number of in-flight requests while a job runs.
+    Uses Little's law (L = λ·W) on the measured completion rate (capped at
+    the limiter's admission rate) and the measured request latency, plus
+    whatever slots the limiter can admit right now, so quota is saturated
+    without piling waiters on the limiter. When the limiter throttles, or
+    other jobs share it, the measured rate drops and so does the target.
+    """
+    
+    def __init__(
+        self,
+        rate_limiter: RateLimiter,
+        min_workers: int = 1,
+        max_workers: int = MAX_CONCURRENT_WORKERS,
+        initial_latency: float = INITIAL_LATENCY_ESTIMATE,
+        smoothing: float = LATENCY_SMOOTHING
+    ):
+        """
+        Initialize concurrency controller.
+        
+        Args:
+            rate_limiter: Rate limiter that admits the requests
+            min_workers: Lower bound on concurrent requests
+            max_workers: Upper bound on concurrent requests
+            initial_latency: Latency estimate in seconds before any request finished
+            smoothing: Weight of the newest sample in the latency moving average (0-1)
+        """
+        self.rate_limiter = rate_limiter
+        self.min_workers = min_workers
+        self.max_workers = max(min_workers, max_workers)
+        self.smoothing = smoothing
+        self.latency = initial_latency
+        self.active = 0
+        self.started = time.time()
+        self._completions = deque()  # Finish times of requests within the limiter's window
+        self.condition = threading.Condition()
+    
+    def measured_rate(self) -> float:
+        """Get the rate requests finished at over the limiter's window, in requests per second."""
+        window = self.rate_limiter.time_window
+        with self.condition:
+            now = time.time()
+            while self._completions and self._completions[0] < now - window:
+                self._completions.popleft()
+            elapsed = min(window, now - self.started)
+            if elapsed <= 0:
+                return 0.0
+            return min(self.rate_limiter.admission_rate, len(self._completions) / elapsed)
+    
+    def _target(self, burst: int) -> int:
+        """Get the target for a number of free limiter slots."""
+        steady = math.ceil(self.measured_rate() * self.latency)
+        return max(self.min_workers, min(self.max_workers, steady + burst))
+    
+    def target(self) -> int:
+        """Get the number of concurrent requests that currently saturates quota."""
+        return self._target(self.rate_limiter.get_available_slots())
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until another request may start.
+        
+        Args:
+            timeout: Maximum time to wait (None = wait indefinitely)
+        
+        Returns:
+            True if a slot was granted, False if timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            # Read the limiter without holding the condition: it may sleep holding its own lock
+            burst = self.rate_limiter.get_available_slots()
+            with self.condition:
+                if self.active < self._target(burst):
+                    self.active += 1
+                    return True
+                if deadline is None:
+                    # Re-check periodically: limiter slots free up as the window slides
+                    self.condition.wait(1.0)
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                    self.condition.wait(min(remaining, 1.0))
+    
+    def release(self, latency: Optional[float] = None):
+        """
+        Finish a request.
+        
+        Args:
+            latency: Measured request duration in seconds (None = not measured)
+        """
+        with self.condition:
+            self.active = max(0, self.active - 1)
+            if latency is not None:
+                self._completions.append(time.time())
+            if latency is not None and latency > 0:
+                self.latency += self.smoothing * (latency - self.latency)
+            self.condition.notify_all()
+
+
+class MemoryBudget:
+    """
+    Admission control keyed on in-flight decoded image bytes.
+    A request only starts once its image fits in the remaining budget;
+    a single image larger than the whole budget is admitted on its own.
+    """
+    
+    def __init__(self, max_bytes: int = MEMORY_BUDGET_BYTES):
+        """
+        Initialize memory budget.
+        
+        Args:
+            max_bytes: Maximum decoded bytes in flight at once
+        """
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.condition = threading.Condition()
+    
+    def acquire(self, num_bytes: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until num_bytes fit in the budget.
+        
+        Args:
+            num_bytes: Decoded size of the image about to be processed
+            timeout: Maximum time to wait (None = wait indefinitely)
+        
+        Returns:
+            True if admitted, False if timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self.condition:
+            while self.in_flight > 0 and self.in_flight + num_bytes > self.max_bytes:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+            self.in_flight += num_bytes
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+    
+    def release(self, num_bytes: int):
+        """Return num_bytes to the budget."""
+        with self.condition:
+            self.in_flight = max(0, self.in_flight - num_bytes)
+            self.condition.notify_all()
@@ -0,0 +1,66 @@
+import os
+from typing import Optional
+
+from utils.page_utils import count_pages, split_page_path
+from utils.text_utils import is_essay_assignment
+from constants import ESSAY_COST_FACTOR, BASE_IMAGE_COST
+
+
+def estimate_cost(image_path: str, custom_prompt: str = "") -> float:
+    """
+    Predict the relative cost of answering an image.
+    Larger images take longer to upload and read, and essays produce far
+    more output tokens than short-answer exercises.
+    
+    Args:
+        image_path: Path to the image file, or a page path (see utils.page_utils)
+        custom_prompt: Custom prompt for the image
+    
+    Returns:
+        Relative cost (unitless, only meaningful for comparison)
+    """
+    file_path, page = split_page_path(image_path)
+    try:
+        size = os.path.getsize(file_path)
+        if page is not None:
+            # A page's share of its file, without decoding it
+            size //= max(1, count_pages(file_path))
+    except OSError:
+        size = 0
+    
+    cost = BASE_IMAGE_COST + size
+    if is_essay_assignment(custom_prompt):
+        cost *= ESSAY_COST_FACTOR
+    return cost
+
+
+def order_by_predicted_cost(
+    image_paths: list[str],
+    custom_prompts: Optional[dict[str, str]] = None,
+    has_deadline: bool = False
+) -> list[int]:
+    """
+    Get the order in which images should be dispatched.
+    
+    Without a deadline the cheapest image goes first so a first result shows
+    up quickly, then the rest run longest-first so the expensive ones do not
+    end up as stragglers. With a deadline everything runs cheapest-first so
+    as many images as possible finish in time.
+    
+    Args:
+        image_paths: Image files in document order
+        custom_prompts: Optional mapping of image path to custom prompt
+        has_deadline: Whether the job has a deadline
+    
+    Returns:
+        Indices into image_paths in dispatch order
+    """
+    custom_prompts = custom_prompts or {}
+    costs = [estimate_cost(path, custom_prompts.get(path, "")) for path in image_paths]
+    cheapest_first = sorted(range(len(image_paths)), key=lambda idx: (costs[idx], idx))
+    
+    if has_deadline or len(cheapest_first) < 3:
+        return cheapest_first
+    
+    first, rest = cheapest_first[0], cheapest_first[1:]
+    return [first] + sorted(rest, key=lambda idx: (-costs[idx], idx))
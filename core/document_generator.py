@@ -1,23 +1,204 @@
+import io
 import os
-import random
+from typing import BinaryIO, Callable, Iterable, Iterator
+from xml.sax.saxutils import escape
 from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from docx import Document
-from docx.shared import Pt
-from reportlab.platypus.tables import ParagraphStyle
-from constants import DOCUMENT_FONTS, MIN_FONT_SIZE, MAX_FONT_SIZE
 
-from utils.text_utils import convert_markdown_bold_to_html, split_markdown_bold
+from core.document_styles import get_style_registry
+from core.docx_builder import get_docx_template, paragraph_xml, EMPTY_PARAGRAPH
+from utils.text_utils import parse_markdown, block_runs, to_reportlab_markup
+from constants import PDF_STREAM_LOOKAHEAD
+
+
+class _FlowableStream(list):
+    """
+    List of flowables that refills itself from an iterator.
+    reportlab's build loop only touches the front of the list (and peeks a few
+    items ahead for keepWithNext), so feeding it this keeps just a small
+    window of flowables alive instead of the whole story.
+    """
+    
+    def __init__(self, flowables: Iterator, lookahead: int = PDF_STREAM_LOOKAHEAD):
+        super().__init__()
+        self._flowables = flowables
+        self._lookahead = lookahead
+    
+    def _fill(self, count: int):
+        """Pull flowables until at least count are buffered or the iterator ends."""
+        while self._flowables is not None and list.__len__(self) < count:
+            try:
+                self.append(next(self._flowables))
+            except StopIteration:
+                self._flowables = None
+    
+    def __len__(self) -> int:
+        self._fill(self._lookahead)
+        return list.__len__(self)
+    
+    def __getitem__(self, idx):
+        if isinstance(idx, int) and idx >= 0:
+            self._fill(idx + 1)
+        return list.__getitem__(self, idx)
 
 
 class DocumentGenerator:
     """Generates PDF and Word documents with answers."""
     
+    @staticmethod
+    def _pdf_flowables(
+        exercises_with_answers: Iterable[tuple[str, str]],
+        student_name: str,
+        group: str,
+        include_header: bool = True
+    ) -> Iterator:
+        """Yield the PDF story one flowable at a time."""
+        # Styles are shared by every document in the process
+        styles = get_style_registry()
+        normal_style = styles.normal_style
+        
+        # Add header information
+        if include_header:
+            yield Paragraph(f"<b>Student:</b> {escape(student_name)}", normal_style)
+            yield Spacer(1, 0.1*inch)
+            yield Paragraph(f"<b>Group:</b> {escape(group)}", normal_style)
+            yield Spacer(1, 0.3*inch)
+        
+        # Add exercises and answers
+        for exercise_text, answer_text in exercises_with_answers:
+            formatted_answer = to_reportlab_markup(parse_markdown(answer_text))
+            yield Paragraph(formatted_answer, styles.random_answer_style())
+            yield Spacer(1, 0.3*inch)
+    
+    @staticmethod
+    def layout_pdf(
+        exercises_with_answers: Iterable[tuple[str, str]],
+        student_name: str,
+        group: str,
+        stream: BinaryIO,
+        include_header: bool = True
+    ):
+        """
+        Lay out a PDF on this core and write it into a binary stream.
+        Answers are laid out and drawn as they are read, so any iterable
+        (a generator, an on-disk AnswerStore) can be passed and memory stays
+        flat no matter how many answers there are.
+        
+        Args:
+            exercises_with_answers: Iterable of (exercise_text, answer_text) tuples
+            student_name: Student name
+            group: Group/class name
+            stream: Writable binary stream
+            include_header: Whether to start with the student and group lines
+        """
+        doc = SimpleDocTemplate(stream, pagesize=letter)
+        story = _FlowableStream(
+            DocumentGenerator._pdf_flowables(exercises_with_answers, student_name, group, include_header)
+        )
+        doc.build(story)
+    
+    @staticmethod
+    def render_pdf(
+        exercises_with_answers: Iterable[tuple[str, str]],
+        student_name: str,
+        group: str,
+        stream: BinaryIO
+    ):
+        """
+        Render a PDF with answers into a binary stream.
+        Large in-memory answer lists are split at exercise boundaries and laid
+        out on several cores (see core.render_pool.render_pdf_parallel, where
+        each chunk starts on a new page); small ones, plain iterators and
+        on-disk AnswerStores are laid out here, streaming, so memory stays flat.
+        
+        Args:
+            exercises_with_answers: Iterable of (exercise_text, answer_text) tuples
+            student_name: Student name
+            group: Group/class name
+            stream: Writable binary stream (an open file, BytesIO, a socket wrapper)
+        """
+        from core.render_pool import use_parallel_pdf, render_pdf_parallel
+        
+        if isinstance(exercises_with_answers, (list, tuple)) and use_parallel_pdf(len(exercises_with_answers)):
+            render_pdf_parallel(exercises_with_answers, student_name, group, stream)
+        else:
+            DocumentGenerator.layout_pdf(exercises_with_answers, student_name, group, stream)
+    
+    @staticmethod
+    def render_word(
+        exercises_with_answers: Iterable[tuple[str, str]],
+        student_name: str,
+        group: str,
+        stream: BinaryIO
+    ):
+        """
+        Render a Word document with answers into a binary stream.
+        
+        Args:
+            exercises_with_answers: Iterable of (exercise_text, answer_text) tuples
+            student_name: Student name
+            group: Group/class name
+            stream: Writable binary stream (an open file, BytesIO, a socket wrapper)
+        """
+        # Add header information
+        body = [
+            paragraph_xml([('Student: ', True, False), (student_name, False, False)]),
+            paragraph_xml([('Group: ', True, False), (group, False, False)]),
+            EMPTY_PARAGRAPH
+        ]
+        
+        # Add exercises and answers
+        for idx, (exercise_text, answer_text) in enumerate(exercises_with_answers):
+            if idx > 0:
+                body.append(EMPTY_PARAGRAPH)
+            
+            for block in parse_markdown(answer_text):
+                body.append(paragraph_xml(block_runs(block)))
+        
+        # Write the document from the preloaded template
+        font_name, font_size = get_style_registry().random_word_font()
+        get_docx_template().write(stream, ''.join(body), font_name, font_size)
+    
+    @staticmethod
+    def render_bytes(
+        output_format: str,
+        exercises_with_answers: Iterable[tuple[str, str]],
+        student_name: str,
+        group: str
+    ) -> bytes:
+        """
+        Render a document in memory.
+        
+        Args:
+            output_format: 'pdf' or 'word'
+            exercises_with_answers: Iterable of (exercise_text, answer_text) tuples
+            student_name: Student name
+            group: Group/class name
+            
+        Returns:
+            The document's bytes
+        """
+        render = DocumentGenerator.render_word if output_format == "word" else DocumentGenerator.render_pdf
+        buffer = io.BytesIO()
+        render(exercises_with_answers, student_name, group, buffer)
+        return buffer.getvalue()
+    
+    @staticmethod
+    def _write_file(output_path: str, render: Callable[[BinaryIO], None]) -> str:
+        """Render into output_path, removing the partial file if rendering fails."""
+        try:
+            with open(output_path, 'wb') as f:
+                render(f)
+        except Exception:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+        return output_path
+    
     @staticmethod
     def generate_pdf(
-        exercises_with_answers: list[tuple[str, str]],
+        exercises_with_answers: Iterable[tuple[str, str]],
         student_name: str,
         group: str,
         output_filename: str
@@ -26,7 +207,7 @@ class DocumentGenerator:
         Generate PDF file with answers.
         
         Args:
-            exercises_with_answers: List of (exercise_text, answer_text) tuples
+            exercises_with_answers: Iterable of (exercise_text, answer_text) tuples
             student_name: Student name
             group: Group/class name
             output_filename: Output filename (without extension)
@@ -39,47 +220,14 @@ class DocumentGenerator:
         
         output_path = os.path.join(os.getcwd(), output_filename)
         
-        # Create PDF
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
-        story = []
-        
-        # Define styles
-        styles = getSampleStyleSheet()
-        normal_style = styles['Normal']
-        
-        # Add header information
-        story.append(Paragraph(f"<b>Student:</b> {student_name}", normal_style))
-        story.append(Spacer(1, 0.1*inch))
-        story.append(Paragraph(f"<b>Group:</b> {group}", normal_style))
-        story.append(Spacer(1, 0.3*inch))
-        
-        # Add exercises and answers
-        for exercise_text, answer_text in exercises_with_answers:
-            formatted_answer = convert_markdown_bold_to_html(answer_text)
-            formatted_answer = formatted_answer.replace('\n', '<br/>')
-
-            font_name = random.choice(DOCUMENT_FONTS) 
-
-            font_name = font_name if font_name != "Times New Roman" else "Times-Roman"
-
-            paragraph_style = ParagraphStyle(
-                        name='RandomStyle',
-                        fontName=font_name,
-                        fontSize=random.randint(MIN_FONT_SIZE, MAX_FONT_SIZE),
-                        leading=14
-                    )
-            
-            story.append(Paragraph(formatted_answer, paragraph_style))
-            story.append(Spacer(1, 0.3*inch))
-        
-        # Build PDF
-        doc.build(story)
-        
-        return output_path
+        return DocumentGenerator._write_file(
+            output_path,
+            lambda f: DocumentGenerator.render_pdf(exercises_with_answers, student_name, group, f)
+        )
     
     @staticmethod
     def generate_word(
-        exercises_with_answers: list[tuple[str, str]],
+        exercises_with_answers: Iterable[tuple[str, str]],
         student_name: str,
         group: str,
         output_filename: str
@@ -88,7 +236,7 @@ class DocumentGenerator:
         Generate Word document file with answers.
         
         Args:
-            exercises_with_answers: List of (exercise_text, answer_text) tuples
+            exercises_with_answers: Iterable of (exercise_text, answer_text) tuples
             student_name: Student name
             group: Group/class name
             output_filename: Output filename (without extension)
@@ -101,50 +249,10 @@ class DocumentGenerator:
         
         output_path = os.path.join(os.getcwd(), output_filename)
         
-        # Create Word document
-        doc = Document()
-        
-        # Set default font
-        style = doc.styles['Normal']
-        font = style.font
-        font.name = random.choice(DOCUMENT_FONTS)
-        font.size = Pt(random.randint(MIN_FONT_SIZE, MAX_FONT_SIZE))
-        
-        # Add header information
-        p = doc.add_paragraph()
-        p.add_run('Student: ').bold = True
-        p.add_run(student_name)
-        
-        p = doc.add_paragraph()
-        p.add_run('Group: ').bold = True
-        p.add_run(group)
-        
-        doc.add_paragraph()
-        
-        # Add exercises and answers
-        for idx, (exercise_text, answer_text) in enumerate(exercises_with_answers, 1):
-            answer_lines = answer_text.split('\n')
-            for line in answer_lines:
-                line = line.strip()
-                if line:
-                    p = doc.add_paragraph()
-                    parts = split_markdown_bold(line)
-                    for part in parts:
-                        if part.startswith('**') and part.endswith('**'):
-                            run = p.add_run(part[2:-2])
-                            run.bold = True
-                        elif part:
-                            p.add_run(part)
-                else:
-                    doc.add_paragraph()
-            
-            if idx < len(exercises_with_answers):
-                doc.add_paragraph()
-        
-        # Save document
-        doc.save(output_path)
-        
-        return output_path
+        return DocumentGenerator._write_file(
+            output_path,
+            lambda f: DocumentGenerator.render_word(exercises_with_answers, student_name, group, f)
+        )
     
     @staticmethod
     def generate_output_filename(student_name: str, group: str, custom_filename: str = "") -> str:
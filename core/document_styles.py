@@ -0,0 +1,130 @@
+import os
+import random
+import threading
+from typing import Optional
+
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from docx.shared import Pt, Length
+
+from constants import (
+    DOCUMENT_FONTS, DOCUMENT_TTF_FONTS, MIN_FONT_SIZE, MAX_FONT_SIZE, ANSWER_LEADING
+)
+
+# Word font names whose reportlab built-in has a different name
+PDF_FONT_ALIASES = {"Times New Roman": "Times-Roman"}
+
+
+class StyleRegistry:
+    """
+    Styles and fonts shared by every document rendered in this process.
+    The sample stylesheet, one ParagraphStyle per (font, size) and the
+    TTF registrations are built once instead of for every document and
+    exercise; styles are only read during layout, so sharing them is safe.
+    """
+    
+    def __init__(
+        self,
+        fonts: Optional[list[str]] = None,
+        min_font_size: int = MIN_FONT_SIZE,
+        max_font_size: int = MAX_FONT_SIZE,
+        ttf_fonts: Optional[dict[str, tuple[str, Optional[str]]]] = None
+    ):
+        """
+        Initialize style registry.
+        
+        Args:
+            fonts: Font names answers are randomly set in (None = DOCUMENT_FONTS)
+            min_font_size: Smallest answer font size
+            max_font_size: Largest answer font size
+            ttf_fonts: Font name -> (regular .ttf path, bold .ttf path or None)
+                to register with reportlab (None = DOCUMENT_TTF_FONTS)
+        """
+        self.fonts = list(fonts if fonts is not None else DOCUMENT_FONTS)
+        self.min_font_size = min_font_size
+        self.max_font_size = max_font_size
+        self.registered_fonts = self._register_ttf_fonts(
+            ttf_fonts if ttf_fonts is not None else DOCUMENT_TTF_FONTS
+        )
+        
+        self.stylesheet = getSampleStyleSheet()
+        self.normal_style = self.stylesheet['Normal']
+        
+        # Every style an answer can get, built up front
+        self._answer_styles = {
+            (font, size): ParagraphStyle(
+                name='RandomStyle',
+                fontName=self.pdf_font_name(font),
+                fontSize=size,
+                leading=ANSWER_LEADING
+            )
+            for font in self.fonts
+            for size in range(min_font_size, max_font_size + 1)
+        }
+        self._word_sizes = {size: Pt(size) for size in range(min_font_size, max_font_size + 1)}
+    
+    @staticmethod
+    def _register_ttf_fonts(ttf_fonts: dict[str, tuple[str, Optional[str]]]) -> set[str]:
+        """Register TTF fonts (and their bold faces) with reportlab."""
+        registered = set()
+        for name, (regular_path, bold_path) in ttf_fonts.items():
+            try:
+                if name not in pdfmetrics.getRegisteredFontNames():
+                    pdfmetrics.registerFont(TTFont(name, regular_path))
+                bold_name = name
+                if bold_path and os.path.exists(bold_path):
+                    bold_name = f"{name}-Bold"
+                    if bold_name not in pdfmetrics.getRegisteredFontNames():
+                        pdfmetrics.registerFont(TTFont(bold_name, bold_path))
+                # Lets <b> in answers pick the bold face
+                pdfmetrics.registerFontFamily(
+                    name, normal=name, bold=bold_name, italic=name, boldItalic=bold_name
+                )
+                registered.add(name)
+            except Exception as e:
+                print(f"Could not register font {name} from {regular_path}: {e}")
+        return registered
+    
+    def pdf_font_name(self, font: str) -> str:
+        """Get the reportlab font name for a document font."""
+        if font in self.registered_fonts:
+            return font
+        return PDF_FONT_ALIASES.get(font, font)
+    
+    def answer_style(self, font: str, size: int) -> ParagraphStyle:
+        """Get the shared paragraph style for an answer in font at size."""
+        style = self._answer_styles.get((font, size))
+        if style is None:
+            style = ParagraphStyle(
+                name='RandomStyle',
+                fontName=self.pdf_font_name(font),
+                fontSize=size,
+                leading=ANSWER_LEADING
+            )
+            self._answer_styles[(font, size)] = style
+        return style
+    
+    def random_answer_style(self) -> ParagraphStyle:
+        """Get the style for the next answer, with a random font and size."""
+        font = random.choice(self.fonts)
+        return self.answer_style(font, random.randint(self.min_font_size, self.max_font_size))
+    
+    def random_word_font(self) -> tuple[str, Length]:
+        """Get a random (font name, size) for a Word document's Normal style."""
+        font = random.choice(self.fonts)
+        size = random.randint(self.min_font_size, self.max_font_size)
+        return font, self._word_sizes[size]
+
+
+_registry: Optional[StyleRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_style_registry() -> StyleRegistry:
+    """Get the process-wide style registry, building it on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = StyleRegistry()
+        return _registry
@@ -0,0 +1,142 @@
+import io
+import re
+import zipfile
+import threading
+from typing import BinaryIO, Iterable, Optional, Union
+from xml.sax.saxutils import escape
+
+from docx import Document
+from docx.shared import Length
+
+# Characters lxml refuses to serialize; python-docx would fail on them too
+_INVALID_XML_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+_RUN_BREAK_RE = re.compile(r'([\t\r\n])')
+
+EMPTY_PARAGRAPH = '<w:p/>'
+
+
+def _text_xml(text: str) -> str:
+    """Get the <w:t> element python-docx writes for text."""
+    if _INVALID_XML_RE.search(text):
+        raise ValueError(
+            "All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters"
+        )
+    if len(text.strip()) < len(text):
+        return f'<w:t xml:space="preserve">{escape(text)}</w:t>'
+    return f'<w:t>{escape(text)}</w:t>'
+
+
+def run_xml(text: str, bold: bool = False, italic: bool = False) -> str:
+    """
+    Get the <w:r> element for one run, exactly as python-docx's
+    Paragraph.add_run(text) followed by setting bold/italic would write it.
+    """
+    parts = ['<w:r>']
+    if bold or italic:
+        parts.append('<w:rPr>')
+        if bold:
+            parts.append('<w:b/>')
+        if italic:
+            parts.append('<w:i/>')
+        parts.append('</w:rPr>')
+    if text:
+        # Tabs and line breaks become their own elements between text chunks
+        for chunk in _RUN_BREAK_RE.split(text):
+            if chunk == '\t':
+                parts.append('<w:tab/>')
+            elif chunk in ('\r', '\n'):
+                parts.append('<w:br/>')
+            elif chunk:
+                parts.append(_text_xml(chunk))
+    elif not (bold or italic):
+        return '<w:r/>'
+    parts.append('</w:r>')
+    return ''.join(parts)
+
+
+def paragraph_xml(runs: Iterable[tuple[str, bool, bool]]) -> str:
+    """Get the <w:p> element for (text, bold, italic) runs."""
+    body = ''.join(run_xml(text, bold, italic) for text, bold, italic in runs)
+    return f'<w:p>{body}</w:p>' if body else EMPTY_PARAGRAPH
+
+
+class DocxTemplate:
+    """
+    The default python-docx document, loaded once and kept as serialized parts.
+    A new document is written by splicing generated body XML into the
+    template's document.xml and zipping it with the cached parts, instead of
+    loading the template and going through python-docx's element proxies for
+    every paragraph and run. The parts written match python-docx's byte for byte.
+    """
+    
+    def __init__(self):
+        buffer = io.BytesIO()
+        Document().save(buffer)
+        self._template_bytes = buffer.getvalue()
+        
+        with zipfile.ZipFile(buffer) as package:
+            self._members = [(info.filename, package.read(info.filename)) for info in package.infolist()]
+        
+        document_xml = dict(self._members)['word/document.xml'].decode('utf-8')
+        body_start = document_xml.index('<w:body>') + len('<w:body>')
+        self._document_head = document_xml[:body_start]
+        self._document_tail = document_xml[body_start:]
+        
+        self._styles: dict[tuple[str, int], bytes] = {}
+        self._lock = threading.Lock()
+    
+    def styles_xml(self, font_name: str, font_size: Length) -> bytes:
+        """Get styles.xml with the Normal style set to font_name at font_size."""
+        key = (font_name, int(font_size))
+        with self._lock:
+            styles = self._styles.get(key)
+            if styles is None:
+                doc = Document(io.BytesIO(self._template_bytes))
+                font = doc.styles['Normal'].font
+                font.name = font_name
+                font.size = font_size
+                buffer = io.BytesIO()
+                doc.save(buffer)
+                with zipfile.ZipFile(buffer) as package:
+                    styles = package.read('word/styles.xml')
+                self._styles[key] = styles
+            return styles
+    
+    def write(
+        self,
+        target: Union[str, BinaryIO],
+        body_xml: str,
+        font_name: str,
+        font_size: Length
+    ):
+        """
+        Write a .docx package.
+        
+        Args:
+            target: File path or writable binary stream
+            body_xml: Paragraph elements that make up the document body
+            font_name: Font of the Normal style
+            font_size: Font size of the Normal style
+        """
+        document = (self._document_head + body_xml + self._document_tail).encode('utf-8')
+        styles = self.styles_xml(font_name, font_size)
+        with zipfile.ZipFile(target, 'w', compression=zipfile.ZIP_DEFLATED) as package:
+            for name, data in self._members:
+                if name == 'word/document.xml':
+                    data = document
+                elif name == 'word/styles.xml':
+                    data = styles
+                package.writestr(name, data)
+
+
+_template: Optional[DocxTemplate] = None
+_template_lock = threading.Lock()
+
+
+def get_docx_template() -> DocxTemplate:
+    """Get the process-wide Word template, loading it on first use."""
+    global _template
+    with _template_lock:
+        if _template is None:
+            _template = DocxTemplate()
+        return _template
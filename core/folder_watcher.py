@@ -0,0 +1,252 @@
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from typing import Optional
+
+from constants import IMAGE_EXTENSIONS, MULTI_PAGE_EXTENSIONS, WATCH_SETTLE_TIME, WATCH_POLL_INTERVAL
+
+
+def is_image_file(path: str) -> bool:
+    """Check if a path has a supported image extension, or is a PDF or other multi-page file."""
+    extension = os.path.splitext(path)[1].lower()
+    return extension in IMAGE_EXTENSIONS or extension in MULTI_PAGE_EXTENSIONS
+
+
+class _InotifyBackend:
+    """Minimal recursive inotify wrapper (Linux only)."""
+    
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    EVENT_HEADER = struct.Struct("iIII")
+    
+    def __init__(self, root: str):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        
+        self._watches: dict[int, str] = {}
+        self.add_tree(root)
+    
+    def add_tree(self, root: str):
+        """Watch a directory and all of its subdirectories."""
+        for dirpath, _, _ in os.walk(root):
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {dirpath}")
+            self._watches[wd] = dirpath
+    
+    def read_events(self, timeout: float) -> tuple[set[str], bool]:
+        """
+        Wait for file events.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+        
+        Returns:
+            Tuple of (touched file paths, whether the event queue overflowed)
+        """
+        touched = set()
+        overflow = False
+        
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return touched, overflow
+        
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return touched, overflow
+        
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + name_len].rstrip(b"\0")
+            offset += name_len
+            
+            if mask & self.IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                # New subfolder: watch it and pick up anything already inside
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self.add_tree(path)
+                    for dirpath, _, filenames in os.walk(path):
+                        touched.update(os.path.join(dirpath, f) for f in filenames)
+            else:
+                touched.add(path)
+        
+        return touched, overflow
+    
+    def close(self):
+        """Release the inotify file descriptor."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class FolderWatcher:
+    """
+    Detects new or modified images in a folder tree.
+    Uses inotify where available and falls back to polling. A file is only
+    reported once its size and mtime have been stable for `settle_time`
+    seconds, so scans that are still being written are never picked up.
+    """
+    
+    def __init__(
+        self,
+        folder: str,
+        settle_time: float = WATCH_SETTLE_TIME,
+        poll_interval: float = WATCH_POLL_INTERVAL,
+        use_inotify: bool = True,
+        include_existing: bool = True
+    ):
+        """
+        Initialize folder watcher.
+        
+        Args:
+            folder: Folder to watch (recursively)
+            settle_time: Seconds a file must stay unchanged before it is reported
+            poll_interval: Seconds between scans in polling mode
+            use_inotify: Try inotify before falling back to polling
+            include_existing: Report images already in the folder at start
+        """
+        if not os.path.isdir(folder):
+            raise Exception(f"Watch folder does not exist: {folder}")
+        
+        self.folder = os.path.abspath(folder)
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        
+        self._seen: dict[str, tuple[int, int]] = {}  # path -> signature already reported
+        self._pending: dict[str, tuple[tuple[int, int], float]] = {}  # path -> (signature, stable since)
+        
+        self._backend: Optional[_InotifyBackend] = None
+        if use_inotify:
+            try:
+                self._backend = _InotifyBackend(self.folder)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable, falling back to polling: {e}")
+                self._backend = None
+        
+        existing = self._scan()
+        if include_existing:
+            self._touch(existing, time.time())
+        else:
+            for path in existing:
+                signature = self._signature(path)
+                if signature is not None:
+                    self._seen[path] = signature
+    
+    @property
+    def mode(self) -> str:
+        """Get the active detection mode ('inotify' or 'polling')."""
+        return "inotify" if self._backend is not None else "polling"
+    
+    def _scan(self) -> list[str]:
+        """List all images currently in the folder tree."""
+        found = []
+        for dirpath, _, filenames in os.walk(self.folder):
+            for filename in filenames:
+                if is_image_file(filename):
+                    found.append(os.path.join(dirpath, filename))
+        return found
+    
+    @staticmethod
+    def _signature(path: str) -> Optional[tuple[int, int]]:
+        """Get (size, mtime_ns) for a file, or None if it is gone."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+    
+    def _touch(self, paths, now: float):
+        """Mark paths as possibly changed."""
+        for path in paths:
+            if not is_image_file(path):
+                continue
+            signature = self._signature(path)
+            if signature is None or signature == self._seen.get(path):
+                self._pending.pop(path, None)
+                continue
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != signature:
+                self._pending[path] = (signature, now)
+    
+    def _collect_ready(self, now: float) -> list[str]:
+        """Re-check pending files and return those that have settled."""
+        ready = []
+        for path in list(self._pending):
+            signature, since = self._pending[path]
+            current = self._signature(path)
+            if current is None:
+                del self._pending[path]
+            elif current != signature:
+                self._pending[path] = (current, now)
+            elif current[0] > 0 and now - since >= self.settle_time:
+                del self._pending[path]
+                self._seen[path] = current
+                ready.append(path)
+        return sorted(ready)
+    
+    def poll(self, timeout: Optional[float] = None) -> list[str]:
+        """
+        Wait for changes and return images that are ready to process.
+        
+        Args:
+            timeout: Maximum time to wait (None = one poll interval)
+        
+        Returns:
+            Sorted list of new or modified image paths
+        """
+        if timeout is None:
+            timeout = self.poll_interval
+        
+        # Wake up early when something is waiting to settle
+        if self._pending:
+            timeout = min(timeout, self.settle_time)
+        
+        if self._backend is not None:
+            touched, overflow = self._backend.read_events(timeout)
+            now = time.time()
+            self._touch(self._scan() if overflow else touched, now)
+        else:
+            time.sleep(timeout)
+            now = time.time()
+            self._touch(self._scan(), now)
+        
+        return self._collect_ready(now)
+    
+    def has_pending(self) -> bool:
+        """Check if any file is still waiting to settle."""
+        return bool(self._pending)
+    
+    def close(self):
+        """Stop watching."""
+        if self._backend is not None:
+            self._backend.close()
+            self._backend = None
@@ -1,7 +1,15 @@
 import re
 import time
-from PIL import Image as PILImage
-from constants import BASE_PROMPT, BASE_RETRY_DELAY, MAX_RETRIES
+from typing import Optional
+from core.image_store import get_image_store
+from core.routing import ROUTES, Route, classify, order_models
+from constants import BASE_RETRY_DELAY, MAX_RETRIES, REQUEST_TIMEOUT
+
+MAX_TOKENS_FINISH_REASON = 2  # FinishReason.MAX_TOKENS: the answer was cut off
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request cannot finish before its deadline."""
 
 
 class GeminiClient:
@@ -10,6 +18,9 @@ class GeminiClient:
     def __init__(self, api_key: str):
         self.api_key = api_key
         self._configured = False
+        self.last_model: Optional[str] = None  # Model that produced the last answer
+        self.last_route: Optional[str] = None  # Route of the last answer (see core.routing)
+        self.last_usage = (0, 0)  # (input, output) tokens the last answer took, over all its requests
     
     def _configure(self):
         """Configure the Gemini API."""
@@ -26,30 +37,78 @@ class GeminiClient:
         except ImportError:
             raise Exception("Google Generative AI library not installed. Install with: pip install google-generativeai")
     
+    @staticmethod
+    def _load_image_payload(image_path: str) -> dict:
+        """
+        Read an image into an upload-ready blob.
+        Same bytes and MIME type the SDK would send for an opened file, but the
+        file handle is closed right away and the payload is reused across retries.
+        Images ingested when they were added are served from the image store.
+        """
+        return get_image_store().payload(image_path)
+    
+    @staticmethod
+    def _request_timeout(timeout: float, deadline: Optional[float]) -> float:
+        """Get the timeout for the next attempt, honouring the deadline."""
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise DeadlineExceededError("Deadline reached before the request could be sent")
+        return min(timeout, remaining)
+    
+    @staticmethod
+    def _cut_off(response) -> bool:
+        """Check whether a response stopped at max_output_tokens."""
+        candidates = getattr(response, "candidates", None) or []
+        if not candidates:
+            return False
+        reason = getattr(candidates[0], "finish_reason", None)
+        return getattr(reason, "name", reason) in ("MAX_TOKENS", MAX_TOKENS_FINISH_REASON)
+    
+    def _count_usage(self, response):
+        """Add a response's token counts to last_usage."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return
+        input_tokens, output_tokens = self.last_usage
+        self.last_usage = (
+            input_tokens + (getattr(usage, "prompt_token_count", 0) or 0),
+            output_tokens + (getattr(usage, "candidates_token_count", 0) or 0)
+        )
+    
     def generate_answer_from_image(
         self, 
         image_path: str, 
-        custom_prompt: str = ""
+        custom_prompt: str = "",
+        timeout: float = REQUEST_TIMEOUT,
+        deadline: Optional[float] = None,
+        route: Optional[Route] = None
     ) -> str:
         """
         Generate answer from an image using Gemini Vision API.
+        The route (see core.routing) picks the prompt, the models tried first
+        and the generation config. An answer cut off at the route's output
+        limit is asked again on its fallback route; if that request fails,
+        the cut-off answer is returned rather than nothing, unless it was cut
+        off before any text was written.
         
         Args:
             image_path: Path to the image file
             custom_prompt: Optional custom prompt to append
+            timeout: Per-attempt request timeout in seconds
+            deadline: Optional absolute time (time.time()) by which the answer is needed
+            route: Route to take (None = classify the image by its custom prompt)
             
         Returns:
             Generated answer text
         """
         self._configure()
+        if route is None:
+            route = classify(custom_prompt)
         
-        # Read image file
-        img = PILImage.open(image_path)
-        
-        # Build prompt
-        prompt = BASE_PROMPT
-        if custom_prompt:
-            prompt += f"\n\nAdditional instructions:\n{custom_prompt}"
+        # Read image file once; the handle is closed before any request is sent
+        image_payload = self._load_image_payload(image_path)
         
         # Get available models
         available_models = self._get_available_vision_models()
@@ -57,19 +116,77 @@ class GeminiClient:
         if not available_models:
             raise Exception("No Gemini vision models found. Please check your API key and ensure you have access to Gemini models.")
         
+        self.last_usage = (0, 0)
+        answer, cut_off = self._generate(route, image_payload, custom_prompt, available_models, timeout, deadline)
+        if cut_off and route.fallback is not None:
+            fallback = ROUTES[route.fallback]
+            try:
+                answer, _ = self._generate(fallback, image_payload, custom_prompt, available_models, timeout, deadline)
+                route = fallback
+            except Exception as e:
+                if not answer:
+                    raise
+                # A cut-off answer beats none; last_model and last_route still describe it
+                print(f"Could not ask {image_path} again on the {fallback.name} route, keeping the cut-off answer: {str(e)}")
+        if cut_off and not answer:
+            raise Exception(f"The answer was cut off on the {route.name} route before any text was written")
+        self.last_route = route.name
+        return answer
+    
+    def _generate(
+        self,
+        route: Route,
+        image_payload: dict,
+        custom_prompt: str,
+        available_models: list,
+        timeout: float,
+        deadline: Optional[float]
+    ) -> tuple[str, bool]:
+        """
+        Ask for an answer the way a route says, trying its models first.
+        
+        Returns:
+            (answer text, whether it was cut off at the output limit)
+        """
+        # Build prompt
+        prompt = route.prompt
+        if custom_prompt:
+            prompt += f"\n\nAdditional instructions:\n{custom_prompt}"
+        models = order_models(available_models, route.tier)
+        
         # Try each available model
         last_error = None
         
-        for model_name in available_models:
+        for model_name in models:
             for attempt in range(MAX_RETRIES):
+                request_timeout = self._request_timeout(timeout, deadline)
                 try:
                     model = self.genai.GenerativeModel(model_name)
-                    response = model.generate_content([prompt, img])
-                    return response.text
+                    response = model.generate_content(
+                        [prompt, image_payload],
+                        generation_config=route.generation_config(),
+                        request_options={"timeout": request_timeout}
+                    )
+                    cut_off = self._cut_off(response)
+                    try:
+                        answer = response.text
+                    except ValueError:
+                        # .text raises when the response has no parts; one that
+                        # ran out of tokens before writing any is still cut off
+                        if not cut_off:
+                            raise
+                        answer = ""
+                    self.last_model = model_name
+                    self._count_usage(response)
+                    return answer, cut_off
                 except Exception as e:
                     error_str = str(e)
                     last_error = error_str
                     
+                    # Timed out or hung connection, try next model
+                    if 'deadline' in error_str.lower() or 'timed out' in error_str.lower() or 'timeout' in error_str.lower():
+                        break
+                    
                     # rate limit errors
                     is_rate_limit = (
                         '429' in error_str or 
@@ -85,6 +202,8 @@ class GeminiClient:
                             if delay_match:
                                 delay = float(delay_match.group(1)) + 2  # Add 2 second buffer
                             
+                            if deadline is not None and time.time() + delay >= deadline:
+                                raise DeadlineExceededError(f"Rate limited and the deadline is too close to retry: {error_str}")
                             time.sleep(delay)
                             continue  # same model
                         else:
@@ -99,8 +218,8 @@ class GeminiClient:
                     break
         
         error_msg = f"All Gemini vision models failed. Last error: {last_error}"
-        if available_models:
-            error_msg += f"\n\nTried models: {', '.join(available_models)}"
+        if models:
+            error_msg += f"\n\nTried models: {', '.join(models)}"
         raise Exception(error_msg)
     
     def _get_available_vision_models(self) -> list:
@@ -0,0 +1,183 @@
+import os
+import re
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterable, NamedTuple, Optional
+from PIL import Image as PILImage
+
+from core.folder_watcher import is_image_file
+from utils.page_utils import count_pages, is_pdf, page_path
+from constants import IMAGE_FORMATS, IMPORT_WORKERS, MULTI_PAGE_EXTENSIONS
+
+PNG_END = b"IEND\xaeB`\x82"  # IEND chunk type and CRC: the last 8 bytes of every complete PNG
+JPEG_END = b"\xff\xd9"  # EOI marker
+PDF_START = b"%PDF-"
+PDF_END = b"%%EOF"  # Ends every complete PDF, followed by at most a few bytes
+_DIGITS = re.compile(r"(\d+)")
+
+
+class ImportResult(NamedTuple):
+    """Outcome of importing files and folders."""
+    images: list[str]  # Valid images and pages of multi-page files, in natural order
+    rejected: list[tuple[str, str]]  # (path, reason)
+
+
+def natural_sort_key(path: str) -> tuple:
+    """Sort key that puts 'page2.jpg' before 'page10.jpg' (case-insensitive)."""
+    return tuple(int(part) if idx % 2 else part.casefold() for idx, part in enumerate(_DIGITS.split(path)))
+
+
+def _check_truncated(img: PILImage.Image, f: BinaryIO, file_size: int) -> Optional[str]:
+    """Check from the header and the file's last bytes that no image data is missing."""
+    if img.format == "PNG":
+        f.seek(max(0, file_size - len(PNG_END)))
+        if f.read() != PNG_END:
+            return "truncated PNG (no end chunk)"
+    elif img.format in ("JPEG", "MPO"):
+        f.seek(max(0, file_size - 64))
+        if not f.read().rstrip(b"\0\r\n ").endswith(JPEG_END):
+            return "truncated JPEG (no end marker)"
+    elif img.format == "TIFF":
+        # Strips, or tiles, must lie inside the file
+        offsets = img.tag_v2.get(273) or img.tag_v2.get(324) or ()
+        byte_counts = img.tag_v2.get(279) or img.tag_v2.get(325) or ()
+        if any(offset + count > file_size for offset, count in zip(offsets, byte_counts)):
+            return "truncated TIFF (image data past the end of the file)"
+    elif img.format == "BMP":
+        for tile in img.tile:
+            if tile[0] == "raw" and tile[2] + tile[3][1] * img.height > file_size:
+                return "truncated BMP (image data past the end of the file)"
+    return None
+
+
+def _check_pdf(f: BinaryIO, file_size: int) -> Optional[str]:
+    """Check a PDF's header and that its end-of-file marker was written."""
+    if f.read(len(PDF_START)) != PDF_START:
+        return "not a PDF"
+    f.seek(max(0, file_size - 1024))
+    if PDF_END not in f.read():
+        return "truncated PDF (no end marker)"
+    return None
+
+
+def validate_image(image_path: str) -> Optional[str]:
+    """
+    Check that a file is a complete image of a supported format, or a
+    complete PDF, from its header and last bytes only (the pixels are not
+    decoded).
+    
+    Args:
+        image_path: Path to the file
+    
+    Returns:
+        Why the file is rejected, or None if it is fine
+    """
+    try:
+        file_size = os.path.getsize(image_path)
+        if file_size == 0:
+            return "empty file"
+        with open(image_path, "rb") as f:
+            if is_pdf(image_path):
+                return _check_pdf(f, file_size)
+            with PILImage.open(f) as img:
+                if img.format not in IMAGE_FORMATS:
+                    return f"unsupported format {img.format}"
+                if img.width <= 0 or img.height <= 0:
+                    return f"invalid dimensions {img.width}x{img.height}"
+                return _check_truncated(img, f, file_size)
+    except PILImage.UnidentifiedImageError:
+        return "not an image"
+    except PILImage.DecompressionBombError:
+        return "image too large"
+    except (OSError, SyntaxError, ValueError, struct.error) as e:
+        return f"unreadable ({str(e)})"
+
+
+def expand_pages(image_path: str) -> list[str]:
+    """
+    Get the work items a valid file is added as: the file itself, or one
+    page path per page of a PDF or multi-page TIFF (see utils.page_utils).
+    Pages are counted from the file's structure; none is decoded.
+    
+    Raises:
+        OSError: The pages can't be counted
+    """
+    if not image_path.lower().endswith(MULTI_PAGE_EXTENSIONS):
+        return [image_path]
+    pages = count_pages(image_path)
+    if pages == 1 and not is_pdf(image_path):
+        return [image_path]
+    return [page_path(image_path, page) for page in range(1, pages + 1)]
+
+
+def _inspect(image_path: str) -> tuple[list[str], Optional[str]]:
+    """Validate a file and expand it into pages: (work items, None) or ([], reason)."""
+    reason = validate_image(image_path)
+    if reason is not None:
+        return [], reason
+    try:
+        pages = expand_pages(image_path)
+    except (OSError, SyntaxError, ValueError, struct.error) as e:
+        return [], f"unreadable ({str(e)})"
+    return (pages, None) if pages else ([], "no pages")
+
+
+def _list_folder(folder: str) -> tuple[list[str], list[str], Optional[str]]:
+    """List a folder's image files and subfolders, skipping hidden entries."""
+    files, subfolders = [], []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                # Symlinked folders are skipped so links can't loop
+                if entry.is_dir(follow_symlinks=False):
+                    subfolders.append(entry.path)
+                elif is_image_file(entry.name) and entry.is_file():
+                    files.append(entry.path)
+    except OSError as e:
+        return files, subfolders, str(e)
+    return files, subfolders, None
+
+
+def import_images(paths: Iterable[str], max_workers: int = IMPORT_WORKERS) -> ImportResult:
+    """
+    Collect the images among files and folders (searched recursively) and
+    reject invalid ones before they are added.
+    Folders are listed and headers read on a thread pool, one folder level
+    at a time. Files in folders are picked by extension; files given
+    directly are judged by their header only. PDFs and multi-page TIFFs
+    are added page by page, as separate images.
+    
+    Args:
+        paths: Files and folders, e.g. from a file dialog or a drop
+        max_workers: Threads listing folders and reading headers
+    
+    Returns:
+        ImportResult with the valid images in natural order and the rejected files
+    """
+    files, folders, rejected = [], [], []
+    for path in paths:
+        (folders if os.path.isdir(path) else files).append(path)
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import") as executor:
+        while folders:
+            next_folders = []
+            for folder, (found, subfolders, error) in zip(folders, executor.map(_list_folder, folders)):
+                if error is not None:
+                    rejected.append((folder, f"unreadable folder ({error})"))
+                files.extend(found)
+                next_folders.extend(subfolders)
+            folders = next_folders
+        
+        unique = list(dict.fromkeys(os.path.abspath(path) for path in files))
+        images = []
+        for path, (pages, reason) in zip(unique, executor.map(_inspect, unique)):
+            if reason is None:
+                images.extend(pages)
+            else:
+                rejected.append((path, reason))
+    
+    images.sort(key=natural_sort_key)
+    rejected.sort(key=lambda item: natural_sort_key(item[0]))
+    return ImportResult(images, rejected)
@@ -0,0 +1,304 @@
+import io
+import os
+import mmap
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, NamedTuple, Optional
+from PIL import ExifTags, Image as PILImage
+
+from core.answer_cache import hash_file
+from core.near_duplicates import perceptual_hash
+from utils.memory_utils import estimate_decoded_size
+from utils.page_crop import crop_payload
+from utils.page_utils import encode_page, load_payload, open_image, source_file, split_page_path
+from utils.thumbnail_cache import ThumbnailCache, get_thumbnail_cache
+from constants import (
+    THUMBNAIL_SIZE, INGEST_WORKERS, INGEST_MMAP_THRESHOLD, INGEST_PAYLOAD_BUDGET, INGEST_INFO_CACHE_SIZE
+)
+
+
+class ImageInfo(NamedTuple):
+    """What ingesting an image file learned about it."""
+    path: str
+    content_hash: str  # SHA-256 of the file as hash_file computes it (of the encoded payload for a page)
+    width: int
+    height: int
+    bands: int
+    orientation: int  # EXIF orientation (1 = upright)
+    mime_type: str
+    file_size: int  # Upload payload size (the file's, or the encoded page's)
+    perceptual_hash: int  # pHash of the thumbnail, for finding near-duplicates
+    
+    @property
+    def decoded_size(self) -> int:
+        """Memory the fully decoded image needs, in bytes."""
+        return self.width * self.height * self.bands
+
+
+class ImageStore:
+    """
+    Per-session store of everything derived from the selected image files.
+    Ingesting an image reads the file once (memory-mapped when large) and
+    derives its content hash, dimensions and orientation, its thumbnail
+    (handed to the thumbnail cache) and perceptual hash, and the upload
+    payload; the preview, answer cache and Gemini requests then use these
+    instead of opening the file again. Entries are keyed by path, modification time and size,
+    so an edited file is ingested afresh. Payloads are kept up to a byte
+    budget, least recently used first out; a missing one is read from disk.
+    At most max_infos images are remembered, least recently used first out,
+    so a long-running watch folder doesn't grow the store without bound.
+    A page of a multi-page file (see utils.page_utils) is ingested on its
+    own: only that page is decoded, and its payload is the page re-encoded.
+    With crop_margins set, payloads are cropped to the printed region and
+    straightened as they are handed out (see utils.page_crop).
+    Thread-safe.
+    """
+    
+    def __init__(
+        self,
+        thumbnail_cache: Optional[ThumbnailCache] = None,
+        thumbnail_size: tuple = THUMBNAIL_SIZE,
+        payload_budget: int = INGEST_PAYLOAD_BUDGET,
+        mmap_threshold: int = INGEST_MMAP_THRESHOLD,
+        max_workers: int = INGEST_WORKERS,
+        crop_margins: bool = False,
+        max_infos: int = INGEST_INFO_CACHE_SIZE
+    ):
+        """
+        Initialize image store.
+        
+        Args:
+            thumbnail_cache: Where thumbnails go (None = the shared cache)
+            thumbnail_size: (width, height) of the thumbnails made while ingesting
+            payload_budget: Bytes of upload payloads kept in memory
+            mmap_threshold: Files at least this large are memory-mapped instead of read
+            max_workers: Threads used by ingest_in_background
+            crop_margins: Crop and straighten payloads before upload (needs NumPy)
+            max_infos: Ingested images remembered (their payloads go with them)
+        """
+        self.thumbnail_cache = thumbnail_cache if thumbnail_cache is not None else get_thumbnail_cache()
+        self.thumbnail_size = tuple(thumbnail_size)
+        self.payload_budget = payload_budget
+        self.mmap_threshold = mmap_threshold
+        self.max_workers = max_workers
+        self.crop_margins = crop_margins
+        self.max_infos = max_infos
+        self._infos: OrderedDict[tuple, ImageInfo] = OrderedDict()
+        self._payloads: OrderedDict[tuple, bytes] = OrderedDict()
+        self._payload_bytes = 0
+        self._ingesting: dict[tuple, Future] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.lock = threading.Lock()
+        self.ingested = 0
+        self.payload_hits = 0
+        self.payload_misses = 0
+    
+    @staticmethod
+    def _key(image_path: str) -> tuple:
+        """Key an image by path, modification time and file size (of the file a page is in)."""
+        image_path = os.path.abspath(image_path)
+        stat = os.stat(source_file(image_path))
+        return (image_path, stat.st_mtime_ns, stat.st_size)
+    
+    def ingest(self, image_path: str) -> ImageInfo:
+        """
+        Ingest an image unless its current version already is.
+        If another thread is ingesting it, waits for that instead.
+        
+        Args:
+            image_path: Path to the image file
+        
+        Returns:
+            What was learned about the image
+        
+        Raises:
+            OSError: The file can't be read or isn't an image Pillow can open
+        """
+        key = self._key(image_path)
+        with self.lock:
+            info = self._infos.get(key)
+            if info is not None:
+                self._infos.move_to_end(key)
+                return info
+            future = self._ingesting.get(key)
+            owner = future is None
+            if owner:
+                future = self._ingesting[key] = Future()
+        if not owner:
+            return future.result()
+        
+        try:
+            info = self._ingest(key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self._ingesting.pop(key, None)
+        future.set_result(info)
+        return info
+    
+    def _ingest(self, key: tuple) -> ImageInfo:
+        """Read an image once and derive everything from that read."""
+        image_path, _, file_size = key
+        if split_page_path(image_path)[1] is not None:
+            # Only this page is decoded; everything else is derived from its encoded payload
+            try:
+                with open_image(image_path) as img:
+                    data = encode_page(img)["data"]
+            except (PILImage.DecompressionBombError, SyntaxError, ValueError) as e:
+                raise OSError(f"Cannot read image {image_path}: {str(e)}") from e
+            file_size = len(data)
+            source = io.BytesIO(data)
+        else:
+            with open(image_path, "rb") as f:
+                if file_size >= self.mmap_threshold:
+                    # Hashing and the reduced thumbnail decode work straight on the page cache
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    source = data
+                else:
+                    data = f.read()
+                    source = io.BytesIO(data)
+        
+        try:
+            content_hash = hashlib.sha256(data).hexdigest()
+            try:
+                with PILImage.open(source) as img:
+                    width, height = img.size
+                    bands = len(img.getbands())
+                    mime_type = img.get_format_mimetype() or "application/octet-stream"
+                    orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+                source.seek(0)
+                thumbnail = self.thumbnail_cache.get(image_path, self.thumbnail_size, source=source)
+            except (PILImage.DecompressionBombError, SyntaxError, ValueError) as e:
+                raise OSError(f"Cannot read image {image_path}: {str(e)}") from e
+            
+            info = ImageInfo(
+                image_path, content_hash, width, height, bands, orientation, mime_type, file_size,
+                perceptual_hash(thumbnail)
+            )
+            payload = data if isinstance(data, bytes) else None
+            if payload is None and file_size <= self.payload_budget:
+                payload = bytes(data)  # The SDK needs bytes; this is the file's only copy
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+        
+        with self.lock:
+            self._infos[key] = info
+            while len(self._infos) > self.max_infos:
+                evicted_key, _ = self._infos.popitem(last=False)
+                evicted = self._payloads.pop(evicted_key, None)
+                if evicted is not None:
+                    self._payload_bytes -= len(evicted)
+            self.ingested += 1
+            if payload is not None and len(payload) <= self.payload_budget:
+                self._payloads[key] = payload
+                self._payload_bytes += len(payload)
+                while self._payload_bytes > self.payload_budget:
+                    _, evicted = self._payloads.popitem(last=False)
+                    self._payload_bytes -= len(evicted)
+        return info
+    
+    def ingest_in_background(self, image_paths: Iterable[str]) -> list[Future]:
+        """
+        Queue images for ingestion on worker threads.
+        Failures are left for whoever uses the image next to report.
+        
+        Returns:
+            One future per image, resolving to its ImageInfo
+        """
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest")
+            executor = self._executor
+        return [executor.submit(self.ingest, image_path) for image_path in image_paths]
+    
+    def info(self, image_path: str) -> Optional[ImageInfo]:
+        """Get what was learned about the current version of an image, or None if it wasn't ingested."""
+        try:
+            key = self._key(image_path)
+        except OSError:
+            return None
+        with self.lock:
+            info = self._infos.get(key)
+            if info is not None:
+                self._infos.move_to_end(key)
+            return info
+    
+    def content_hash(self, image_path: str) -> str:
+        """Get an image's content hash, reading the file only if it wasn't ingested."""
+        info = self.info(image_path)
+        if info is None and split_page_path(image_path)[1] is not None:
+            # A page's hash is of its encoded payload, which only ingesting produces
+            info = self.ingest(image_path)
+        return info.content_hash if info is not None else hash_file(image_path)
+    
+    def perceptual_hash(self, image_path: str) -> int:
+        """Get an image's perceptual hash, ingesting it if it wasn't."""
+        info = self.info(image_path)
+        return info.perceptual_hash if info is not None else self.ingest(image_path).perceptual_hash
+    
+    def decoded_size(self, image_path: str) -> int:
+        """Get the memory an image needs decoded, reading its header only if it wasn't ingested."""
+        info = self.info(image_path)
+        return info.decoded_size if info is not None else estimate_decoded_size(image_path)
+    
+    def payload(self, image_path: str) -> dict:
+        """
+        Get an image's upload payload: the file's bytes (a page's encoding)
+        and MIME type. Served from memory when ingestion kept it, otherwise
+        read from disk, which decodes a page again. With crop_margins set, the
+        payload is cropped and straightened first (the kept one stays whole).
+        """
+        key = self._key(image_path)
+        with self.lock:
+            info = self._infos.get(key)
+            data = self._payloads.get(key)
+            if data is not None:
+                self._payloads.move_to_end(key)
+                self.payload_hits += 1
+            else:
+                self.payload_misses += 1
+        
+        if data is None:
+            payload = load_payload(image_path)
+        else:
+            payload = {"mime_type": info.mime_type, "data": data}
+        return crop_payload(payload) if self.crop_margins else payload
+    
+    def shutdown(self):
+        """Drop queued background ingestion (images being ingested finish)."""
+        with self.lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._infos)
+    
+    def clear(self):
+        """Forget every ingested image."""
+        with self.lock:
+            self._infos.clear()
+            self._payloads.clear()
+            self._payload_bytes = 0
+            self.ingested = 0
+            self.payload_hits = 0
+            self.payload_misses = 0
+
+
+_image_store: Optional[ImageStore] = None
+_image_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """Get the process-wide image store."""
+    global _image_store
+    with _image_store_lock:
+        if _image_store is None:
+            _image_store = ImageStore()
+        return _image_store
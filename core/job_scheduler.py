@@ -0,0 +1,414 @@
+import os
+import time
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional, Union
+
+from core.answer_cache import AnswerCache
+from core.image_store import get_image_store
+from core.answer_store import AnswerStore, create_answer_list
+from core.cost_model import order_by_predicted_cost
+from core.gemini_client import DeadlineExceededError
+from core.metrics import RouteMeter, ThroughputMeter
+from core.near_duplicates import CACHED, NEAR_DUPLICATE, SharedAnswers
+from core.pipeline import ImagePipeline, is_api_key_error, get_shared_rate_limiter, perceptual_hash_or_none
+from core.rate_limiter import RateLimiter
+from core.results_bundle import ResultsBundle, bundle_path
+from utils.memory_utils import current_rss, format_bytes
+from constants import MAX_CONCURRENT_WORKERS, DEADLINE_MARKER, NEAR_DUPLICATE_THRESHOLD
+
+
+class Job:
+    """A batch of images that becomes one student's document."""
+    
+    _ids = itertools.count(1)
+    
+    def __init__(
+        self,
+        student_name: str,
+        group: str,
+        image_paths: list[str],
+        custom_prompts: Optional[dict[str, str]] = None,
+        output_format: Union[str, Iterable[str]] = "pdf",
+        output_filename: str = "",
+        output_dir: Optional[str] = None,
+        job_timeout: Optional[float] = None,
+        match_near_duplicates: bool = False
+    ):
+        """
+        Initialize job.
+        
+        Args:
+            student_name: Student name
+            group: Group/class name
+            image_paths: Image files to process, in document order
+            custom_prompts: Optional mapping of image path to custom prompt
+            output_format: 'pdf' or 'word', or several formats to render from the same answers
+            output_filename: Optional custom filename (without extension)
+            output_dir: Where the document is written (None = current directory)
+            job_timeout: Optional time budget in seconds from submission; images
+                that cannot finish in time are abandoned with DEADLINE_MARKER
+            match_near_duplicates: Whether images may reuse the answer of a
+                near-identical image once its pixels confirm the match
+                (identical ones always do)
+        """
+        if not image_paths:
+            raise Exception("No images selected")
+        
+        self.job_id = next(Job._ids)
+        self.student_name = student_name
+        self.group = group
+        self.image_paths = list(image_paths)
+        self.custom_prompts = custom_prompts or {}
+        self.output_formats = [output_format] if isinstance(output_format, str) else list(output_format)
+        self.output_filename = output_filename
+        self.output_dir = output_dir
+        self.job_timeout = job_timeout
+        self.match_near_duplicates = match_near_duplicates
+        self.deadline: Optional[float] = None
+        self.dispatch_order = order_by_predicted_cost(
+            self.image_paths, self.custom_prompts, has_deadline=job_timeout is not None
+        )
+        
+        self.results = create_answer_list(len(self.image_paths))
+        self.image_hashes = [""] * len(self.image_paths)
+        self.records = [{"model": "", "seconds": 0.0} for _ in self.image_paths]  # Model and request time per image
+        self.next_index = 0
+        self.remaining = len(self.image_paths)
+        self.cache_hits = 0
+        self.near_duplicates = 0  # Images answered with a near-identical image's answer
+        self.abandoned = 0
+        self.rendering = False  # Set once every image is answered and the documents are being written
+        self.peak_rss = 0  # Process RSS sampled while this job ran
+        self.output_path: Optional[str] = None  # First of output_paths
+        self.output_paths: list[str] = []
+        self.bundle_path: Optional[str] = None  # Results bundle saved next to the documents
+        self.error: Optional[str] = None
+        self.meter = ThroughputMeter()
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.done = threading.Event()
+    
+    @property
+    def name(self) -> str:
+        """Get a short display name."""
+        return f"#{self.job_id} {self.student_name} ({self.group})"
+    
+    def has_pending(self) -> bool:
+        """Check if the job still has images to dispatch."""
+        return self.error is None and self.next_index < len(self.image_paths)
+    
+    def summary(self) -> str:
+        """Get a one-line human readable summary."""
+        elapsed = (self.finished_at or time.time()) - self.submitted_at
+        return (
+            f"Job {self.name}: {len(self.image_paths)} images in {elapsed:.1f}s, "
+            f"{self.cache_hits} cached, {self.near_duplicates} near-duplicates, {self.abandoned} abandoned, "
+            f"peak memory {format_bytes(self.peak_rss)}, {self.meter.summary()}"
+        )
+
+
+class JobScheduler:
+    """
+    Runs many jobs on one shared rate limiter, answer cache and worker pool.
+    Images are dispatched round-robin across jobs so no job starves, and
+    documents are rendered on a separate thread while requests keep flowing.
+    Identical and near-identical images, within a job or across jobs, are
+    requested once and the answer shared (see SharedAnswers).
+    A job is dropped from the queue once job_callback has been called with
+    it; a large job's on-disk results (an AnswerStore) are closed then, so
+    read them in the callback if they are needed afterwards.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_workers: int = MAX_CONCURRENT_WORKERS,
+        cache: Optional[AnswerCache] = None,
+        status_callback: Optional[Callable[[str], None]] = None,
+        job_callback: Optional[Callable[[Job], None]] = None,
+        pipeline: Optional[ImagePipeline] = None,
+        near_duplicate_threshold: Optional[int] = NEAR_DUPLICATE_THRESHOLD
+    ):
+        """
+        Initialize job scheduler.
+        
+        Args:
+            api_key: Gemini API key
+            rate_limiter: Rate limiter shared by all jobs (None = process-wide limiter)
+            max_workers: Maximum parallel requests across all jobs
+            cache: Answer cache shared by all jobs (None = create one)
+            status_callback: Called with human readable progress messages
+            job_callback: Called with each job once it has finished or failed
+            pipeline: Pipeline to use (None = create one)
+            near_duplicate_threshold: Largest perceptual hash distance at which
+                images share an answer (None = identical images only)
+        """
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.pipeline = pipeline or ImagePipeline(api_key, rate_limiter=self.rate_limiter)
+        self.cache = cache if cache is not None else AnswerCache()
+        self.shared_answers = SharedAnswers(self.cache, near_duplicate_threshold)
+        self.max_workers = max_workers
+        self.status_callback = status_callback
+        self.job_callback = job_callback
+        self.meter = ThroughputMeter()
+        self.route_meter = RouteMeter()
+        
+        self._jobs: list[Job] = []  # Jobs not yet delivered to job_callback
+        self._submitted = 0
+        self._finished = 0
+        self._cache_hits = 0  # Of delivered jobs (queued ones are counted in summary)
+        self._near_duplicates = 0
+        self._cursor = 0
+        self._condition = threading.Condition()
+        self._slots = threading.Semaphore(max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._render_executor = ThreadPoolExecutor(max_workers=1)
+        self._shutdown = False
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+    
+    def _emit(self, message: str):
+        """Report progress if a status callback is set."""
+        if self.status_callback is not None:
+            self.status_callback(message)
+    
+    def submit(self, job: Job) -> Job:
+        """
+        Queue a job.
+        
+        Args:
+            job: Job to run
+        
+        Returns:
+            The queued job
+        """
+        with self._condition:
+            if self._shutdown:
+                raise Exception("Scheduler has been shut down")
+            if job.job_timeout is not None:
+                job.deadline = time.time() + job.job_timeout
+            self._jobs.append(job)
+            self._submitted += 1
+            self._condition.notify_all()
+        self._emit(f"Queued job {job.name} with {len(job.image_paths)} images")
+        return job
+    
+    def active_jobs(self) -> list[Job]:
+        """Get jobs that have not finished yet."""
+        with self._condition:
+            return [job for job in self._jobs if not job.done.is_set()]
+    
+    def _next_item(self) -> Optional[tuple[Job, int]]:
+        """Pick the next image round-robin across jobs. Caller holds the lock."""
+        pending = [job for job in self._jobs if job.has_pending()]
+        if not pending:
+            return None
+        job = pending[self._cursor % len(pending)]
+        self._cursor += 1
+        idx = job.dispatch_order[job.next_index]
+        job.next_index += 1
+        return job, idx
+    
+    def _dispatch_loop(self):
+        """Feed worker slots from the job queues."""
+        while True:
+            self._slots.acquire()
+            with self._condition:
+                item = self._next_item()
+                while item is None and not self._shutdown:
+                    self._condition.wait()
+                    item = self._next_item()
+                if item is None:
+                    self._slots.release()
+                    return
+            self._executor.submit(self._run_item, *item)
+    
+    def _run_item(self, job: Job, idx: int):
+        """Answer one image of a job."""
+        image_path = job.image_paths[idx]
+        custom_prompt = job.custom_prompts.get(image_path, "")
+        started = time.time()
+        error = False
+        
+        try:
+            image_hash = get_image_store().content_hash(image_path)
+            job.image_hashes[idx] = image_hash
+            answer, how = self.shared_answers.answer(
+                image_hash,
+                perceptual_hash_or_none(image_path) if job.match_near_duplicates else None,
+                custom_prompt,
+                lambda: self.pipeline.process_image(image_path, custom_prompt, job.deadline, job.records[idx]),
+                image_path
+            )
+            if how in (CACHED, NEAR_DUPLICATE):
+                with self._condition:
+                    if how == CACHED:
+                        job.cache_hits += 1
+                    else:
+                        job.near_duplicates += 1
+            else:
+                record = job.records[idx]
+                if record.get("route"):
+                    self.route_meter.record(
+                        record["route"], record["seconds"], record["input_tokens"], record["output_tokens"]
+                    )
+        except DeadlineExceededError:
+            answer = DEADLINE_MARKER
+            with self._condition:
+                job.abandoned += 1
+            error = True
+        except Exception as e:
+            error_msg = str(e)
+            if is_api_key_error(error_msg):
+                self._slots.release()
+                self._fail_all(error_msg)
+                return
+            print(f"Error processing {image_path} for job {job.name}: {error_msg}")
+            answer = f"Error: {error_msg}"
+            error = True
+        
+        self._slots.release()
+        
+        latency = time.time() - started
+        job.meter.record(latency, error=error)
+        self.meter.record(latency, error=error)
+        
+        rss = current_rss()
+        with self._condition:
+            job.peak_rss = max(job.peak_rss, rss)
+            if job.finished_at is not None:
+                return  # Failed meanwhile; its results may already be closed
+            job.results[idx] = ("", answer)
+            job.remaining -= 1
+            done_images = len(job.image_paths) - job.remaining
+            finished = job.remaining == 0 and job.error is None
+            if finished:
+                job.rendering = True  # From here on only _render finishes the job
+        
+        self._emit(
+            f"{'✗' if error else '✓'} Job {job.name}: "
+            f"{done_images}/{len(job.image_paths)} images"
+        )
+        
+        if finished:
+            self._render_executor.submit(self._render, job)
+    
+    def _render(self, job: Job):
+        """Generate the documents for a finished job."""
+        from core.document_generator import DocumentGenerator
+        from core.render_pool import render_formats, format_render_times
+        
+        try:
+            output_filename = DocumentGenerator.generate_output_filename(
+                job.student_name, job.group, job.output_filename
+            )
+            if job.output_dir:
+                output_filename = os.path.join(job.output_dir, output_filename)
+            
+            self._emit(f"Generating document for job {job.name}...")
+            results = render_formats(
+                job.results, job.student_name, job.group, output_filename, job.output_formats
+            )
+            job.output_paths = [output_path for output_path, _ in results.values()]
+            job.output_path = job.output_paths[0]
+            self._emit(f"Job {job.name}: rendered {format_render_times(results)}")
+            self._save_results(job)
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.peak_rss = max(job.peak_rss, current_rss())
+        
+        self._finish(job)
+    
+    def _save_results(self, job: Job):
+        """Save a results bundle next to a job's documents."""
+        try:
+            bundle = ResultsBundle.from_results(
+                job.student_name, job.group, job.image_paths, job.results,
+                job.custom_prompts, job.records, job.image_hashes, job.output_filename
+            )
+            job.bundle_path = bundle.save(bundle_path(job.output_path))
+        except Exception as e:
+            # The documents are already written; a missing bundle only costs re-rendering
+            print(f"Could not save results bundle for job {job.name}: {str(e)}")
+    
+    def _finish(self, job: Job):
+        """Mark a job as finished, notify listeners, then drop it and its on-disk results."""
+        with self._condition:
+            if job.finished_at is not None:
+                return
+            job.finished_at = time.time()
+        job.done.set()
+        if job.error:
+            self._emit(f"Job {job.name} failed: {job.error}")
+        else:
+            self._emit(job.summary())
+        try:
+            if self.job_callback is not None:
+                self.job_callback(job)
+        finally:
+            with self._condition:
+                if job in self._jobs:
+                    self._jobs.remove(job)
+                self._finished += 1
+                self._cache_hits += job.cache_hits
+                self._near_duplicates += job.near_duplicates
+            if isinstance(job.results, AnswerStore):
+                job.results.close()
+    
+    def _fail_all(self, error_msg: str):
+        """Fail every unfinished job whose documents aren't being written (used for API key errors)."""
+        with self._condition:
+            failed = [
+                job for job in self._jobs
+                if job.error is None and not job.rendering and job.finished_at is None
+            ]
+            for job in failed:
+                job.error = error_msg
+        for job in failed:
+            self._finish(job)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for all queued jobs to finish.
+        
+        Args:
+            timeout: Maximum time to wait (None = wait indefinitely)
+        
+        Returns:
+            True if all jobs finished, False if timeout
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            jobs = list(self._jobs)
+        for job in jobs:
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            if not job.done.wait(remaining):
+                return False
+        return True
+    
+    def summary(self) -> str:
+        """Get aggregate throughput over all jobs."""
+        with self._condition:
+            finished = self._finished + sum(1 for job in self._jobs if job.done.is_set())
+            near_duplicates = self._near_duplicates + sum(job.near_duplicates for job in self._jobs)
+            saved = self._cache_hits + sum(job.cache_hits for job in self._jobs) + near_duplicates
+            submitted = self._submitted
+        summary = (
+            f"{finished}/{submitted} jobs finished, "
+            f"{saved} requests saved ({near_duplicates} by near-duplicates), {self.meter.summary()}"
+        )
+        routes = self.route_meter.summary()
+        return f"{summary}, routes: {routes}" if routes else summary
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and release the worker pools."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+        self._render_executor.shutdown(wait=wait)
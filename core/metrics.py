@@ -0,0 +1,134 @@
+import time
+import threading
+from collections import deque
+from typing import Optional
+
+from constants import THROUGHPUT_WINDOW
+
+
+class ThroughputMeter:
+    """
+    Tracks completed requests and reports throughput.
+    Steady-state rate is measured over a sliding window so that idle
+    periods and start-up do not skew the number.
+    """
+    
+    def __init__(self, window: float = THROUGHPUT_WINDOW):
+        """
+        Initialize throughput meter.
+        
+        Args:
+            window: Sliding window in seconds used for the steady-state rate
+        """
+        self.window = window
+        self.started_at = time.time()
+        self.completions = deque()  # Store (timestamp, latency) of completions
+        self.total_completed = 0
+        self.total_errors = 0
+        self.total_latency = 0.0
+        self.lock = threading.Lock()
+    
+    def record(self, latency: float, error: bool = False):
+        """
+        Record a finished request.
+        
+        Args:
+            latency: Request duration in seconds
+            error: Whether the request failed
+        """
+        with self.lock:
+            now = time.time()
+            self.completions.append((now, latency))
+            self.total_completed += 1
+            self.total_latency += latency
+            if error:
+                self.total_errors += 1
+            self._trim(now)
+    
+    def _trim(self, now: float):
+        """Drop completions that fell out of the sliding window."""
+        while self.completions and self.completions[0][0] < now - self.window:
+            self.completions.popleft()
+    
+    def steady_state_rate(self, now: Optional[float] = None) -> float:
+        """Get completions per minute over the sliding window."""
+        with self.lock:
+            now = now if now is not None else time.time()
+            self._trim(now)
+            if not self.completions:
+                return 0.0
+            span = min(self.window, now - self.started_at)
+            if span <= 0:
+                return 0.0
+            return len(self.completions) * 60.0 / span
+    
+    def overall_rate(self) -> float:
+        """Get completions per minute since the meter was created."""
+        with self.lock:
+            elapsed = time.time() - self.started_at
+            if elapsed <= 0:
+                return 0.0
+            return self.total_completed * 60.0 / elapsed
+    
+    def mean_latency(self) -> float:
+        """Get mean request latency in seconds."""
+        with self.lock:
+            if not self.total_completed:
+                return 0.0
+            return self.total_latency / self.total_completed
+    
+    def summary(self) -> str:
+        """Get a one-line human readable summary."""
+        return (
+            f"{self.total_completed} done ({self.total_errors} errors), "
+            f"{self.steady_state_rate():.1f} img/min steady, "
+            f"{self.overall_rate():.1f} img/min overall, "
+            f"{self.mean_latency():.1f}s mean latency"
+        )
+
+
+class RouteMeter:
+    """
+    Tracks latency and token use of answered requests per route (see
+    core.routing), so the cost of each kind of exercise can be compared.
+    Thread-safe.
+    """
+    
+    def __init__(self):
+        self._routes: dict[str, list] = {}  # route -> [requests, seconds, input tokens, output tokens]
+        self.lock = threading.Lock()
+    
+    def record(self, route: str, latency: float, input_tokens: int = 0, output_tokens: int = 0):
+        """
+        Record an answered request.
+        
+        Args:
+            route: Route the request took
+            latency: Request duration in seconds
+            input_tokens: Prompt and image tokens billed
+            output_tokens: Answer tokens billed
+        """
+        with self.lock:
+            totals = self._routes.setdefault(route, [0, 0.0, 0, 0])
+            totals[0] += 1
+            totals[1] += latency
+            totals[2] += input_tokens
+            totals[3] += output_tokens
+    
+    def totals(self) -> dict[str, dict]:
+        """Get requests, seconds, input_tokens and output_tokens per route."""
+        with self.lock:
+            return {
+                route: dict(zip(("requests", "seconds", "input_tokens", "output_tokens"), totals))
+                for route, totals in self._routes.items()
+            }
+    
+    def summary(self) -> str:
+        """Get a one-line human readable summary (empty before the first request)."""
+        return "; ".join(
+            f"{route}: {totals['requests']} requests, "
+            f"{totals['seconds'] / totals['requests']:.1f}s mean, "
+            f"{totals['input_tokens'] // totals['requests']} in / "
+            f"{totals['output_tokens'] // totals['requests']} out tokens each"
+            for route, totals in sorted(self.totals().items())
+        )
@@ -0,0 +1,329 @@
+import math
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+from PIL import Image as PILImage, ImageChops, ImageOps
+
+from core.answer_cache import AnswerCache
+from utils.page_utils import open_image
+from constants import NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_TILE, NEAR_DUPLICATE_TOLERANCE
+
+PHASH_SIZE = 32  # Images are reduced to this many pixels square before the DCT
+PHASH_FREQUENCIES = 8  # Lowest frequencies kept per axis; without the DC term that is 63 bits
+_COSINES = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * PHASH_SIZE)) for x in range(PHASH_SIZE)]
+    for u in range(PHASH_FREQUENCIES)
+]
+
+# How an answer was obtained (see SharedAnswers.answer)
+REQUESTED = "requested"
+CACHED = "cached"
+NEAR_DUPLICATE = "near-duplicate"
+
+
+def perceptual_hash(img: PILImage.Image) -> int:
+    """
+    Compute a DCT perceptual hash (pHash) of an image.
+    The image is reduced to 32x32 grey, and each of the 63 lowest-frequency
+    DCT coefficients becomes one bit: above or below their median. Resizing,
+    recompression and exposure changes flip few bits; a thumbnail is plenty
+    of input.
+    
+    Returns:
+        63-bit hash; compare hashes with hamming_distance
+    """
+    pixels = img.convert("L").resize((PHASH_SIZE, PHASH_SIZE), PILImage.Resampling.LANCZOS).tobytes()
+    # Separable 2D DCT-II, computing only the frequencies that are kept
+    rows = [
+        [sum(cosine[x] * pixels[y * PHASH_SIZE + x] for x in range(PHASH_SIZE)) for cosine in _COSINES]
+        for y in range(PHASH_SIZE)
+    ]
+    coefficients = [
+        sum(cosine_v[y] * rows[y][u] for y in range(PHASH_SIZE))
+        for cosine_v in _COSINES for u in range(PHASH_FREQUENCIES)
+    ][1:]  # The DC term is the mean brightness
+    median = sorted(coefficients)[len(coefficients) // 2]
+    bits = 0
+    for coefficient in coefficients:
+        bits = (bits << 1) | (coefficient > median)
+    return bits
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of bits in which two hashes differ."""
+    return (a ^ b).bit_count()
+
+
+def images_match(path_a: str, path_b: str) -> bool:
+    """
+    Confirm that two images with close perceptual hashes show the same content.
+    Worksheets printed from one template hash alike, so the pixels decide:
+    both images are compared in grey at the smaller one's full resolution,
+    and the mean difference of every NEAR_DUPLICATE_TILE pixel square must
+    stay within NEAR_DUPLICATE_TOLERANCE. Recompression noise passes; a
+    changed word or digit fails the squares it is in. Copies shrunk until
+    small print blurs fail too, and are simply requested again.
+    
+    Returns:
+        Whether the images match (False if either can't be read)
+    """
+    try:
+        with open_image(path_a) as img_a, open_image(path_b) as img_b:
+            grey_a = ImageOps.exif_transpose(img_a).convert("L")
+            grey_b = ImageOps.exif_transpose(img_b).convert("L")
+    except (OSError, PILImage.DecompressionBombError, SyntaxError, ValueError):
+        return False
+    if grey_a.width * grey_b.height != grey_a.height * grey_b.width:
+        # Allow the rounding of a resized copy, nothing more
+        if abs(grey_a.width / grey_a.height - grey_b.width / grey_b.height) > 0.01:
+            return False
+    if grey_a.width * grey_a.height > grey_b.width * grey_b.height:
+        grey_a = grey_a.resize(grey_b.size)
+    elif grey_a.size != grey_b.size:
+        grey_b = grey_b.resize(grey_a.size)
+    difference = ImageChops.difference(grey_a, grey_b)
+    tiles = difference.resize(
+        (max(1, difference.width // NEAR_DUPLICATE_TILE), max(1, difference.height // NEAR_DUPLICATE_TILE)),
+        PILImage.Resampling.BOX
+    )
+    return tiles.getextrema()[1] <= NEAR_DUPLICATE_TOLERANCE
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree of hashes under Hamming distance.
+    Each child hangs off its parent at its distance from it, so the triangle
+    inequality lets a search skip every subtree whose edge distance is
+    further than max_distance from the query's distance to the parent.
+    Not thread-safe.
+    """
+    
+    def __init__(self):
+        self._root: Optional[list] = None  # [hash, values, {distance: child}]
+        self._size = 0
+    
+    def add(self, key: int, value: Any):
+        """Add a value under a hash (several values may share one)."""
+        self._size += 1
+        if self._root is None:
+            self._root = [key, [value], {}]
+            return
+        node = self._root
+        while True:
+            distance = hamming_distance(key, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [value], {}]
+                return
+            node = child
+    
+    def search(self, key: int, max_distance: int) -> list[tuple[int, Any]]:
+        """Get the (distance, value) pairs within max_distance of a hash, nearest first."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(key, node[0])
+            if distance <= max_distance:
+                found.extend((distance, value) for value in node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        found.sort(key=lambda item: item[0])
+        return found
+    
+    def __len__(self) -> int:
+        return self._size
+
+
+class NearDuplicateIndex:
+    """
+    Perceptual hashes of answered images, searchable for near-duplicates.
+    Only images with the same custom prompt match, since the prompt is part
+    of what is answered. Thread-safe.
+    """
+    
+    def __init__(self, threshold: int = NEAR_DUPLICATE_THRESHOLD):
+        """
+        Initialize near-duplicate index.
+        
+        Args:
+            threshold: Largest Hamming distance still counted as the same image
+        """
+        self.threshold = threshold
+        self._trees: dict[str, BKTree] = {}
+        self.lock = threading.Lock()
+    
+    def add(self, phash: int, value: Any, custom_prompt: str = ""):
+        """Record an image (value identifies it, e.g. its content hash)."""
+        with self.lock:
+            self._trees.setdefault(custom_prompt, BKTree()).add(phash, value)
+    
+    def candidates(self, phash: int, custom_prompt: str = "") -> list[Any]:
+        """Get the recorded images within the threshold, nearest first."""
+        with self.lock:
+            tree = self._trees.get(custom_prompt)
+            found = tree.search(phash, self.threshold) if tree is not None else []
+        return [value for _, value in found]
+    
+    def match(self, phash: int, custom_prompt: str = "") -> Optional[Any]:
+        """Get the nearest recorded image within the threshold, or None."""
+        found = self.candidates(phash, custom_prompt)
+        return found[0] if found else None
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(tree) for tree in self._trees.values())
+    
+    def clear(self):
+        """Forget every recorded image."""
+        with self.lock:
+            self._trees.clear()
+
+
+class SharedAnswers:
+    """
+    Lets concurrent workers answer identical and near-identical images with
+    one request. The first worker to reach an image makes the request; an
+    identical image (same content hash) with the same prompt reuses the
+    cached answer, or waits for the request in flight instead of sending its
+    own. With a threshold set, so may a near-duplicate: an image whose
+    perceptual hash is within the threshold and whose pixels confirm it
+    (see images_match), since a close hash alone doesn't tell worksheets
+    printed from one template apart.
+    Thread-safe.
+    """
+    
+    def __init__(
+        self,
+        cache: Optional[AnswerCache] = None,
+        threshold: Optional[int] = None,
+        confirm: Callable[[str, str], bool] = images_match
+    ):
+        """
+        Initialize shared answers.
+        
+        Args:
+            cache: Where finished answers are kept (None = create one)
+            threshold: Largest Hamming distance counted as a near-duplicate
+                (None = share answers between identical images only)
+            confirm: Decides whether two image files close in hash really
+                are the same (run without holding the lock)
+        """
+        self.cache = cache if cache is not None else AnswerCache()
+        self.index = NearDuplicateIndex(threshold) if threshold is not None else None
+        self.confirm = confirm
+        self._pending: dict[tuple[str, str], Future] = {}
+        self._sources: dict[str, str] = {}  # Content hash -> image file, of every indexed image
+        self._confirmed: dict[tuple[str, str], bool] = {}  # (hash, indexed hash) -> whether the pixels matched
+        self.lock = threading.Lock()
+    
+    def _lookup(self, image_hash: str, custom_prompt: str) -> tuple[Optional[str], Optional[Future]]:
+        """Get an image's answer if finished, or the request in flight for it. Caller holds the lock."""
+        answer = self.cache.get(image_hash, custom_prompt)
+        if answer is not None:
+            return answer, None
+        return None, self._pending.get((image_hash, custom_prompt))
+    
+    def _near_duplicate(
+        self,
+        image_hash: str,
+        phash: int,
+        custom_prompt: str
+    ) -> tuple[Optional[str], Optional[tuple[str, str]]]:
+        """
+        Find a confirmed near-duplicate of an image. Caller holds the lock.
+        
+        Returns:
+            (twin_hash, None) for a confirmed near-duplicate, (None, (image
+            hash, twin hash)) for a candidate whose pixels must be compared
+            first, or (None, None) if there is nothing to reuse
+        """
+        for twin_hash in self.index.candidates(phash, custom_prompt):
+            if twin_hash == image_hash:
+                continue
+            confirmed = self._confirmed.get((image_hash, twin_hash))
+            if confirmed is None:
+                return None, (image_hash, twin_hash)
+            if confirmed:
+                return twin_hash, None
+        return None, None
+    
+    def answer(
+        self,
+        image_hash: str,
+        phash: Optional[int],
+        custom_prompt: str,
+        request: Callable[[], str],
+        image_path: Optional[str] = None
+    ) -> tuple[str, str]:
+        """
+        Answer an image, reusing the answer of an identical or near-identical one.
+        
+        Args:
+            image_hash: The image's content hash
+            phash: The image's perceptual hash (None = match identical images only)
+            custom_prompt: Custom prompt for the image
+            request: Makes the request; called only if no answer can be reused
+            image_path: The image file, for confirming near-duplicates
+                (None = match identical images only)
+        
+        Returns:
+            (answer, how) where how is REQUESTED, CACHED or NEAR_DUPLICATE
+        
+        Raises:
+            Whatever request raises
+        """
+        near = phash is not None and image_path is not None and self.index is not None
+        while True:
+            unconfirmed = None
+            with self.lock:
+                how = CACHED
+                answer, pending = self._lookup(image_hash, custom_prompt)
+                if answer is None and pending is None and near:
+                    twin_hash, unconfirmed = self._near_duplicate(image_hash, phash, custom_prompt)
+                    if twin_hash is not None:
+                        how = NEAR_DUPLICATE
+                        answer, pending = self._lookup(twin_hash, custom_prompt)
+                if answer is None and pending is None and unconfirmed is None:
+                    # Nobody has answered this image: this worker does
+                    key = (image_hash, custom_prompt)
+                    future = self._pending[key] = Future()
+                    if near:
+                        self.index.add(phash, image_hash, custom_prompt)
+                        self._sources[image_hash] = image_path
+                    break
+                twin_path = self._sources.get(unconfirmed[1]) if unconfirmed is not None else None
+            if unconfirmed is not None:
+                # Compare the pixels outside the lock, then look again
+                matched = twin_path is not None and self.confirm(image_path, twin_path)
+                with self.lock:
+                    self._confirmed[unconfirmed] = matched
+                continue
+            if answer is not None:
+                return answer, how
+            if pending.result() is not None:
+                return pending.result(), how
+            # That request failed; look again, so this image is requested if nothing else matches
+        
+        answer = None
+        try:
+            answer = request()
+            self.cache.put(image_hash, custom_prompt, answer)
+        finally:
+            with self.lock:
+                self._pending.pop(key, None)
+            # Waiters reuse only real answers; after an error they send their own request
+            future.set_result(answer if answer is not None and not answer.startswith("Error:") else None)
+        return answer, REQUESTED
+    
+    def clear(self):
+        """Forget the recorded images (finished answers stay in the cache)."""
+        if self.index is not None:
+            self.index.clear()
+        with self.lock:
+            self._sources.clear()
+            self._confirmed.clear()
@@ -0,0 +1,315 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Optional
+
+from core.answer_store import create_answer_list
+from core.concurrency import ConcurrencyController, MemoryBudget
+from core.cost_model import order_by_predicted_cost
+from core.gemini_client import GeminiClient, DeadlineExceededError
+from core.image_store import get_image_store
+from core.metrics import RouteMeter
+from core.near_duplicates import REQUESTED, SharedAnswers
+from core.rate_limiter import RateLimiter
+from utils.memory_utils import PeakMemoryTracker, format_bytes
+from utils.page_utils import display_name
+from constants import (
+    MAX_REQUESTS_PER_WINDOW, RATE_LIMIT_WINDOW, MAX_CONCURRENT_WORKERS,
+    MIN_REQUEST_TIME, DEADLINE_MARKER, NEAR_DUPLICATE_THRESHOLD
+)
+
+
+_shared_rate_limiter: Optional[RateLimiter] = None
+_shared_rate_limiter_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter shared by all jobs."""
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter(MAX_REQUESTS_PER_WINDOW, RATE_LIMIT_WINDOW)
+        return _shared_rate_limiter
+
+
+def perceptual_hash_or_none(image_path: str) -> Optional[int]:
+    """Get an image's perceptual hash, or None if it can't be read (its request then reports why)."""
+    try:
+        return get_image_store().perceptual_hash(image_path)
+    except OSError:
+        return None
+
+
+def is_api_key_error(error_msg: str) -> bool:
+    """Check if an error message is caused by an invalid API key."""
+    return 'api key' in error_msg.lower() or 'API_KEY' in error_msg
+
+
+class ImagePipeline:
+    """
+    Headless image-to-answer pipeline.
+    Sends images to Gemini in parallel under a (possibly shared) rate limiter,
+    with the number of in-flight requests tuned by a ConcurrencyController.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_workers: int = MAX_CONCURRENT_WORKERS,
+        status_callback: Optional[Callable[[str], None]] = None,
+        client_factory: Callable[[str], GeminiClient] = GeminiClient,
+        memory_budget: Optional[MemoryBudget] = None,
+        near_duplicate_threshold: Optional[int] = NEAR_DUPLICATE_THRESHOLD
+    ):
+        """
+        Initialize pipeline.
+        
+        Args:
+            api_key: Gemini API key
+            rate_limiter: Rate limiter to share with other pipelines (None = create one)
+            max_workers: Upper bound on parallel requests (actual concurrency is auto-tuned)
+            status_callback: Called with human readable progress messages
+            client_factory: Creates a client for an API key (one per request thread)
+            memory_budget: Admission control on in-flight decoded bytes (None = create one)
+            near_duplicate_threshold: Largest perceptual hash distance at which
+                images share an answer (None = identical images only)
+        """
+        if not api_key:
+            raise Exception("API key is empty")
+        
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter or RateLimiter(MAX_REQUESTS_PER_WINDOW, RATE_LIMIT_WINDOW)
+        self.max_workers = max_workers
+        self.status_callback = status_callback
+        self.client_factory = client_factory
+        self.concurrency = ConcurrencyController(self.rate_limiter, max_workers=max_workers)
+        self.memory_budget = memory_budget or MemoryBudget()
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.shared_answers = SharedAnswers(threshold=near_duplicate_threshold)  # Spans every process() of this pipeline
+        self.last_peak_rss = 0
+        self.last_requests_saved = 0  # Images of the last process() answered from an identical or near-identical one
+        self.last_records: list[dict] = []  # Model and request time per image of the last process()
+        self.route_meter = RouteMeter()  # Latency and tokens per route of every request this pipeline made
+    
+    def _emit(self, message: str):
+        """Report progress if a status callback is set."""
+        if self.status_callback is not None:
+            self.status_callback(message)
+    
+    @staticmethod
+    def _wait_timeout(deadline: Optional[float]) -> float:
+        """Get how long to wait for a slot, honouring the deadline."""
+        if deadline is None:
+            return 300  # 5 minute timeout
+        remaining = deadline - time.time() - MIN_REQUEST_TIME
+        if remaining <= 0:
+            raise DeadlineExceededError("Not enough time left before the deadline")
+        return min(300, remaining)
+    
+    def process_image(
+        self,
+        image_path: str,
+        custom_prompt: str = "",
+        deadline: Optional[float] = None,
+        record: Optional[dict] = None
+    ) -> str:
+        """
+        Process a single image with rate limiting.
+        
+        Args:
+            image_path: Path to the image file
+            custom_prompt: Optional custom prompt for this image
+            deadline: Optional absolute time (time.time()) after which the image is abandoned
+            record: Optional dict that receives the answering model, request time,
+                route and token counts
+        
+        Returns:
+            Generated answer text
+        """
+        if not self.concurrency.acquire(timeout=self._wait_timeout(deadline)):
+            self._wait_timeout(deadline)  # Raises if the deadline is what ran out
+            raise TimeoutError("Rate limit timeout")
+        
+        latency = None
+        decoded_size = get_image_store().decoded_size(image_path)
+        try:
+            if not self.memory_budget.acquire(decoded_size, timeout=self._wait_timeout(deadline)):
+                self._wait_timeout(deadline)  # Raises if the deadline is what ran out
+                raise TimeoutError("Memory budget timeout")
+            
+            try:
+                if not self.rate_limiter.acquire(timeout=self._wait_timeout(deadline)):
+                    self._wait_timeout(deadline)
+                    raise TimeoutError("Rate limit timeout")
+                
+                # Create a new client instance for this thread
+                client = self.client_factory(self.api_key)
+                started = time.time()
+                answer = client.generate_answer_from_image(image_path, custom_prompt, deadline=deadline)
+                latency = time.time() - started
+                route = getattr(client, "last_route", None) or ""
+                input_tokens, output_tokens = getattr(client, "last_usage", (0, 0))
+                if route:
+                    self.route_meter.record(route, latency, input_tokens, output_tokens)
+                if record is not None:
+                    record["model"] = getattr(client, "last_model", None) or ""
+                    record["seconds"] = latency
+                    record["route"] = route
+                    record["input_tokens"] = input_tokens
+                    record["output_tokens"] = output_tokens
+                return answer
+            finally:
+                self.memory_budget.release(decoded_size)
+        finally:
+            self.concurrency.release(latency)
+    
+    def process(
+        self,
+        image_paths: list[str],
+        custom_prompts: Optional[dict[str, str]] = None,
+        job_timeout: Optional[float] = None,
+        match_near_duplicates: bool = False
+    ) -> list[tuple[str, str]]:
+        """
+        Process all images in parallel with rate limiting.
+        Images are dispatched in order of predicted cost; results keep input order.
+        Identical images, and near-identical ones if enabled, are requested
+        once and share the answer, also with images of earlier calls.
+        
+        Args:
+            image_paths: Image files to process
+            custom_prompts: Optional mapping of image path to custom prompt
+            job_timeout: Optional time budget in seconds; images that cannot
+                finish in time are abandoned with DEADLINE_MARKER
+            match_near_duplicates: Whether near-identical images share an answer
+                (each match is confirmed on the pixels)
+        
+        Returns:
+            List of (exercise_text, answer_text) tuples in input order
+            (an on-disk AnswerStore for very large jobs)
+        """
+        if not image_paths:
+            raise Exception("No images selected")
+        
+        custom_prompts = custom_prompts or {}
+        total_images = len(image_paths)
+        deadline = None if job_timeout is None else time.time() + job_timeout
+        
+        # Threads are cheap; the controller decides how many run at once
+        max_workers = min(self.max_workers, total_images)
+        
+        self._emit(
+            f"Processing {total_images} images in parallel "
+            f"({self.concurrency.target()}-{max_workers} concurrent workers, {self.rate_limiter.max_requests} "
+            f"requests/{self.rate_limiter.time_window}s limit)..."
+        )
+        
+        exercises_with_answers = create_answer_list(total_images)
+        records = [{"model": "", "seconds": 0.0} for _ in image_paths]
+        self.last_records = records
+        completed = 0
+        abandoned = 0
+        saved = 0
+        completed_lock = threading.Lock()
+        
+        def process_single_image(idx: int, image_path: str) -> tuple[int, tuple[str, str]]:
+            """Process a single image and report progress."""
+            nonlocal completed, abandoned, saved
+            
+            try:
+                self._emit(
+                    f"Processing image {idx + 1} of {total_images}: {display_name(image_path)}"
+                )
+                custom_prompt = custom_prompts.get(image_path, "")
+                
+                def request() -> str:
+                    return self.process_image(image_path, custom_prompt, deadline, records[idx])
+                
+                try:
+                    image_hash = get_image_store().content_hash(image_path)
+                except OSError:
+                    answer, how = request(), REQUESTED  # The request reports why the file can't be read
+                else:
+                    phash = perceptual_hash_or_none(image_path) if match_near_duplicates else None
+                    answer, how = self.shared_answers.answer(image_hash, phash, custom_prompt, request, image_path)
+                
+                with completed_lock:
+                    if how != REQUESTED:
+                        saved += 1
+                    completed += 1
+                    self._emit(
+                        f"✓ Completed {completed}/{total_images} images "
+                        f"({self.rate_limiter.get_available_slots()} slots remaining, "
+                        f"{self.concurrency.target()} workers)"
+                    )
+                
+                return (idx, ("", answer))
+            except DeadlineExceededError:
+                with completed_lock:
+                    abandoned += 1
+                return (idx, ("", DEADLINE_MARKER))
+            except TimeoutError as e:
+                error_msg = str(e)
+                with completed_lock:
+                    completed += 1
+                    self._emit(
+                        f"✗ Timed out processing image {idx + 1}: {error_msg[:80]}"
+                    )
+                return (idx, ("", f"Error: {error_msg}"))
+            except Exception as e:
+                error_msg = str(e)
+                print(f"Error processing image {idx + 1}: {error_msg}")
+                
+                # Check if it's an API key error
+                if is_api_key_error(error_msg):
+                    raise Exception(error_msg)
+                
+                with completed_lock:
+                    completed += 1
+                    self._emit(
+                        f"✗ Error processing image {idx + 1}: {error_msg[:80]}"
+                    )
+                
+                return (idx, ("", f"Error: {error_msg}"))
+        
+        with PeakMemoryTracker() as memory_tracker, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            dispatch_order = order_by_predicted_cost(
+                image_paths, custom_prompts, has_deadline=deadline is not None
+            )
+            futures = {
+                executor.submit(process_single_image, idx, image_paths[idx]): idx
+                for idx in dispatch_order
+            }
+            
+            for future in as_completed(futures):
+                try:
+                    idx, result = future.result()
+                    exercises_with_answers[idx] = result
+                except Exception as e:
+                    idx = futures[future]
+                    error_msg = str(e)
+                    exercises_with_answers[idx] = ("", f"Error: {error_msg}")
+                    
+                    # API key error, cancel remaining tasks and raise
+                    if is_api_key_error(error_msg):
+                        for f in futures:
+                            f.cancel()
+                        raise Exception(error_msg)
+        
+        self.last_peak_rss = memory_tracker.peak_rss
+        self.last_requests_saved = saved
+        peak_memory = format_bytes(self.last_peak_rss)
+        duplicates = f", {saved} answered from duplicates" if saved else ""
+        
+        if abandoned:
+            self._emit(
+                f"Finished processing {total_images - abandoned} of {total_images} images "
+                f"({abandoned} abandoned at the deadline, peak memory {peak_memory}{duplicates})"
+            )
+        else:
+            self._emit(f"Finished processing all {total_images} images (peak memory {peak_memory}{duplicates})")
+        routes = self.route_meter.summary()
+        if routes:
+            self._emit(f"Routes: {routes}")
+        return exercises_with_answers
@@ -1,12 +1,11 @@
 import traceback
-import os
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
 from PyQt6.QtCore import QThread, pyqtSignal
 
-from core.gemini_client import GeminiClient
-from core.rate_limiter import RateLimiter
-from constants import MAX_REQUESTS_PER_WINDOW, RATE_LIMIT_WINDOW, MAX_CONCURRENT_WORKERS
+from core.answer_store import AnswerStore
+from core.pipeline import ImagePipeline, get_shared_rate_limiter
+from core.results_bundle import ResultsBundle, bundle_path
+from constants import OUTPUT_FORMATS, FORMAT_NAMES
 
 
 class ProcessingThread(QThread):
@@ -19,6 +18,8 @@ class ProcessingThread(QThread):
     def __init__(self, app_instance):
         super().__init__()
         self.app = app_instance
+        self.records: list[dict] = []
+        self.image_prompts: dict[str, str] = {}
     
     def run(self):
         """Run the processing in background thread."""
@@ -43,10 +44,15 @@ class ProcessingThread(QThread):
             else:
                 self.status_update.emit("All images processed successfully. Generating document...")
             
-            # Generate document (PDF or Word)
-            output_path = self._generate_document(exercises_with_answers)
+            # Generate documents (PDF and/or Word)
+            try:
+                output_paths = self._generate_document(exercises_with_answers)
+                self._save_results(exercises_with_answers, output_paths[0])
+            finally:
+                if isinstance(exercises_with_answers, AnswerStore):
+                    exercises_with_answers.close()
             
-            self.finished.emit(output_path)
+            self.finished.emit("\n".join(output_paths))
         except Exception as e:
             error_details = f"{str(e)}\n\n{traceback.format_exc()}"
             print(f"Processing error: {error_details}")
@@ -62,104 +68,56 @@ class ProcessingThread(QThread):
             raise Exception("No images selected")
         
         # Collect custom prompts from UI
-        image_custom_prompts = {}
-        for image_path in self.app.image_paths:
-            if image_path in self.app.image_prompt_widgets:
-                _, text_edit = self.app.image_prompt_widgets[image_path]
-                custom_prompt = text_edit.toPlainText().strip()
-                if custom_prompt:
-                    image_custom_prompts[image_path] = custom_prompt
-        
-        total_images = len(self.app.image_paths)
-        
-        rate_limiter = RateLimiter(MAX_REQUESTS_PER_WINDOW, RATE_LIMIT_WINDOW)
+        self.image_prompts = self.app.collect_image_prompts()
         
-        available_slots = rate_limiter.get_available_slots()
-        max_workers = min(
-            MAX_CONCURRENT_WORKERS,
-            max(available_slots, 1),
-            total_images
+        pipeline = ImagePipeline(
+            api_key,
+            rate_limiter=get_shared_rate_limiter(),
+            status_callback=self.status_update.emit
         )
-        
-        self.status_update.emit(
-            f"Processing {total_images} images in parallel "
-            f"({max_workers} concurrent workers, {MAX_REQUESTS_PER_WINDOW} requests/{RATE_LIMIT_WINDOW}s limit)..."
+        results = pipeline.process(
+            self.app.image_paths, self.image_prompts,
+            match_near_duplicates=self.app.near_duplicates_checkbox.isChecked()
         )
+        self.records = pipeline.last_records
+        return results
+    
+    def _save_results(self, exercises_with_answers: list[tuple[str, str]], output_path: str):
+        """Save a results bundle next to the documents so they can be re-rendered later."""
+        try:
+            bundle = ResultsBundle.from_results(
+                self.app.student_name_edit.text().strip(),
+                self.app.group_edit.text().strip(),
+                self.app.image_paths,
+                exercises_with_answers,
+                self.image_prompts,
+                self.records,
+                output_filename=self.app.output_filename_edit.text().strip()
+            )
+            path = bundle.save(bundle_path(output_path))
+            self.status_update.emit(f"Saved results to {path}")
+        except Exception as e:
+            # The documents are already written; a missing bundle only costs re-rendering
+            print(f"Could not save results bundle: {str(e)}")
+    
+    def _generate_document(
+        self,
+        exercises_with_answers: list[tuple[str, str]],
+        output_formats: Optional[set[str]] = None
+    ) -> list[str]:
+        """
+        Generate the selected documents from one set of answers.
+        Several formats are rendered in parallel worker processes.
         
-        exercises_with_answers = [None] * total_images
-        completed = 0
-        completed_lock = threading.Lock()
-        
-        def process_single_image(idx: int, image_path: str) -> tuple[int, tuple[str, str]]:
-            """Process a single image with rate limiting."""
-            nonlocal completed
-            
-            if not rate_limiter.acquire(timeout=300):  # 5 minute timeout
-                return (idx, ("", "Error: Rate limit timeout"))
-            
-            try:
-                self.status_update.emit(
-                    f"Processing image {idx + 1} of {total_images}: {os.path.basename(image_path)}"
-                )
-                
-                # Create a new client instance for this thread
-                client = GeminiClient(api_key)
-                answer = client.generate_answer_from_image(
-                    image_path,
-                    image_custom_prompts.get(image_path, "")
-                )
-                
-                with completed_lock:
-                    completed += 1
-                    self.status_update.emit(
-                        f"✓ Completed {completed}/{total_images} images "
-                        f"({rate_limiter.get_available_slots()} slots remaining)"
-                    )
-                
-                return (idx, ("", answer))
-            except Exception as e:
-                error_msg = str(e)
-                print(f"Error processing image {idx + 1}: {error_msg}")
-                
-                # Check if it's an API key error
-                if 'api key' in error_msg.lower() or 'API_KEY' in error_msg:
-                    raise Exception(error_msg)
-                
-                with completed_lock:
-                    completed += 1
-                    self.status_update.emit(
-                        f"✗ Error processing image {idx + 1}: {error_msg[:80]}"
-                    )
-                
-                return (idx, ("", f"Error: {error_msg}"))
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(process_single_image, idx, path): idx
-                for idx, path in enumerate(self.app.image_paths)
-            }
-            
-            for future in as_completed(futures):
-                try:
-                    idx, result = future.result()
-                    exercises_with_answers[idx] = result
-                except Exception as e:
-                    idx = futures[future]
-                    error_msg = str(e)
-                    exercises_with_answers[idx] = ("", f"Error: {error_msg}")
-                    
-                    # API key error, cancel remaining tasks and raise
-                    if 'api key' in error_msg.lower() or 'API_KEY' in error_msg:
-                        for f in futures:
-                            f.cancel()
-                        raise Exception(error_msg)
+        Args:
+            exercises_with_answers: List of (exercise_text, answer_text) tuples
+            output_formats: Formats to render (None = the formats selected in the UI)
         
-        self.status_update.emit(f"Finished processing all {total_images} images")
-        return exercises_with_answers
-    
-    def _generate_document(self, exercises_with_answers: list[tuple[str, str]]) -> str:
-        """Generate PDF or Word document."""
+        Returns:
+            Paths of the generated documents
+        """
         from core.document_generator import DocumentGenerator
+        from core.render_pool import render_formats, format_render_times
         
         student_name = self.app.student_name_edit.text().strip()
         group = self.app.group_edit.text().strip()
@@ -169,18 +127,14 @@ class ProcessingThread(QThread):
             student_name, group, custom_filename
         )
         
-        output_format = self.app.output_format_group.checkedButton().text().lower()
+        if output_formats is None:
+            output_formats = set(self.app.selected_output_formats())
         
-        if output_format == "word":
-            self.status_update.emit("Generating Word document...")
-            output_path = DocumentGenerator.generate_word(
-                exercises_with_answers, student_name, group, output_filename
-            )
-        else:
-            self.status_update.emit("Generating PDF...")
-            output_path = DocumentGenerator.generate_pdf(
-                exercises_with_answers, student_name, group, output_filename
-            )
+        names = " and ".join(FORMAT_NAMES[fmt] for fmt in OUTPUT_FORMATS if fmt in output_formats)
+        self.status_update.emit(f"Generating {names}...")
+        results = render_formats(
+            exercises_with_answers, student_name, group, output_filename, output_formats
+        )
+        self.status_update.emit(f"Rendered {format_render_times(results)}")
         
-        return output_path
-
+        return [output_path for output_path, _ in results.values()]
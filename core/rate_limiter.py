@@ -67,6 +67,11 @@ class RateLimiter:
             if timeout is not None and (time.time() - start_time) >= timeout:
                 return False
     
+    @property
+    def admission_rate(self) -> float:
+        """Get the sustained admission rate in requests per second."""
+        return self.max_requests / self.time_window
+    
     def get_available_slots(self) -> int:
         """Get number of available request slots."""
         with self.lock:
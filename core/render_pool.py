@@ -0,0 +1,282 @@
+import os
+import math
+import time
+import tempfile
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import BinaryIO, Callable, Iterable, NamedTuple, Optional
+
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:  # Optional: without it every PDF is laid out on one core
+    PdfReader = PdfWriter = None
+
+from core.document_generator import DocumentGenerator
+from core.document_styles import get_style_registry
+from core.docx_builder import get_docx_template
+from constants import (
+    OUTPUT_FORMATS, FORMAT_NAMES, PDF_PARALLEL_MIN_EXERCISES, PDF_MIN_CHUNK_EXERCISES
+)
+
+
+def render_document(
+    output_format: str,
+    exercises_with_answers: Iterable[tuple[str, str]],
+    student_name: str,
+    group: str,
+    output_filename: str
+) -> tuple[str, float]:
+    """
+    Render one document.
+    
+    Returns:
+        (output path, render time in seconds)
+    """
+    started = time.perf_counter()
+    if output_format == "word":
+        output_path = DocumentGenerator.generate_word(
+            exercises_with_answers, student_name, group, output_filename
+        )
+    else:
+        output_path = DocumentGenerator.generate_pdf(
+            exercises_with_answers, student_name, group, output_filename
+        )
+    return output_path, time.perf_counter() - started
+
+
+class RenderResult(NamedTuple):
+    """Outcome of one document in a bulk render."""
+    output_path: Optional[str]
+    seconds: float
+    error: Optional[str] = None
+
+
+_in_worker = False
+
+
+def _warm_up_worker():
+    """Build styles, fonts and the Word template once when a worker starts."""
+    global _in_worker
+    _in_worker = True  # Workers never fan out into a pool of their own
+    get_style_registry()
+    get_docx_template()
+
+
+def create_render_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Start a pool of render worker processes.
+    Workers are spawned rather than forked so they don't inherit the GUI's
+    threads, and each warms up its styles and template before the first job.
+    
+    Args:
+        max_workers: Number of worker processes (None = one per CPU)
+    """
+    return ProcessPoolExecutor(
+        max_workers=max_workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm_up_worker
+    )
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Get the process-wide render pool, starting it on first use. Workers stay alive between documents."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = create_render_pool()
+        return _pool
+
+
+def _render_job(
+    output_format: str,
+    exercises_with_answers: list[tuple[str, str]],
+    student_name: str,
+    group: str,
+    output_filename: str
+) -> RenderResult:
+    """Render one bulk job in a worker, reporting failure instead of raising."""
+    started = time.perf_counter()
+    try:
+        output_path, seconds = render_document(
+            output_format, exercises_with_answers, student_name, group, output_filename
+        )
+        return RenderResult(output_path, seconds)
+    except Exception as e:
+        return RenderResult(None, time.perf_counter() - started, str(e))
+
+
+def render_many(
+    jobs: Iterable[tuple[str, str, list[tuple[str, str]], str]],
+    output_dir: Optional[str] = None,
+    pool: Optional[ProcessPoolExecutor] = None,
+    status_callback: Optional[Callable[[str], None]] = None
+) -> list[RenderResult]:
+    """
+    Render documents for many students across worker processes.
+    A failed document does not stop the others; its result carries the error.
+    
+    Args:
+        jobs: (student_name, group, exercises_with_answers, output_format) tuples
+        output_dir: Where documents are written (None = current directory)
+        pool: Worker pool from create_render_pool (None = the shared pool, one worker per CPU)
+        status_callback: Called with human readable progress messages
+    
+    Returns:
+        One RenderResult per job, in input order
+    """
+    jobs = list(jobs)
+    output_dir = os.path.abspath(output_dir or os.getcwd())
+    pool = pool or get_render_pool()
+    
+    futures = {}
+    for idx, (student_name, group, exercises_with_answers, output_format) in enumerate(jobs):
+        output_filename = os.path.join(
+            output_dir, DocumentGenerator.generate_output_filename(student_name, group)
+        )
+        future = pool.submit(
+            _render_job, output_format, list(exercises_with_answers),
+            student_name, group, output_filename
+        )
+        futures[future] = idx
+    
+    results: list[Optional[RenderResult]] = [None] * len(jobs)
+    started = time.perf_counter()
+    for done, future in enumerate(as_completed(futures), 1):
+        results[futures[future]] = future.result()
+        if status_callback is not None:
+            elapsed = time.perf_counter() - started
+            status_callback(f"Rendered {done}/{len(jobs)} documents ({done / elapsed:.1f} docs/s)")
+    return results
+
+
+def render_formats(
+    exercises_with_answers: Iterable[tuple[str, str]],
+    student_name: str,
+    group: str,
+    output_filename: str,
+    output_formats: Iterable[str]
+) -> dict[str, tuple[str, float]]:
+    """
+    Render the same answers in several formats at once.
+    Each format is laid out in its own worker process because reportlab
+    layout is CPU-bound; a single format renders in this process so the
+    answers can still be streamed.
+    
+    Args:
+        exercises_with_answers: Iterable of (exercise_text, answer_text) tuples
+        student_name: Student name
+        group: Group/class name
+        output_filename: Output filename (without extension)
+        output_formats: Formats to render ('pdf', 'word')
+    
+    Returns:
+        Mapping of format to (output path, render time in seconds), in OUTPUT_FORMATS order
+    """
+    selected = set(output_formats)
+    formats = [fmt for fmt in OUTPUT_FORMATS if fmt in selected]
+    if not formats:
+        raise Exception("No output format selected")
+    
+    if len(formats) == 1:
+        return {formats[0]: render_document(
+            formats[0], exercises_with_answers, student_name, group, output_filename
+        )}
+    
+    # Workers may not share our working directory, so resolve the path here
+    output_filename = os.path.join(os.getcwd(), output_filename)
+    answers = list(exercises_with_answers)
+    pool = get_render_pool()
+    futures = {
+        fmt: pool.submit(render_document, fmt, answers, student_name, group, output_filename)
+        for fmt in formats
+    }
+    return {fmt: future.result() for fmt, future in futures.items()}
+
+
+def format_render_times(results: dict[str, tuple[str, float]]) -> str:
+    """Get a one-line summary of per-format render times."""
+    return ", ".join(
+        f"{FORMAT_NAMES.get(fmt, fmt)} in {seconds:.2f}s" for fmt, (_, seconds) in results.items()
+    )
+
+
+def use_parallel_pdf(exercise_count: int) -> bool:
+    """Check if a PDF with exercise_count answers is worth laying out on several cores."""
+    return (
+        PdfWriter is not None
+        and not _in_worker
+        and (os.cpu_count() or 1) >= 2
+        and exercise_count >= PDF_PARALLEL_MIN_EXERCISES
+    )
+
+
+def _layout_pdf_chunk(
+    exercises_with_answers: list[tuple[str, str]],
+    student_name: str,
+    group: str,
+    include_header: bool,
+    chunk_path: str
+) -> str:
+    """Lay out one chunk of a PDF in a worker, into a file so it isn't sent back through the pool."""
+    with open(chunk_path, "wb") as f:
+        DocumentGenerator.layout_pdf(exercises_with_answers, student_name, group, f, include_header)
+    return chunk_path
+
+
+def render_pdf_parallel(
+    exercises_with_answers: Iterable[tuple[str, str]],
+    student_name: str,
+    group: str,
+    stream: BinaryIO,
+    pool: Optional[ProcessPoolExecutor] = None,
+    chunk_size: Optional[int] = None
+):
+    """
+    Lay out a PDF on several cores and merge the pages into one document.
+    Answers are split into chunks at exercise boundaries; every chunk is laid
+    out in its own worker into a temporary file, and the pages are appended
+    from those files in order, so page numbers run on continuously. Each
+    chunk starts on a new page, so the last page of a chunk may end short
+    where the single-core layout would have carried on.
+    Meant for in-memory answer lists: the answers are sent to the workers.
+    
+    Args:
+        exercises_with_answers: Iterable of (exercise_text, answer_text) tuples
+        student_name: Student name
+        group: Group/class name
+        stream: Writable binary stream
+        pool: Worker pool from create_render_pool (None = the shared pool)
+        chunk_size: Answers per chunk (None = spread evenly over the workers)
+    """
+    if PdfWriter is None:
+        raise Exception("Parallel PDF layout needs the pypdf package")
+    
+    pool = pool or get_render_pool()
+    answers = list(exercises_with_answers)
+    if chunk_size is None:
+        # A couple of chunks per worker keeps every core busy until the end
+        chunks = max(1, (os.cpu_count() or 1) * 2)
+        chunk_size = max(PDF_MIN_CHUNK_EXERCISES, math.ceil(len(answers) / chunks))
+    
+    with tempfile.TemporaryDirectory(prefix="luma-pdf-") as chunk_dir, contextlib.ExitStack() as chunk_files:
+        futures = [
+            pool.submit(
+                _layout_pdf_chunk, answers[start:start + chunk_size], student_name, group, start == 0,
+                os.path.join(chunk_dir, f"{start}.pdf")
+            )
+            for start in range(0, max(len(answers), 1), chunk_size)
+        ]
+        writer = PdfWriter()
+        for idx, future in enumerate(futures):
+            # Readers get open files, which pypdf reads on demand rather than loading whole
+            reader = PdfReader(chunk_files.enter_context(open(future.result(), "rb")))
+            if idx == 0 and reader.metadata:
+                writer.add_metadata(reader.metadata)
+            writer.append(reader)
+        writer.write(stream)
@@ -0,0 +1,207 @@
+import os
+import gzip
+import json
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from core.image_store import get_image_store
+from core.routing import ROUTES
+from constants import BASE_PROMPT, RESULTS_BUNDLE_EXTENSION, RESULTS_BUNDLE_VERSION
+
+
+class BundleItem(NamedTuple):
+    """One image's answer as stored in a results bundle."""
+    image: str
+    image_hash: str
+    prompt: str  # The image's custom prompt
+    model: str
+    answer: str
+    seconds: float
+    route: str = ""  # Route that produced the answer (see core.routing; empty in version 1 bundles)
+    route_prompt: str = ""  # That route's prompt, as sent before the custom prompt
+
+
+class ResultsBundle:
+    """
+    Everything needed to render a job's documents again without calling Gemini:
+    image hashes, prompts, the model and route that answered, answers and
+    request times.
+    Saved as gzipped JSON next to the documents.
+    """
+    
+    def __init__(
+        self,
+        student_name: str,
+        group: str,
+        items: Iterable[BundleItem],
+        output_filename: str = "",
+        base_prompt: str = BASE_PROMPT,
+        created_at: Optional[float] = None
+    ):
+        """
+        Initialize results bundle.
+        
+        Args:
+            student_name: Student name
+            group: Group/class name
+            items: One BundleItem per image, in document order
+            output_filename: Custom filename the job used (without extension, may be empty)
+            base_prompt: Prompt of images without a route (each item records its route's own)
+            created_at: When the answers were generated (None = now)
+        """
+        self.student_name = student_name
+        self.group = group
+        self.items = list(items)
+        self.output_filename = output_filename
+        self.base_prompt = base_prompt
+        self.created_at = time.time() if created_at is None else created_at
+    
+    @classmethod
+    def from_results(
+        cls,
+        student_name: str,
+        group: str,
+        image_paths: list[str],
+        exercises_with_answers: Iterable[tuple[str, str]],
+        custom_prompts: Optional[dict[str, str]] = None,
+        records: Optional[list[dict]] = None,
+        image_hashes: Optional[list[str]] = None,
+        output_filename: str = ""
+    ) -> "ResultsBundle":
+        """
+        Build a bundle from a finished job.
+        
+        Args:
+            student_name: Student name
+            group: Group/class name
+            image_paths: Image files, in document order
+            exercises_with_answers: (exercise_text, answer_text) tuples in the same order
+            custom_prompts: Optional mapping of image path to custom prompt
+            records: Optional per-image dicts with 'model', 'seconds' and 'route'
+            image_hashes: Optional precomputed content hashes (None = hash the files)
+            output_filename: Custom filename the job used
+        """
+        custom_prompts = custom_prompts or {}
+        items = []
+        for idx, (image_path, (_, answer)) in enumerate(zip(image_paths, exercises_with_answers)):
+            record = records[idx] if records else {}
+            if image_hashes:
+                image_hash = image_hashes[idx]
+            else:
+                try:
+                    image_hash = get_image_store().content_hash(image_path)
+                except OSError:
+                    image_hash = ""  # Image moved or deleted since it was answered
+            route = record.get("route", "")
+            items.append(BundleItem(
+                os.path.basename(image_path), image_hash, custom_prompts.get(image_path, ""),
+                record.get("model", ""), answer, record.get("seconds", 0.0),
+                route, ROUTES[route].prompt if route in ROUTES else ""
+            ))
+        return cls(student_name, group, items, output_filename)
+    
+    def answers(self) -> list[tuple[str, str]]:
+        """Get the answers as (exercise_text, answer_text) tuples for the document generator."""
+        return [("", item.answer) for item in self.items]
+    
+    def to_dict(self) -> dict:
+        """Get a JSON-serializable representation."""
+        return {
+            "version": RESULTS_BUNDLE_VERSION,
+            "student_name": self.student_name,
+            "group": self.group,
+            "output_filename": self.output_filename,
+            "base_prompt": self.base_prompt,
+            "created_at": self.created_at,
+            "items": [item._asdict() for item in self.items]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResultsBundle":
+        """Create a bundle from its to_dict representation."""
+        if data.get("version", 0) > RESULTS_BUNDLE_VERSION:
+            raise Exception(f"Results bundle version {data['version']} is newer than this app supports")
+        return cls(
+            data.get("student_name", ""),
+            data.get("group", ""),
+            [BundleItem(**item) for item in data.get("items", [])],
+            data.get("output_filename", ""),
+            data.get("base_prompt", BASE_PROMPT),
+            data.get("created_at")
+        )
+    
+    def save(self, path: str) -> str:
+        """
+        Write the bundle to disk.
+        
+        Args:
+            path: Bundle path (RESULTS_BUNDLE_EXTENSION is appended if missing)
+        
+        Returns:
+            Path of the written bundle
+        """
+        if not path.endswith(RESULTS_BUNDLE_EXTENSION):
+            path += RESULTS_BUNDLE_EXTENSION
+        data = json.dumps(self.to_dict(), ensure_ascii=False).encode("utf-8")
+        # No name or mtime in the header keeps the file identical for identical results
+        with open(path, "wb") as f, gzip.GzipFile(filename="", fileobj=f, mode="wb", mtime=0) as package:
+            package.write(data)
+        return path
+    
+    @classmethod
+    def load(cls, path: str) -> "ResultsBundle":
+        """Read a bundle written by save()."""
+        try:
+            with gzip.open(path, "rb") as f:
+                data = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError) as e:
+            raise Exception(f"Not a valid results bundle: {path} ({str(e)})")
+        return cls.from_dict(data)
+    
+    def render(
+        self,
+        output_formats: Iterable[str],
+        student_name: Optional[str] = None,
+        group: Optional[str] = None,
+        output_filename: Optional[str] = None,
+        output_dir: Optional[str] = None
+    ) -> dict[str, tuple[str, float]]:
+        """
+        Render documents from the saved answers.
+        
+        Args:
+            output_formats: Formats to render ('pdf', 'word')
+            student_name: Student name to use instead of the saved one
+            group: Group name to use instead of the saved one
+            output_filename: Filename (without extension) to use instead of the saved one
+            output_dir: Where documents are written (None = current directory)
+        
+        Returns:
+            Mapping of format to (output path, render time in seconds)
+        """
+        from core.document_generator import DocumentGenerator
+        from core.render_pool import render_formats
+        
+        student_name = student_name or self.student_name
+        group = group or self.group
+        filename = DocumentGenerator.generate_output_filename(
+            student_name, group, output_filename if output_filename is not None else self.output_filename
+        )
+        if output_dir:
+            filename = os.path.join(output_dir, filename)
+        return render_formats(self.answers(), student_name, group, filename, output_formats)
+    
+    def summary(self) -> str:
+        """Get a one-line human readable summary."""
+        models = sorted({item.model for item in self.items if item.model})
+        request_time = sum(item.seconds for item in self.items)
+        return (
+            f"{self.student_name} ({self.group}): {len(self.items)} answers from "
+            f"{', '.join(models) or 'unknown model'}, {request_time:.1f}s of requests, "
+            f"generated {time.strftime('%Y-%m-%d %H:%M', time.localtime(self.created_at))}"
+        )
+
+
+def bundle_path(output_path: str) -> str:
+    """Get the results bundle path that belongs next to a document."""
+    return os.path.splitext(output_path)[0] + RESULTS_BUNDLE_EXTENSION
@@ -0,0 +1,66 @@
+from typing import NamedTuple, Optional
+
+from utils.text_utils import is_essay_assignment, is_short_answer_exercise
+from constants import (
+    BASE_PROMPT, ESSAY_PROMPT, EXERCISE_PROMPT, MODEL_TIERS,
+    ESSAY_MAX_OUTPUT_TOKENS, EXERCISE_MAX_OUTPUT_TOKENS, GENERAL_MAX_OUTPUT_TOKENS
+)
+
+# Route names
+EXERCISE = "exercise"
+ESSAY = "essay"
+GENERAL = "general"
+
+
+class Route(NamedTuple):
+    """How an image is asked: prompt, model tier and generation settings."""
+    name: str
+    prompt: str
+    tier: str  # Key of MODEL_TIERS (any other keeps the models in the order the API lists them)
+    max_output_tokens: int
+    temperature: Optional[float] = None  # None = the model's default
+    fallback: Optional[str] = None  # Route asked again when an answer is cut off at max_output_tokens
+    
+    def generation_config(self) -> dict:
+        """Get the generation config sent with the request."""
+        config = {"max_output_tokens": self.max_output_tokens}
+        if self.temperature is not None:
+            config["temperature"] = self.temperature
+        return config
+
+
+ROUTES = {
+    # Gaps, choices and matching: few output tokens, nothing to be creative about
+    EXERCISE: Route(EXERCISE, EXERCISE_PROMPT, "fast", EXERCISE_MAX_OUTPUT_TOKENS, temperature=0.2, fallback=GENERAL),
+    # Hundreds of words of prose, where the stronger model shows
+    ESSAY: Route(ESSAY, ESSAY_PROMPT, "strong", ESSAY_MAX_OUTPUT_TOKENS),
+    # Not known in advance: the prompt that handles both, on the models as listed
+    GENERAL: Route(GENERAL, BASE_PROMPT, "listed", GENERAL_MAX_OUTPUT_TOKENS),
+}
+
+
+def classify(custom_prompt: str = "") -> Route:
+    """
+    Pick the route for an image from its custom prompt, before any request.
+    Essay wording wins over short-answer wording; images without either
+    take the general route.
+    """
+    if is_essay_assignment(custom_prompt):
+        return ROUTES[ESSAY]
+    if is_short_answer_exercise(custom_prompt):
+        return ROUTES[EXERCISE]
+    return ROUTES[GENERAL]
+
+
+def order_models(models: list[str], tier: str) -> list[str]:
+    """
+    Put a tier's models first, in the tier's order of preference; the rest
+    keep their order behind them as fallbacks.
+    """
+    fragments = MODEL_TIERS.get(tier, ())
+    
+    def rank(model: str) -> int:
+        name = model.lower()
+        return next((idx for idx, fragment in enumerate(fragments) if fragment in name), len(fragments))
+    
+    return sorted(models, key=rank)
@@ -0,0 +1,278 @@
+import os
+import time
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Optional
+
+from core.folder_watcher import FolderWatcher
+from core.image_import import expand_pages, natural_sort_key
+from core.metrics import ThroughputMeter
+from core.image_store import get_image_store
+from core.near_duplicates import REQUESTED, SharedAnswers
+from core.pipeline import ImagePipeline, is_api_key_error, perceptual_hash_or_none
+from core.rate_limiter import RateLimiter
+from core.results_bundle import ResultsBundle, bundle_path
+from constants import (
+    MAX_CONCURRENT_WORKERS, MAX_REQUESTS_PER_WINDOW, NEAR_DUPLICATE_THRESHOLD, RATE_LIMIT_WINDOW,
+    WATCH_GROUP_IDLE, WATCH_GROUPINGS, WATCH_METRICS_INTERVAL
+)
+
+
+class WatchService:
+    """
+    Continuously processes scans dropped into a folder.
+    New images go through the headless pipeline under one shared rate limiter,
+    identical (and, if enabled, near-identical) scans share one request,
+    and a document is (re)generated per group once the group has gone quiet.
+    """
+    
+    def __init__(
+        self,
+        api_key: str,
+        folder: str,
+        group: str = "",
+        grouping: str = "subfolder",
+        output_format: str = "pdf",
+        output_dir: Optional[str] = None,
+        custom_prompt: str = "",
+        rate_limiter: Optional[RateLimiter] = None,
+        max_workers: int = MAX_CONCURRENT_WORKERS,
+        group_idle: float = WATCH_GROUP_IDLE,
+        status_callback: Optional[Callable[[str], None]] = print,
+        watcher: Optional[FolderWatcher] = None,
+        pipeline: Optional[ImagePipeline] = None,
+        match_near_duplicates: bool = False
+    ):
+        """
+        Initialize watch service.
+        
+        Args:
+            api_key: Gemini API key
+            folder: Folder to watch
+            group: Group/class name written into every document
+            grouping: How images are split into documents ('subfolder', 'student' or 'folder')
+            output_format: 'pdf' or 'word'
+            output_dir: Where documents are written (None = current directory)
+            custom_prompt: Custom prompt applied to every image
+            rate_limiter: Rate limiter to share with other work (None = create one)
+            max_workers: Maximum parallel requests
+            group_idle: Seconds without new images before a group's document is written
+            status_callback: Called with human readable progress messages
+            watcher: Folder watcher to use (None = create one for `folder`)
+            pipeline: Pipeline to use (None = create one)
+            match_near_duplicates: Whether near-identical scans share an answer
+                (each match is confirmed on the pixels)
+        """
+        if grouping not in WATCH_GROUPINGS:
+            raise Exception(f"Unknown grouping '{grouping}'. Choose one of: {', '.join(WATCH_GROUPINGS)}")
+        
+        self.folder = os.path.abspath(folder)
+        self.group = group
+        self.grouping = grouping
+        self.output_format = output_format
+        self.output_dir = output_dir or os.getcwd()
+        self.custom_prompt = custom_prompt
+        self.group_idle = group_idle
+        self.status_callback = status_callback
+        self.match_near_duplicates = match_near_duplicates
+        
+        self.rate_limiter = rate_limiter or RateLimiter(MAX_REQUESTS_PER_WINDOW, RATE_LIMIT_WINDOW)
+        self.pipeline = pipeline or ImagePipeline(api_key, rate_limiter=self.rate_limiter)
+        self.watcher = watcher or FolderWatcher(self.folder)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.meter = ThroughputMeter()
+        self.shared_answers = SharedAnswers(threshold=NEAR_DUPLICATE_THRESHOLD)
+        
+        self._in_flight: dict[Future, tuple[str, str, float]] = {}  # future -> (group, path, started)
+        self._answers: dict[str, dict[str, str]] = {}  # group -> path -> answer
+        self._records: dict[str, dict] = {}  # path -> model and request time
+        self._dirty: set[str] = set()
+        self._last_activity: dict[str, float] = {}
+        self._last_metrics = time.time()
+        self.documents_written = 0
+    
+    def _emit(self, message: str):
+        """Report progress if a status callback is set."""
+        if self.status_callback is not None:
+            self.status_callback(message)
+    
+    def group_key(self, image_path: str) -> str:
+        """
+        Get the document group an image belongs to.
+        
+        Args:
+            image_path: Path to the image file
+        
+        Returns:
+            Group key, used as the student name of the document
+        """
+        if self.grouping == "student":
+            stem = os.path.splitext(os.path.basename(image_path))[0]
+            return stem.split('_', 1)[0].strip() or stem
+        
+        if self.grouping == "subfolder":
+            relative = os.path.relpath(image_path, self.folder)
+            parts = relative.split(os.sep)
+            if len(parts) > 1:
+                return parts[0]
+        
+        return os.path.basename(self.folder)
+    
+    def _answer(self, image_path: str, record: dict) -> tuple[str, str]:
+        """
+        Answer an image, reusing the answer of an identical or near-identical one.
+        
+        Returns:
+            (answer, how) where how is REQUESTED, CACHED or NEAR_DUPLICATE
+        """
+        def request() -> str:
+            return self.pipeline.process_image(image_path, self.custom_prompt, None, record)
+        
+        try:
+            image_hash = get_image_store().content_hash(image_path)
+        except OSError:
+            return request(), REQUESTED  # The request reports why the file can't be read
+        phash = perceptual_hash_or_none(image_path) if self.match_near_duplicates else None
+        return self.shared_answers.answer(image_hash, phash, self.custom_prompt, request, image_path)
+    
+    def _pages(self, file_path: str) -> list[str]:
+        """Get the work items a new file is processed as: itself, or one per page of a PDF or multi-page TIFF."""
+        try:
+            return expand_pages(file_path)
+        except (OSError, SyntaxError, ValueError, struct.error) as e:
+            self._emit(f"✗ {os.path.relpath(file_path, self.folder)}: unreadable ({str(e)[:80]})")
+            return []
+    
+    def _submit(self, image_path: str):
+        """Queue an image for processing."""
+        key = self.group_key(image_path)
+        self._last_activity[key] = time.time()
+        record = self._records[image_path] = {"model": "", "seconds": 0.0}
+        future = self.executor.submit(self._answer, image_path, record)
+        self._in_flight[future] = (key, image_path, time.time())
+        self._emit(f"Queued {os.path.relpath(image_path, self.folder)} ({key})")
+    
+    def _collect(self):
+        """Store answers of finished requests."""
+        for future in [f for f in self._in_flight if f.done()]:
+            key, image_path, started = self._in_flight.pop(future)
+            latency = time.time() - started
+            try:
+                answer, how = future.result()
+                self.meter.record(latency)
+                duplicate = "" if how == REQUESTED else ", answered from a duplicate"
+                self._emit(f"✓ {os.path.basename(image_path)} ({key}{duplicate})")
+            except Exception as e:
+                error_msg = str(e)
+                if is_api_key_error(error_msg):
+                    raise Exception(error_msg)
+                answer = f"Error: {error_msg}"
+                self.meter.record(latency, error=True)
+                self._emit(f"✗ {os.path.basename(image_path)} ({key}): {error_msg[:80]}")
+            
+            self._answers.setdefault(key, {})[image_path] = answer
+            self._dirty.add(key)
+            self._last_activity[key] = time.time()
+    
+    def _group_busy(self, key: str) -> bool:
+        """Check if a group still has requests in flight."""
+        return any(group == key for group, _, _ in self._in_flight.values())
+    
+    def _write_documents(self, force: bool = False):
+        """Generate documents for groups that have gone quiet."""
+        from core.document_generator import DocumentGenerator
+        
+        now = time.time()
+        for key in sorted(self._dirty):
+            if self._group_busy(key):
+                continue
+            if not force and now - self._last_activity.get(key, 0) < self.group_idle:
+                continue
+            
+            answers = self._answers[key]
+            image_paths = sorted(answers, key=natural_sort_key)
+            exercises_with_answers = [("", answers[path]) for path in image_paths]
+            output_filename = os.path.join(
+                self.output_dir,
+                DocumentGenerator.generate_output_filename(key, self.group)
+            )
+            
+            try:
+                if self.output_format == "word":
+                    output_path = DocumentGenerator.generate_word(
+                        exercises_with_answers, key, self.group, output_filename
+                    )
+                else:
+                    output_path = DocumentGenerator.generate_pdf(
+                        exercises_with_answers, key, self.group, output_filename
+                    )
+            except Exception as e:
+                # Disk full, no permission...: keep watching and try again once the group is idle again
+                self._last_activity[key] = now
+                self._emit(f"✗ Could not write document for {key}: {str(e)}")
+                continue
+            
+            self._dirty.discard(key)
+            self.documents_written += 1
+            self._emit(f"Wrote {output_path} ({len(exercises_with_answers)} answers)")
+            
+            try:
+                bundle = ResultsBundle.from_results(
+                    key, self.group, image_paths, exercises_with_answers,
+                    dict.fromkeys(image_paths, self.custom_prompt),
+                    [self._records.get(path, {}) for path in image_paths]
+                )
+                bundle.save(bundle_path(output_path))
+            except Exception as e:
+                # The document is already written; a missing bundle only costs re-rendering
+                self._emit(f"Could not save results bundle for {key}: {str(e)}")
+    
+    def step(self, timeout: Optional[float] = None):
+        """
+        Run one iteration of the watch loop.
+        
+        Args:
+            timeout: Maximum time to wait for file changes
+        """
+        for file_path in self.watcher.poll(timeout):
+            for image_path in self._pages(file_path):
+                self._submit(image_path)
+        
+        self._collect()
+        self._write_documents()
+        
+        now = time.time()
+        if now - self._last_metrics >= WATCH_METRICS_INTERVAL and self.meter.total_completed:
+            self._last_metrics = now
+            self._emit(f"Throughput: {self.meter.summary()}")
+    
+    def is_idle(self) -> bool:
+        """Check if there is nothing left to process or write."""
+        return not self._in_flight and not self._dirty and not self.watcher.has_pending()
+    
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """
+        Watch the folder until stopped.
+        
+        Args:
+            stop_event: Set to stop the loop (None = run until interrupted)
+        """
+        self._emit(
+            f"Watching {self.folder} ({self.watcher.mode}, grouping by {self.grouping})..."
+        )
+        try:
+            while stop_event is None or not stop_event.is_set():
+                self.step()
+        except KeyboardInterrupt:
+            self._emit("Stopping...")
+        finally:
+            self.close()
+    
+    def close(self):
+        """Finish in-flight work, write pending documents and stop watching."""
+        self.executor.shutdown(wait=True)
+        self._collect()
+        self._write_documents(force=True)
+        self.watcher.close()
+        self._emit(f"Throughput: {self.meter.summary()}")
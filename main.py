@@ -1,16 +1,92 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from ui.main_window import MainWindow
+import argparse
+import multiprocessing
 
+from constants import WATCH_GROUPINGS, WATCH_GROUP_IDLE
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Luma")
+    parser.add_argument("--watch", metavar="FOLDER", help="Run headless and process new images dropped into FOLDER")
+    parser.add_argument("--render", metavar="RESULTS", help="Render documents from a saved results file without calling Gemini")
+    parser.add_argument("--student", default=None, help="Student name for --render (defaults to the saved results)")
+    parser.add_argument("--group-by", choices=WATCH_GROUPINGS, default="subfolder", help="How watched images are split into documents")
+    parser.add_argument("--group", default=None, help="Group/class name (defaults to the saved setting)")
+    parser.add_argument("--format", choices=("pdf", "word"), default=None, help="Output format (defaults to the saved setting)")
+    parser.add_argument("--output-dir", default=None, help="Where documents are written (defaults to the current directory)")
+    parser.add_argument("--group-idle", type=float, default=WATCH_GROUP_IDLE, help="Seconds without new images before a document is written")
+    parser.add_argument("--api-key", default=None, help="Gemini API key (defaults to the saved setting)")
+    args, _ = parser.parse_known_args(argv)  # Leave Qt arguments alone
+    return args
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """Run the headless watch-folder mode."""
+    from core.config_manager import ConfigManager
+    from core.watch_service import WatchService
+    
+    config = ConfigManager().load()
+    api_key = args.api_key or config.get("api_key", "")
+    if not api_key:
+        print("No API key configured. Pass --api-key or save one in the app settings.")
+        return 1
+    
+    service = WatchService(
+        api_key,
+        args.watch,
+        group=args.group if args.group is not None else config.get("group", ""),
+        grouping=args.group_by,
+        output_format=args.format or config.get("output_format", "pdf"),
+        output_dir=args.output_dir,
+        custom_prompt=config.get("custom_prompt", ""),
+        group_idle=args.group_idle,
+        match_near_duplicates=config.get("match_near_duplicates", False)
+    )
+    service.run()
+    return 0
 
-def main():
 
+def run_render(args: argparse.Namespace) -> int:
+    """Re-render documents from a results bundle."""
+    from core.config_manager import ConfigManager
+    from core.render_pool import format_render_times
+    from core.results_bundle import ResultsBundle
+    
+    try:
+        bundle = ResultsBundle.load(args.render)
+    except Exception as e:
+        print(str(e))
+        return 1
+    
+    config = ConfigManager().load()
+    output_formats = [args.format] if args.format else (
+        config.get("output_formats") or [config.get("output_format", "pdf")]
+    )
+    print(f"Rendering {bundle.summary()}")
+    results = bundle.render(output_formats, args.student, args.group, output_dir=args.output_dir)
+    for output_path, _ in results.values():
+        print(f"Wrote {output_path}")
+    print(f"Rendered {format_render_times(results)}")
+    return 0
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.render:
+        sys.exit(run_render(args))
+    if args.watch:
+        sys.exit(run_watch(args))
+    
+    from PyQt6.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+    
     app = QApplication(sys.argv)
-    window = MainWindow()    
+    window = MainWindow()
     window.show()
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Render workers in frozen builds
     main()
-
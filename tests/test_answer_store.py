@@ -0,0 +1,80 @@
+import threading
+from core.answer_store import AnswerStore, create_answer_list
+from core.concurrency import MemoryBudget
+
+
+class TestAnswerStore:
+    """Test cases for AnswerStore."""
+    
+    def test_set_and_get(self):
+        """Test storing and reading answers out of order."""
+        store = AnswerStore(3)
+        store[2] = ("", "third")
+        store[0] = ("", "**first** & <second>")
+        assert store[0] == ("", "**first** & <second>")
+        assert store[1] is None
+        assert store[2] == ("", "third")
+        store.close()
+    
+    def test_overwrite(self):
+        """Test that setting a slot again replaces the answer."""
+        store = AnswerStore(1)
+        store[0] = ("", "old")
+        store[0] = ("", "new")
+        assert store[0] == ("", "new")
+        store.close()
+    
+    def test_iteration_and_len(self):
+        """Test list-like iteration."""
+        store = AnswerStore(3)
+        for idx in range(3):
+            store[idx] = ("", f"answer {idx}")
+        assert len(store) == 3
+        assert [answer for _, answer in store] == ["answer 0", "answer 1", "answer 2"]
+        store.close()
+    
+    def test_concurrent_writes(self):
+        """Test that parallel writers don't corrupt each other."""
+        store = AnswerStore(50)
+        threads = [
+            threading.Thread(target=store.__setitem__, args=(idx, ("", f"answer {idx}" * 20)))
+            for idx in range(50)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(store[idx] == ("", f"answer {idx}" * 20) for idx in range(50))
+        store.close()
+    
+    def test_create_answer_list(self):
+        """Test that only large jobs spill to disk."""
+        assert create_answer_list(3, spill_threshold=10) == [None] * 3
+        store = create_answer_list(11, spill_threshold=10)
+        assert isinstance(store, AnswerStore)
+        store.close()
+
+
+class TestMemoryBudget:
+    """Test cases for MemoryBudget."""
+    
+    def test_admits_within_budget(self):
+        """Test that requests within the budget are admitted."""
+        budget = MemoryBudget(max_bytes=100)
+        assert budget.acquire(60, timeout=0.1) is True
+        assert budget.acquire(40, timeout=0.1) is True
+        assert budget.in_flight == 100
+    
+    def test_blocks_over_budget(self):
+        """Test that a request over the budget waits."""
+        budget = MemoryBudget(max_bytes=100)
+        budget.acquire(60)
+        assert budget.acquire(60, timeout=0.1) is False
+        budget.release(60)
+        assert budget.acquire(60, timeout=0.1) is True
+    
+    def test_oversized_image_admitted_alone(self):
+        """Test that an image bigger than the budget still runs when nothing else does."""
+        budget = MemoryBudget(max_bytes=100)
+        assert budget.acquire(500, timeout=0.1) is True
+        assert budget.peak_in_flight == 500
@@ -0,0 +1,101 @@
+import threading
+import time
+from core.concurrency import ConcurrencyController
+from core.rate_limiter import RateLimiter
+
+
+class TestConcurrencyController:
+    """Test cases for ConcurrencyController."""
+    
+    def test_burst_uses_free_slots(self):
+        """Test that free limiter slots allow full concurrency."""
+        limiter = RateLimiter(max_requests=15, time_window=60.0)
+        controller = ConcurrencyController(limiter, max_workers=5, initial_latency=4.0)
+        assert controller.target() == 5
+    
+    def finished(self, controller, count, latency):
+        """Pretend the controller has run for a whole window and seen count requests finish."""
+        controller.started -= controller.rate_limiter.time_window
+        for _ in range(count):
+            controller.acquire()
+            controller.release(latency=latency)
+    
+    def test_steady_state_littles_law(self):
+        """Test that an exhausted limiter falls back to measured rate x latency."""
+        limiter = RateLimiter(max_requests=15, time_window=60.0)
+        controller = ConcurrencyController(limiter, max_workers=5, initial_latency=8.0, smoothing=0.0)
+        self.finished(controller, 15, 8.0)
+        for _ in range(15):
+            limiter.acquire()
+        # 0.25 requests/s * 8 s = 2 requests in flight
+        assert controller.target() == 2
+    
+    def test_throttled_rate_shrinks_target(self):
+        """Test that finishing fewer requests than the limiter's rate allows lowers the target."""
+        limiter = RateLimiter(max_requests=15, time_window=60.0)
+        controller = ConcurrencyController(limiter, max_workers=5, initial_latency=40.0, smoothing=0.0)
+        self.finished(controller, 3, 40.0)
+        for _ in range(15):
+            limiter.acquire()
+        # Measured 0.05 requests/s * 40 s = 2, where the limiter's nominal rate would give 10
+        assert controller.measured_rate() == 0.05
+        assert controller.target() == 2
+    
+    def test_acquire_reads_limiter_outside_condition(self):
+        """Test that release isn't held up while a waiting acquire is stuck on the limiter's lock."""
+        limiter = RateLimiter(max_requests=1, time_window=60.0)
+        limiter.acquire()
+        controller = ConcurrencyController(limiter, max_workers=5, initial_latency=0.1)
+        controller.acquire()
+        waiter = threading.Thread(target=lambda: controller.acquire(timeout=1.0))
+        
+        with limiter.lock:  # As while RateLimiter.acquire sleeps
+            waiter.start()
+            time.sleep(0.1)
+            start_time = time.time()
+            controller.release(latency=0.1)
+            assert time.time() - start_time < 0.05
+        waiter.join()
+    
+    def test_min_workers(self):
+        """Test that the target never drops below min_workers."""
+        limiter = RateLimiter(max_requests=1, time_window=60.0)
+        limiter.acquire()
+        controller = ConcurrencyController(limiter, min_workers=1, max_workers=5, initial_latency=0.1)
+        assert controller.target() == 1
+    
+    def test_latency_moving_average(self):
+        """Test that measured latency updates the estimate."""
+        limiter = RateLimiter(max_requests=15, time_window=60.0)
+        controller = ConcurrencyController(limiter, initial_latency=10.0, smoothing=0.5)
+        controller.acquire()
+        controller.release(latency=20.0)
+        assert controller.latency == 15.0
+        assert controller.active == 0
+    
+    def test_acquire_blocks_at_target(self):
+        """Test that acquire waits while the target is reached."""
+        limiter = RateLimiter(max_requests=1, time_window=60.0)
+        limiter.acquire()
+        controller = ConcurrencyController(limiter, max_workers=5, initial_latency=0.1)
+        assert controller.acquire(timeout=0.1) is True
+        
+        start_time = time.time()
+        assert controller.acquire(timeout=0.3) is False
+        assert time.time() - start_time >= 0.25
+    
+    def test_release_wakes_waiter(self):
+        """Test that releasing a slot lets a waiting request start."""
+        limiter = RateLimiter(max_requests=1, time_window=60.0)
+        limiter.acquire()
+        controller = ConcurrencyController(limiter, max_workers=5, initial_latency=0.1)
+        controller.acquire()
+        
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(controller.acquire(timeout=5)))
+        waiter.start()
+        time.sleep(0.1)
+        controller.release(latency=0.1)
+        waiter.join()
+        
+        assert results == [True]
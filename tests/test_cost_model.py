@@ -0,0 +1,51 @@
+import pytest
+from core.cost_model import estimate_cost, order_by_predicted_cost
+
+
+@pytest.fixture
+def images(tmp_path):
+    """Create images of increasing size."""
+    paths = []
+    for i, size in enumerate([300_000, 100_000, 500_000, 200_000]):
+        path = tmp_path / f"page{i}.png"
+        path.write_bytes(b"x" * size)
+        paths.append(str(path))
+    return paths
+
+
+class TestEstimateCost:
+    """Test cases for estimate_cost."""
+    
+    def test_larger_images_cost_more(self, images):
+        """Test that cost grows with file size."""
+        assert estimate_cost(images[2]) > estimate_cost(images[0]) > estimate_cost(images[1])
+    
+    def test_essays_cost_more(self, images):
+        """Test that essay prompts raise the predicted cost."""
+        assert estimate_cost(images[1], "Write an essay") > estimate_cost(images[1], "Fill in the blanks")
+    
+    def test_missing_file(self, tmp_path):
+        """Test that a missing file still gets a cost."""
+        assert estimate_cost(str(tmp_path / "missing.png")) > 0
+
+
+class TestOrderByPredictedCost:
+    """Test cases for order_by_predicted_cost."""
+    
+    def test_cheapest_first_then_longest(self, images):
+        """Test the default order: one quick result, then longest first."""
+        assert order_by_predicted_cost(images) == [1, 2, 0, 3]
+    
+    def test_deadline_cheapest_first(self, images):
+        """Test that deadlines run the cheapest images first."""
+        assert order_by_predicted_cost(images, has_deadline=True) == [1, 3, 0, 2]
+    
+    def test_essay_prompt_reorders(self, images):
+        """Test that an essay prompt moves an image later in a deadline job."""
+        order = order_by_predicted_cost(images, {images[1]: "Write an essay"}, has_deadline=True)
+        assert order[-1] == 1
+    
+    def test_small_batches(self, images):
+        """Test ordering of one and two images."""
+        assert order_by_predicted_cost(images[:1]) == [0]
+        assert order_by_predicted_cost(images[:2]) == [1, 0]
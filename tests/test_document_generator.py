@@ -1,6 +1,7 @@
+import io
 import os
 import pytest
-from core.document_generator import DocumentGenerator
+from core.document_generator import DocumentGenerator, _FlowableStream
 
 
 class TestGenerateOutputFilename:
@@ -166,3 +167,137 @@ class TestGenerateWord:
         finally:
             os.chdir(original_cwd)
 
+
+
+class TestGeneratePDFStreaming:
+    """Test cases for streaming PDF generation."""
+    
+    def test_generate_pdf_from_generator(self, tmp_path):
+        """Test that answers can come from a one-shot iterator."""
+        answers = (("", f"**Exercise {i}**\n1. Answer") for i in range(50))
+        output_path = DocumentGenerator.generate_pdf(
+            answers, "Test Student", "Test Group", str(tmp_path / "stream")
+        )
+        assert os.path.exists(output_path)
+        with open(output_path, "rb") as f:
+            assert f.read(5) == b"%PDF-"
+    
+    def test_story_is_consumed_lazily(self, tmp_path):
+        """Test that answers are pulled while laying out, not all up front."""
+        pulled = []
+        
+        def answers():
+            for i in range(100):
+                pulled.append(i)
+                yield ("", f"Answer {i}")
+        
+        stream = _FlowableStream(
+            DocumentGenerator._pdf_flowables(answers(), "Test Student", "Test Group"),
+            lookahead=4
+        )
+        assert len(stream) == 4
+        assert len(pulled) < 5
+        del stream[0]
+        assert stream[10] is not None
+        assert len(pulled) < 10
+    
+    def test_markup_characters_in_answers(self, tmp_path):
+        """Test that < and & in answers and names don't break the layout."""
+        answers = [("", "# Title\nIf x < 3 & y > 2 then *maybe*\n1. **A & B**")]
+        output_path = DocumentGenerator.generate_pdf(
+            answers, "Smith & Sons", "<Group>", str(tmp_path / "escaped")
+        )
+        assert os.path.exists(output_path)
+
+
+class TestGenerateWordMarkdown:
+    """Test cases for Word rendering of markdown answers."""
+    
+    def test_runs_from_parsed_answer(self, tmp_path):
+        """Test that bold and italic runs come from the shared parse."""
+        from docx import Document
+        
+        output_path = DocumentGenerator.generate_word(
+            [("", "## Heading\nSome **bold** and *italic*")], "S", "G", str(tmp_path / "runs")
+        )
+        paragraphs = Document(output_path).paragraphs
+        heading, body = paragraphs[3], paragraphs[4]
+        assert heading.text == "Heading"
+        assert all(run.bold for run in heading.runs)
+        assert [(r.text, r.bold, r.italic) for r in body.runs] == [
+            ("Some ", None, None), ("bold", True, None), (" and ", None, None), ("italic", None, True)
+        ]
+
+
+class _WriteOnlyStream:
+    """A binary sink that cannot seek or tell, like a socket or HTTP response."""
+    
+    def __init__(self):
+        self.chunks = []
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+
+
+class TestRenderToStream:
+    """Test cases for in-memory rendering."""
+    
+    @pytest.fixture
+    def sample_exercises(self):
+        """Sample exercises for testing."""
+        return [
+            ("Exercise A", "**Exercise A**\n1. Answer one\n2. Answer two"),
+            ("Exercise B", "**Exercise B**\n1. Answer three")
+        ]
+    
+    def test_render_pdf_to_bytesio(self, sample_exercises, tmp_path, monkeypatch):
+        """Test that nothing is written to disk when rendering into a buffer."""
+        monkeypatch.chdir(tmp_path)
+        buffer = io.BytesIO()
+        DocumentGenerator.render_pdf(sample_exercises, "Test Student", "Test Group", buffer)
+        assert buffer.getvalue().startswith(b"%PDF-")
+        assert os.listdir(tmp_path) == []
+    
+    def test_render_bytes(self, sample_exercises):
+        """Test rendering both formats straight to bytes."""
+        assert DocumentGenerator.render_bytes("pdf", sample_exercises, "S", "G").startswith(b"%PDF-")
+        assert DocumentGenerator.render_bytes("word", sample_exercises, "S", "G").startswith(b"PK")
+    
+    def test_render_word_to_unseekable_stream(self, sample_exercises):
+        """Test that Word documents can be streamed to a write-only sink."""
+        from docx import Document
+        
+        sink = _WriteOnlyStream()
+        DocumentGenerator.render_word(sample_exercises, "Jane Smith", "Class 3B", sink)
+        doc = Document(io.BytesIO(b"".join(sink.chunks)))
+        assert doc.paragraphs[0].text == "Student: Jane Smith"
+    
+    def test_file_matches_bytes(self, sample_exercises, tmp_path):
+        """Test that writing a file is the same rendering as in memory."""
+        import random
+        from reportlab import rl_config
+        
+        rl_config.invariant = 1
+        try:
+            random.seed(1)
+            data = DocumentGenerator.render_bytes("pdf", sample_exercises, "S", "G")
+            random.seed(1)
+            output_path = DocumentGenerator.generate_pdf(sample_exercises, "S", "G", str(tmp_path / "same"))
+        finally:
+            rl_config.invariant = 0
+        with open(output_path, "rb") as f:
+            assert f.read() == data
+    
+    def test_failed_render_leaves_no_file(self, tmp_path):
+        """Test that a partial file is removed when rendering fails."""
+        def answers():
+            yield ("", "First")
+            raise RuntimeError("answers unavailable")
+        
+        with pytest.raises(RuntimeError):
+            DocumentGenerator.generate_word(answers(), "S", "G", str(tmp_path / "broken"))
+        assert not os.path.exists(tmp_path / "broken.docx")
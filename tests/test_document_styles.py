@@ -0,0 +1,48 @@
+from core.document_styles import StyleRegistry, get_style_registry
+from constants import MIN_FONT_SIZE, MAX_FONT_SIZE
+
+
+class TestStyleRegistry:
+    """Test cases for StyleRegistry."""
+    
+    def test_styles_are_reused(self):
+        """Test that the same font and size always gets the same style object."""
+        registry = StyleRegistry(fonts=["Helvetica"])
+        assert registry.answer_style("Helvetica", 12) is registry.answer_style("Helvetica", 12)
+        assert registry.answer_style("Helvetica", 12) is not registry.answer_style("Helvetica", 13)
+    
+    def test_all_styles_built_up_front(self):
+        """Test that every font and size combination is prebuilt."""
+        registry = StyleRegistry(fonts=["Helvetica", "Courier"], min_font_size=10, max_font_size=12)
+        assert len(registry._answer_styles) == 6
+    
+    def test_random_style_in_range(self):
+        """Test that random answer styles use configured fonts and sizes."""
+        registry = StyleRegistry(fonts=["Helvetica"])
+        for _ in range(20):
+            style = registry.random_answer_style()
+            assert style.fontName == "Helvetica"
+            assert MIN_FONT_SIZE <= style.fontSize <= MAX_FONT_SIZE
+            assert style.leading == 14
+    
+    def test_times_alias(self):
+        """Test that Times New Roman maps to the reportlab built-in."""
+        registry = StyleRegistry(fonts=["Times New Roman"])
+        assert registry.answer_style("Times New Roman", 12).fontName == "Times-Roman"
+    
+    def test_missing_ttf_is_skipped(self, capsys):
+        """Test that a font file that cannot be loaded does not break the registry."""
+        registry = StyleRegistry(fonts=["Missing"], ttf_fonts={"Missing": ("/nonexistent.ttf", None)})
+        assert "Missing" not in registry.registered_fonts
+        assert "Could not register font" in capsys.readouterr().out
+    
+    def test_word_font(self):
+        """Test random Word font settings."""
+        registry = StyleRegistry(fonts=["Helvetica"])
+        name, size = registry.random_word_font()
+        assert name == "Helvetica"
+        assert MIN_FONT_SIZE <= size.pt <= MAX_FONT_SIZE
+    
+    def test_shared_registry(self):
+        """Test that the process-wide registry is built once."""
+        assert get_style_registry() is get_style_registry()
@@ -0,0 +1,84 @@
+import io
+import zipfile
+import pytest
+from docx import Document
+from docx.shared import Pt
+from core.docx_builder import DocxTemplate, get_docx_template, run_xml, paragraph_xml, EMPTY_PARAGRAPH
+
+
+def read_members(data: bytes) -> dict[str, bytes]:
+    """Get every part of a .docx package."""
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        return {name: package.read(name) for name in package.namelist()}
+
+
+class TestRunXml:
+    """Test cases for run and paragraph XML."""
+    
+    def test_plain_run(self):
+        """Test a plain run."""
+        assert run_xml("text") == "<w:r><w:t>text</w:t></w:r>"
+    
+    def test_styled_run(self):
+        """Test bold and italic properties."""
+        assert run_xml("x", bold=True, italic=True) == "<w:r><w:rPr><w:b/><w:i/></w:rPr><w:t>x</w:t></w:r>"
+    
+    def test_preserve_space_and_escape(self):
+        """Test that outer spaces are preserved and markup escaped."""
+        assert run_xml(" a & <b> ") == '<w:r><w:t xml:space="preserve"> a &amp; &lt;b&gt; </w:t></w:r>'
+    
+    def test_empty_run(self):
+        """Test that an empty run is an empty element."""
+        assert run_xml("") == "<w:r/>"
+    
+    def test_invalid_characters(self):
+        """Test that control characters are rejected like python-docx does."""
+        with pytest.raises(ValueError):
+            run_xml("bad\x0bchar")
+    
+    def test_empty_paragraph(self):
+        """Test that a paragraph without runs is empty."""
+        assert paragraph_xml([]) == EMPTY_PARAGRAPH
+
+
+class TestDocxTemplate:
+    """Test cases for DocxTemplate."""
+    
+    def test_matches_python_docx(self):
+        """Test that every part matches what python-docx writes."""
+        doc = Document()
+        font = doc.styles['Normal'].font
+        font.name = "Helvetica"
+        font.size = Pt(12)
+        p = doc.add_paragraph()
+        p.add_run("Student: ").bold = True
+        p.add_run("A & B")
+        doc.add_paragraph()
+        p = doc.add_paragraph()
+        p.add_run("tab\there").italic = True
+        p.add_run(" end ")
+        expected = io.BytesIO()
+        doc.save(expected)
+        
+        body = "".join([
+            paragraph_xml([("Student: ", True, False), ("A & B", False, False)]),
+            EMPTY_PARAGRAPH,
+            paragraph_xml([("tab\there", False, True), (" end ", False, False)])
+        ])
+        actual = io.BytesIO()
+        DocxTemplate().write(actual, body, "Helvetica", Pt(12))
+        
+        assert read_members(actual.getvalue()) == read_members(expected.getvalue())
+    
+    def test_output_opens(self, tmp_path):
+        """Test that python-docx can read the written file."""
+        path = str(tmp_path / "out.docx")
+        get_docx_template().write(path, paragraph_xml([("Hello", True, False)]), "Helvetica", Pt(11))
+        doc = Document(path)
+        assert doc.paragraphs[0].text == "Hello"
+        assert doc.paragraphs[0].runs[0].bold is True
+        assert doc.styles['Normal'].font.size == Pt(11)
+    
+    def test_shared_template(self):
+        """Test that the process-wide template is loaded once."""
+        assert get_docx_template() is get_docx_template()
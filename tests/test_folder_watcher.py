@@ -0,0 +1,212 @@
+import os
+import time
+import pytest
+from PIL import Image as PILImage
+from core.folder_watcher import FolderWatcher, is_image_file
+from core.results_bundle import ResultsBundle
+from core.watch_service import WatchService
+
+
+def write_file(path, data=b"data"):
+    """Write a file, creating parent folders."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def poll_until(watcher, expected_count, timeout=5.0):
+    """Poll a watcher until it reports the expected number of files."""
+    found = []
+    deadline = time.time() + timeout
+    while len(found) < expected_count and time.time() < deadline:
+        found.extend(watcher.poll(0.05))
+    return found
+
+
+class TestIsImageFile:
+    """Test cases for is_image_file."""
+    
+    def test_image_extensions(self):
+        """Test that image extensions are recognized."""
+        assert is_image_file("scan.JPG") is True
+        assert is_image_file("page.tif") is True
+        assert is_image_file("scans.PDF") is True
+    
+    def test_other_extensions(self):
+        """Test that other files are ignored."""
+        assert is_image_file("notes.txt") is False
+        assert is_image_file("scan.jpg.part") is False
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+class TestFolderWatcher:
+    """Test cases for FolderWatcher in both detection modes."""
+    
+    def test_existing_files_reported(self, tmp_path, use_inotify):
+        """Test that images present at start are reported."""
+        write_file(str(tmp_path / "a.png"))
+        watcher = FolderWatcher(str(tmp_path), settle_time=0.1, poll_interval=0.05, use_inotify=use_inotify)
+        try:
+            assert poll_until(watcher, 1) == [str(tmp_path / "a.png")]
+        finally:
+            watcher.close()
+    
+    def test_existing_files_skipped(self, tmp_path, use_inotify):
+        """Test that include_existing=False ignores the backlog."""
+        write_file(str(tmp_path / "a.png"))
+        watcher = FolderWatcher(
+            str(tmp_path), settle_time=0.1, poll_interval=0.05,
+            use_inotify=use_inotify, include_existing=False
+        )
+        try:
+            assert poll_until(watcher, 1, timeout=0.5) == []
+        finally:
+            watcher.close()
+    
+    def test_new_file_in_subfolder(self, tmp_path, use_inotify):
+        """Test that images in new subfolders are detected."""
+        watcher = FolderWatcher(str(tmp_path), settle_time=0.1, poll_interval=0.05, use_inotify=use_inotify)
+        try:
+            write_file(str(tmp_path / "alice" / "p1.jpg"))
+            write_file(str(tmp_path / "notes.txt"))
+            assert poll_until(watcher, 1) == [str(tmp_path / "alice" / "p1.jpg")]
+        finally:
+            watcher.close()
+    
+    def test_growing_file_debounced(self, tmp_path, use_inotify):
+        """Test that a file is not reported while it is still being written."""
+        path = str(tmp_path / "scan.png")
+        watcher = FolderWatcher(str(tmp_path), settle_time=0.3, poll_interval=0.05, use_inotify=use_inotify)
+        try:
+            with open(path, "wb") as f:
+                for _ in range(5):
+                    f.write(b"x" * 100)
+                    f.flush()
+                    assert watcher.poll(0.05) == []
+            assert poll_until(watcher, 1) == [path]
+            assert os.path.getsize(path) == 500
+        finally:
+            watcher.close()
+    
+    def test_modified_file_reported_again(self, tmp_path, use_inotify):
+        """Test that rewriting a reported file reports it again."""
+        path = str(tmp_path / "a.png")
+        write_file(path)
+        watcher = FolderWatcher(str(tmp_path), settle_time=0.1, poll_interval=0.05, use_inotify=use_inotify)
+        try:
+            assert poll_until(watcher, 1) == [path]
+            write_file(path, b"rescanned page")
+            assert poll_until(watcher, 1) == [path]
+        finally:
+            watcher.close()
+
+
+class FakePipeline:
+    """Pipeline double that answers with the file name."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def process_image(self, image_path, custom_prompt="", deadline=None, record=None):
+        self.calls.append(image_path)
+        return f"**{os.path.basename(image_path)}**"
+
+
+class TestWatchService:
+    """Test cases for WatchService."""
+    
+    def make_service(self, tmp_path, grouping):
+        """Create a watch service over tmp_path/in."""
+        folder = tmp_path / "in"
+        folder.mkdir()
+        watcher = FolderWatcher(str(folder), settle_time=0.05, poll_interval=0.02, use_inotify=False)
+        return WatchService(
+            "test_key", str(folder), group="Class 1", grouping=grouping,
+            output_dir=str(tmp_path), group_idle=0.0, status_callback=None,
+            watcher=watcher, pipeline=FakePipeline()
+        )
+    
+    def test_invalid_grouping(self, tmp_path):
+        """Test that unknown groupings are rejected."""
+        with pytest.raises(Exception, match="Unknown grouping"):
+            WatchService("test_key", str(tmp_path), grouping="page", pipeline=FakePipeline())
+    
+    def test_group_key_subfolder(self, tmp_path):
+        """Test grouping by subfolder."""
+        service = self.make_service(tmp_path, "subfolder")
+        assert service.group_key(os.path.join(service.folder, "alice", "p1.png")) == "alice"
+        assert service.group_key(os.path.join(service.folder, "p1.png")) == "in"
+        service.close()
+    
+    def test_group_key_student(self, tmp_path):
+        """Test grouping by student name prefix."""
+        service = self.make_service(tmp_path, "student")
+        assert service.group_key(os.path.join(service.folder, "Bob Smith_page2.jpg")) == "Bob Smith"
+        service.close()
+    
+    def test_documents_per_group(self, tmp_path):
+        """Test that one document is written per subfolder."""
+        service = self.make_service(tmp_path, "subfolder")
+        write_file(os.path.join(service.folder, "alice", "p1.png"))
+        write_file(os.path.join(service.folder, "bob", "p1.png"))
+        
+        deadline = time.time() + 5.0
+        while service.documents_written < 2 and time.time() < deadline:
+            service.step(0.02)
+        service.close()
+        
+        assert os.path.exists(tmp_path / "alice_Class_1.pdf")
+        assert os.path.exists(tmp_path / "bob_Class_1.pdf")
+        assert service.meter.total_completed == 2
+    
+    def test_pdf_pages_processed(self, tmp_path):
+        """Test that each page of a dropped PDF is processed on its own."""
+        pytest.importorskip("pypdfium2")
+        service = self.make_service(tmp_path, "folder")
+        frames = [PILImage.new("RGB", (60, 80), color) for color in ("white", "black")]
+        pdf = tmp_path / "scans.pdf"
+        frames[0].save(pdf, "PDF", save_all=True, append_images=frames[1:])
+        os.replace(pdf, os.path.join(service.folder, "scans.pdf"))
+        
+        deadline = time.time() + 5.0
+        while service.documents_written < 1 and time.time() < deadline:
+            service.step(0.02)
+        service.close()
+        
+        assert sorted(os.path.basename(path) for path in service.pipeline.calls) == ["scans.pdf#page=1", "scans.pdf#page=2"]
+        assert os.path.exists(tmp_path / "in_Class_1.pdf")
+    
+    def test_duplicates_requested_once(self, tmp_path):
+        """Test that a scan dropped twice is sent once and both copies get the answer."""
+        service = self.make_service(tmp_path, "folder")
+        write_file(os.path.join(service.folder, "p1.png"), b"same scan")
+        write_file(os.path.join(service.folder, "p1 copy.png"), b"same scan")
+        
+        deadline = time.time() + 5.0
+        while service.meter.total_completed < 2 and time.time() < deadline:
+            service.step(0.02)
+        service.close()
+        
+        assert len(service.pipeline.calls) == 1
+        answers = service._answers["in"]
+        assert len(answers) == 2 and len(set(answers.values())) == 1
+    
+    def test_write_errors_do_not_stop_watching(self, tmp_path, monkeypatch):
+        """Test that a failing bundle save is reported and the next group is still written."""
+        def fail(self, path):
+            raise OSError("No space left on device")
+        
+        monkeypatch.setattr(ResultsBundle, "save", fail)
+        messages = []
+        service = self.make_service(tmp_path, "subfolder")
+        service.status_callback = messages.append
+        write_file(os.path.join(service.folder, "alice", "p1.png"))
+        write_file(os.path.join(service.folder, "bob", "p1.png"))
+        
+        deadline = time.time() + 5.0
+        while service.documents_written < 2 and time.time() < deadline:
+            service.step(0.02)
+        service.close()
+        
+        assert service.documents_written == 2
+        assert sum("Could not save results bundle" in message for message in messages) == 2
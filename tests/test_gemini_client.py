@@ -0,0 +1,194 @@
+import time
+from types import SimpleNamespace
+import pytest
+from PIL import Image as PILImage
+from core.gemini_client import GeminiClient, DeadlineExceededError
+from constants import BASE_PROMPT, ESSAY_PROMPT, EXERCISE_MAX_OUTPUT_TOKENS, EXERCISE_PROMPT
+
+
+class FakeModelInfo:
+    """Model listing entry."""
+    
+    def __init__(self, name):
+        self.name = name
+        self.supported_generation_methods = ['generateContent']
+
+
+class FakeResponse:
+    """Response with text, finish reason and token counts."""
+    
+    text = "**Exercise A**\n1. answer"
+    
+    def __init__(self, finish_reason="STOP"):
+        self.candidates = [SimpleNamespace(finish_reason=SimpleNamespace(name=finish_reason))]
+        self.usage_metadata = SimpleNamespace(prompt_token_count=300, candidates_token_count=20)
+
+
+class EmptyResponse(FakeResponse):
+    """Response with no parts, whose text accessor raises like the SDK's."""
+    
+    @property
+    def text(self):
+        raise ValueError("The `response.text` quick accessor requires the response to contain a valid `Part`")
+
+
+class FakeGenAI:
+    """Stand-in for the google.generativeai module."""
+    
+    def __init__(self, errors=None, finish_reasons=None, empty_responses=0):
+        self.calls = []
+        self.contents = []  # (prompt, generation_config) per call
+        self.errors = list(errors or [])
+        self.finish_reasons = list(finish_reasons or [])
+        self.empty_responses = empty_responses  # first N successful calls come back without text
+    
+    def list_models(self):
+        return [FakeModelInfo("models/gemini-2.0-flash"), FakeModelInfo("models/gemini-1.5-pro")]
+    
+    def GenerativeModel(self, model_name):
+        genai = self
+        
+        class Model:
+            def generate_content(self, contents, generation_config=None, request_options=None):
+                genai.calls.append((model_name, request_options))
+                genai.contents.append((contents[0], generation_config))
+                error = genai.errors.pop(0) if genai.errors else None
+                if error:  # None lets that call succeed
+                    raise Exception(error)
+                finish_reason = genai.finish_reasons.pop(0) if genai.finish_reasons else "STOP"
+                if genai.empty_responses:
+                    genai.empty_responses -= 1
+                    return EmptyResponse(finish_reason)
+                return FakeResponse(finish_reason)
+        
+        return Model()
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    """Create a small test image."""
+    path = tmp_path / "page.png"
+    PILImage.new("RGB", (20, 20), "white").save(path)
+    return str(path)
+
+
+def make_client(genai):
+    """Create a client that uses the fake SDK."""
+    client = GeminiClient("test_key")
+    client.genai = genai
+    client._configured = True
+    return client
+
+
+class TestGeminiClientTimeouts:
+    """Test cases for request timeouts and deadlines."""
+    
+    def test_timeout_passed_to_sdk(self, image_path):
+        """Test that the request timeout reaches the SDK."""
+        genai = FakeGenAI()
+        answer = make_client(genai).generate_answer_from_image(image_path, timeout=42.0)
+        assert answer == FakeResponse.text
+        assert genai.calls == [("models/gemini-2.0-flash", {"timeout": 42.0})]
+    
+    def test_deadline_caps_timeout(self, image_path):
+        """Test that the timeout never runs past the deadline."""
+        genai = FakeGenAI()
+        make_client(genai).generate_answer_from_image(image_path, timeout=120.0, deadline=time.time() + 10)
+        assert genai.calls[0][1]["timeout"] <= 10
+    
+    def test_deadline_already_passed(self, image_path):
+        """Test that nothing is sent after the deadline."""
+        genai = FakeGenAI()
+        with pytest.raises(DeadlineExceededError):
+            make_client(genai).generate_answer_from_image(image_path, deadline=time.time() - 1)
+        assert genai.calls == []
+    
+    def test_timeout_moves_to_next_model(self, image_path):
+        """Test that a timed-out request falls through to the next model without retry sleeps."""
+        genai = FakeGenAI(errors=["504 Deadline Exceeded"])
+        start_time = time.time()
+        answer = make_client(genai).generate_answer_from_image(image_path)
+        assert answer == FakeResponse.text
+        assert [model for model, _ in genai.calls] == ["models/gemini-2.0-flash", "models/gemini-1.5-pro"]
+        assert time.time() - start_time < 1
+    
+    def test_rate_limit_retry_respects_deadline(self, image_path):
+        """Test that a retry delay past the deadline abandons the request."""
+        genai = FakeGenAI(errors=["429 quota exceeded, retry in 30s"])
+        with pytest.raises(DeadlineExceededError):
+            make_client(genai).generate_answer_from_image(image_path, deadline=time.time() + 5)
+
+
+
+class TestGeminiClientRouting:
+    """Test cases for routing requests by exercise type."""
+    
+    def test_general_route(self, image_path):
+        """Test that an image without a custom prompt gets the full prompt on the first listed model."""
+        genai = FakeGenAI()
+        client = make_client(genai)
+        client.generate_answer_from_image(image_path)
+        assert genai.contents[0][0] == BASE_PROMPT
+        assert genai.calls[0][0] == "models/gemini-2.0-flash"
+        assert (client.last_route, client.last_usage) == ("general", (300, 20))
+    
+    def test_essay_route(self, image_path):
+        """Test that an essay is asked with the essay prompt on the strong model."""
+        genai = FakeGenAI()
+        client = make_client(genai)
+        client.generate_answer_from_image(image_path, "Write an essay of 300 words")
+        prompt = genai.contents[0][0]
+        assert prompt.startswith(ESSAY_PROMPT) and prompt.endswith("Write an essay of 300 words")
+        assert genai.calls[0][0] == "models/gemini-1.5-pro"
+        assert client.last_route == "essay"
+    
+    def test_exercise_route(self, image_path):
+        """Test that a short-answer exercise is asked with a low output limit."""
+        genai = FakeGenAI()
+        client = make_client(genai)
+        client.generate_answer_from_image(image_path, "Fill in the blanks")
+        prompt, config = genai.contents[0]
+        assert prompt.startswith(EXERCISE_PROMPT)
+        assert config["max_output_tokens"] == EXERCISE_MAX_OUTPUT_TOKENS
+        assert client.last_route == "exercise"
+    
+    def test_cut_off_answer_asked_again(self, image_path):
+        """Test that an answer cut off at the exercise limit is asked again on the general route."""
+        genai = FakeGenAI(finish_reasons=["MAX_TOKENS"])
+        client = make_client(genai)
+        client.generate_answer_from_image(image_path, "Fill in the blanks")
+        assert [prompt.split("\n\nAdditional")[0] for prompt, _ in genai.contents] == [EXERCISE_PROMPT, BASE_PROMPT]
+        assert (client.last_route, client.last_usage) == ("general", (600, 40))
+    
+    def test_cut_off_answer_kept_when_asking_again_fails(self, image_path):
+        """Test that a failed re-ask returns the cut-off answer instead of failing the image."""
+        genai = FakeGenAI(errors=[None, "503 Service unavailable", "503 Service unavailable"], finish_reasons=["MAX_TOKENS"])
+        client = make_client(genai)
+        answer = client.generate_answer_from_image(image_path, "Fill in the blanks")
+        assert answer == FakeResponse.text
+        assert len(genai.calls) == 3
+        assert (client.last_route, client.last_model) == ("exercise", "models/gemini-2.0-flash")
+    
+    def test_cut_off_without_text_asked_again(self, image_path):
+        """Test that a response cut off before any text is asked again instead of failing the model."""
+        genai = FakeGenAI(finish_reasons=["MAX_TOKENS"], empty_responses=1)
+        client = make_client(genai)
+        answer = client.generate_answer_from_image(image_path, "Fill in the blanks")
+        assert answer == FakeResponse.text
+        assert len(genai.calls) == 2
+        assert client.last_route == "general"
+    
+    def test_cut_off_without_text_fails_when_asking_again_fails(self, image_path):
+        """Test that an empty cut-off answer is not returned when the re-ask fails."""
+        genai = FakeGenAI(errors=[None, "503 Service unavailable", "503 Service unavailable"], finish_reasons=["MAX_TOKENS"], empty_responses=1)
+        with pytest.raises(Exception, match="503"):
+            make_client(genai).generate_answer_from_image(image_path, "Fill in the blanks")
+
+class TestLoadImagePayload:
+    """Test cases for _load_image_payload."""
+    
+    def test_payload_is_file_bytes(self, image_path):
+        """Test that the upload payload is the original file with its MIME type."""
+        payload = GeminiClient._load_image_payload(image_path)
+        with open(image_path, "rb") as f:
+            assert payload == {"mime_type": "image/png", "data": f.read()}
@@ -0,0 +1,115 @@
+import os
+import pytest
+from PIL import Image as PILImage
+from core.image_import import import_images, natural_sort_key, validate_image
+from utils.page_utils import page_path
+
+
+def make_image(path, fmt="JPEG", size=(300, 200)):
+    """Write a small image, creating folders as needed."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    PILImage.new("RGB", size, (10, 120, 200)).save(path, fmt)
+    return str(path)
+
+
+def truncate(path):
+    """Cut a file in half, as an interrupted copy would."""
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:len(data) // 2])
+    return path
+
+
+class TestValidateImage:
+    """Test cases for validate_image."""
+    
+    @pytest.mark.parametrize("fmt,ext", [("JPEG", "jpg"), ("PNG", "png"), ("BMP", "bmp"), ("TIFF", "tif")])
+    def test_complete_image_accepted(self, tmp_path, fmt, ext):
+        """Test that complete images of each supported format pass."""
+        assert validate_image(make_image(tmp_path / f"page.{ext}", fmt)) is None
+    
+    @pytest.mark.parametrize("fmt,ext", [("JPEG", "jpg"), ("PNG", "png"), ("BMP", "bmp"), ("TIFF", "tif")])
+    def test_truncated_image_rejected(self, tmp_path, fmt, ext):
+        """Test that a half-written file is caught without decoding it."""
+        reason = validate_image(truncate(make_image(tmp_path / f"page.{ext}", fmt)))
+        assert reason is not None and "truncated" in reason
+    
+    def test_unsupported_format(self, tmp_path):
+        """Test that images Gemini isn't sent are rejected."""
+        assert validate_image(make_image(tmp_path / "anim.gif", "GIF")) == "unsupported format GIF"
+    
+    def test_not_an_image(self, tmp_path):
+        """Test that other files are rejected, whatever their extension."""
+        path = tmp_path / "page.jpg"
+        path.write_text("not an image")
+        assert validate_image(str(path)) == "not an image"
+        empty = tmp_path / "empty.png"
+        empty.write_bytes(b"")
+        assert validate_image(str(empty)) == "empty file"
+    
+    def test_truncated_pdf_rejected(self, tmp_path):
+        """Test that a PDF is checked for its end marker."""
+        pdf = tmp_path / "scans.pdf"
+        PILImage.new("RGB", (100, 100)).save(pdf, "PDF")
+        assert validate_image(str(pdf)) is None
+        assert validate_image(truncate(str(pdf))) == "truncated PDF (no end marker)"
+    
+    def test_missing_file(self, tmp_path):
+        """Test that a missing file is reported, not raised."""
+        assert validate_image(str(tmp_path / "missing.jpg")).startswith("unreadable")
+
+
+class TestImportImages:
+    """Test cases for import_images."""
+    
+    def test_natural_sort(self):
+        """Test that page numbers sort numerically."""
+        names = ["page10.jpg", "Page2.jpg", "page1.jpg", "page2b.jpg"]
+        assert sorted(names, key=natural_sort_key) == ["page1.jpg", "Page2.jpg", "page2b.jpg", "page10.jpg"]
+    
+    def test_folders_searched_recursively(self, tmp_path):
+        """Test that folders are scanned, with images in natural order and other files ignored."""
+        for name in ["p10.jpg", "p2.jpg", "p1.png"]:
+            make_image(tmp_path / "week1" / name, "PNG" if name.endswith("png") else "JPEG")
+        make_image(tmp_path / "week1" / "extra" / "p3.jpg")
+        (tmp_path / "week1" / "notes.txt").write_text("not an image")
+        make_image(tmp_path / "week1" / ".hidden" / "p4.jpg")
+        
+        result = import_images([str(tmp_path / "week1")])
+        assert [os.path.relpath(path, tmp_path) for path in result.images] == [
+            os.path.join("week1", "extra", "p3.jpg"),
+            os.path.join("week1", "p1.png"),
+            os.path.join("week1", "p2.jpg"),
+            os.path.join("week1", "p10.jpg"),
+        ]
+        assert result.rejected == []
+    
+    def test_bad_files_rejected(self, tmp_path):
+        """Test that bad files are reported with a reason instead of added."""
+        good = make_image(tmp_path / "good.jpg")
+        bad = truncate(make_image(tmp_path / "bad.jpg"))
+        notes = tmp_path / "notes.txt"
+        notes.write_text("dropped by mistake")
+        
+        result = import_images([good, bad, str(notes)])
+        assert result.images == [good]
+        assert [path for path, _ in result.rejected] == [bad, str(notes)]
+    
+    def test_duplicates_removed(self, tmp_path):
+        """Test that an image given directly and through its folder is added once."""
+        image = make_image(tmp_path / "page.jpg")
+        assert import_images([image, str(tmp_path)]).images == [image]
+    
+    def test_multi_page_files_expanded(self, tmp_path):
+        """Test that PDFs and multi-page TIFFs are added page by page, single-page TIFFs as they are."""
+        pytest.importorskip("pypdfium2")
+        frames = [PILImage.new("L", (100, 100), shade) for shade in (0, 128, 255)]
+        frames[0].save(tmp_path / "b.tif", "TIFF", save_all=True, append_images=frames[1:])
+        frames[0].save(tmp_path / "a.pdf", "PDF", save_all=True, append_images=frames[1:2])
+        single = make_image(tmp_path / "c.tif", "TIFF")
+        
+        pdf, tiff = str(tmp_path / "a.pdf"), str(tmp_path / "b.tif")
+        assert import_images([str(tmp_path)]).images == [
+            page_path(pdf, 1), page_path(pdf, 2), page_path(tiff, 1), page_path(tiff, 2), page_path(tiff, 3), single
+        ]
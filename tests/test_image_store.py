@@ -0,0 +1,166 @@
+import io
+import os
+import threading
+import pytest
+from PIL import Image as PILImage
+from core.answer_cache import hash_file
+from core.image_store import ImageStore
+from utils.page_utils import page_path
+from utils.thumbnail_cache import ThumbnailCache
+
+
+def make_image(path, size=(400, 300), color=(200, 30, 30), orientation=None):
+    """Write a solid-colour JPEG, optionally with an EXIF orientation."""
+    img = PILImage.new("RGB", size, color)
+    exif = PILImage.Exif()
+    if orientation is not None:
+        exif[0x0112] = orientation
+    img.save(path, "JPEG", exif=exif)
+    return str(path)
+
+
+@pytest.fixture
+def thumbnail_cache():
+    return ThumbnailCache(None)
+
+
+@pytest.fixture
+def store(thumbnail_cache):
+    return ImageStore(thumbnail_cache, thumbnail_size=(100, 100))
+
+
+class TestImageStore:
+    """Test cases for ImageStore."""
+    
+    def test_ingest_derives_everything(self, tmp_path, store, thumbnail_cache):
+        """Test that one ingestion yields hash, dimensions, thumbnail and payload."""
+        image = make_image(tmp_path / "page.jpg")
+        info = store.ingest(image)
+        assert info.content_hash == hash_file(image)
+        assert (info.width, info.height, info.orientation) == (400, 300, 1)
+        assert info.mime_type == "image/jpeg"
+        assert info.decoded_size == 400 * 300 * 3
+        assert store.perceptual_hash(image) == info.perceptual_hash
+        
+        assert thumbnail_cache.get(image, (100, 100)).size == (100, 75)
+        assert thumbnail_cache.misses == 1  # Made while ingesting, from the same read
+        
+        with open(image, "rb") as f:
+            assert store.payload(image) == {"mime_type": "image/jpeg", "data": f.read()}
+        assert (store.payload_hits, store.payload_misses) == (1, 0)
+    
+    def test_ingest_once(self, tmp_path, store):
+        """Test that an unchanged image is only ingested once, even concurrently."""
+        image = make_image(tmp_path / "page.jpg", size=(2000, 2000))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(store.ingest(image))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.ingest(image) == results[0]
+        assert len(set(results)) == 1
+        assert store.ingested == 1
+    
+    def test_memory_mapped(self, tmp_path, thumbnail_cache):
+        """Test that large files are ingested through mmap with the same results."""
+        image = make_image(tmp_path / "page.jpg")
+        info = ImageStore(thumbnail_cache, mmap_threshold=0).ingest(image)
+        assert info.content_hash == hash_file(image)
+        assert info.width == 400
+    
+    def test_orientation(self, tmp_path, store, thumbnail_cache):
+        """Test that the EXIF orientation is recorded and the thumbnail turned upright."""
+        image = make_image(tmp_path / "photo.jpg", orientation=6)
+        assert store.ingest(image).orientation == 6
+        assert thumbnail_cache.get(image, (100, 100)).size == (75, 100)
+    
+    def test_changed_image_reingested(self, tmp_path, store):
+        """Test that editing an image replaces what was learned about it."""
+        image = make_image(tmp_path / "page.jpg")
+        store.ingest(image)
+        make_image(tmp_path / "page.jpg", size=(300, 500))
+        os.utime(image, (1, 1))
+        assert store.info(image) is None
+        assert store.ingest(image).height == 500
+    
+    def test_payload_budget(self, tmp_path, thumbnail_cache):
+        """Test that payloads over the budget are dropped and read from disk instead."""
+        images = [make_image(tmp_path / f"p{i}.jpg", color=(i * 80, 0, 0)) for i in range(3)]
+        budget = os.path.getsize(images[0]) + os.path.getsize(images[1])
+        store = ImageStore(thumbnail_cache, payload_budget=budget)
+        for image in images:
+            store.ingest(image)
+        with open(images[0], "rb") as f:
+            assert store.payload(images[0])["data"] == f.read()
+        assert store.payload_misses == 1
+        store.payload(images[2])
+        assert store.payload_hits == 1
+    
+    def test_info_lru_bound(self, tmp_path, thumbnail_cache):
+        """Test that the least recently used images are forgotten, payloads included."""
+        store = ImageStore(thumbnail_cache, max_infos=2)
+        images = [make_image(tmp_path / f"page{i}.jpg", color=(i * 40, 0, 0)) for i in range(3)]
+        store.ingest(images[0])
+        store.ingest(images[1])
+        store.info(images[0])  # Used again, so page1 is the oldest
+        store.ingest(images[2])
+        
+        assert len(store) == 2
+        assert store.info(images[1]) is None
+        assert store.info(images[0]) is not None
+        assert store._payload_bytes == sum(len(data) for data in store._payloads.values())
+        assert store.payload(images[1])["data"] == open(images[1], "rb").read()
+    
+    def test_not_ingested_falls_back_to_file(self, tmp_path, store):
+        """Test that images that weren't ingested are read as before."""
+        image = make_image(tmp_path / "page.jpg")
+        assert store.content_hash(image) == hash_file(image)
+        assert store.decoded_size(image) == 400 * 300 * 3
+        assert store.payload(image)["mime_type"] == "image/jpeg"
+        assert len(store) == 0
+    
+    def test_ingest_in_background(self, tmp_path, store):
+        """Test that queued images are ingested on worker threads."""
+        images = [make_image(tmp_path / f"p{i}.jpg") for i in range(3)]
+        futures = store.ingest_in_background(images)
+        assert [future.result().path for future in futures] == images
+        store.shutdown()
+    
+    def test_corrupt_image(self, tmp_path, store):
+        """Test that a file that isn't an image raises OSError and isn't stored."""
+        path = tmp_path / "page.jpg"
+        path.write_bytes(b"not an image")
+        with pytest.raises(OSError):
+            store.ingest(str(path))
+        assert store.info(str(path)) is None
+    
+    def test_page_ingested_alone(self, tmp_path, store, thumbnail_cache):
+        """Test that a page of a multi-page TIFF gets its own thumbnail, hash and encoded payload."""
+        tiff = str(tmp_path / "scan.tif")
+        frames = [PILImage.new("L", (400, 300), shade) for shade in (0, 255)]
+        frames[0].save(tiff, "TIFF", save_all=True, append_images=frames[1:])
+        
+        first, second = store.ingest(page_path(tiff, 1)), store.ingest(page_path(tiff, 2))
+        assert (second.width, second.height, second.mime_type) == (400, 300, "image/png")
+        assert first.content_hash != second.content_hash
+        assert thumbnail_cache.get(page_path(tiff, 2), (100, 100)).getpixel((0, 0)) == (255, 255, 255)
+        payload = store.payload(page_path(tiff, 2))
+        assert len(payload["data"]) == second.file_size < os.path.getsize(tiff)
+    
+    def test_crop_margins(self, tmp_path, thumbnail_cache):
+        """Test that payloads are cropped when enabled while the kept payload stays whole."""
+        pytest.importorskip("numpy")
+        img = PILImage.new("RGB", (800, 600), (90, 60, 40))
+        img.paste((245, 245, 245), (100, 50, 700, 550))
+        img.paste((20, 20, 20), (200, 150, 600, 170))
+        image = str(tmp_path / "photo.jpg")
+        img.save(image, "JPEG")
+        
+        store = ImageStore(thumbnail_cache, crop_margins=True)
+        store.ingest(image)
+        with PILImage.open(io.BytesIO(store.payload(image)["data"])) as cropped:
+            assert cropped.width < 500 and cropped.height < 100
+        store.crop_margins = False
+        with open(image, "rb") as f:
+            assert store.payload(image)["data"] == f.read()
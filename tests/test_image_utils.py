@@ -0,0 +1,49 @@
+import pytest
+from PIL import Image as PILImage
+from utils.image_utils import pil_to_qimage
+
+
+def gradient(mode, size=(101, 37)):
+    """An image whose every pixel differs, so a wrong stride shows up."""
+    img = PILImage.new("RGB", size)
+    img.putdata([(x * 2 % 256, y * 5 % 256, (x + y) % 256) for y in range(size[1]) for x in range(size[0])])
+    return img.convert(mode)
+
+
+class TestPilToQImage:
+    """Test cases for pil_to_qimage."""
+    
+    @pytest.mark.parametrize("width", [1, 2, 3, 101, 1001])
+    def test_pixels_match_any_width(self, width):
+        """Test that rows line up for widths that aren't a multiple of 4."""
+        img = gradient("RGB", (width, 7))
+        qimage = pil_to_qimage(img)
+        assert (qimage.width(), qimage.height()) == img.size
+        for x, y in [(0, 0), (width - 1, 0), (width // 2, 3), (width - 1, 6)]:
+            assert qimage.pixelColor(x, y).getRgb()[:3] == img.getpixel((x, y))
+    
+    def test_alpha_kept(self):
+        """Test that RGBA images keep their transparency."""
+        img = PILImage.new("RGBA", (5, 5), (255, 0, 0, 64))
+        qimage = pil_to_qimage(img)
+        assert qimage.hasAlphaChannel()
+        assert qimage.pixelColor(2, 2).getRgb() == (255, 0, 0, 64)
+    
+    @pytest.mark.parametrize("mode", ["L", "P", "CMYK", "1"])
+    def test_other_modes_converted(self, mode):
+        """Test that non-RGB images are shown like their RGB conversion."""
+        img = gradient(mode)
+        expected = img.convert("RGB").getpixel((50, 20))
+        assert pil_to_qimage(img).pixelColor(50, 20).getRgb()[:3] == expected
+    
+    def test_owns_pixels(self):
+        """Test that the QImage stays valid after the PIL image is gone."""
+        img = gradient("RGB")
+        expected = img.getpixel((10, 10))
+        qimage = pil_to_qimage(img)
+        del img
+        assert qimage.pixelColor(10, 10).getRgb()[:3] == expected
+    
+    def test_empty_image(self):
+        """Test that a zero-sized image converts to a null QImage."""
+        assert pil_to_qimage(PILImage.new("RGB", (0, 0))).isNull()
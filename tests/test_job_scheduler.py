@@ -0,0 +1,246 @@
+import os
+import threading
+import pytest
+from PIL import Image as PILImage, ImageDraw
+from core.answer_cache import AnswerCache, hash_file
+from core.answer_store import AnswerStore
+from core.job_scheduler import Job, JobScheduler
+from core.rate_limiter import RateLimiter
+from core.results_bundle import ResultsBundle
+
+
+class RecordingPipeline:
+    """Pipeline double that records the order images are processed in."""
+    
+    def __init__(self, fail_with=None):
+        self.api_key = "test_key"
+        self.order = []
+        self.lock = threading.Lock()
+        self.fail_with = fail_with
+    
+    def process_image(self, image_path, custom_prompt="", deadline=None, record=None):
+        with self.lock:
+            self.order.append(image_path)
+        if self.fail_with:
+            raise Exception(self.fail_with)
+        return f"**{os.path.basename(image_path)}**"
+
+
+class BlockingPipeline(RecordingPipeline):
+    """Pipeline double whose requests wait until released."""
+    
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+    
+    def process_image(self, image_path, custom_prompt="", deadline=None, record=None):
+        self.started.set()
+        self.release.wait(10)
+        return super().process_image(image_path, custom_prompt, deadline, record)
+
+
+def make_images(folder, prefix, count):
+    """Create distinct image files."""
+    paths = []
+    for i in range(count):
+        path = folder / f"{prefix}{i}.png"
+        path.write_bytes(f"{prefix}-{i}".encode())
+        paths.append(str(path))
+    return paths
+
+
+class TestAnswerCache:
+    """Test cases for AnswerCache."""
+    
+    def test_put_and_get(self):
+        """Test caching an answer."""
+        cache = AnswerCache()
+        cache.put("abc", "", "answer")
+        assert cache.get("abc", "") == "answer"
+        assert cache.hits == 1
+    
+    def test_prompt_is_part_of_key(self):
+        """Test that different prompts do not share answers."""
+        cache = AnswerCache()
+        cache.put("abc", "", "answer")
+        assert cache.get("abc", "Be brief") is None
+    
+    def test_errors_not_cached(self):
+        """Test that error answers are not cached."""
+        cache = AnswerCache()
+        cache.put("abc", "", "Error: failed")
+        assert len(cache) == 0
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used answer is evicted."""
+        cache = AnswerCache(max_entries=2)
+        cache.put("a", "", "1")
+        cache.put("b", "", "2")
+        cache.get("a", "")
+        cache.put("c", "", "3")
+        assert cache.get("b", "") is None
+        assert cache.get("a", "") == "1"
+    
+    def test_hash_file(self, tmp_path):
+        """Test that identical contents hash identically."""
+        (tmp_path / "a.png").write_bytes(b"same")
+        (tmp_path / "b.png").write_bytes(b"same")
+        assert hash_file(str(tmp_path / "a.png")) == hash_file(str(tmp_path / "b.png"))
+
+
+class TestJobScheduler:
+    """Test cases for JobScheduler."""
+    
+    def make_scheduler(self, pipeline, max_workers=1):
+        """Create a scheduler with a private limiter."""
+        return JobScheduler(
+            "test_key",
+            rate_limiter=RateLimiter(max_requests=100, time_window=60.0),
+            max_workers=max_workers,
+            pipeline=pipeline
+        )
+    
+    def test_empty_job_rejected(self):
+        """Test that a job needs images."""
+        with pytest.raises(Exception, match="No images selected"):
+            Job("Alice", "1A", [])
+    
+    def test_jobs_interleave_fairly(self, tmp_path):
+        """Test that images are dispatched round-robin across jobs."""
+        pipeline = RecordingPipeline()
+        scheduler = self.make_scheduler(pipeline)
+        gate = threading.Event()
+        original = pipeline.process_image
+        pipeline.process_image = lambda path, prompt="", deadline=None, record=None: (gate.wait(), original(path, prompt))[1]
+        
+        alice = make_images(tmp_path, "alice", 3)
+        bob = make_images(tmp_path, "bob", 3)
+        scheduler.submit(Job("Alice", "1A", alice, output_dir=str(tmp_path)))
+        scheduler.submit(Job("Bob", "1A", bob, output_dir=str(tmp_path)))
+        gate.set()
+        
+        assert scheduler.wait(timeout=10)
+        scheduler.shutdown()
+        
+        # Alice's first image may be dispatched before Bob's job arrives
+        assert pipeline.order[1:] == [bob[0], alice[1], bob[1], alice[2], bob[2]]
+    
+    def test_documents_rendered(self, tmp_path):
+        """Test that each job produces its document."""
+        scheduler = self.make_scheduler(RecordingPipeline(), max_workers=3)
+        job = scheduler.submit(Job("Alice", "1A", make_images(tmp_path, "a", 4), output_dir=str(tmp_path)))
+        assert scheduler.wait(timeout=10)
+        scheduler.shutdown()
+        
+        assert job.error is None
+        assert job.output_path == str(tmp_path / "Alice_1A.pdf")
+        assert os.path.exists(job.output_path)
+        assert [answer for _, answer in job.results] == [f"**a{i}.png**" for i in range(4)]
+    
+    def test_results_bundle_saved(self, tmp_path):
+        """Test that a finished job saves its answers next to the document."""
+        scheduler = self.make_scheduler(RecordingPipeline())
+        images = make_images(tmp_path, "a", 2)
+        job = scheduler.submit(Job("Alice", "1A", images, output_dir=str(tmp_path)))
+        assert scheduler.wait(timeout=10)
+        scheduler.shutdown()
+        
+        assert job.bundle_path == str(tmp_path / "Alice_1A.luma")
+        bundle = ResultsBundle.load(job.bundle_path)
+        assert bundle.answers() == list(job.results)
+        assert [item.image_hash for item in bundle.items] == [hash_file(path) for path in images]
+    
+    def test_cache_shared_across_jobs(self, tmp_path):
+        """Test that identical worksheets are only requested once."""
+        pipeline = RecordingPipeline()
+        scheduler = self.make_scheduler(pipeline)
+        worksheet = make_images(tmp_path, "sheet", 1)
+        
+        first = scheduler.submit(Job("Alice", "1A", worksheet, output_dir=str(tmp_path)))
+        first.done.wait(10)
+        second = scheduler.submit(Job("Bob", "1A", worksheet, output_dir=str(tmp_path)))
+        assert scheduler.wait(timeout=10)
+        scheduler.shutdown()
+        
+        assert len(pipeline.order) == 1
+        assert second.cache_hits == 1
+        assert second.results == first.results
+    
+    def test_near_duplicates_shared_across_jobs(self, tmp_path):
+        """Test that a re-saved copy of a worksheet reuses its answer only if the job opts in."""
+        pipeline = RecordingPipeline()
+        scheduler = self.make_scheduler(pipeline)
+        original, copy, other = str(tmp_path / "sheet.png"), str(tmp_path / "copy.jpg"), str(tmp_path / "other.png")
+        sheet = PILImage.new("RGB", (400, 560), "white")
+        draw = ImageDraw.Draw(sheet)
+        for row in range(10):
+            draw.rectangle((40, 40 + row * 50, 60 + (row * 97) % 300, 60 + row * 50), fill="black")
+        sheet.save(original)
+        sheet.resize((300, 420)).save(copy, quality=70)
+        sheet.transpose(PILImage.Transpose.FLIP_LEFT_RIGHT).save(other)
+        
+        first = scheduler.submit(Job("Alice", "1A", [original], output_dir=str(tmp_path), match_near_duplicates=True))
+        first.done.wait(10)
+        second = scheduler.submit(Job("Bob", "1A", [copy, other], output_dir=str(tmp_path), match_near_duplicates=True))
+        second.done.wait(10)
+        third = scheduler.submit(Job("Carol", "1A", [copy], output_dir=str(tmp_path)))
+        assert scheduler.wait(timeout=10)
+        scheduler.shutdown()
+        
+        assert pipeline.order == [original, other, copy]
+        assert second.near_duplicates == 1
+        assert second.results[0] == first.results[0]
+        assert (third.near_duplicates, third.cache_hits) == (0, 0)
+        assert "1 requests saved (1 by near-duplicates)" in scheduler.summary()
+    
+    def test_api_key_error_fails_jobs(self, tmp_path):
+        """Test that an API key error fails the queued jobs."""
+        finished = []
+        scheduler = self.make_scheduler(RecordingPipeline(fail_with="API key not valid"))
+        scheduler.job_callback = finished.append
+        job = scheduler.submit(Job("Alice", "1A", make_images(tmp_path, "a", 2), output_dir=str(tmp_path)))
+        assert scheduler.wait(timeout=10)
+        scheduler.shutdown()
+        
+        assert "API key" in job.error
+        assert finished == [job]
+        assert job.output_path is None
+    
+    def test_finished_jobs_dropped(self, tmp_path):
+        """Test that a delivered job leaves the queue and its on-disk results are closed."""
+        delivered = []
+        scheduler = self.make_scheduler(RecordingPipeline())
+        scheduler.job_callback = lambda job: delivered.append(list(job.results))
+        job = Job("Alice", "1A", make_images(tmp_path, "a", 3), output_dir=str(tmp_path))
+        job.results = AnswerStore(3)
+        scheduler.submit(job)
+        assert scheduler.wait(timeout=10)
+        scheduler.shutdown()
+        
+        assert delivered == [[("", f"**a{i}.png**") for i in range(3)]]
+        assert scheduler._jobs == []
+        assert job.results._file.closed
+        assert scheduler.summary().startswith("1/1 jobs finished")
+    
+    def test_fail_all_spares_rendering_jobs(self, tmp_path):
+        """Test that failing all jobs leaves one being rendered alone, and finishes each job once."""
+        finished = []
+        pipeline = BlockingPipeline()
+        scheduler = self.make_scheduler(pipeline)
+        scheduler.job_callback = finished.append
+        first = scheduler.submit(Job("Alice", "1A", make_images(tmp_path, "a", 1), output_dir=str(tmp_path)))
+        pipeline.started.wait(5)
+        second = Job("Bob", "1A", make_images(tmp_path, "b", 1), output_dir=str(tmp_path))
+        second.rendering = True  # As if its documents were being written
+        scheduler.submit(second)
+        
+        scheduler._fail_all("API key not valid")
+        scheduler._finish(first)
+        pipeline.release.set()
+        assert scheduler.wait(timeout=10)
+        scheduler.shutdown()
+        
+        assert finished == [first, second]
+        assert first.error == "API key not valid"
+        assert second.error is None
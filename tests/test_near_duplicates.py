@@ -0,0 +1,215 @@
+import io
+import random
+import threading
+import pytest
+from PIL import Image as PILImage, ImageDraw, ImageEnhance
+from core.near_duplicates import (
+    BKTree, NearDuplicateIndex, SharedAnswers, CACHED, NEAR_DUPLICATE, REQUESTED,
+    hamming_distance, images_match, perceptual_hash
+)
+from constants import NEAR_DUPLICATE_THRESHOLD
+
+
+def worksheet(seed, size=(620, 877)):
+    """Draw a worksheet of random exercises, all on the same layout."""
+    rng = random.Random(seed)
+    img = PILImage.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((40, 30, 580, 90), outline="black", width=3)
+    for row in range(12):
+        y = 130 + row * 60
+        draw.text((50, y), f"{row + 1}. {rng.randint(1, 99)} x {rng.randint(1, 99)} = ____", fill="black")
+        draw.rectangle((300, y, 300 + rng.randint(50, 250), y + 12), fill="black")
+    return img
+
+
+def resaved(img, scale=0.6, brightness=1.08, quality=60):
+    """The same image resized, re-exposed and recompressed, as a re-export would."""
+    img = img.resize((int(img.width * scale), int(img.height * scale)))
+    img = ImageEnhance.Brightness(img).enhance(brightness)
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=quality)
+    return PILImage.open(buffer).convert("RGB")
+
+
+def thumbnail(img):
+    """Reduce an image as ingestion does before hashing."""
+    img = img.copy()
+    img.thumbnail((100, 100))
+    return img
+
+
+class TestPerceptualHash:
+    """Test cases for perceptual_hash."""
+    
+    def test_copies_match(self):
+        """Test that resized, re-exposed and recompressed copies are within the threshold."""
+        original = worksheet(1)
+        distance = hamming_distance(perceptual_hash(thumbnail(original)), perceptual_hash(thumbnail(resaved(original))))
+        assert distance <= NEAR_DUPLICATE_THRESHOLD
+    
+    def test_different_worksheets_differ(self):
+        """Test that different exercises on the same layout are beyond the threshold."""
+        hashes = [perceptual_hash(thumbnail(worksheet(seed))) for seed in range(4)]
+        distances = [hamming_distance(a, b) for i, a in enumerate(hashes) for b in hashes[i + 1:]]
+        assert min(distances) > NEAR_DUPLICATE_THRESHOLD
+    
+    def test_63_bits(self):
+        """Test that hashes fit in 63 bits."""
+        assert perceptual_hash(worksheet(1)) < 1 << 63
+
+
+class TestBKTree:
+    """Test cases for BKTree."""
+    
+    def test_matches_linear_search(self):
+        """Test that searching finds exactly what comparing against every hash finds."""
+        rng = random.Random(7)
+        keys = [rng.getrandbits(16) for _ in range(500)]
+        tree = BKTree()
+        for idx, key in enumerate(keys):
+            tree.add(key, idx)
+        assert len(tree) == 500
+        for query in [rng.getrandbits(16) for _ in range(20)]:
+            expected = sorted((hamming_distance(query, key), idx) for idx, key in enumerate(keys)
+                              if hamming_distance(query, key) <= 3)
+            assert sorted(tree.search(query, 3)) == expected
+    
+    def test_nearest_first(self):
+        """Test that results are ordered by distance."""
+        tree = BKTree()
+        for key, value in [(0b1111, "far"), (0b0001, "near"), (0b0000, "same")]:
+            tree.add(key, value)
+        assert [value for _, value in tree.search(0b0000, 4)] == ["same", "near", "far"]
+    
+    def test_empty(self):
+        """Test that an empty tree finds nothing."""
+        assert BKTree().search(0, 10) == []
+
+
+class TestImagesMatch:
+    """Test cases for images_match."""
+    
+    def test_resaved_copy_matches(self, tmp_path):
+        """Test that a resized, recompressed copy is confirmed."""
+        original, copy = str(tmp_path / "sheet.png"), str(tmp_path / "copy.png")
+        worksheet(1).save(original)
+        resaved(worksheet(1), scale=0.8, brightness=1.0, quality=90).save(copy)
+        assert images_match(original, copy)
+    
+    def test_changed_number_rejected(self, tmp_path):
+        """Test that the same worksheet with one number changed is not confirmed."""
+        paths = []
+        for number in (45, 46):
+            img = worksheet(1)
+            draw = ImageDraw.Draw(img)
+            draw.rectangle((50, 430, 200, 445), fill="white")
+            draw.text((50, 430), f"6. 12 x {number} = ____", fill="black")
+            paths.append(str(tmp_path / f"sheet{number}.png"))
+            img.save(paths[-1])
+        assert hamming_distance(*(perceptual_hash(thumbnail(PILImage.open(path))) for path in paths)) == 0
+        assert not images_match(*paths)
+    
+    def test_unreadable(self, tmp_path):
+        """Test that a missing file never matches."""
+        worksheet(1).save(tmp_path / "sheet.png")
+        assert not images_match(str(tmp_path / "sheet.png"), str(tmp_path / "missing.png"))
+
+
+class TestNearDuplicateIndex:
+    """Test cases for NearDuplicateIndex."""
+    
+    def test_threshold_and_prompt(self):
+        """Test that only images within the threshold and with the same prompt match."""
+        index = NearDuplicateIndex(threshold=2)
+        index.add(0b1010_1010, "sheet")
+        assert index.match(0b1010_1011) == "sheet"
+        assert index.match(0b0101_1010) is None
+        assert index.match(0b1010_1010, "Be brief") is None
+
+
+def confirm_all(path_a, path_b):
+    """Confirm every candidate, so tests choose matches by hash alone."""
+    return True
+
+
+class TestSharedAnswers:
+    """Test cases for SharedAnswers."""
+    
+    def test_near_duplicate_reuses_answer(self):
+        """Test that a confirmed near-identical image is answered without a request."""
+        shared = SharedAnswers(threshold=2, confirm=confirm_all)
+        assert shared.answer("a", 0b1000, "", lambda: "answer", "a.png") == ("answer", REQUESTED)
+        assert shared.answer("b", 0b1001, "", lambda: pytest.fail("requested"), "b.png") == ("answer", NEAR_DUPLICATE)
+        assert shared.answer("a", 0b1000, "", lambda: pytest.fail("requested"), "a.png") == ("answer", CACHED)
+        assert shared.answer("c", 0b0111, "", lambda: "other", "c.png") == ("other", REQUESTED)
+    
+    def test_unconfirmed_candidate_requested(self):
+        """Test that a close hash whose pixels differ gets its own request, and is compared once."""
+        compared = []
+        
+        def confirm(path_a, path_b):
+            compared.append((path_a, path_b))
+            return False
+        
+        shared = SharedAnswers(threshold=2, confirm=confirm)
+        shared.answer("a", 0b1000, "", lambda: "answer", "a.png")
+        assert shared.answer("b", 0b1000, "", lambda: "own", "b.png") == ("own", REQUESTED)
+        assert compared == [("b.png", "a.png")]
+    
+    def test_default_identical_only(self):
+        """Test that by default only identical images share answers."""
+        shared = SharedAnswers(confirm=confirm_all)
+        shared.answer("a", 0b1000, "", lambda: "answer", "a.png")
+        assert shared.answer("b", 0b1000, "", lambda: "own", "b.png") == ("own", REQUESTED)
+        assert shared.answer("a", 0b1000, "", lambda: pytest.fail("requested"), "a.png") == ("answer", CACHED)
+    
+    def test_disabled(self):
+        """Test that without a threshold only identical images share answers."""
+        shared = SharedAnswers(threshold=None)
+        shared.answer("a", 0b1000, "", lambda: "answer")
+        assert shared.answer("b", 0b1000, "", lambda: "own") == ("own", REQUESTED)
+    
+    def test_in_flight_request_shared(self):
+        """Test that concurrent near-duplicates wait for the one request in flight."""
+        shared = SharedAnswers(threshold=2, confirm=confirm_all)
+        started, release = threading.Event(), threading.Event()
+        requests = []
+        
+        def request():
+            requests.append(1)
+            started.set()
+            release.wait(5)
+            return "answer"
+        
+        results = []
+        first = threading.Thread(target=lambda: results.append(shared.answer("a", 0b1000, "", request, "a.png")))
+        first.start()
+        started.wait(5)
+        others = [
+            threading.Thread(
+                target=lambda image_hash=image_hash: results.append(
+                    shared.answer(image_hash, 0b1001, "", request, f"{image_hash}.png")
+                )
+            )
+            for image_hash in ("a", "b")
+        ]
+        for thread in others:
+            thread.start()
+        release.set()
+        for thread in [first] + others:
+            thread.join(5)
+        
+        assert len(requests) == 1
+        assert sorted(how for _, how in results) == [CACHED, NEAR_DUPLICATE, REQUESTED]
+    
+    def test_failed_request_not_shared(self):
+        """Test that after a failed request a near-duplicate sends its own."""
+        shared = SharedAnswers(threshold=2, confirm=confirm_all)
+        
+        def fail():
+            raise RuntimeError("Service unavailable")
+        
+        with pytest.raises(RuntimeError):
+            shared.answer("a", 0b1000, "", fail, "a.png")
+        assert shared.answer("b", 0b1001, "", lambda: "answer", "b.png") == ("answer", REQUESTED)
@@ -0,0 +1,93 @@
+import io
+import random
+import pytest
+from PIL import Image as PILImage, ImageDraw
+
+pytest.importorskip("numpy")
+
+from utils.page_crop import crop_payload, crop_to_content
+from utils.page_utils import encode_page
+
+DESK = (90, 60, 40)
+TEXT_BOX = (200, 300, 1000, 1363)  # Where page() prints its lines
+
+
+def page(seed=1, size=(1240, 1754)):
+    """Draw a page with lines of text inside TEXT_BOX."""
+    rng = random.Random(seed)
+    img = PILImage.new("RGB", size, (245, 243, 238))
+    draw = ImageDraw.Draw(img)
+    for row in range(20):
+        y = TEXT_BOX[1] + row * 55
+        width = 800 if row == 19 else rng.randint(300, 800)
+        draw.rectangle((TEXT_BOX[0], y, TEXT_BOX[0] + width, y + 18), fill=(30, 30, 30))
+    return img
+
+
+def photo(angle=0.0):
+    """The page photographed on a desk, turned by angle, with a finger at its edge."""
+    turned = page().rotate(angle, PILImage.Resampling.BICUBIC, expand=True, fillcolor=DESK)
+    img = PILImage.new("RGB", (turned.width + 600, turned.height + 500), DESK)
+    img.paste(turned, (320, 200))
+    ImageDraw.Draw(img).ellipse((250, 1200, 480, 1400), fill=(200, 150, 120))
+    return img
+
+
+def longest_dark_row(img):
+    """Length of the darkest row: a whole printed line only if the page is straight."""
+    grey = img.convert("L")
+    return max(
+        sum(1 for x in range(grey.width) if grey.getpixel((x, y)) < 128)
+        for y in range(grey.height)
+    )
+
+
+class TestCropToContent:
+    """Test cases for crop_to_content."""
+    
+    def test_desk_and_margins_removed(self):
+        """Test that a straight photo is cropped to the printed region plus padding."""
+        cropped = crop_to_content(photo())
+        text_width, text_height = TEXT_BOX[2] - TEXT_BOX[0], TEXT_BOX[3] - TEXT_BOX[1]
+        assert text_width <= cropped.width <= text_width * 1.2
+        assert text_height <= cropped.height <= text_height * 1.15
+        # Nothing of the desk is left at the corners
+        assert cropped.getpixel((0, 0))[0] > 200
+    
+    @pytest.mark.parametrize("angle", [2.0, -3.5])
+    def test_tilt_straightened(self, angle):
+        """Test that a tilted page is turned straight and its text kept whole."""
+        cropped = crop_to_content(photo(angle))
+        assert cropped.width <= (TEXT_BOX[2] - TEXT_BOX[0]) * 1.2
+        # The longest line (800 pixels) lies along one row; tilted, it would cross 28 of them
+        assert longest_dark_row(cropped) >= 780
+    
+    def test_blank_image_unchanged(self):
+        """Test that an image without ink is returned as it is."""
+        img = PILImage.new("RGB", (300, 400), "white")
+        assert crop_to_content(img) is img
+    
+    def test_grey_image(self):
+        """Test that single-band images are cropped too."""
+        cropped = crop_to_content(page().convert("L"))
+        assert cropped.mode == "L"
+        assert cropped.width < 1240
+
+
+class TestCropPayload:
+    """Test cases for crop_payload."""
+    
+    def test_photo_shrinks(self):
+        """Test that a photo's payload is re-encoded smaller."""
+        payload = encode_page(photo(2.0))
+        cropped = crop_payload(payload)
+        assert cropped["mime_type"] == "image/jpeg"
+        assert len(cropped["data"]) < len(payload["data"])
+        with PILImage.open(io.BytesIO(cropped["data"])) as img:
+            assert img.width < 1240
+    
+    def test_small_saving_keeps_original(self):
+        """Test that an image already trimmed to its text is sent as it was."""
+        trimmed = page().crop((180, 280, 1020, 1383))
+        payload = encode_page(trimmed)
+        assert crop_payload(payload) is payload
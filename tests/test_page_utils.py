@@ -0,0 +1,113 @@
+import io
+import math
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image as PILImage
+from utils.memory_utils import estimate_decoded_size
+from utils.page_utils import (
+    count_pages, display_name, encode_page, load_payload, open_image, page_path, split_page_path
+)
+from constants import PDF_RENDER_DPI
+
+
+def make_tiff(path, pages=3, size=(200, 100)):
+    """Write a multi-page TIFF whose page n is filled with grey level 40 * n."""
+    frames = [PILImage.new("L", size, 40 * page) for page in range(1, pages + 1)]
+    frames[0].save(path, "TIFF", save_all=True, append_images=frames[1:])
+    return str(path)
+
+
+def make_pdf(path, pages=2):
+    """Write a PDF of blank A4-proportioned pages, or skip without pypdfium2."""
+    pytest.importorskip("pypdfium2")
+    frames = [PILImage.new("RGB", (210, 297), "white") for _ in range(pages)]
+    frames[0].save(path, "PDF", save_all=True, append_images=frames[1:], resolution=72)
+    return str(path)
+
+
+class TestPagePaths:
+    """Test cases for page paths."""
+    
+    def test_round_trip(self):
+        """Test that a page path splits back into file and page."""
+        assert split_page_path(page_path("/scans/week1.pdf", 12)) == ("/scans/week1.pdf", 12)
+        assert split_page_path("/scans/page.jpg") == ("/scans/page.jpg", None)
+    
+    def test_only_multi_page_formats(self):
+        """Test that a file merely named like a page path is left alone."""
+        assert split_page_path("/scans/odd#page=2.jpg") == ("/scans/odd#page=2.jpg", None)
+        assert split_page_path("/scans/photo.jpg#page=2") == ("/scans/photo.jpg#page=2", None)
+    
+    def test_display_name(self):
+        """Test that pages are named after their file and number."""
+        assert display_name(page_path("/scans/week1.tif", 3)) == "week1.tif, page 3"
+        assert display_name("/scans/page.jpg") == "page.jpg"
+
+
+class TestOpenImage:
+    """Test cases for opening pages."""
+    
+    def test_tiff_pages(self, tmp_path):
+        """Test that each TIFF page is opened on its own."""
+        tiff = make_tiff(tmp_path / "scan.tif")
+        assert count_pages(tiff) == 3
+        for page in range(1, 4):
+            with open_image(page_path(tiff, page)) as img:
+                assert img.getpixel((0, 0)) == 40 * page
+    
+    def test_missing_page(self, tmp_path):
+        """Test that a page past the end raises OSError."""
+        tiff = make_tiff(tmp_path / "scan.tif")
+        with pytest.raises(OSError):
+            open_image(page_path(tiff, 4))
+    
+    def test_pdf_pages(self, tmp_path):
+        """Test that PDF pages are rasterized at PDF_RENDER_DPI, or smaller for a small target."""
+        pdf = make_pdf(tmp_path / "scan.pdf")
+        assert count_pages(pdf) == 2
+        with open_image(page_path(pdf, 2)) as img:
+            assert img.size == (math.ceil(210 * PDF_RENDER_DPI / 72), math.ceil(297 * PDF_RENDER_DPI / 72))
+        with open_image(page_path(pdf, 1), max_size=(50, 50)) as img:
+            assert img.height <= 100
+        with pytest.raises(OSError):
+            open_image(page_path(pdf, 3))
+    
+    def test_pdf_size_from_structure(self, tmp_path):
+        """Test that a PDF page's decoded size is known without rasterizing it."""
+        pdf = make_pdf(tmp_path / "scan.pdf")
+        expected = math.ceil(210 * PDF_RENDER_DPI / 72) * math.ceil(297 * PDF_RENDER_DPI / 72) * 3
+        assert estimate_decoded_size(page_path(pdf, 1)) == expected
+    
+    def test_pdf_from_many_threads(self, tmp_path):
+        """Test that PDF pages can be counted, measured and rasterized from several threads at once."""
+        pdf = make_pdf(tmp_path / "scan.pdf", pages=4)
+        
+        def read(page):
+            with open_image(page_path(pdf, page), max_size=(50, 50)) as img:
+                return count_pages(pdf), estimate_decoded_size(page_path(pdf, page)), img.mode
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(read, [1, 2, 3, 4] * 10))
+        assert {(pages, mode) for pages, _, mode in results} == {(4, "RGB")}
+
+
+class TestPayload:
+    """Test cases for page payloads."""
+    
+    def test_grey_page_as_png(self, tmp_path):
+        """Test that a grey TIFF page is uploaded as a PNG of that page alone."""
+        tiff = make_tiff(tmp_path / "scan.tif")
+        payload = load_payload(page_path(tiff, 2))
+        assert payload["mime_type"] == "image/png"
+        with PILImage.open(io.BytesIO(payload["data"])) as img:
+            assert (img.size, img.getpixel((0, 0))) == ((200, 100), 80)
+    
+    def test_colour_page_as_jpeg(self):
+        """Test that colour pages are uploaded as JPEG."""
+        assert encode_page(PILImage.new("RGB", (50, 50), (200, 0, 0)))["mime_type"] == "image/jpeg"
+    
+    def test_plain_file_unchanged(self, tmp_path):
+        """Test that an ordinary image is uploaded as the file's own bytes."""
+        path = tmp_path / "page.jpg"
+        PILImage.new("RGB", (50, 50)).save(path, "JPEG")
+        assert load_payload(str(path)) == {"mime_type": "image/jpeg", "data": path.read_bytes()}
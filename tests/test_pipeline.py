@@ -0,0 +1,196 @@
+import threading
+import time
+import pytest
+from PIL import Image as PILImage
+from core.pipeline import ImagePipeline, is_api_key_error
+from core.rate_limiter import RateLimiter
+from constants import DEADLINE_MARKER
+
+
+class FakeClient:
+    """Client double that answers with the image path."""
+    
+    calls = []
+    lock = threading.Lock()
+    
+    def __init__(self, api_key):
+        self.api_key = api_key
+    
+    def generate_answer_from_image(self, image_path, custom_prompt="", deadline=None):
+        with FakeClient.lock:
+            FakeClient.calls.append((image_path, custom_prompt))
+        if "broken" in image_path:
+            raise Exception("Model failed")
+        if "badkey" in image_path:
+            raise Exception("API key not valid")
+        if "stuck" in image_path:
+            raise TimeoutError("Rate limit timeout")
+        return f"answer for {image_path}"
+
+
+class TestImagePipeline:
+    """Test cases for ImagePipeline."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_calls(self):
+        """Reset recorded client calls."""
+        FakeClient.calls = []
+    
+    def make_pipeline(self, **kwargs):
+        """Create a pipeline using the fake client."""
+        return ImagePipeline(
+            "test_key",
+            rate_limiter=RateLimiter(max_requests=100, time_window=60.0),
+            client_factory=FakeClient,
+            **kwargs
+        )
+    
+    def test_empty_api_key(self):
+        """Test that an empty API key is rejected."""
+        with pytest.raises(Exception, match="API key is empty"):
+            ImagePipeline("", client_factory=FakeClient)
+    
+    def test_results_in_input_order(self):
+        """Test that answers are returned in input order."""
+        paths = [f"img{i}.png" for i in range(8)]
+        results = self.make_pipeline().process(paths)
+        assert results == [("", f"answer for {p}") for p in paths]
+    
+    def test_custom_prompts_passed(self):
+        """Test that per-image prompts reach the client."""
+        self.make_pipeline().process(["a.png", "b.png"], {"b.png": "Be brief"})
+        assert sorted(FakeClient.calls) == [("a.png", ""), ("b.png", "Be brief")]
+    
+    def test_errors_become_error_answers(self):
+        """Test that a failing image does not fail the batch."""
+        results = self.make_pipeline().process(["ok.png", "broken.png"])
+        assert results[0] == ("", "answer for ok.png")
+        assert results[1] == ("", "Error: Model failed")
+    
+    def test_api_key_error_raises(self):
+        """Test that API key errors abort processing."""
+        with pytest.raises(Exception, match="API key"):
+            self.make_pipeline().process(["badkey.png"])
+    
+    def test_no_images(self):
+        """Test that an empty image list is rejected."""
+        with pytest.raises(Exception, match="No images selected"):
+            self.make_pipeline().process([])
+    
+    def test_shared_rate_limiter_consumed(self):
+        """Test that requests are counted on the shared limiter."""
+        limiter = RateLimiter(max_requests=10, time_window=60.0)
+        pipeline = ImagePipeline("test_key", rate_limiter=limiter, client_factory=FakeClient)
+        pipeline.process(["a.png", "b.png", "c.png"])
+        assert limiter.get_available_slots() == 7
+    
+    def test_duplicates_requested_once(self, tmp_path):
+        """Test that a worksheet selected twice is sent once and both get the answer."""
+        image = tmp_path / "sheet.png"
+        PILImage.new("RGB", (60, 80), (30, 90, 150)).save(image)
+        copy = tmp_path / "sheet copy.png"
+        copy.write_bytes(image.read_bytes())
+        
+        pipeline = self.make_pipeline(max_workers=1)
+        results = pipeline.process([str(image), str(copy)])
+        assert len(FakeClient.calls) == 1
+        assert results[0] == results[1]
+        assert pipeline.last_requests_saved == 1
+    
+    def test_duplicates_shared_across_calls(self, tmp_path):
+        """Test that an image answered by an earlier process() is not sent again."""
+        image = tmp_path / "sheet.png"
+        PILImage.new("RGB", (60, 80), (30, 90, 150)).save(image)
+        
+        pipeline = self.make_pipeline()
+        first = pipeline.process([str(image)])
+        second = pipeline.process([str(image)])
+        assert len(FakeClient.calls) == 1
+        assert first == second
+        assert pipeline.last_requests_saved == 1
+    
+    def test_status_callback(self):
+        """Test that progress is reported."""
+        messages = []
+        self.make_pipeline(status_callback=messages.append).process(["a.png"])
+        assert any("Finished processing all 1 images" in m for m in messages)
+    
+    def test_timeout_counted_as_completed(self):
+        """Test that a timed-out image is reported and still counts towards progress."""
+        messages = []
+        results = self.make_pipeline(max_workers=1, status_callback=messages.append).process(["stuck.png", "a.png"])
+        assert results[0] == ("", "Error: Rate limit timeout")
+        assert any(m.startswith("✗ Timed out processing image 1") for m in messages)
+        assert any(m.startswith("✓ Completed 2/2 images") for m in messages)
+    
+    def test_routes_recorded(self):
+        """Test that each request's route and tokens reach its record and the route meter."""
+        class RoutedClient(FakeClient):
+            def generate_answer_from_image(self, image_path, custom_prompt="", deadline=None):
+                self.last_route = "essay" if custom_prompt else "general"
+                self.last_usage = (300, 900 if custom_prompt else 40)
+                return super().generate_answer_from_image(image_path, custom_prompt, deadline)
+        
+        messages = []
+        pipeline = self.make_pipeline(status_callback=messages.append)
+        pipeline.client_factory = RoutedClient
+        pipeline.process(["a.png", "b.png", "c.png"], {"c.png": "Write an essay"})
+        assert [(r["route"], r["output_tokens"]) for r in pipeline.last_records] == [
+            ("general", 40), ("general", 40), ("essay", 900)
+        ]
+        totals = pipeline.route_meter.totals()
+        assert (totals["general"]["requests"], totals["essay"]["output_tokens"]) == (2, 900)
+        assert any(m.startswith("Routes: essay: 1 requests") for m in messages)
+
+
+class TestIsApiKeyError:
+    """Test cases for is_api_key_error."""
+    
+    def test_detects_api_key_errors(self):
+        """Test detection of API key errors."""
+        assert is_api_key_error("API key not valid") is True
+        assert is_api_key_error("API_KEY_INVALID") is True
+    
+    def test_other_errors(self):
+        """Test that other errors are not API key errors."""
+        assert is_api_key_error("429 quota exceeded") is False
+
+
+class SlowClient:
+    """Client double that takes a fixed time per request."""
+    
+    def __init__(self, api_key):
+        self.api_key = api_key
+    
+    def generate_answer_from_image(self, image_path, custom_prompt="", deadline=None):
+        time.sleep(0.3)
+        return f"answer for {image_path}"
+
+
+class TestPipelineDeadline:
+    """Test cases for job deadlines."""
+    
+    def test_images_abandoned_at_deadline(self, monkeypatch):
+        """Test that images which cannot start in time get the deadline marker."""
+        monkeypatch.setattr("core.pipeline.MIN_REQUEST_TIME", 0.0)
+        pipeline = ImagePipeline(
+            "test_key",
+            rate_limiter=RateLimiter(max_requests=100, time_window=60.0),
+            max_workers=1,
+            client_factory=SlowClient
+        )
+        results = pipeline.process([f"img{i}.png" for i in range(5)], job_timeout=0.5)
+        
+        answers = [answer for _, answer in results]
+        assert DEADLINE_MARKER in answers
+        assert any(answer.startswith("answer for") for answer in answers)
+    
+    def test_no_deadline_processes_all(self):
+        """Test that without a deadline nothing is abandoned."""
+        pipeline = ImagePipeline(
+            "test_key",
+            rate_limiter=RateLimiter(max_requests=100, time_window=60.0),
+            client_factory=FakeClient
+        )
+        results = pipeline.process(["a.png", "b.png", "c.png"])
+        assert DEADLINE_MARKER not in [answer for _, answer in results]
@@ -0,0 +1,149 @@
+import io
+import os
+import pytest
+import core.render_pool
+from core.answer_store import AnswerStore
+from core.document_generator import DocumentGenerator
+from core.render_pool import (
+    render_formats, format_render_times, render_many, create_render_pool,
+    render_pdf_parallel, use_parallel_pdf
+)
+
+
+class TestRenderFormats:
+    """Test cases for render_formats."""
+    
+    @pytest.fixture
+    def sample_exercises(self):
+        """Sample exercises for testing."""
+        return [
+            ("Exercise A", "**Exercise A**\n1. Answer one\n2. Answer two"),
+            ("Exercise B", "**Exercise B**\n1. Answer three")
+        ]
+    
+    def test_single_format(self, sample_exercises, tmp_path):
+        """Test that one format renders in this process."""
+        results = render_formats(
+            iter(sample_exercises), "Test Student", "Test Group", str(tmp_path / "single"), {"word"}
+        )
+        assert list(results) == ["word"]
+        output_path, seconds = results["word"]
+        assert output_path.endswith("single.docx")
+        assert os.path.exists(output_path)
+        assert seconds >= 0
+    
+    def test_both_formats(self, sample_exercises, tmp_path):
+        """Test that PDF and Word are rendered from the same answers."""
+        results = render_formats(
+            sample_exercises, "Test Student", "Test Group", str(tmp_path / "both"), ["word", "pdf"]
+        )
+        assert list(results) == ["pdf", "word"]
+        for output_path, _ in results.values():
+            assert os.path.exists(output_path)
+    
+    def test_relative_filename(self, sample_exercises, tmp_path, monkeypatch):
+        """Test that workers write relative names into our working directory."""
+        monkeypatch.chdir(tmp_path)
+        results = render_formats(sample_exercises, "S", "G", "relative", {"pdf", "word"})
+        assert results["pdf"][0] == str(tmp_path / "relative.pdf")
+        assert os.path.exists(tmp_path / "relative.docx")
+    
+    def test_no_format(self, sample_exercises):
+        """Test that an empty selection is an error."""
+        with pytest.raises(Exception, match="No output format"):
+            render_formats(sample_exercises, "S", "G", "none", set())
+    
+    def test_format_render_times(self):
+        """Test the render time summary."""
+        summary = format_render_times({"pdf": ("a.pdf", 1.234), "word": ("a.docx", 0.5)})
+        assert summary == "PDF in 1.23s, Word document in 0.50s"
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """A small worker pool shared by the tests in this module."""
+    pool = create_render_pool(2)
+    yield pool
+    pool.shutdown()
+
+
+class TestRenderMany:
+    """Test cases for render_many."""
+    
+    def test_results_in_input_order(self, pool, tmp_path):
+        """Test that every job is rendered and results keep the job order."""
+        answers = [("", "**Exercise A**\n1. Answer")]
+        jobs = [
+            ("Anna", "3B", answers, "pdf"),
+            ("Ben", "3B", answers, "word"),
+            ("Cleo", "3B", iter(answers), "pdf")
+        ]
+        messages = []
+        results = render_many(jobs, str(tmp_path), pool=pool, status_callback=messages.append)
+        
+        assert [os.path.basename(r.output_path) for r in results] == [
+            "Anna_3B.pdf", "Ben_3B.docx", "Cleo_3B.pdf"
+        ]
+        assert all(os.path.exists(r.output_path) and r.error is None for r in results)
+        assert len(messages) == 3
+        assert messages[-1].startswith("Rendered 3/3 documents")
+    
+    def test_failure_is_reported_per_job(self, pool, tmp_path):
+        """Test that one broken document doesn't stop the others."""
+        jobs = [
+            ("Bad", "G", [("", "control \x0b character")], "word"),
+            ("Good", "G", [("", "fine")], "word")
+        ]
+        bad, good = render_many(jobs, str(tmp_path), pool=pool)
+        assert bad.output_path is None
+        assert "XML compatible" in bad.error
+        assert good.error is None
+        assert os.path.exists(good.output_path)
+
+
+class TestRenderPdfParallel:
+    """Test cases for chunked PDF layout."""
+    
+    def test_pages_merged_in_order(self, pool):
+        """Test that chunks are merged into one PDF in answer order."""
+        from pypdf import PdfReader
+        
+        answers = [("", f"Answer number {i}") for i in range(7)]
+        buffer = io.BytesIO()
+        render_pdf_parallel(answers, "Test Student", "Test Group", buffer, pool=pool, chunk_size=3)
+        
+        reader = PdfReader(io.BytesIO(buffer.getvalue()))
+        assert len(reader.pages) == 3  # One page per chunk
+        text = "".join(page.extract_text() for page in reader.pages)
+        assert text.count("Student:") == 1
+        positions = [text.index(f"Answer number {i}") for i in range(7)]
+        assert positions == sorted(positions)
+    
+    def test_empty_answers(self, pool):
+        """Test that a PDF with only the header can be chunked."""
+        buffer = io.BytesIO()
+        render_pdf_parallel([], "Test Student", "Test Group", buffer, pool=pool)
+        assert buffer.getvalue().startswith(b"%PDF-")
+    
+    def test_small_documents_stay_on_one_core(self, monkeypatch):
+        """Test the crossover and the single-CPU fallback."""
+        monkeypatch.setattr(os, "cpu_count", lambda: 4)
+        assert use_parallel_pdf(100) is False
+        assert use_parallel_pdf(100000) is True
+        monkeypatch.setattr(os, "cpu_count", lambda: 1)
+        assert use_parallel_pdf(100000) is False
+    
+    def test_answer_store_streams(self, monkeypatch):
+        """Test that on-disk answers are laid out streaming, not sent to workers."""
+        monkeypatch.setattr(os, "cpu_count", lambda: 4)
+        monkeypatch.setattr(core.render_pool, "PDF_PARALLEL_MIN_EXERCISES", 2)
+        monkeypatch.setattr(
+            core.render_pool, "render_pdf_parallel", lambda *args, **kwargs: pytest.fail("laid out in parallel")
+        )
+        store = AnswerStore(3)
+        for idx in range(3):
+            store[idx] = ("", f"Answer number {idx}")
+        buffer = io.BytesIO()
+        DocumentGenerator.render_pdf(store, "Test Student", "Test Group", buffer)
+        store.close()
+        assert buffer.getvalue().startswith(b"%PDF-")
@@ -0,0 +1,121 @@
+import os
+import pytest
+from core.pipeline import ImagePipeline
+from core.rate_limiter import RateLimiter
+from core.results_bundle import BundleItem, ResultsBundle, bundle_path
+from core.answer_cache import hash_file
+from constants import EXERCISE_PROMPT
+
+
+class ModelClient:
+    """Client double that reports which model answered."""
+    
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.last_model = None
+    
+    def generate_answer_from_image(self, image_path, custom_prompt="", deadline=None):
+        self.last_model = "models/gemini-2.0-flash"
+        return f"**{os.path.basename(image_path)}**"
+
+
+def make_bundle():
+    """Create a bundle with two answers."""
+    return ResultsBundle(
+        "Alice", "1A",
+        [
+            BundleItem("p1.png", "abc", "", "models/gemini-2.0-flash", "**Exercise 1**\n1. yes", 1.5),
+            BundleItem("p2.png", "def", "Be brief", "models/gemini-1.5-pro", "Error: failed", 0.5),
+        ],
+        output_filename="homework"
+    )
+
+
+class TestResultsBundle:
+    """Test cases for ResultsBundle."""
+    
+    def test_save_and_load(self, tmp_path):
+        """Test that a bundle survives a round trip through disk."""
+        bundle = make_bundle()
+        path = bundle.save(str(tmp_path / "alice"))
+        assert path.endswith(".luma")
+        loaded = ResultsBundle.load(path)
+        assert loaded.to_dict() == bundle.to_dict()
+        assert loaded.answers() == [("", "**Exercise 1**\n1. yes"), ("", "Error: failed")]
+    
+    def test_save_is_deterministic(self, tmp_path):
+        """Test that the same results give the same file."""
+        bundle = make_bundle()
+        first = open(bundle.save(str(tmp_path / "a.luma")), "rb").read()
+        second = open(bundle.save(str(tmp_path / "b.luma")), "rb").read()
+        assert first == second
+    
+    def test_load_invalid(self, tmp_path):
+        """Test that a file that is not a bundle is rejected."""
+        path = tmp_path / "broken.luma"
+        path.write_bytes(b"not gzip")
+        with pytest.raises(Exception, match="Not a valid results bundle"):
+            ResultsBundle.load(str(path))
+    
+    def test_newer_version_rejected(self):
+        """Test that bundles from a newer app version are rejected."""
+        data = make_bundle().to_dict()
+        data["version"] += 1
+        with pytest.raises(Exception, match="newer than this app supports"):
+            ResultsBundle.from_dict(data)
+    
+    def test_from_results_hashes_images(self, tmp_path):
+        """Test building a bundle from a finished job."""
+        image = tmp_path / "page.png"
+        image.write_bytes(b"page")
+        bundle = ResultsBundle.from_results(
+            "Bob", "2B", [str(image), str(tmp_path / "missing.png")],
+            [("", "one"), ("", "two")], {str(image): "Short"},
+            [{"model": "m", "seconds": 2.0, "route": "exercise"}, {}]
+        )
+        assert bundle.items[0] == BundleItem(
+            "page.png", hash_file(str(image)), "Short", "m", "one", 2.0, "exercise", EXERCISE_PROMPT
+        )
+        assert bundle.items[1] == BundleItem("missing.png", "", "", "", "two", 0.0)
+    
+    def test_load_version_1(self):
+        """Test that bundles saved before routes were recorded still load."""
+        data = make_bundle().to_dict()
+        data["version"] = 1
+        for item in data["items"]:
+            del item["route"], item["route_prompt"]
+        bundle = ResultsBundle.from_dict(data)
+        assert [item.route for item in bundle.items] == ["", ""]
+        assert bundle.answers() == make_bundle().answers()
+    
+    def test_render(self, tmp_path):
+        """Test re-rendering with a corrected student name."""
+        results = make_bundle().render(["word"], student_name="Alicia", output_dir=str(tmp_path))
+        output_path, seconds = results["word"]
+        assert output_path == os.path.join(str(tmp_path), "homework.docx")
+        assert os.path.exists(output_path)
+        assert seconds >= 0
+    
+    def test_render_default_filename(self, tmp_path):
+        """Test that an empty filename override falls back to the generated name."""
+        results = make_bundle().render(["pdf"], group="1B", output_filename="", output_dir=str(tmp_path))
+        assert os.path.basename(results["pdf"][0]) == "Alice_1B.pdf"
+    
+    def test_bundle_path(self):
+        """Test that bundles sit next to their documents."""
+        assert bundle_path(os.path.join("out", "Alice_1A.pdf")) == os.path.join("out", "Alice_1A.luma")
+
+
+class TestPipelineRecords:
+    """Test that the pipeline records what a bundle needs."""
+    
+    def test_records_model_and_time(self):
+        """Test that every processed image gets its model and request time."""
+        pipeline = ImagePipeline(
+            "test_key",
+            rate_limiter=RateLimiter(max_requests=100, time_window=60.0),
+            client_factory=ModelClient
+        )
+        pipeline.process(["a.png", "b.png"])
+        assert [record["model"] for record in pipeline.last_records] == ["models/gemini-2.0-flash"] * 2
+        assert all(record["seconds"] >= 0 for record in pipeline.last_records)
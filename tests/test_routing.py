@@ -0,0 +1,39 @@
+from core.routing import ESSAY, EXERCISE, GENERAL, ROUTES, classify, order_models
+from constants import GENERAL_MAX_OUTPUT_TOKENS
+
+MODELS = ["models/gemini-1.5-pro", "models/gemini-2.0-flash", "models/gemini-2.0-flash-lite", "models/gemini-exp"]
+
+
+class TestClassify:
+    """Test cases for classify."""
+    
+    def test_routes(self):
+        """Test that essays, short-answer exercises and everything else take their own routes."""
+        assert classify("Write an essay about your holidays").name == ESSAY
+        assert classify("Fill in the gaps").name == EXERCISE
+        assert classify("").name == GENERAL
+        assert classify("Answer in British English").name == GENERAL
+    
+    def test_essay_wins(self):
+        """Test that essay wording wins over short-answer wording."""
+        assert classify("Choose a topic and write an essay").name == ESSAY
+    
+    def test_generation_config(self):
+        """Test that every route limits its output and only some set a temperature."""
+        assert ROUTES[GENERAL].generation_config() == {"max_output_tokens": GENERAL_MAX_OUTPUT_TOKENS}
+        assert "temperature" in ROUTES[EXERCISE].generation_config()
+
+
+class TestOrderModels:
+    """Test cases for order_models."""
+    
+    def test_tier_first(self):
+        """Test that a tier's models come first, in its order, with the rest behind."""
+        assert order_models(MODELS, "fast") == [
+            "models/gemini-2.0-flash-lite", "models/gemini-2.0-flash", "models/gemini-1.5-pro", "models/gemini-exp"
+        ]
+        assert order_models(MODELS, "strong")[0] == "models/gemini-1.5-pro"
+    
+    def test_unknown_tier(self):
+        """Test that an unknown tier keeps the listed order."""
+        assert order_models(MODELS, "unknown") == MODELS
@@ -2,7 +2,12 @@ import pytest
 from utils.text_utils import (
     convert_markdown_bold_to_html,
     split_markdown_bold,
-    is_essay_assignment
+    is_essay_assignment,
+    is_short_answer_exercise,
+    parse_markdown,
+    to_reportlab_markup,
+    block_runs,
+    Span
 )
 
 
@@ -144,3 +149,113 @@ class TestIsEssayAssignment:
         assert is_essay_assignment("The task is to write an essay") is True
         assert is_essay_assignment("Please complete this essay assignment") is True
 
+
+
+class TestIsShortAnswerExercise:
+    """Test cases for is_short_answer_exercise."""
+    
+    def test_short_answer_keywords(self):
+        """Test detection of gap-filling, choice and matching exercises."""
+        assert is_short_answer_exercise("Fill in the blanks") is True
+        assert is_short_answer_exercise("Choose the correct answer") is True
+        assert is_short_answer_exercise("MATCH the words") is True
+        assert is_short_answer_exercise("True or false?") is True
+    
+    def test_not_short_answer(self):
+        """Test that open tasks are not detected as short-answer exercises."""
+        assert is_short_answer_exercise("Write an essay about your town") is False
+        assert is_short_answer_exercise("") is False
+
+
+class TestParseMarkdown:
+    """Test cases for parse_markdown."""
+    
+    def test_bold_and_italics(self):
+        """Test inline bold and italics in one line."""
+        (block,) = parse_markdown("A **bold** and *italic* word")
+        assert block.kind == "paragraph"
+        assert block.spans == (
+            Span("A "), Span("bold", bold=True), Span(" and "), Span("italic", italic=True), Span(" word")
+        )
+    
+    def test_bold_italic(self):
+        """Test triple markers nest bold and italics."""
+        (block,) = parse_markdown("***both***")
+        assert block.spans == (Span("both", bold=True, italic=True),)
+    
+    def test_unmatched_markers_are_literal(self):
+        """Test that stray markers are kept as text."""
+        (block,) = parse_markdown("a **b** c **d")
+        assert block.spans == (Span("a "), Span("b", bold=True), Span(" c **d"))
+    
+    def test_arithmetic_is_not_italic(self):
+        """Test that spaced asterisks are not emphasis."""
+        (block,) = parse_markdown("5 * 3 = 15 and 2 * 4")
+        assert block.spans == (Span("5 * 3 = 15 and 2 * 4"),)
+    
+    def test_underscores_in_words(self):
+        """Test that snake_case is left alone but _x_ is italic."""
+        assert parse_markdown("snake_case_name")[0].spans == (Span("snake_case_name"),)
+        assert parse_markdown("_x_")[0].spans == (Span("x", italic=True),)
+    
+    def test_pair_closes_bold_first(self):
+        """Test that ** closes bold even with an open italic marker inside."""
+        (block,) = parse_markdown("**a *b** c")
+        assert block.spans == (Span("a *b", bold=True), Span(" c"))
+    
+    def test_blocks(self):
+        """Test headings, numbered list items and blank lines."""
+        blocks = parse_markdown("## Title\n\n1. First\n2) Second\nText")
+        assert [b.kind for b in blocks] == ["heading", "blank", "list_item", "list_item", "paragraph"]
+        assert blocks[0].level == 2
+        assert blocks[2].marker == "1."
+        assert blocks[3].marker == "2)"
+    
+    def test_cached(self):
+        """Test that the same answer is only parsed once."""
+        text = "**Cached** answer"
+        assert parse_markdown(text) is parse_markdown(text)
+    
+    def test_long_line_with_many_markers(self):
+        """Test that many unmatched markers parse quickly."""
+        text = "a * _b " * 20000
+        (block,) = parse_markdown(text)
+        assert block.spans == (Span(text.strip()),)
+
+
+class TestBlockRuns:
+    """Test cases for block_runs."""
+    
+    def test_heading_is_bold(self):
+        """Test that heading text is drawn bold."""
+        (block,) = parse_markdown("# Title *x*")
+        assert block_runs(block) == [Span("Title ", bold=True), Span("x", bold=True, italic=True)]
+    
+    def test_list_marker_merged(self):
+        """Test that the list number joins the first plain run."""
+        (block,) = parse_markdown("1. Answer **one**")
+        assert block_runs(block) == [Span("1. Answer "), Span("one", bold=True)]
+    
+    def test_list_marker_before_bold(self):
+        """Test that the list number is its own run before styled text."""
+        (block,) = parse_markdown("1. **one**")
+        assert block_runs(block) == [Span("1. "), Span("one", bold=True)]
+
+
+class TestToReportlabMarkup:
+    """Test cases for to_reportlab_markup."""
+    
+    def test_matches_old_bold_conversion(self):
+        """Test that plain bold answers render as before."""
+        text = "**Exercise A (Page 45)**\n1. Answer one\n2. Answer two"
+        expected = convert_markdown_bold_to_html(text).replace('\n', '<br/>')
+        assert to_reportlab_markup(parse_markdown(text)) == expected
+    
+    def test_escapes_html(self):
+        """Test that < and & in answers are escaped."""
+        markup = to_reportlab_markup(parse_markdown("x < y & **z**"))
+        assert markup == "x &lt; y &amp; <b>z</b>"
+    
+    def test_italics_and_blank_lines(self):
+        """Test italics and line breaks."""
+        assert to_reportlab_markup(parse_markdown("*a*\n\nb")) == "<i>a</i><br/><br/>b"
@@ -0,0 +1,106 @@
+import os
+import pytest
+from PIL import Image as PILImage
+from utils.thumbnail_cache import ThumbnailCache, make_thumbnail
+
+
+def make_image(path, size=(400, 300), color=(200, 30, 30)):
+    """Write a solid-colour JPEG."""
+    PILImage.new("RGB", size, color).save(path, "JPEG")
+    return str(path)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / "thumbnails")
+
+
+class TestThumbnailCache:
+    """Test cases for ThumbnailCache."""
+    
+    def test_thumbnail_fits_size(self, tmp_path, cache_dir):
+        """Test that thumbnails keep aspect ratio within the requested size."""
+        image = make_image(tmp_path / "page.jpg")
+        thumbnail = ThumbnailCache(cache_dir).get(image, (100, 100))
+        assert thumbnail.size == (100, 75)
+        assert thumbnail.mode == "RGB"
+    
+    def test_memory_hit(self, tmp_path, cache_dir):
+        """Test that a second request is served from memory."""
+        image = make_image(tmp_path / "page.jpg")
+        cache = ThumbnailCache(cache_dir)
+        first = cache.get(image)
+        assert cache.get(image) is first
+        assert (cache.misses, cache.memory_hits) == (1, 1)
+    
+    def test_disk_hit_across_instances(self, tmp_path, cache_dir):
+        """Test that a new cache (a restart) reads thumbnails from disk."""
+        image = make_image(tmp_path / "page.jpg")
+        expected = ThumbnailCache(cache_dir).get(image).tobytes()
+        cache = ThumbnailCache(cache_dir)
+        assert cache.get(image).tobytes() == expected
+        assert (cache.misses, cache.disk_hits) == (0, 1)
+    
+    def test_spec_metadata(self, tmp_path, cache_dir):
+        """Test that stored thumbnails carry the freedesktop Thumb:: keys."""
+        image = make_image(tmp_path / "page.jpg")
+        ThumbnailCache(cache_dir).get(image, (100, 100))
+        [name] = os.listdir(os.path.join(cache_dir, "100x100"))
+        with PILImage.open(os.path.join(cache_dir, "100x100", name)) as stored:
+            assert stored.info["Thumb::URI"].startswith("file://")
+            assert stored.info["Thumb::Size"] == str(os.path.getsize(image))
+    
+    def test_changed_image_regenerated(self, tmp_path, cache_dir):
+        """Test that editing an image invalidates its thumbnail."""
+        image = make_image(tmp_path / "page.jpg")
+        ThumbnailCache(cache_dir).get(image)
+        make_image(tmp_path / "page.jpg", size=(300, 400), color=(0, 0, 255))
+        os.utime(image, (1, 1))
+        cache = ThumbnailCache(cache_dir)
+        thumbnail = cache.get(image)
+        assert thumbnail.size == (75, 100)
+        assert cache.misses == 1
+    
+    def test_size_is_part_of_key(self, tmp_path, cache_dir):
+        """Test that different thumbnail sizes are cached separately."""
+        image = make_image(tmp_path / "page.jpg")
+        cache = ThumbnailCache(cache_dir)
+        assert cache.get(image, (100, 100)).size == (100, 75)
+        assert cache.get(image, (200, 200)).size == (200, 150)
+        assert cache.misses == 2
+    
+    def test_peek_only_memory(self, tmp_path, cache_dir):
+        """Test that peek never decodes."""
+        image = make_image(tmp_path / "page.jpg")
+        cache = ThumbnailCache(cache_dir)
+        assert cache.peek(image) is None
+        thumbnail = cache.get(image)
+        assert cache.peek(image) is thumbnail
+        assert cache.peek(str(tmp_path / "missing.jpg")) is None
+    
+    def test_large_jpeg_decoded_reduced(self, tmp_path):
+        """Test that a big JPEG thumbnail matches the requested size after a reduced decode."""
+        image = make_image(tmp_path / "scan.jpg", size=(2480, 3508))
+        assert make_thumbnail(image, (100, 100)).size == (71, 100)
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used thumbnail leaves memory."""
+        images = [make_image(tmp_path / f"p{i}.jpg") for i in range(3)]
+        cache = ThumbnailCache(None, max_entries=2)
+        for image in images:
+            cache.get(image)
+        assert len(cache) == 2
+        cache.get(images[0])
+        assert cache.misses == 4
+    
+    def test_unwritable_cache_dir(self, tmp_path):
+        """Test that a cache directory that can't be created doesn't break thumbnails."""
+        image = make_image(tmp_path / "page.jpg")
+        blocker = tmp_path / "file"
+        blocker.write_bytes(b"")
+        assert ThumbnailCache(str(blocker / "thumbnails")).get(image).size == (100, 75)
+    
+    def test_missing_image(self, tmp_path, cache_dir):
+        """Test that a missing image raises."""
+        with pytest.raises(OSError):
+            ThumbnailCache(cache_dir).get(str(tmp_path / "missing.jpg"))
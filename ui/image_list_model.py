@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from typing import Optional
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor, QImage, QPixmap
+from PyQt6.QtWidgets import QPlainTextEdit, QStyledItemDelegate
+
+from ui.thumbnail_loader import ThumbnailLoader
+from utils.page_utils import display_name
+from constants import THUMBNAIL_SIZE, THUMBNAIL_PIXMAP_CACHE_SIZE, IMAGE_LIST_RESET_RUNS
+
+
+class ImageListModel(QAbstractTableModel):
+    """
+    Selected images and their custom prompts, one row per image.
+    Thumbnails are only requested when a view asks for a row's decoration,
+    which it does for visible rows only, and at most
+    THUMBNAIL_PIXMAP_CACHE_SIZE pixmaps are kept, so memory stays flat no
+    matter how many images are selected.
+    """
+    
+    IMAGE_COLUMN = 0
+    PROMPT_COLUMN = 1
+    HEADERS = ("Image", "Custom Prompt (Optional)")
+    
+    def __init__(self, thumbnail_loader: ThumbnailLoader, parent=None):
+        """
+        Initialize image list model.
+        
+        Args:
+            thumbnail_loader: Background loader for thumbnails
+            parent: Owning Qt object
+        """
+        super().__init__(parent)
+        self._paths: list[str] = []
+        self._prompts: dict[str, str] = {}  # Only non-empty prompts
+        self._pixmaps: OrderedDict[str, QPixmap] = OrderedDict()
+        self._errors: set[str] = set()
+        
+        self._placeholder = QPixmap(*THUMBNAIL_SIZE)
+        self._placeholder.fill(QColor("#e8e8e8"))
+        
+        self.thumbnail_loader = thumbnail_loader
+        self.thumbnail_loader.loaded.connect(self._on_thumbnail_loaded)
+        self.thumbnail_loader.failed.connect(self._on_thumbnail_failed)
+    
+    def set_images(self, image_paths: list[str], saved_prompts: Optional[dict[str, str]] = None):
+        """
+        Bring the rows in line with image_paths.
+        Only rows of added or removed images change; prompts typed into the
+        other rows are kept.
+        
+        Args:
+            image_paths: Selected images, in display order
+            saved_prompts: Prompts to start new rows with
+        """
+        saved_prompts = saved_prompts or {}
+        self._remove_missing(set(image_paths))
+        
+        # Existing rows keep their relative order, so each new image goes in at its index
+        present = set(self._paths)
+        for idx, image_path in enumerate(image_paths):
+            if image_path not in present:
+                self.beginInsertRows(QModelIndex(), idx, idx)
+                self._paths.insert(idx, image_path)
+                saved_prompt = saved_prompts.get(image_path, "").strip()
+                if saved_prompt:
+                    self._prompts[image_path] = saved_prompt
+                self.endInsertRows()
+                present.add(image_path)
+    
+    def _remove_missing(self, selected: set[str]):
+        """
+        Remove the rows of images not in selected.
+        Each run of adjacent rows goes in one removal; removing many
+        scattered rows rebuilds the list instead, as one signal per run
+        would cost the view a pass over every row each time.
+        """
+        removed = [row for row, image_path in enumerate(self._paths) if image_path not in selected]
+        if not removed:
+            return
+        for row in removed:
+            image_path = self._paths[row]
+            self._prompts.pop(image_path, None)
+            self._pixmaps.pop(image_path, None)
+            self._errors.discard(image_path)
+        
+        runs = []  # (first, last) rows
+        for row in removed:
+            if runs and runs[-1][1] == row - 1:
+                runs[-1] = (runs[-1][0], row)
+            else:
+                runs.append((row, row))
+        
+        if len(runs) > IMAGE_LIST_RESET_RUNS:
+            self.beginResetModel()
+            self._paths = [image_path for image_path in self._paths if image_path in selected]
+            self.endResetModel()
+            return
+        # From the end so earlier row numbers stay valid
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._paths[first:last + 1]
+            self.endRemoveRows()
+    
+    def image_path(self, row: int) -> str:
+        """Get the image shown in a row."""
+        return self._paths[row]
+    
+    def image_paths(self) -> list[str]:
+        """Get the images in display order."""
+        return list(self._paths)
+    
+    def prompts(self) -> dict[str, str]:
+        """Get the non-empty custom prompts by image path."""
+        return dict(self._prompts)
+    
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._paths)
+    
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+    
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        flags = super().flags(index)
+        if index.column() == self.PROMPT_COLUMN:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        image_path = self._paths[index.row()]
+        
+        if index.column() == self.PROMPT_COLUMN:
+            if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+                return self._prompts.get(image_path, "")
+            return None
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if image_path in self._errors:
+                return f"{index.row() + 1}. Error loading {display_name(image_path)}"
+            return f"{index.row() + 1}. {display_name(image_path)}"
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._thumbnail(image_path)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return image_path
+        if role == Qt.ItemDataRole.ForegroundRole and image_path in self._errors:
+            return QColor("red")
+        return None
+    
+    def setData(self, index: QModelIndex, value, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        if not index.isValid() or index.column() != self.PROMPT_COLUMN or role != Qt.ItemDataRole.EditRole:
+            return False
+        image_path = self._paths[index.row()]
+        custom_prompt = (value or "").strip()
+        if custom_prompt:
+            self._prompts[image_path] = custom_prompt
+        else:
+            self._prompts.pop(image_path, None)
+        self.dataChanged.emit(index, index, [role])
+        return True
+    
+    def _thumbnail(self, image_path: str) -> Optional[QPixmap]:
+        """Get a row's thumbnail, queueing it and returning a placeholder if it isn't loaded."""
+        pixmap = self._pixmaps.get(image_path)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(image_path)
+            return pixmap
+        if image_path in self._errors:
+            return None
+        
+        cached = self.thumbnail_loader.cached(image_path)
+        if cached is not None:
+            return self._store(image_path, cached)
+        self.thumbnail_loader.request(image_path)
+        return self._placeholder
+    
+    def _store(self, image_path: str, image: QImage) -> QPixmap:
+        pixmap = QPixmap.fromImage(image)
+        self._pixmaps[image_path] = pixmap
+        while len(self._pixmaps) > THUMBNAIL_PIXMAP_CACHE_SIZE:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+    
+    def _row_changed(self, image_path: str):
+        """Tell views that a row's image cell changed."""
+        try:
+            row = self._paths.index(image_path)
+        except ValueError:
+            return  # Removed while its thumbnail was loading
+        index = self.index(row, self.IMAGE_COLUMN)
+        self.dataChanged.emit(index, index)
+    
+    def _on_thumbnail_loaded(self, image_path: str, image: QImage):
+        if image_path in self._paths:
+            self._store(image_path, image)
+            self._row_changed(image_path)
+    
+    def _on_thumbnail_failed(self, image_path: str, error_message: str):
+        print(f"Error loading image {image_path}: {error_message}")
+        if image_path in self._paths:
+            self._errors.add(image_path)
+            self._row_changed(image_path)
+
+
+class PromptDelegate(QStyledItemDelegate):
+    """Edits custom prompts in place with a multi-line editor."""
+    
+    def createEditor(self, parent, option, index):
+        editor = QPlainTextEdit(parent)
+        editor.setTabChangesFocus(True)
+        return editor
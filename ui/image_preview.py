@@ -1,152 +1,154 @@
-import os
-from functools import partial
+import time
 from PyQt6.QtWidgets import (
-    QGroupBox, QScrollArea, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QFrame
+    QGroupBox, QVBoxLayout, QHBoxLayout, QTableView, QHeaderView,
+    QAbstractItemView, QPushButton, QWidget
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QSize, QModelIndex
+from PyQt6.QtGui import QKeySequence, QShortcut
 
-from utils.image_utils import load_image_as_pixmap, get_image_filename
-from constants import PREVIEW_MIN_HEIGHT
+from ui.image_list_model import ImageListModel, PromptDelegate
+from ui.thumbnail_loader import ThumbnailLoader
+from constants import IMAGE_LIST_HEIGHT, THUMBNAIL_SIZE
 
 
 class ImagePreviewWidget:
-    """Manages image preview display."""
+    """
+    Manages the list of selected images: thumbnail, name and custom prompt per row.
+    Rows are drawn by a QTableView over an ImageListModel, so only visible
+    rows cost widgets, pixmaps or decoding, and the list stays responsive
+    with thousands of images.
+    """
     
-    def __init__(self, parent_widget, content_layout, on_image_click, on_remove_image):
+    def __init__(self, parent_widget, content_layout, on_image_click, on_remove_images):
         self.parent = parent_widget
         self.content_layout = content_layout
         self.on_image_click = on_image_click
-        self.on_remove_image = on_remove_image
+        self.on_remove_images = on_remove_images  # Called once with every image to remove
         self.image_preview_group = None
-        self.image_preview_widgets = {}
-        self._pixmap_cache = []
+        self.table_view = None
+        self.time_to_interactive = 0.0  # Seconds the last update_preview took
+        
+        self.thumbnail_loader = ThumbnailLoader(parent=parent_widget)
+        self.model = ImageListModel(self.thumbnail_loader, parent_widget)
     
-    def create_preview(self, image_paths: list):
-        """Create preview thumbnails for selected images."""
-        if self.image_preview_group is not None:
-            try:
-                self.content_layout.removeWidget(self.image_preview_group)
-                self.image_preview_widgets.clear()
-                self._pixmap_cache.clear()
-                QApplication.processEvents()
-                self.image_preview_group.deleteLater()
-                self.image_preview_group = None
-                QApplication.processEvents()
-            except Exception as e:
-                print(f"Error cleaning up preview: {e}")
-                self.image_preview_group = None
+    def update_preview(self, image_paths: list, saved_prompts: dict = None):
+        """
+        Bring the list in line with the selected images.
+        Only rows of added or removed images change; thumbnails are decoded
+        in the background once their rows scroll into view.
         
+        Args:
+            image_paths: Selected images, in display order
+            saved_prompts: Custom prompts to start new rows with
+        """
+        started = time.perf_counter()
         if not image_paths:
+            self.clear()
             return
         
-        self.image_preview_group = QGroupBox("Image Preview")
-        preview_layout = QHBoxLayout()
-        preview_layout.setSpacing(5)
-        
-        preview_scroll = QScrollArea()
-        preview_scroll.setWidgetResizable(True)
-        preview_scroll.setMinimumHeight(PREVIEW_MIN_HEIGHT)
-        preview_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        preview_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        if self.image_preview_group is None:
+            self._create_group()
+        self.model.set_images(image_paths, saved_prompts)
+        self.time_to_interactive = time.perf_counter() - started
+    
+    def prompts(self) -> dict[str, str]:
+        """Get the non-empty per-image custom prompts."""
+        if self.table_view is not None and self.table_view.state() == QAbstractItemView.State.EditingState:
+            # Commit the prompt being typed
+            self.table_view.setCurrentIndex(QModelIndex())
+        return self.model.prompts()
+    
+    def _create_group(self):
+        """Create the image list group box."""
+        self.image_preview_group = QGroupBox("Images")
+        group_layout = QVBoxLayout()
         
-        preview_content = QWidget()
-        preview_content_layout = QHBoxLayout(preview_content)
-        preview_content_layout.setSpacing(5)
+        self.table_view = QTableView()
+        self.table_view.setModel(self.model)
+        self.table_view.setItemDelegateForColumn(ImageListModel.PROMPT_COLUMN, PromptDelegate(self.table_view))
+        self.table_view.setIconSize(QSize(*THUMBNAIL_SIZE))
+        self.table_view.setMinimumHeight(IMAGE_LIST_HEIGHT)
+        self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table_view.setEditTriggers(
+            QAbstractItemView.EditTrigger.DoubleClicked
+            | QAbstractItemView.EditTrigger.SelectedClicked
+            | QAbstractItemView.EditTrigger.EditKeyPressed
+            | QAbstractItemView.EditTrigger.AnyKeyPressed
+        )
+        self.table_view.setWordWrap(True)
+        self.table_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
         
-        self.image_preview_widgets = {}
-        self._pixmap_cache.clear()
+        # Fixed row heights let the view lay out any number of rows without asking the model
+        vertical_header = self.table_view.verticalHeader()
+        vertical_header.setVisible(False)
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(THUMBNAIL_SIZE[1] + 10)
+        horizontal_header = self.table_view.horizontalHeader()
+        horizontal_header.setSectionResizeMode(ImageListModel.IMAGE_COLUMN, QHeaderView.ResizeMode.Fixed)
+        horizontal_header.resizeSection(ImageListModel.IMAGE_COLUMN, THUMBNAIL_SIZE[0] + 180)
+        horizontal_header.setSectionResizeMode(ImageListModel.PROMPT_COLUMN, QHeaderView.ResizeMode.Stretch)
         
-        for idx, image_path in enumerate(image_paths):
-            try:
-                pixmap = load_image_as_pixmap(image_path)
-                self._pixmap_cache.append(pixmap)
-                
-                preview_frame = QFrame()
-                preview_frame.setFrameStyle(QFrame.Shape.Box)
-                preview_frame.setLineWidth(1)
-                frame_layout = QVBoxLayout(preview_frame)
-                frame_layout.setSpacing(2)
-                frame_layout.setContentsMargins(5, 5, 5, 5)
-                
-                label_img = QLabel()
-                label_img.setPixmap(pixmap)
-                label_img.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                label_img.setScaledContents(False)
-                frame_layout.addWidget(label_img)
-                
-                filename = get_image_filename(image_path)
-                label_text = QLabel(f"{idx+1}. {filename}")
-                label_text.setStyleSheet("font-size: 9pt;")
-                label_text.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                frame_layout.addWidget(label_text)
-                
-                remove_btn = QPushButton("Remove")
-                remove_btn.setStyleSheet(
-                    "QPushButton { background-color: #ff4444; color: white; font-weight: bold; "
-                    "padding: 3px 8px; border: none; border-radius: 3px; }"
-                    "QPushButton:hover { background-color: #cc0000; }"
-                    "QPushButton:pressed { background-color: #990000; }"
-                )
-                remove_btn.clicked.connect(partial(self.on_remove_image, image_path))
-                frame_layout.addWidget(remove_btn)
-                
-                label_img.mousePressEvent = partial(self._on_image_click, image_path)
-                label_text.mousePressEvent = partial(self._on_image_click, image_path)
-                
-                self.image_preview_widgets[image_path] = (
-                    preview_frame, pixmap, label_img, label_text, remove_btn
-                )
-                preview_content_layout.addWidget(preview_frame)
-            except Exception as e:
-                print(f"Error loading image {image_path}: {e}")
-                preview_frame = QFrame()
-                preview_frame.setFrameStyle(QFrame.Shape.Box)
-                preview_frame.setLineWidth(1)
-                frame_layout = QVBoxLayout(preview_frame)
-                frame_layout.setSpacing(2)
-                frame_layout.setContentsMargins(5, 5, 5, 5)
-                
-                error_label = QLabel(f"Error loading\n{os.path.basename(image_path)}")
-                error_label.setStyleSheet("color: red; font-size: 9pt;")
-                error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                frame_layout.addWidget(error_label)
-                
-                remove_btn = QPushButton("Remove")
-                remove_btn.setStyleSheet(
-                    "QPushButton { background-color: #ff4444; color: white; font-weight: bold; "
-                    "padding: 3px 8px; border: none; border-radius: 3px; }"
-                    "QPushButton:hover { background-color: #cc0000; }"
-                )
-                remove_btn.clicked.connect(partial(self.on_remove_image, image_path))
-                frame_layout.addWidget(remove_btn)
-                
-                self.image_preview_widgets[image_path] = (
-                    preview_frame, None, None, error_label, remove_btn
-                )
-                preview_content_layout.addWidget(preview_frame)
+        self.table_view.doubleClicked.connect(self._on_double_click)
+        self.table_view.verticalScrollBar().valueChanged.connect(self._cancel_offscreen)
+        QShortcut(QKeySequence.StandardKey.Delete, self.table_view, self.remove_selected)
+        group_layout.addWidget(self.table_view)
         
-        preview_scroll.setWidget(preview_content)
-        preview_layout.addWidget(preview_scroll)
-        self.image_preview_group.setLayout(preview_layout)
+        buttons_layout = QHBoxLayout()
+        buttons_layout.setContentsMargins(0, 0, 0, 0)
+        buttons_layout.addStretch(1)
+        remove_btn = QPushButton("Remove Selected")
+        remove_btn.setStyleSheet(
+            "QPushButton { background-color: #ff4444; color: white; font-weight: bold; "
+            "padding: 3px 8px; border: none; border-radius: 3px; }"
+            "QPushButton:hover { background-color: #cc0000; }"
+            "QPushButton:pressed { background-color: #990000; }"
+        )
+        remove_btn.clicked.connect(self.remove_selected)
+        buttons_layout.addWidget(remove_btn)
+        buttons_widget = QWidget()
+        buttons_widget.setLayout(buttons_layout)
+        group_layout.addWidget(buttons_widget)
         
+        self.image_preview_group.setLayout(group_layout)
         self.content_layout.addWidget(self.image_preview_group, 5, 0, 1, 2)
     
-    def _on_image_click(self, image_path, event):
-        """Handle image click event safely."""
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.on_image_click(image_path)
+    def visible_rows(self) -> range:
+        """Get the rows currently scrolled into view."""
+        viewport = self.table_view.viewport()
+        first = self.table_view.rowAt(0)
+        if first < 0:
+            return range(0)
+        last = self.table_view.rowAt(viewport.height() - 1)
+        if last < 0:
+            last = self.model.rowCount() - 1
+        return range(first, last + 1)
+    
+    def _cancel_offscreen(self):
+        """Drop queued thumbnails of rows that were scrolled past."""
+        if self.table_view is None:
+            return
+        self.thumbnail_loader.cancel(keep=[self.model.image_path(row) for row in self.visible_rows()])
+    
+    def remove_selected(self):
+        """Remove the selected rows' images, all in one update."""
+        rows = sorted({index.row() for index in self.table_view.selectionModel().selectedRows()})
+        if rows:
+            self.on_remove_images([self.model.image_path(row) for row in rows])
+    
+    def _on_double_click(self, index: QModelIndex):
+        """Open the full image when its thumbnail is double-clicked."""
+        if index.column() == ImageListModel.IMAGE_COLUMN:
+            self.on_image_click(self.model.image_path(index.row()))
     
     def clear(self):
         """Clear the preview."""
+        self.thumbnail_loader.cancel()
+        self.model.set_images([])
         if self.image_preview_group is not None:
             try:
                 self.content_layout.removeWidget(self.image_preview_group)
                 self.image_preview_group.deleteLater()
                 self.image_preview_group = None
-                self.image_preview_widgets.clear()
-                self._pixmap_cache.clear()
+                self.table_view = None
             except Exception:
                 pass
-
@@ -0,0 +1,174 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+from PyQt6.QtCore import Qt, QObject, QSize, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox
+from PIL import Image as PILImage
+
+from utils.image_utils import pil_to_qimage
+from utils.page_utils import display_name, source_file, split_page_path
+from utils.thumbnail_cache import make_thumbnail
+from constants import FULL_IMAGE_CACHE_SIZE, FULL_IMAGE_PROGRESSIVE_PIXELS
+
+
+class FullImageLoader(QObject):
+    """
+    Decodes images for the full image viewer on a background thread,
+    scaled down to the screen instead of kept at scan resolution.
+    The most recently viewed images stay in an LRU, so opening one again is
+    instant. JPEGs above FULL_IMAGE_PROGRESSIVE_PIXELS are first sent at a
+    quarter of the screen size from a reduced decode, then at full size.
+    """
+    
+    loaded = pyqtSignal(str, QImage, bool)  # image path, image, final (False for the low-resolution pass)
+    failed = pyqtSignal(str, str)  # image path, error message
+    
+    def __init__(self, cache_size: int = FULL_IMAGE_CACHE_SIZE, parent: Optional[QObject] = None):
+        """
+        Initialize full image loader.
+        
+        Args:
+            cache_size: Number of decoded images kept
+            parent: Owning Qt object
+        """
+        super().__init__(parent)
+        self.cache_size = cache_size
+        # One thread: screen-sized decodes are large and usually one at a time
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="full-image")
+        self._images: OrderedDict[tuple, QImage] = OrderedDict()
+        self._pending: dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(image_path: str, max_size: tuple) -> tuple:
+        """Key an image by path, modification time, file size and display size."""
+        image_path = os.path.abspath(image_path)
+        stat = os.stat(source_file(image_path))
+        return (image_path, stat.st_mtime_ns, stat.st_size, tuple(max_size))
+    
+    def cached(self, image_path: str, max_size: tuple) -> Optional[QImage]:
+        """Get a decoded image right away if it was viewed recently, or None."""
+        try:
+            key = self._key(image_path, max_size)
+        except OSError:
+            return None
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+    
+    def request(self, image_path: str, max_size: tuple):
+        """Queue an image; loaded or failed is emitted once it is ready."""
+        try:
+            key = self._key(image_path, max_size)
+        except OSError:
+            # Opening it in the worker reports the error like any other failure
+            key = (os.path.abspath(image_path), None, None, tuple(max_size))
+        with self._lock:
+            if key not in self._pending:
+                self._pending[key] = self._executor.submit(self._load, image_path, key)
+    
+    def _load(self, image_path: str, key: tuple):
+        """Decode one image in the worker."""
+        max_size = key[3]
+        try:
+            progressive = False
+            if split_page_path(image_path)[1] is None:
+                with PILImage.open(image_path) as img:
+                    progressive = img.format == "JPEG" and img.width * img.height > FULL_IMAGE_PROGRESSIVE_PIXELS
+            if progressive:
+                preview = make_thumbnail(image_path, (max_size[0] // 4, max_size[1] // 4), reducing_gap=2.0)
+                self.loaded.emit(image_path, pil_to_qimage(preview), False)
+            image = pil_to_qimage(make_thumbnail(image_path, max_size, reducing_gap=2.0))
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(key, None)
+            self.failed.emit(image_path, str(e))
+            return
+        
+        with self._lock:
+            self._pending.pop(key, None)
+            self._images[key] = image
+            while len(self._images) > self.cache_size:
+                self._images.popitem(last=False)
+        self.loaded.emit(image_path, image, True)
+    
+    def shutdown(self):
+        """Stop the worker thread, dropping queued images."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ImageViewerWindow(QMainWindow):
+    """Window showing one image scaled to fit the screen."""
+    
+    def __init__(
+        self,
+        image_path: str,
+        loader: FullImageLoader,
+        max_size: tuple,
+        placeholder: Optional[QImage] = None,
+        parent: Optional[QWidget] = None
+    ):
+        """
+        Initialize image viewer window.
+        
+        Args:
+            image_path: Image to show
+            loader: Loader that decodes the image
+            max_size: (width, height) the image is scaled down to fit
+            placeholder: Small image (e.g. the thumbnail) shown enlarged until the image is decoded
+            parent: Parent widget
+        """
+        super().__init__(parent)
+        self.image_path = image_path
+        self.max_size = max_size
+        self.final = False
+        self.setWindowTitle(f"Preview: {display_name(image_path)}")
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        
+        self.label = QLabel("Loading...")
+        self.label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout = QVBoxLayout()
+        layout.addWidget(self.label)
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        layout.addWidget(close_btn)
+        central = QWidget()
+        central.setLayout(layout)
+        self.setCentralWidget(central)
+        
+        image = loader.cached(image_path, max_size)
+        if image is not None:
+            self._on_loaded(image_path, image, True)
+            return
+        if placeholder is not None:
+            self._show(placeholder, scale=True)
+        loader.loaded.connect(self._on_loaded)
+        loader.failed.connect(self._on_failed)
+        loader.request(image_path, max_size)
+    
+    def _show(self, image: QImage, scale: bool = False):
+        pixmap = QPixmap.fromImage(image)
+        if scale:
+            # Enlarge a low-resolution pass to roughly the final size so the layout doesn't jump
+            pixmap = pixmap.scaled(
+                QSize(*self.max_size), Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+        self.label.setPixmap(pixmap)
+    
+    def _on_loaded(self, image_path: str, image: QImage, final: bool):
+        if image_path != self.image_path or self.final:
+            return
+        self.final = final
+        self._show(image, scale=not final)
+    
+    def _on_failed(self, image_path: str, error_message: str):
+        if image_path != self.image_path:
+            return
+        QMessageBox.critical(self, "Error", f"Could not display image: {error_message}")
+        self.close()
@@ -2,42 +2,59 @@ import os
 from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QGridLayout,
-    QLabel, QLineEdit, QPushButton, QTextEdit, QRadioButton, QButtonGroup,
-    QScrollArea, QFileDialog, QMessageBox, QProgressBar, QGroupBox
+    QLabel, QLineEdit, QPushButton, QTextEdit, QCheckBox, QButtonGroup,
+    QScrollArea, QFileDialog, QMessageBox, QProgressBar, QApplication
 )
-from PyQt6.QtCore import Qt
-from PIL import Image as PILImage
+from PyQt6.QtCore import Qt, pyqtSignal
 
 from core.config_manager import ConfigManager
+from core.image_import import import_images
+from core.image_store import get_image_store
+from core.job_scheduler import Job, JobScheduler
 from core.processing_thread import ProcessingThread
+from core.render_pool import format_render_times
+from core.results_bundle import ResultsBundle
 from ui.image_preview import ImagePreviewWidget
-from constants import IMAGE_FILTER
+from ui.image_viewer import FullImageLoader, ImageViewerWindow
+from utils import page_crop
+from utils.page_utils import split_page_path
+from constants import IMAGE_FILTER, RESULTS_FILTER, OUTPUT_FORMATS, FORMAT_NAMES, MAX_REJECTED_SHOWN
 
 
 class MainWindow(QMainWindow):
     """Main application window."""
     
+    job_status_update = pyqtSignal(str)
+    job_finished = pyqtSignal(object)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Luma")
         self.setGeometry(100, 100, 750, 900)
+        self.setAcceptDrops(True)
         
         # Initialize variables
         self.image_paths = []
         self.image_custom_prompts = {}
         self.processing_thread = None
+        self.job_scheduler = None
         
         # Initialize managers
         self.config_manager = ConfigManager()
         
         # Initialize image preview widget
         self.image_preview = None
+        self.full_image_loader = None  # Created when an image is first opened
         
         # Create UI
         self.create_ui()
         
         # Load configuration
         self.load_config()
+        
+        # Job queue updates arrive from worker threads
+        self.job_status_update.connect(self.status_label.setText)
+        self.job_finished.connect(self.job_complete)
     
     def create_ui(self):
         """Create the user interface."""
@@ -110,8 +127,13 @@ class MainWindow(QMainWindow):
         self.content_layout.addWidget(QLabel("Exercise Images:"), row, 0)
         image_layout = QHBoxLayout()
         self.select_images_btn = QPushButton("Select Images")
+        self.select_images_btn.setToolTip("Images and folders can also be dropped onto the window")
         self.select_images_btn.clicked.connect(self.select_images)
         image_layout.addWidget(self.select_images_btn)
+        add_folder_btn = QPushButton("Add Folder...")
+        add_folder_btn.setToolTip("Add every image in a folder and its subfolders")
+        add_folder_btn.clicked.connect(self.select_folder)
+        image_layout.addWidget(add_folder_btn)
         self.image_label = QLabel("No images selected")
         image_layout.addWidget(self.image_label)
         image_widget = QWidget()
@@ -121,13 +143,9 @@ class MainWindow(QMainWindow):
         
         # Initialize image preview widget
         self.image_preview = ImagePreviewWidget(
-            self, self.content_layout, self.show_full_image, self.remove_image
+            self, self.content_layout, self.show_full_image, self.remove_images
         )
         
-        # Image prompts (will be added dynamically)
-        self.image_prompts_group = None
-        self.image_prompt_widgets = {}
-        
         # Store row positions
         self.format_row = row
         self.custom_prompt_row = row + 1
@@ -137,13 +155,34 @@ class MainWindow(QMainWindow):
         self.content_layout.addWidget(self.format_label, self.format_row, 0)
         format_layout = QHBoxLayout()
         self.output_format_group = QButtonGroup()
-        pdf_radio = QRadioButton("PDF")
-        pdf_radio.setChecked(True)
-        word_radio = QRadioButton("Word")
-        self.output_format_group.addButton(pdf_radio, 0)
-        self.output_format_group.addButton(word_radio, 1)
-        format_layout.addWidget(pdf_radio)
-        format_layout.addWidget(word_radio)
+        self.output_format_group.setExclusive(False)  # Both formats can be rendered from one run
+        pdf_checkbox = QCheckBox("PDF")
+        pdf_checkbox.setChecked(True)
+        word_checkbox = QCheckBox("Word")
+        self.output_format_group.addButton(pdf_checkbox, 0)
+        self.output_format_group.addButton(word_checkbox, 1)
+        format_layout.addWidget(pdf_checkbox)
+        format_layout.addWidget(word_checkbox)
+        format_layout.addStretch()
+        self.near_duplicates_checkbox = QCheckBox("Reuse answers for near-identical images")
+        self.near_duplicates_checkbox.setToolTip(
+            "Re-saved, resized or recompressed copies of an image are answered once.\n"
+            "Identical files always are; near-identical ones are compared pixel by pixel first."
+        )
+        self.near_duplicates_checkbox.setChecked(False)
+        format_layout.addWidget(self.near_duplicates_checkbox)
+        self.crop_margins_checkbox = QCheckBox("Crop and straighten photos")
+        if page_crop.is_available():
+            self.crop_margins_checkbox.setToolTip(
+                "Trim the desk, fingers and blank margins around each page and straighten it\n"
+                "before sending, so requests are smaller."
+            )
+        else:
+            self.crop_margins_checkbox.setEnabled(False)
+            self.crop_margins_checkbox.setText("Crop and straighten photos (unavailable: numpy not installed)")
+            self.crop_margins_checkbox.setToolTip("Needs the numpy package (pip install numpy)")
+        self.crop_margins_checkbox.toggled.connect(self._set_crop_margins)
+        format_layout.addWidget(self.crop_margins_checkbox)
         self.format_widget = QWidget()
         self.format_widget.setLayout(format_layout)
         self.content_layout.addWidget(self.format_widget, self.format_row, 1)
@@ -164,11 +203,24 @@ class MainWindow(QMainWindow):
         
         row = self.custom_prompt_row + 1
         
-        # Process button
+        # Process and queue buttons
+        actions_layout = QHBoxLayout()
+        actions_layout.setContentsMargins(0, 0, 0, 0)
         self.process_btn = QPushButton("Process and Generate Document")
         self.process_btn.clicked.connect(self.process_exercises)
+        actions_layout.addWidget(self.process_btn, 1)
+        self.queue_btn = QPushButton("Add to Queue")
+        self.queue_btn.setToolTip("Queue this student's images and continue with the next student")
+        self.queue_btn.clicked.connect(self.queue_job)
+        actions_layout.addWidget(self.queue_btn)
+        self.rerender_btn = QPushButton("Re-render Results...")
+        self.rerender_btn.setToolTip("Render documents again from a saved results file, without calling Gemini")
+        self.rerender_btn.clicked.connect(self.rerender_results)
+        actions_layout.addWidget(self.rerender_btn)
+        self.actions_widget = QWidget()
+        self.actions_widget.setLayout(actions_layout)
         self.process_btn_row = row
-        self.content_layout.addWidget(self.process_btn, self.process_btn_row, 0, 1, 2)
+        self.content_layout.addWidget(self.actions_widget, self.process_btn_row, 0, 1, 2)
         row += 1
         
         # Progress bar
@@ -190,11 +242,55 @@ class MainWindow(QMainWindow):
             self, "Select Exercise Images", "", IMAGE_FILTER
         )
         if files:
-            new_files = [f for f in files if f not in self.image_paths]
+            self.add_images(files)
+    
+    def select_folder(self):
+        """Open a folder dialog and add the images found in it."""
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder of Exercise Images")
+        if folder:
+            self.add_images([folder])
+    
+    def add_images(self, paths: list[str]):
+        """
+        Add images from files and folders.
+        Headers are checked first, so unsupported, corrupt or truncated files
+        are reported now instead of failing later in the preview or a request.
+        """
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            result = import_images(paths)
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        selected = set(self.image_paths)
+        new_files = [f for f in result.images if f not in selected]
+        if new_files:
             self.image_paths.extend(new_files)
+            # Pages of multi-page files are only decoded when shown or sent, never all up front
+            get_image_store().ingest_in_background(f for f in new_files if split_page_path(f)[1] is None)
             self._update_image_ui(len(self.image_paths))
-            self.image_preview.create_preview(self.image_paths)
-            self.create_image_prompt_fields()
+            self._update_image_list()
+        
+        if result.rejected:
+            lines = [f"{os.path.basename(path)}: {reason}" for path, reason in result.rejected[:MAX_REJECTED_SHOWN]]
+            if len(result.rejected) > MAX_REJECTED_SHOWN:
+                lines.append(f"...and {len(result.rejected) - MAX_REJECTED_SHOWN} more")
+            QMessageBox.warning(
+                self, "Some Files Skipped",
+                f"Added {len(new_files)} image(s). These files were skipped:\n\n" + "\n".join(lines)
+            )
+    
+    def dragEnterEvent(self, event):
+        """Accept dragged files and folders."""
+        if any(url.isLocalFile() for url in event.mimeData().urls()):
+            event.acceptProposedAction()
+    
+    def dropEvent(self, event):
+        """Add dropped files and folders."""
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        if paths:
+            event.acceptProposedAction()
+            self.add_images(paths)
     
     def _update_image_ui(self, count: int):
         """Update UI elements based on image count."""
@@ -203,25 +299,26 @@ class MainWindow(QMainWindow):
     
     def remove_image(self, image_path: str):
         """Remove an image from the selection."""
-        if image_path in self.image_paths:
-            self.image_paths.remove(image_path)
-            if image_path in self.image_custom_prompts:
-                del self.image_custom_prompts[image_path]
-            
-            self._update_image_ui(len(self.image_paths))
-            self.image_preview.create_preview(self.image_paths)
-            self.create_image_prompt_fields()
-            
-            # Reset widget positions if no images
-            if not self.image_paths:
-                self._reset_widget_positions()
+        self.remove_images([image_path])
+    
+    def remove_images(self, image_paths: list[str]):
+        """Remove several images from the selection, updating the list once."""
+        removed = set(image_paths).intersection(self.image_paths)
+        if not removed:
+            return
+        self.image_paths = [image_path for image_path in self.image_paths if image_path not in removed]
+        for image_path in removed:
+            self.image_custom_prompts.pop(image_path, None)
+        
+        self._update_image_ui(len(self.image_paths))
+        self._update_image_list()
     
     def _reset_widget_positions(self):
         """Reset widget positions when no images are present."""
         widgets_to_move = [
             (self.format_label, self.format_widget),
             (self.custom_prompt_label, self.prompt_widget),
-            (self.process_btn,),
+            (self.actions_widget,),
             (self.progress,),
             (self.status_label,)
         ]
@@ -240,52 +337,22 @@ class MainWindow(QMainWindow):
         self.content_layout.addWidget(self.format_widget, self.format_row, 1)
         self.content_layout.addWidget(self.custom_prompt_label, self.custom_prompt_row, 0, Qt.AlignmentFlag.AlignTop)
         self.content_layout.addWidget(self.prompt_widget, self.custom_prompt_row, 1)
-        self.content_layout.addWidget(self.process_btn, self.process_btn_row, 0, 1, 2)
+        self.content_layout.addWidget(self.actions_widget, self.process_btn_row, 0, 1, 2)
         self.content_layout.addWidget(self.progress, self.progress_row, 0, 1, 2)
         self.content_layout.addWidget(self.status_label, self.status_row, 0, 1, 2)
     
-    def create_image_prompt_fields(self):
-        """Create custom prompt fields for each selected image."""
-        # Remove old group if it exists
-        if self.image_prompts_group is not None:
-            self.content_layout.removeWidget(self.image_prompts_group)
-            self.image_prompts_group.deleteLater()
-            self.image_prompts_group = None
-        
-        if not self.image_paths:
-            return
-        
-        # Create new group box
-        self.image_prompts_group = QGroupBox("Custom Prompts per Image (Optional)")
-        prompts_layout = QGridLayout()
-        prompts_layout.setColumnStretch(1, 1)
-        
-        self.image_prompt_widgets = {}
-        
-        for idx, image_path in enumerate(self.image_paths):
-            filename = os.path.basename(image_path)
-            if len(filename) > 30:
-                filename = filename[:27] + "..."
-            
-            label = QLabel(f"Image {idx+1} ({filename}):")
-            label.setStyleSheet("font-size: 9pt;")
-            prompts_layout.addWidget(label, idx, 0)
-            
-            text_edit = QTextEdit()
-            text_edit.setMaximumHeight(50)
-            
-            saved_prompt = self.image_custom_prompts.get(image_path, "")
-            if saved_prompt:
-                text_edit.setPlainText(saved_prompt)
-            
-            prompts_layout.addWidget(text_edit, idx, 1)
-            self.image_prompt_widgets[image_path] = (label, text_edit)
-        
-        self.image_prompts_group.setLayout(prompts_layout)
-        
-        # Calculate row positions
-        prompts_row = 6 if self.image_preview.image_preview_group else 5
-        new_format_row = prompts_row + 1
+    def _update_image_list(self):
+        """Show the selected images, making room for the list when it appears or goes."""
+        had_list = self.image_preview.image_preview_group is not None
+        self.image_preview.update_preview(self.image_paths, self.image_custom_prompts)
+        if self.image_paths and not had_list:
+            self._place_widgets_below_image_list()
+        elif not self.image_paths and had_list:
+            self._reset_widget_positions()
+    
+    def _place_widgets_below_image_list(self):
+        """Move the widgets under the image selection below the image list."""
+        new_format_row = 6
         new_prompt_row = new_format_row + 1
         new_process_row = new_prompt_row + 1
         new_progress_row = new_process_row + 1
@@ -295,25 +362,17 @@ class MainWindow(QMainWindow):
         widgets_to_remove = [
             self.format_label, self.format_widget,
             self.custom_prompt_label, self.prompt_widget,
-            self.process_btn, self.progress, self.status_label
+            self.actions_widget, self.progress, self.status_label
         ]
         for widget in widgets_to_remove:
             self.content_layout.removeWidget(widget)
         
-        # Re-add preview if it exists
-        if self.image_preview.image_preview_group is not None:
-            self.content_layout.removeWidget(self.image_preview.image_preview_group)
-            self.content_layout.addWidget(self.image_preview.image_preview_group, 5, 0, 1, 2)
-        
-        # Add prompts group
-        self.content_layout.addWidget(self.image_prompts_group, prompts_row, 0, 1, 2)
-        
         # Re-add widgets at new positions
         self.content_layout.addWidget(self.format_label, new_format_row, 0)
         self.content_layout.addWidget(self.format_widget, new_format_row, 1)
         self.content_layout.addWidget(self.custom_prompt_label, new_prompt_row, 0, Qt.AlignmentFlag.AlignTop)
         self.content_layout.addWidget(self.prompt_widget, new_prompt_row, 1)
-        self.content_layout.addWidget(self.process_btn, new_process_row, 0, 1, 2)
+        self.content_layout.addWidget(self.actions_widget, new_process_row, 0, 1, 2)
         self.content_layout.addWidget(self.progress, new_progress_row, 0, 1, 2)
         self.content_layout.addWidget(self.status_label, new_status_row, 0, 1, 2)
         
@@ -325,73 +384,48 @@ class MainWindow(QMainWindow):
         self.status_row = new_status_row
     
     def show_full_image(self, image_path: str):
-        """Show full-size image in a new window."""
-        try:
-            from PyQt6.QtWidgets import QMainWindow as QImgWindow
-            from PyQt6.QtGui import QPixmap, QImage
-            
-            img = PILImage.open(image_path)
-            
-            # Create new window
-            img_window = QImgWindow(self)
-            img_window.setWindowTitle(f"Preview: {os.path.basename(image_path)}")
-            
-            # Resize if needed
-            screen = self.screen().geometry()
-            max_width = screen.width() - 100
-            max_height = screen.height() - 100
-            
-            if img.width > max_width or img.height > max_height:
-                img.thumbnail((max_width, max_height), PILImage.Resampling.LANCZOS)
-            
-            # Convert to QPixmap
-            img_rgb = img.convert('RGB')
-            width, height = img_rgb.size
-            img_bytes = img_rgb.tobytes("raw", "RGB")
-            q_image = QImage(img_bytes, width, height, QImage.Format.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_image)
-            
-            # Create label with image
-            from PyQt6.QtWidgets import QLabel as QImgLabel
-            label = QImgLabel()
-            label.setPixmap(pixmap)
-            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            
-            # Create layout
-            layout = QVBoxLayout()
-            layout.addWidget(label)
-            
-            # Add close button
-            close_btn = QPushButton("Close")
-            close_btn.clicked.connect(img_window.close)
-            layout.addWidget(close_btn)
-            
-            central = QWidget()
-            central.setLayout(layout)
-            img_window.setCentralWidget(central)
-            
-            img_window.show()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Could not display image: {str(e)}")
+        """Show an image at screen size in a new window, decoding it in the background."""
+        if self.full_image_loader is None:
+            self.full_image_loader = FullImageLoader(parent=self)
+        
+        screen = self.screen().geometry()
+        max_size = (screen.width() - 100, screen.height() - 100)
+        thumbnail = self.image_preview.thumbnail_loader.cached(image_path)
+        img_window = ImageViewerWindow(image_path, self.full_image_loader, max_size, thumbnail, self)
+        img_window.show()
+    
+    def _set_crop_margins(self, checked: bool):
+        """Crop and straighten images before they are sent, or send them as they are."""
+        get_image_store().crop_margins = checked
+    
+    def collect_image_prompts(self) -> dict[str, str]:
+        """Collect non-empty per-image custom prompts from the UI."""
+        prompts = self.image_preview.prompts()
+        return {image_path: prompts[image_path] for image_path in self.image_paths if image_path in prompts}
+    
+    def selected_output_formats(self) -> list[str]:
+        """Get the checked output formats, e.g. ['pdf', 'word']."""
+        return [
+            button.text().lower() for button in self.output_format_group.buttons()
+            if button.isChecked()
+        ]
     
     def save_config(self):
         """Save settings to config file."""
         # Collect custom prompts from UI
-        for image_path in self.image_paths:
-            if image_path in self.image_prompt_widgets:
-                _, text_edit = self.image_prompt_widgets[image_path]
-                custom_prompt = text_edit.toPlainText().strip()
-                if custom_prompt:
-                    self.image_custom_prompts[image_path] = custom_prompt
+        self.image_custom_prompts.update(self.collect_image_prompts())
         
         config = {
             "api_key": self.api_key_edit.text(),
-            "output_format": self.output_format_group.checkedButton().text().lower(),
+            "output_format": (self.selected_output_formats() or ["pdf"])[0],
+            "output_formats": self.selected_output_formats(),
             "student_name": self.student_name_edit.text(),
             "group": self.group_edit.text(),
             "output_filename": self.output_filename_edit.text(),
             "custom_prompt": self.custom_prompt_text.toPlainText().strip(),
-            "image_custom_prompts": self.image_custom_prompts
+            "image_custom_prompts": self.image_custom_prompts,
+            "match_near_duplicates": self.near_duplicates_checkbox.isChecked(),
+            "crop_margins": self.crop_margins_checkbox.isChecked()
         }
         
         if self.config_manager.save(config):
@@ -404,11 +438,9 @@ class MainWindow(QMainWindow):
         config = self.config_manager.load()
         
         self.api_key_edit.setText(config.get("api_key", ""))
-        output_format = config.get("output_format", "pdf")
-        if output_format == "word":
-            self.output_format_group.button(1).setChecked(True)
-        else:
-            self.output_format_group.button(0).setChecked(True)
+        output_formats = config.get("output_formats") or [config.get("output_format", "pdf")]
+        self.output_format_group.button(0).setChecked("pdf" in output_formats)
+        self.output_format_group.button(1).setChecked("word" in output_formats)
         
         self.student_name_edit.setText(config.get("student_name", ""))
         self.group_edit.setText(config.get("group", ""))
@@ -419,21 +451,32 @@ class MainWindow(QMainWindow):
             self.custom_prompt_text.setPlainText(custom_prompt)
         
         self.image_custom_prompts = config.get("image_custom_prompts", {})
+        self.near_duplicates_checkbox.setChecked(config.get("match_near_duplicates", False))
+        self.crop_margins_checkbox.setChecked(config.get("crop_margins", False) and page_crop.is_available())
     
-    def process_exercises(self):
-        """Process exercises in a separate thread."""
-        # Validate inputs
+    def _validate_inputs(self) -> bool:
+        """Check that everything needed for processing is filled in."""
         if not self.student_name_edit.text().strip():
             QMessageBox.critical(self, "Error", "Please enter student name")
-            return
+            return False
         if not self.group_edit.text().strip():
             QMessageBox.critical(self, "Error", "Please enter group")
-            return
+            return False
         if not self.api_key_edit.text().strip():
             QMessageBox.critical(self, "Error", "Please enter API key")
-            return
+            return False
         if not self.image_paths:
             QMessageBox.critical(self, "Error", "Please select at least one image")
+            return False
+        if not self.selected_output_formats():
+            QMessageBox.critical(self, "Error", "Please select at least one output format")
+            return False
+        return True
+    
+    def process_exercises(self):
+        """Process exercises in a separate thread."""
+        # Validate inputs
+        if not self._validate_inputs():
             return
         
         # Auto-save config
@@ -460,16 +503,18 @@ class MainWindow(QMainWindow):
             self.progress.setVisible(False)
             QMessageBox.critical(self, "Error", "Failed to start processing thread")
     
-    def processing_complete(self, output_path: str):
-        """Called when processing is complete."""
+    def processing_complete(self, output_paths: str):
+        """Called when processing is complete (output_paths is one path per line)."""
         self.progress.setVisible(False)
         self.process_btn.setEnabled(True)
         self.status_label.setText("Complete!")
-        format_name = "Word document" if self.output_format_group.checkedButton().text().lower() == "word" else "PDF"
+        format_name = " and ".join(
+            FORMAT_NAMES[fmt] for fmt in OUTPUT_FORMATS if fmt in self.selected_output_formats()
+        )
         QMessageBox.information(
             self,
             "Success",
-            f"{format_name} generated successfully!\n\nSaved to:\n{output_path}"
+            f"{format_name} generated successfully!\n\nSaved to:\n{output_paths}"
         )
     
     def processing_error(self, error_message: str):
@@ -478,4 +523,108 @@ class MainWindow(QMainWindow):
         self.process_btn.setEnabled(True)
         self.status_label.setText("Error occurred")
         QMessageBox.critical(self, "Error", f"An error occurred:\n\n{error_message}")
-
+    
+    def rerender_results(self):
+        """Render documents from a saved results bundle, using the current form fields where filled in."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Select Results File", "", RESULTS_FILTER
+        )
+        if not path:
+            return
+        if not self.selected_output_formats():
+            QMessageBox.critical(self, "Error", "Please select at least one output format")
+            return
+        
+        try:
+            bundle = ResultsBundle.load(path)
+            self.status_label.setText(f"Rendering {bundle.summary()}...")
+            results = bundle.render(
+                self.selected_output_formats(),
+                self.student_name_edit.text().strip() or None,
+                self.group_edit.text().strip() or None,
+                self.output_filename_edit.text().strip() or None
+            )
+        except Exception as e:
+            self.status_label.setText("Error occurred")
+            QMessageBox.critical(self, "Error", f"Could not render results:\n\n{str(e)}")
+            return
+        
+        self.status_label.setText(f"Rendered {format_render_times(results)}")
+        output_paths = "\n".join(output_path for output_path, _ in results.values())
+        QMessageBox.information(self, "Success", f"Documents rendered from saved results!\n\nSaved to:\n{output_paths}")
+    
+    def _api_key_changed_under_jobs(self) -> bool:
+        """Check whether queued jobs still run on an API key that has since been changed."""
+        return (
+            self.job_scheduler is not None
+            and self.job_scheduler.pipeline.api_key != self.api_key_edit.text().strip()
+            and bool(self.job_scheduler.active_jobs())
+        )
+    
+    def _get_job_scheduler(self) -> JobScheduler:
+        """Get the job scheduler, recreating it if the API key changed and no job is running."""
+        api_key = self.api_key_edit.text().strip()
+        if self.job_scheduler is not None and self.job_scheduler.pipeline.api_key != api_key:
+            if not self.job_scheduler.active_jobs():
+                self.job_scheduler.shutdown(wait=False)
+                self.job_scheduler = None
+        
+        if self.job_scheduler is None:
+            self.job_scheduler = JobScheduler(
+                api_key,
+                status_callback=self.job_status_update.emit,
+                job_callback=self.job_finished.emit
+            )
+        return self.job_scheduler
+    
+    def queue_job(self):
+        """Queue the current student's images and clear the form for the next one."""
+        if not self._validate_inputs():
+            return
+        
+        if self._api_key_changed_under_jobs():
+            # The running jobs hold the old key, so a new job would silently use it too
+            QMessageBox.warning(
+                self, "API Key Changed",
+                "The API key was changed while jobs are still running with the previous key.\n\n"
+                "Wait for the queued jobs to finish before queuing with the new key, "
+                "or change the key back to keep queuing."
+            )
+            return
+        
+        job = Job(
+            self.student_name_edit.text().strip(),
+            self.group_edit.text().strip(),
+            self.image_paths,
+            self.collect_image_prompts(),
+            self.selected_output_formats(),
+            self.output_filename_edit.text().strip(),
+            match_near_duplicates=self.near_duplicates_checkbox.isChecked()
+        )
+        self._get_job_scheduler().submit(job)
+        
+        # Ready for the next student of the same group
+        self.student_name_edit.clear()
+        self.output_filename_edit.clear()
+        self.image_paths = []
+        self._update_image_ui(0)
+        self._update_image_list()
+        
+        active = len(self.job_scheduler.active_jobs())
+        self.status_label.setText(f"Queued job {job.name} ({active} job(s) in queue)")
+    
+    def job_complete(self, job: Job):
+        """Called when a queued job has finished or failed."""
+        if job.error:
+            outcome = f"Job {job.name} failed: {job.error}"
+        else:
+            outcome = f"Job {job.name} saved to {', '.join(job.output_paths)}"
+        self.status_label.setText(f"{outcome}\n{self.job_scheduler.summary()}")
+    
+    def closeEvent(self, event):
+        """Drop queued background decoding so closing doesn't wait for it."""
+        self.image_preview.thumbnail_loader.shutdown()
+        if self.full_image_loader is not None:
+            self.full_image_loader.shutdown()
+        get_image_store().shutdown()
+        super().closeEvent(event)
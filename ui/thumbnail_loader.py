@@ -0,0 +1,88 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Optional
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImage
+
+from core.image_store import get_image_store
+from utils.image_utils import pil_to_qimage
+from utils.thumbnail_cache import ThumbnailCache, get_thumbnail_cache
+from constants import THUMBNAIL_SIZE, THUMBNAIL_WORKERS
+
+
+class ThumbnailLoader(QObject):
+    """
+    Decodes thumbnails on a background thread pool.
+    Results arrive on the GUI thread through the loaded/failed signals;
+    QImages are built in the workers because QPixmaps may only be
+    created on the GUI thread.
+    """
+    
+    loaded = pyqtSignal(str, QImage)  # image path, thumbnail
+    failed = pyqtSignal(str, str)  # image path, error message
+    
+    def __init__(
+        self,
+        thumbnail_size: tuple = THUMBNAIL_SIZE,
+        max_workers: int = THUMBNAIL_WORKERS,
+        cache: Optional[ThumbnailCache] = None,
+        parent: Optional[QObject] = None
+    ):
+        """
+        Initialize thumbnail loader.
+        
+        Args:
+            thumbnail_size: (width, height) thumbnails must fit in
+            max_workers: Number of decoding threads
+            cache: Thumbnail cache to use (None = the shared cache)
+            parent: Owning Qt object
+        """
+        super().__init__(parent)
+        self.thumbnail_size = thumbnail_size
+        self.cache = cache if cache is not None else get_thumbnail_cache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="thumbnail")
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def cached(self, image_path: str) -> Optional[QImage]:
+        """Get a thumbnail right away if it is already in memory, or None."""
+        thumbnail = self.cache.peek(image_path, self.thumbnail_size)
+        return None if thumbnail is None else pil_to_qimage(thumbnail)
+    
+    def request(self, image_path: str):
+        """Queue a thumbnail; loaded or failed is emitted once it is ready."""
+        with self._lock:
+            if image_path not in self._pending:
+                self._pending[image_path] = self._executor.submit(self._load, image_path)
+    
+    def cancel(self, keep: Iterable[str] = ()):
+        """Drop queued thumbnails that have not started, except those in keep."""
+        keep = set(keep)
+        with self._lock:
+            for image_path, future in list(self._pending.items()):
+                if image_path not in keep and future.cancel():
+                    del self._pending[image_path]
+    
+    def pending(self) -> int:
+        """Get the number of thumbnails queued or decoding."""
+        with self._lock:
+            return len(self._pending)
+    
+    def _load(self, image_path: str):
+        """Decode one thumbnail in a worker."""
+        try:
+            # Ingesting reads the file once for everything, this thumbnail included
+            get_image_store().ingest(image_path)
+            image = pil_to_qimage(self.cache.get(image_path, self.thumbnail_size))
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(image_path, None)
+            self.failed.emit(image_path, str(e))
+            return
+        with self._lock:
+            self._pending.pop(image_path, None)
+        self.loaded.emit(image_path, image)
+    
+    def shutdown(self):
+        """Stop the worker threads, dropping queued thumbnails."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,12 +1,15 @@
 import os
 from PIL import Image as PILImage
 from PyQt6.QtGui import QPixmap, QImage
+from utils.thumbnail_cache import get_thumbnail_cache
 from constants import THUMBNAIL_SIZE
 
 
 def load_image_as_pixmap(image_path: str, thumbnail_size: tuple = None) -> QPixmap:
     """
-    Load an image file and convert it to QPixmap.
+    Load an image's thumbnail and convert it to QPixmap.
+    Thumbnails come from the shared thumbnail cache, so an unchanged image is
+    only decoded once, even across restarts.
     
     Args:
         image_path: Path to the image file
@@ -18,18 +21,39 @@ def load_image_as_pixmap(image_path: str, thumbnail_size: tuple = None) -> QPixm
     if thumbnail_size is None:
         thumbnail_size = THUMBNAIL_SIZE
     
-    # Open and resize image to thumbnail
-    img = PILImage.open(image_path)
-    img.thumbnail(thumbnail_size, PILImage.Resampling.LANCZOS)
+    img_rgb = get_thumbnail_cache().get(image_path, thumbnail_size)
+    return QPixmap.fromImage(pil_to_qimage(img_rgb))
+
+
+def pil_to_qimage(img: PILImage.Image) -> QImage:
+    """
+    Convert a PIL image to a QImage that owns its pixels.
+    Unlike a QPixmap, the result may be created and passed between threads.
     
-    # Convert PIL Image to QPixmap
-    img_rgb = img.convert('RGB')
-    width, height = img_rgb.size
-    img_bytes = img_rgb.tobytes("raw", "RGB")
-    q_image = QImage(img_bytes, width, height, QImage.Format.Format_RGB888)
-    pixmap = QPixmap.fromImage(q_image)
+    Pillow keeps RGB pixels 4 bytes wide, so they are pasted straight into
+    the QImage's RGBX buffer: one copy, no intermediate bytes object, and
+    rows follow Qt's bytesPerLine whatever the image width.
+    """
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        mode, qt_format = 'RGBA', QImage.Format.Format_RGBA8888
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+    else:
+        mode, qt_format = 'RGBX', QImage.Format.Format_RGBX8888
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
     
-    return pixmap
+    width, height = img.size
+    qimage = QImage(width, height, qt_format)
+    if width and height:
+        if qimage.isNull():
+            raise MemoryError(f"Could not allocate a {width}x{height} image")
+        buffer = qimage.bits()
+        buffer.setsize(qimage.sizeInBytes())
+        # A Pillow image over the QImage's memory; pasting into its core image writes there directly
+        target = PILImage.frombuffer(mode, img.size, buffer, "raw", mode, qimage.bytesPerLine(), 1)
+        target.im.paste(img.im, (0, 0, width, height))
+    return qimage
 
 
 def get_image_filename(image_path: str, max_length: int = 20) -> str:
@@ -0,0 +1,110 @@
+import os
+import sys
+import threading
+from typing import Optional
+
+from utils.page_utils import image_size, source_file
+from constants import MEMORY_SAMPLE_INTERVAL
+
+
+def current_rss() -> int:
+    """
+    Get the resident set size of this process in bytes.
+    Falls back to the peak RSS where the current value is not available,
+    and to 0 where neither is.
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def format_bytes(num_bytes: float) -> str:
+    """Format a byte count for display (e.g. '12.3 MB')."""
+    for unit in ("B", "KB", "MB"):
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def estimate_decoded_size(image_path: str) -> int:
+    """
+    Estimate the memory a fully decoded image needs, from its header only.
+    
+    Args:
+        image_path: Path to the image file, or a page path (see utils.page_utils)
+    
+    Returns:
+        Estimated decoded size in bytes (file size if the header can't be read)
+    """
+    try:
+        width, height, bands = image_size(image_path)
+        return width * height * bands
+    except Exception:
+        try:
+            return os.path.getsize(source_file(image_path))
+        except OSError:
+            return 0
+
+
+class PeakMemoryTracker:
+    """
+    Samples process RSS in the background and remembers the peak.
+    Use as a context manager around a job.
+    """
+    
+    def __init__(self, interval: float = MEMORY_SAMPLE_INTERVAL):
+        """
+        Initialize tracker.
+        
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _sample(self):
+        """Record the current RSS."""
+        self.peak_rss = max(self.peak_rss, current_rss())
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+    
+    def start(self) -> "PeakMemoryTracker":
+        """Start sampling."""
+        self.start_rss = current_rss()
+        self.peak_rss = self.start_rss
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> int:
+        """Stop sampling and return the peak RSS in bytes."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._sample()
+        return self.peak_rss
+    
+    def __enter__(self) -> "PeakMemoryTracker":
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
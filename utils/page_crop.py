@@ -0,0 +1,199 @@
+import io
+from typing import Optional
+from PIL import ImageOps, Image as PILImage
+
+try:
+    import numpy as np
+except ImportError:  # Optional: without it images are uploaded uncropped
+    np = None
+
+from utils.page_utils import encode_page
+from constants import (
+    CROP_ANALYSIS_SIZE, CROP_PADDING, CROP_MIN_SAVING, DESKEW_MAX_ANGLE, DESKEW_MIN_ANGLE
+)
+
+INK_CONTRAST = 48  # Ink is at least this much darker than the paper's typical grey level
+MIN_INK_PIXELS = 2  # Fewer ink pixels in a row or column of the reduced image count as noise
+
+
+def is_available() -> bool:
+    """Whether cropping can run (it needs NumPy)."""
+    return np is not None
+
+
+def _otsu_threshold(grey: "np.ndarray") -> int:
+    """Grey level that best separates dark from light pixels (Otsu's method)."""
+    histogram = np.bincount(grey.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_dark = np.cumsum(histogram)
+    weight_light = weight_dark[-1] - weight_dark
+    sum_dark = np.cumsum(histogram * levels)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_dark = sum_dark / weight_dark
+        mean_light = (sum_dark[-1] - sum_dark) / weight_light
+        between = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(np.nan_to_num(between)))  # 0 for a single shade
+
+
+def _span(fractions: "np.ndarray", minimum: float) -> Optional[tuple[int, int]]:
+    """First and one-past-last index where fractions reach minimum."""
+    indices = np.flatnonzero(fractions >= minimum)
+    if indices.size == 0:
+        return None
+    return int(indices[0]), int(indices[-1]) + 1
+
+
+def _between_light(light: "np.ndarray", axis: int) -> "np.ndarray":
+    """Pixels from the first light pixel of their row (axis=1) or column (axis=0) up to the last."""
+    count = np.cumsum(light, axis=axis, dtype=np.int32)
+    total = count[:, -1:] if axis == 1 else count[-1:, :]
+    return (count > 0) & (count < total)
+
+
+def _ink_mask(grey: "np.ndarray") -> Optional["np.ndarray"]:
+    """
+    Find the ink on the paper.
+    The paper is the light region, spanning from the first to the last light
+    pixel of each row and column, which leaves out the desk, fingers and
+    shadows around it; ink is what is clearly darker than the paper within it.
+    
+    Returns:
+        Boolean mask of ink pixels, or None if no paper was found
+    """
+    light = grey > _otsu_threshold(grey)
+    # Rows and columns crossing the paper are mostly light; others only catch glare
+    rows = _span(light.mean(axis=1), 0.5 * light.mean(axis=1).max())
+    columns = _span(light.mean(axis=0), 0.5 * light.mean(axis=0).max())
+    if rows is None or columns is None:
+        return None
+    paper = np.zeros_like(light)
+    paper[rows[0]:rows[1], columns[0]:columns[1]] = True
+    paper &= _between_light(light, axis=1) & _between_light(light, axis=0)
+    if not paper.any():
+        return None
+    shades = grey[paper]
+    threshold = min(_otsu_threshold(shades), int(np.median(shades)) - INK_CONTRAST)
+    return paper & (grey < threshold)
+
+
+def _turn(xs: "np.ndarray", ys: "np.ndarray", angle: float) -> tuple["np.ndarray", "np.ndarray"]:
+    """Where points land once an image is turned angle degrees counter-clockwise about the origin."""
+    radians = np.deg2rad(angle)
+    cos, sin = np.cos(radians), np.sin(radians)
+    return cos * xs + sin * ys, cos * ys - sin * xs
+
+
+def _skew_angle(ink: "np.ndarray") -> float:
+    """
+    Estimate the rotation that straightens the text, in degrees counter-clockwise.
+    Straight text makes the row profile sharpest: lines of text fall into few
+    rows with empty rows between them. Only the ink pixels' coordinates are
+    turned, not the image.
+    """
+    ys, xs = np.nonzero(ink)
+    ys, xs = ys.astype(np.float64), xs.astype(np.float64)
+    
+    def sharpness(angle: float) -> float:
+        rows = np.round(_turn(xs, ys, angle)[1]).astype(np.int64)
+        profile = np.bincount(rows - rows.min())
+        return float(np.sum(np.diff(profile) ** 2))
+    
+    coarse = np.arange(-DESKEW_MAX_ANGLE, DESKEW_MAX_ANGLE + 0.25, 0.5)
+    best = max(coarse, key=sharpness)
+    fine = np.arange(best - 0.4, best + 0.45, 0.1)
+    return float(max(fine, key=sharpness))
+
+
+def _extent(positions: "np.ndarray", step: float) -> tuple[float, float]:
+    """
+    Range covered by ink, counting only strips (step wide) with a few ink
+    pixels, so specks of noise don't stretch it.
+    """
+    strips = np.floor(positions / step).astype(np.int64)
+    first = strips.min()
+    inked = np.flatnonzero(np.bincount(strips - first) >= MIN_INK_PIXELS)
+    if inked.size == 0:
+        inked = np.arange(strips.max() - first + 1)
+    return (first + inked[0]) * step, (first + inked[-1] + 1) * step
+
+
+def crop_to_content(img: PILImage.Image) -> PILImage.Image:
+    """
+    Straighten a photo or scan of a page and trim it to the printed region,
+    dropping the desk, fingers and blank margins around it.
+    The analysis runs on a reduced copy, so its cost barely depends on the
+    photo's size, and only the kept region is resampled when straightening.
+    Images where no ink is found are returned unchanged.
+    
+    Args:
+        img: Upright image (EXIF orientation already applied)
+    
+    Returns:
+        Cropped (and straightened) image, or img itself
+    
+    Raises:
+        ImportError: NumPy is not installed
+    """
+    if np is None:
+        raise ImportError("Cropping needs the numpy package (pip install numpy)")
+    
+    small = img.convert("L")
+    small.thumbnail((CROP_ANALYSIS_SIZE, CROP_ANALYSIS_SIZE))
+    ink = _ink_mask(np.asarray(small))
+    if ink is None or not ink.any():
+        return img
+    
+    angle = _skew_angle(ink)
+    if abs(angle) < DESKEW_MIN_ANGLE:
+        angle = 0.0
+    
+    # Ink pixel centres at full size, about the image centre, turned straight
+    scale = img.width / small.width
+    ys, xs = np.nonzero(ink)
+    xs = (xs + 0.5) * scale - img.width / 2
+    ys = (ys + 0.5) * scale - img.height / 2
+    turned_x, turned_y = _turn(xs, ys, angle)
+    pad = CROP_PADDING * max(img.size)
+    left, right = _extent(turned_x, scale)
+    top, bottom = _extent(turned_y, scale)
+    left, top, right, bottom = left - pad, top - pad, right + pad, bottom + pad
+    
+    if angle == 0.0:
+        return img.crop((
+            max(0, int(left + img.width / 2)), max(0, int(top + img.height / 2)),
+            min(img.width, int(right + img.width / 2)), min(img.height, int(bottom + img.height / 2))
+        ))
+    
+    # One resampling pass over the kept region: each output pixel is turned back into the photo
+    radians = np.deg2rad(angle)
+    cos, sin = float(np.cos(radians)), float(np.sin(radians))
+    size = (int(right - left), int(bottom - top))
+    matrix = (
+        cos, -sin, cos * left - sin * top + img.width / 2,
+        sin, cos, sin * left + cos * top + img.height / 2
+    )
+    fill = 255 if len(img.getbands()) == 1 else (255,) * len(img.getbands())
+    return img.transform(size, PILImage.Transform.AFFINE, matrix, PILImage.Resampling.BILINEAR, fillcolor=fill)
+
+
+def crop_payload(payload: dict) -> dict:
+    """
+    Crop and straighten an upload payload (see crop_to_content) and encode
+    the result. The original payload is kept when the crop would save less
+    than CROP_MIN_SAVING of its pixels, which isn't worth a re-encode, or
+    when NumPy is missing.
+    
+    Args:
+        payload: Payload dict with mime_type and data
+    
+    Returns:
+        Payload dict with mime_type and data
+    """
+    if np is None:
+        return payload
+    with PILImage.open(io.BytesIO(payload["data"])) as img:
+        upright = ImageOps.exif_transpose(img)
+        cropped = crop_to_content(upright)
+        if cropped.width * cropped.height > (1 - CROP_MIN_SAVING) * upright.width * upright.height:
+            return payload
+        return encode_page(cropped)
@@ -0,0 +1,189 @@
+import io
+import os
+import math
+import re
+import threading
+from typing import Optional
+from PIL import Image as PILImage
+
+try:
+    import pypdfium2
+except ImportError:  # Optional: only needed to rasterize PDF pages
+    pypdfium2 = None
+
+from constants import MULTI_PAGE_EXTENSIONS, PDF_RENDER_DPI, PAGE_JPEG_QUALITY
+
+# PDFium is not thread-safe: every call into it, from any thread, holds this lock
+_pdfium_lock = threading.Lock()
+
+PAGE_MARKER = "#page="
+_PAGE_PATH = re.compile(r"^(.*)#page=(\d+)$", re.DOTALL)
+POINTS_PER_INCH = 72
+
+
+def page_path(file_path: str, page: int) -> str:
+    """Name one page (1-based) of a multi-page file, e.g. 'scan.pdf#page=2'."""
+    return f"{file_path}{PAGE_MARKER}{page}"
+
+
+def split_page_path(image_path: str) -> tuple[str, Optional[int]]:
+    """
+    Split a path into the file and the page it names.
+    
+    Returns:
+        (file path, 1-based page), with page None for plain image files
+    """
+    match = _PAGE_PATH.match(image_path)
+    # Only multi-page formats have pages, so a file really named 'a#page=2.jpg' is left alone
+    if match is None or not match.group(1).lower().endswith(MULTI_PAGE_EXTENSIONS):
+        return image_path, None
+    return match.group(1), int(match.group(2))
+
+
+def source_file(image_path: str) -> str:
+    """Get the file an image or page lives in."""
+    return split_page_path(image_path)[0]
+
+
+def display_name(image_path: str) -> str:
+    """Short name for lists and titles, e.g. 'scan.pdf, page 2'."""
+    file_path, page = split_page_path(image_path)
+    name = os.path.basename(file_path)
+    return name if page is None else f"{name}, page {page}"
+
+
+def is_pdf(file_path: str) -> bool:
+    """Whether a file is a PDF, judged by its extension."""
+    return file_path.lower().endswith(".pdf")
+
+
+def _open_pdf(file_path: str):
+    """Open a PDF for reading pages; pdfium reads the file on demand. Caller holds _pdfium_lock."""
+    if pypdfium2 is None:
+        raise OSError("Reading PDF pages needs the pypdfium2 package (pip install pypdfium2)")
+    try:
+        return pypdfium2.PdfDocument(file_path)
+    except pypdfium2.PdfiumError as e:
+        raise OSError(f"Cannot read PDF {file_path}: {str(e)}") from e
+
+
+def _pdf_page(pdf, file_path: str, page: int):
+    """Get one page (1-based) of an open PDF."""
+    if not 1 <= page <= len(pdf):
+        raise OSError(f"{os.path.basename(file_path)} has no page {page}")
+    return pdf[page - 1]
+
+
+def count_pages(file_path: str) -> int:
+    """
+    Count the pages of a file without decoding them (1 for single images).
+    
+    Raises:
+        OSError: The file can't be read
+    """
+    if is_pdf(file_path):
+        with _pdfium_lock:
+            pdf = _open_pdf(file_path)
+            try:
+                return len(pdf)
+            finally:
+                pdf.close()
+    with PILImage.open(file_path) as img:
+        return getattr(img, "n_frames", 1)
+
+
+def _render_pdf_page(file_path: str, page: int, max_size: Optional[tuple]) -> PILImage.Image:
+    """Rasterize one PDF page at PDF_RENDER_DPI, or just large enough for max_size."""
+    with _pdfium_lock:
+        pdf = _open_pdf(file_path)
+        try:
+            pdf_page = _pdf_page(pdf, file_path, page)
+            try:
+                width, height = pdf_page.get_size()
+                scale = PDF_RENDER_DPI / POINTS_PER_INCH
+                if max_size is not None:
+                    # Twice the target so downscaling still has detail to work with
+                    scale = min(scale, 2 * min(max_size[0] / width, max_size[1] / height))
+                # RGB bitmaps are copied out of pdfium's buffer, so the image outlives the document
+                return pdf_page.render(scale=scale).to_pil()
+            finally:
+                pdf_page.close()
+        finally:
+            pdf.close()
+
+
+def open_image(image_path: str, max_size: Optional[tuple] = None) -> PILImage.Image:
+    """
+    Open an image file or one page of a multi-page file.
+    A TIFF page is seeked to, so only its frame is decoded; a PDF page is
+    rasterized on the spot. Nothing else of the file is loaded.
+    
+    Args:
+        image_path: Path to an image, or a page path (see page_path)
+        max_size: (width, height) the caller will scale to, so PDF pages
+            aren't rasterized larger than needed (None = full resolution)
+    
+    Raises:
+        OSError: The file or page can't be read
+    """
+    file_path, page = split_page_path(image_path)
+    if is_pdf(file_path):
+        return _render_pdf_page(file_path, page or 1, max_size)
+    img = PILImage.open(file_path)
+    if page is not None:
+        try:
+            img.seek(page - 1)
+        except EOFError:
+            img.close()
+            raise OSError(f"{os.path.basename(file_path)} has no page {page}") from None
+    return img
+
+
+def image_size(image_path: str) -> tuple[int, int, int]:
+    """
+    Get an image's or page's (width, height, bands) without decoding it.
+    PDF pages report the size they are rasterized at.
+    """
+    file_path, page = split_page_path(image_path)
+    if is_pdf(file_path):
+        with _pdfium_lock:
+            pdf = _open_pdf(file_path)
+            try:
+                width, height = _pdf_page(pdf, file_path, page or 1).get_size()
+            finally:
+                pdf.close()
+        scale = PDF_RENDER_DPI / POINTS_PER_INCH
+        # Rounded up, as pdfium sizes the bitmap
+        return math.ceil(width * scale), math.ceil(height * scale), 3
+    with open_image(image_path) as img:
+        return img.width, img.height, len(img.getbands())
+
+
+def encode_page(img: PILImage.Image) -> dict:
+    """
+    Encode one page for upload: black-and-white and grey pages as PNG,
+    which stays small and sharp for text, colour pages as JPEG.
+    
+    Returns:
+        Payload dict with mime_type and data, as Gemini expects it
+    """
+    buffer = io.BytesIO()
+    if img.mode in ("1", "L"):
+        img.save(buffer, "PNG")
+        return {"mime_type": "image/png", "data": buffer.getvalue()}
+    img.convert("RGB").save(buffer, "JPEG", quality=PAGE_JPEG_QUALITY)
+    return {"mime_type": "image/jpeg", "data": buffer.getvalue()}
+
+
+def load_payload(image_path: str) -> dict:
+    """
+    Read an image's upload payload from disk: the file's own bytes, or for
+    a page of a multi-page file, that page decoded and encoded on its own.
+    """
+    if split_page_path(image_path)[1] is not None:
+        with open_image(image_path) as img:
+            return encode_page(img)
+    with PILImage.open(image_path) as img:
+        mime_type = img.get_format_mimetype()
+    with open(image_path, "rb") as f:
+        return {"mime_type": mime_type, "data": f.read()}
@@ -1,4 +1,9 @@
 import re
+from functools import lru_cache
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+from constants import MARKDOWN_CACHE_SIZE
 
 
 def convert_markdown_bold_to_html(text: str) -> str:
@@ -18,3 +23,188 @@ def is_essay_assignment(text: str) -> bool:
     text_lower = text.lower()
     return any(keyword in text_lower for keyword in essay_keywords)
 
+
+def is_short_answer_exercise(text: str) -> bool:
+    """Check if the exercise asks for short answers (gaps, choices, matching)."""
+    short_answer_keywords = [
+        'fill in', 'blank', 'gap', 'choose', 'circle', 'underline', 'match',
+        'true or false', 'one word', 'short answer', 'complete the sentences'
+    ]
+    text_lower = text.lower()
+    return any(keyword in text_lower for keyword in short_answer_keywords)
+
+
+class Span(NamedTuple):
+    """A run of answer text with one inline style."""
+    text: str
+    bold: bool = False
+    italic: bool = False
+
+
+class Block(NamedTuple):
+    """
+    One line of an answer.
+    kind is 'paragraph', 'heading', 'list_item' or 'blank'; headings carry
+    their level and list items their number marker (e.g. '1.').
+    """
+    kind: str
+    spans: tuple[Span, ...] = ()
+    level: int = 0
+    marker: str = ""
+
+
+_HEADING_RE = re.compile(r'(#{1,6})\s+(.*)')
+_LIST_ITEM_RE = re.compile(r'(\d{1,3}[.)])\s+(.*)')
+_DELIMITER_RE = re.compile(r'\*+|_+')
+
+
+def _parse_inline(line: str) -> tuple[Span, ...]:
+    """
+    Parse bold (** or __) and italics (* or _) in one line.
+    Single pass over delimiter runs with a stack that holds at most one
+    opener per kind, so it stays linear however many stray markers there are.
+    Unmatched markers are kept as literal text.
+    """
+    if '*' not in line and '_' not in line:
+        return (Span(line),)
+    
+    pieces: list = []  # Text strings, or [kind, 'open'|'close'] markers
+    stack: list[tuple[str, int]] = []  # (kind, index in pieces) of unmatched openers
+    length = len(line)
+    pos = 0
+    
+    for run in _DELIMITER_RE.finditer(line):
+        start, end = run.span()
+        if start > pos:
+            pieces.append(line[pos:start])
+        char = line[start]
+        count = end - start
+        before = line[start - 1] if start > 0 else ' '
+        after = line[end] if end < length else ' '
+        can_open = not after.isspace()
+        can_close = not before.isspace()
+        if char == '_':
+            # Underscores inside words (snake_case) are never emphasis
+            can_open = can_open and not before.isalnum()
+            can_close = can_close and not after.isalnum()
+        
+        # Close the innermost openers this run can match
+        while count:
+            match = None
+            for depth in range(len(stack) - 1, -1, -1):
+                kind, idx = stack[depth]
+                if kind[0] != char or idx == len(pieces) - 1:
+                    continue
+                if len(kind) == 2 and count >= 2 and (char == '*' or can_close):
+                    match = depth
+                elif len(kind) == 1 and count != 2 and can_close:
+                    # A pair of markers closes bold before it closes italics
+                    match = depth
+                if match is not None:
+                    break
+            if match is None:
+                break
+            kind, idx = stack[match]
+            del stack[match:]  # Openers inside the match stay literal text
+            pieces[idx] = [kind, 'open']
+            pieces.append([kind, 'close'])
+            count -= len(kind)
+        
+        # Open with what is left
+        open_kinds = {kind for kind, _ in stack}
+        if count >= 2 and char * 2 not in open_kinds and (char == '*' or can_open):
+            stack.append((char * 2, len(pieces)))
+            pieces.append(char * 2)
+            count -= 2
+        if count == 1 and char not in open_kinds and can_open:
+            stack.append((char, len(pieces)))
+            pieces.append(char)
+            count -= 1
+        if count:
+            pieces.append(char * count)
+        pos = end
+    
+    if pos < length:
+        pieces.append(line[pos:])
+    
+    # Unmatched openers are still plain strings, i.e. literal text
+    spans: list[Span] = []
+    texts: list[str] = []
+    bold = italic = 0
+    for piece in pieces:
+        if isinstance(piece, str):
+            texts.append(piece)
+            continue
+        if texts:
+            spans.append(Span(''.join(texts), bold > 0, italic > 0))
+            texts = []
+        step = 1 if piece[1] == 'open' else -1
+        if len(piece[0]) == 2:
+            bold += step
+        else:
+            italic += step
+    if texts:
+        spans.append(Span(''.join(texts), bold > 0, italic > 0))
+    return tuple(spans)
+
+
+@lru_cache(maxsize=MARKDOWN_CACHE_SIZE)
+def parse_markdown(text: str) -> tuple[Block, ...]:
+    """
+    Parse an answer into blocks, one per line.
+    Results are cached, so the PDF and Word renderers share one parse.
+    """
+    blocks = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            blocks.append(Block('blank'))
+            continue
+        heading = _HEADING_RE.fullmatch(line)
+        if heading:
+            blocks.append(Block('heading', _parse_inline(heading.group(2)), level=len(heading.group(1))))
+            continue
+        item = _LIST_ITEM_RE.fullmatch(line)
+        if item:
+            blocks.append(Block('list_item', _parse_inline(item.group(2)), marker=item.group(1)))
+            continue
+        blocks.append(Block('paragraph', _parse_inline(line)))
+    return tuple(blocks)
+
+
+def block_runs(block: Block) -> list[Span]:
+    """
+    Get the runs to draw for a block.
+    Headings are bold and list items start with their marker, merged into
+    the first run when it is plain so the text reads as it was written.
+    """
+    spans = list(block.spans)
+    if block.kind == 'heading':
+        spans = []
+        for span in block.spans:
+            if spans and spans[-1].italic == span.italic:
+                spans[-1] = spans[-1]._replace(text=spans[-1].text + span.text)
+            else:
+                spans.append(span._replace(bold=True))
+    elif block.kind == 'list_item':
+        if spans and not spans[0].bold and not spans[0].italic:
+            spans[0] = spans[0]._replace(text=f"{block.marker} {spans[0].text}")
+        else:
+            spans.insert(0, Span(f"{block.marker} "))
+    return spans
+
+
+def to_reportlab_markup(blocks: tuple[Block, ...]) -> str:
+    """Render parsed blocks as escaped reportlab paragraph markup."""
+    lines = []
+    for block in blocks:
+        parts = []
+        for span in block_runs(block):
+            text = escape(span.text)
+            if span.italic:
+                text = f"<i>{text}</i>"
+            if span.bold:
+                text = f"<b>{text}</b>"
+            parts.append(text)
+        lines.append(''.join(parts))
+    return '<br/>'.join(lines)
@@ -0,0 +1,211 @@
+import os
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import BinaryIO, Optional, Union
+from PIL import ExifTags, ImageOps, Image as PILImage
+from PIL.PngImagePlugin import PngInfo
+
+from utils.page_utils import open_image, split_page_path
+from constants import THUMBNAIL_SIZE, THUMBNAIL_MEMORY_CACHE_SIZE, THUMBNAIL_CACHE_DIR
+
+
+def make_thumbnail(
+    source: Union[str, BinaryIO],
+    thumbnail_size: tuple = THUMBNAIL_SIZE,
+    reducing_gap: Optional[float] = None
+) -> PILImage.Image:
+    """
+    Decode an image and scale it down to fit thumbnail_size, as an RGB image
+    turned upright according to its EXIF orientation.
+    JPEGs are decoded at reduced resolution (1/2 to 1/8 scale) so a small
+    thumbnail never pays for a full-size decode. A reducing_gap (see
+    PIL.Image.thumbnail) trades some quality for speed on large targets.
+    
+    Args:
+        source: Path to the image file (or page), or the file's contents as a file object
+        thumbnail_size: (width, height) the thumbnail must fit in
+        reducing_gap: See PIL.Image.thumbnail (None = full-quality resampling)
+    """
+    # Closing releases the file and the decoded data
+    with (open_image(source, thumbnail_size) if isinstance(source, str) else PILImage.open(source)) as img:
+        if img.getexif().get(ExifTags.Base.Orientation, 1) in (5, 6, 7, 8):
+            # Rotated a quarter turn: the stored width becomes the shown height
+            thumbnail_size = (thumbnail_size[1], thumbnail_size[0])
+        # Decode at the smallest DCT scale still at least twice the thumbnail, then LANCZOS the rest
+        img.draft('RGB', (thumbnail_size[0] * 2, thumbnail_size[1] * 2))
+        img.thumbnail(thumbnail_size, PILImage.Resampling.LANCZOS, reducing_gap=reducing_gap)
+        return ImageOps.exif_transpose(img).convert('RGB')
+
+
+class ThumbnailCache:
+    """
+    Thumbnails keyed by image path, modification time, file size and thumbnail size.
+    An in-memory LRU sits in front of PNG files on disk laid out like the
+    freedesktop thumbnail spec: the file is named after the MD5 of the image's
+    file URI and carries Thumb::URI, Thumb::MTime and Thumb::Size, which are
+    checked on read so an edited image is never shown with a stale thumbnail.
+    Thread-safe.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Optional[str] = THUMBNAIL_CACHE_DIR,
+        max_entries: int = THUMBNAIL_MEMORY_CACHE_SIZE
+    ):
+        """
+        Initialize thumbnail cache.
+        
+        Args:
+            cache_dir: Where thumbnails are stored (None = memory only)
+            max_entries: Maximum number of thumbnails kept in memory
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, PILImage.Image] = OrderedDict()
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+    
+    def _thumbnail_path(self, uri: str, thumbnail_size: tuple) -> str:
+        """Get the on-disk location of an image's thumbnail."""
+        name = hashlib.md5(uri.encode("utf-8")).hexdigest() + ".png"
+        return os.path.join(self.cache_dir, f"{thumbnail_size[0]}x{thumbnail_size[1]}", name)
+    
+    def _memory_get(self, key: tuple) -> Optional[PILImage.Image]:
+        with self.lock:
+            thumbnail = self._entries.get(key)
+            if thumbnail is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+            return thumbnail
+    
+    def _memory_put(self, key: tuple, thumbnail: PILImage.Image):
+        with self.lock:
+            self._entries[key] = thumbnail
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def peek(self, image_path: str, thumbnail_size: tuple = THUMBNAIL_SIZE) -> Optional[PILImage.Image]:
+        """Get a thumbnail only if it is already in memory (no disk access beyond a stat)."""
+        try:
+            image_path = os.path.abspath(image_path)
+            stat = os.stat(split_page_path(image_path)[0])
+        except OSError:
+            return None
+        return self._memory_get((image_path, stat.st_mtime_ns, stat.st_size, tuple(thumbnail_size)))
+    
+    @staticmethod
+    def _read(path: str, uri: str, mtime: int, size: int) -> Optional[PILImage.Image]:
+        """Read a thumbnail from disk if it exists and still matches the image."""
+        try:
+            with PILImage.open(path) as img:
+                info = img.info
+                if (
+                    info.get("Thumb::URI") != uri
+                    or info.get("Thumb::MTime") != str(mtime)
+                    or info.get("Thumb::Size") != str(size)
+                ):
+                    return None
+                return img.convert('RGB')
+        except (OSError, ValueError):
+            return None
+    
+    @staticmethod
+    def _write(path: str, thumbnail: PILImage.Image, uri: str, mtime: int, size: int):
+        """Write a thumbnail atomically so readers never see a partial file."""
+        info = PngInfo()
+        info.add_text("Thumb::URI", uri)
+        info.add_text("Thumb::MTime", str(mtime))
+        info.add_text("Thumb::Size", str(size))
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(suffix=".png", dir=os.path.dirname(path))
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    thumbnail.save(f, "PNG", pnginfo=info)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except OSError as e:
+            # A read-only or full cache directory only costs regenerating next time
+            print(f"Could not cache thumbnail: {str(e)}")
+    
+    def get(
+        self,
+        image_path: str,
+        thumbnail_size: tuple = THUMBNAIL_SIZE,
+        source: Optional[BinaryIO] = None
+    ) -> PILImage.Image:
+        """
+        Get the thumbnail of an image, generating and storing it on a miss.
+        
+        Args:
+            image_path: Path to the image file, or a page path (see utils.page_utils)
+            thumbnail_size: (width, height) the thumbnail must fit in
+            source: The file's contents, already read, to decode on a miss instead of opening the file
+        
+        Returns:
+            RGB thumbnail (shared; don't modify it)
+        """
+        thumbnail_size = tuple(thumbnail_size)
+        image_path = os.path.abspath(image_path)
+        file_path, page = split_page_path(image_path)
+        stat = os.stat(file_path)
+        key = (image_path, stat.st_mtime_ns, stat.st_size, thumbnail_size)
+        
+        thumbnail = self._memory_get(key)
+        if thumbnail is not None:
+            return thumbnail
+        
+        if self.cache_dir:
+            # Pages of one file are told apart by a URI fragment, as in 'file:///scan.pdf#page=2'
+            uri = Path(file_path).as_uri() + ("" if page is None else f"#page={page}")
+            mtime = int(stat.st_mtime)
+            path = self._thumbnail_path(uri, thumbnail_size)
+            thumbnail = self._read(path, uri, mtime, stat.st_size)
+            if thumbnail is not None:
+                with self.lock:
+                    self.disk_hits += 1
+            else:
+                thumbnail = make_thumbnail(image_path if source is None else source, thumbnail_size)
+                self._write(path, thumbnail, uri, mtime, stat.st_size)
+                with self.lock:
+                    self.misses += 1
+        else:
+            thumbnail = make_thumbnail(image_path if source is None else source, thumbnail_size)
+            with self.lock:
+                self.misses += 1
+        
+        self._memory_put(key, thumbnail)
+        return thumbnail
+    
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._entries)
+    
+    def clear(self):
+        """Drop the in-memory thumbnails (files on disk are kept)."""
+        with self.lock:
+            self._entries.clear()
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+
+_thumbnail_cache: Optional[ThumbnailCache] = None
+_thumbnail_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Get the process-wide thumbnail cache."""
+    global _thumbnail_cache
+    with _thumbnail_cache_lock:
+        if _thumbnail_cache is None:
+            _thumbnail_cache = ThumbnailCache()
+        return _thumbnail_cache